@@ -0,0 +1,106 @@
+"""This module refreshes the character summaries of many agents at once, such as every agent that has
+a memories database and a character summary. Each summary only determines again the attributes whose inputs changed.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import os
+import re
+from datetime import datetime
+
+from character_summaries.character_summary_creator import CharacterSummaryCreator
+from defines.defines import MAX_CONCURRENT_CHARACTER_SUMMARY_REFRESHES
+from llms.interface import AIModelInterface
+from paths.full_paths import (
+    get_base_memories_directory,
+    get_character_summary_full_path,
+)
+from vector_databases.memory_service_client import MemoryServiceClient
+
+BASE_MEMORIES_FILE_SUFFIX = "_memories.ann"
+CHARACTER_SUMMARY_NAME_PATTERN = re.compile(r"^Name: (?P<name>.+) \(age [^)]*\)$")
+
+
+def _read_name_from_character_summary(agent_file_name: str) -> str | None:
+    try:
+        with open(
+            get_character_summary_full_path(agent_file_name), "r", encoding="utf-8"
+        ) as file:
+            first_line = file.readline().strip()
+    except OSError:
+        return None
+
+    match = CHARACTER_SUMMARY_NAME_PATTERN.match(first_line)
+
+    return match.group("name") if match else None
+
+
+def determine_names_of_agents_with_memories() -> list[str]:
+    """Determines the names of every agent that has both a memories database and a character summary.
+    The names are read from the character summaries, because the file names lose their capitalization.
+    Memories databases without a character summary (such as those of test fixtures) are left out;
+    their summaries can be created one by one.
+
+    Returns:
+        list[str]: the names of the agents, in alphabetical order.
+    """
+    base_memories_directory = get_base_memories_directory()
+
+    if not os.path.isdir(base_memories_directory):
+        return []
+
+    agent_names = (
+        _read_name_from_character_summary(file_name[: -len(BASE_MEMORIES_FILE_SUFFIX)])
+        for file_name in os.listdir(base_memories_directory)
+        if file_name.endswith(BASE_MEMORIES_FILE_SUFFIX)
+    )
+
+    return sorted(agent_name for agent_name in agent_names if agent_name is not None)
+
+
+def refresh_character_summaries(
+    current_timestamp: datetime,
+    agent_names: list[str] | None = None,
+    max_workers: int = MAX_CONCURRENT_CHARACTER_SUMMARY_REFRESHES,
+    ai_model_interface: AIModelInterface | None = None,
+    regenerate_all: bool = False,
+    memory_service_client: MemoryServiceClient | None = None,
+) -> dict[str, list[str]]:
+    """Refreshes the character summaries of several agents using a pool of workers.
+
+    Args:
+        current_timestamp (datetime): the current timestamp.
+        agent_names (list[str] | None): the names of the agents whose summaries will be refreshed.
+            If None, every agent that has a memories database and a character summary.
+        max_workers (int): how many summaries can be refreshed at the same time.
+        ai_model_interface (AIModelInterface | None): the interface to request responses from the AI model.
+            If None, GPT is used.
+        regenerate_all (bool): whether to determine every attribute again, regardless of the fingerprints.
+        memory_service_client (MemoryServiceClient | None): the client of a running memory service that
+            will query the memories databases. If None, they are loaded in this process.
+
+    Returns:
+        dict[str, list[str]]: the names of the attributes that were determined again, by agent.
+    """
+    if agent_names is None:
+        agent_names = determine_names_of_agents_with_memories()
+
+    if not agent_names:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        refresh_futures = {
+            agent_name: executor.submit(
+                CharacterSummaryCreator(
+                    agent_name,
+                    current_timestamp,
+                    ai_model_interface,
+                    memory_service_client,
+                ).create,
+                regenerate_all,
+            )
+            for agent_name in agent_names
+        }
+
+        return {
+            agent_name: refresh_future.result()
+            for agent_name, refresh_future in refresh_futures.items()
+        }
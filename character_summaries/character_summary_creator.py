@@ -1,29 +1,42 @@
 """This module contains the definition of a CharacterSummaryCreator, that handles creating and saving to a file
 the character summary for any given character.
 """
+from concurrent.futures import ThreadPoolExecutor
 import os
 from datetime import datetime
 
+from character_summaries.fingerprints import (
+    load_character_summary_fingerprints,
+    save_character_summary_fingerprints,
+)
 from defines.defines import (
+    DEFAULT_TEMPERATURE,
     GPT_3_5,
     GPT_4,
     SYSTEM_ROLE,
     USER_ROLE,
 )
-from llms.api_requests import request_ai_response_with_functions
 from llms.functions import append_function
+from llms.gpt_responder import GPTResponder
+from llms.interface import AIModelInterface
 from llms.messages import (
     get_message_from_gpt_response,
     load_arguments_of_message_with_function_call,
 )
+from llms.request_keys import determine_request_key
 from vector_databases.database_loader import DatabaseLoader
 from vector_databases.database_querier import DatabaseQuerier
+from vector_databases.database_updater import DatabaseUpdater
+from vector_databases.memory_service_client import MemoryServiceClient
 
 from paths.full_paths import (
     get_base_memories_full_path,
+    get_base_memories_json_full_path,
     get_character_summary_full_path,
 )
 
+NUMBER_OF_MEMORIES_FOR_CHARACTER_ATTRIBUTE_QUERY = 30
+
 CHARACTER_AGE_DETERMINER_GPT_SYSTEM_CONTENT = "I am CharacterAgeDeterminerGPT. I have the responsibility of extracting the age of a character from a list of memories."
 GET_CHARACTER_AGE_FUNCTION_NAME = "get_character_age"
 GET_CHARACTER_AGE_FUNCTION_DESCRIPTION = "Gets the character's numerical age from a list of memories belonging to that character."
@@ -73,33 +86,46 @@ TRAITS_PARAMETER_DESCRIPTION = (
 class CharacterSummaryCreator:
     """This class handles creating and saving to file the character summary for any given character."""
 
-    def __init__(self, agent_name: str, current_timestamp: datetime):
+    def __init__(
+        self,
+        agent_name: str,
+        current_timestamp: datetime,
+        ai_model_interface: AIModelInterface | None = None,
+        memory_service_client: MemoryServiceClient | None = None,
+    ):
         """Creates an instance of the class CharacterSummaryCreator
 
         Args:
             agent_name (str): the name of the agent whose character summary will be created.
             current_timestamp (datetime): the current timestamp.
+            ai_model_interface (AIModelInterface | None): the interface to request responses from the AI model.
+                If None, GPT is used.
+            memory_service_client (MemoryServiceClient | None): the client of a running memory service that
+                will query the memories database. If None, the memories database is loaded in this process.
 
         Raises:
             FileNotFoundError: if the memories database doesn't exist for the given character.
         """
-        # First ensure that a memories database exists for this agent.
-        if not os.path.isfile(get_base_memories_full_path(agent_name)):
+        # First ensure that a memories database exists for this agent. The memory service checks it on its own.
+        if memory_service_client is None and not os.path.isfile(
+            get_base_memories_full_path(agent_name)
+        ):
             error_message = f"The class {CharacterSummaryCreator.__name__} failed to find a memories database at {get_base_memories_full_path(agent_name)}"
             raise FileNotFoundError(error_message)
 
         self._agent_name = agent_name
         self._current_timestamp = current_timestamp
+        self._ai_model_interface = ai_model_interface or GPTResponder()
+        self._memory_service_client = memory_service_client
 
-    def _determine_character_attribute(
-        self, determine_character_attribute_parameters: dict
-    ):
-        """Relies on the AI model to determine a character attribute.
+    def _create_request_of_character_attribute(
+        self, determine_character_attribute_parameters: dict, query_results: list[str]
+    ) -> dict:
+        """Creates the request to the AI model that determines a character attribute.
 
         Args:
             determine_character_attribute_parameters (dict): contains all the necessary arguments for this function.
                 The keys for this dict are the following:
-                'memories_database_querier'
                 'query'
                 'system_content'
                 'function_name'
@@ -108,14 +134,11 @@ class CharacterSummaryCreator:
                 'parameter_type'
                 'parameter_description'
                 'model'
+            query_results (list[str]): the memories of the character returned for the query of the attribute.
 
         Returns:
-            str or int: the character's attribute determined by the AI.
+            dict: the request, with the keys 'messages', 'functions', 'function_call' and 'model'.
         """
-        query_results = determine_character_attribute_parameters[
-            "memories_database_querier"
-        ].query(determine_character_attribute_parameters["query"], 30)
-
         messages = []
         messages.append(
             {
@@ -125,9 +148,11 @@ class CharacterSummaryCreator:
         )
 
         user_content = f"Determine {determine_character_attribute_parameters['parameter_description']} of {self._agent_name} "
+        # The memories are sorted so that the same set of memories always produces the same prompt,
+        # regardless of how their scores shifted since the last time.
         user_content += (
             "given the following list of memories of that character:\n"
-            + " ".join(query_results)
+            + " ".join(sorted(query_results))
         )
         messages.append(
             {
@@ -152,13 +177,33 @@ class CharacterSummaryCreator:
             ],
         )
 
-        response = request_ai_response_with_functions(
-            messages,
-            functions,
-            function_call={
+        return {
+            "messages": messages,
+            "functions": functions,
+            "function_call": {
                 "name": determine_character_attribute_parameters["function_name"]
             },
-            model=determine_character_attribute_parameters["model"],
+            "model": determine_character_attribute_parameters["model"],
+        }
+
+    def _determine_character_attribute(
+        self, determine_character_attribute_parameters: dict, request: dict
+    ):
+        """Relies on the AI model to determine a character attribute.
+
+        Args:
+            determine_character_attribute_parameters (dict): the parameters of the attribute.
+            request (dict): the request that determines the attribute, as created by
+                '_create_request_of_character_attribute'.
+
+        Returns:
+            str or int: the character's attribute determined by the AI.
+        """
+        response = self._ai_model_interface.request_response_using_functions(
+            request["messages"],
+            request["functions"],
+            request["function_call"],
+            request["model"],
         )
 
         function_arguments = load_arguments_of_message_with_function_call(
@@ -169,20 +214,24 @@ class CharacterSummaryCreator:
             determine_character_attribute_parameters["parameter_name"]
         )
 
-    def _determine_character_traits(
-        self, memories_database_querier: DatabaseQuerier
-    ):
-        """Relies on the AI model to determine the character's traits.
-
-        Args:
-            memories_database_querier (MemoriesDatabaseQuerier): an instance of the class that handles queries to the memories database.
+    def _create_character_attribute_parameters(self) -> dict[str, dict]:
+        """Creates the parameters with which every attribute of the character will be determined.
 
         Returns:
-            str: the character's traits, as a list of adjectives.
+            dict[str, dict]: the parameters of every attribute, keyed by the name of the attribute.
         """
-        return self._determine_character_attribute(
-            {
-                "memories_database_querier": memories_database_querier,
+        return {
+            "age": {
+                "query": f"{self._agent_name}'s current age.",
+                "system_content": CHARACTER_AGE_DETERMINER_GPT_SYSTEM_CONTENT,
+                "function_name": GET_CHARACTER_AGE_FUNCTION_NAME,
+                "function_description": GET_CHARACTER_AGE_FUNCTION_DESCRIPTION,
+                "parameter_name": AGE_PARAMETER_NAME,
+                "parameter_type": "integer",
+                "parameter_description": AGE_PARAMETER_DESCRIPTION,
+                "model": GPT_3_5,
+            },
+            "traits": {
                 "query": f"{self._agent_name}'s traits.",
                 "system_content": CHARACTER_TRAITS_GPT_SYSTEM_CONTENT,
                 "function_name": GET_CHARACTER_TRAITS_FUNCTION_NAME,
@@ -191,23 +240,28 @@ class CharacterSummaryCreator:
                 "parameter_type": "string",
                 "parameter_description": TRAITS_PARAMETER_DESCRIPTION,
                 "model": GPT_3_5,
-            }
-        )
-
-    def _determine_recent_progress_in_life(
-        self, memories_database_querier: DatabaseQuerier
-    ):
-        """Relies on the AI model to determine the character's recent progress in life.
-
-        Args:
-            memories_database_querier (MemoriesDatabaseQuerier): an instance of the class that handles queries to the memories database.
-
-        Returns:
-            str: the character's recent progress in life.
-        """
-        return self._determine_character_attribute(
-            {
-                "memories_database_querier": memories_database_querier,
+            },
+            "core_characteristics": {
+                "query": f"{self._agent_name}'s core characteristics.",
+                "system_content": CHARACTER_CORE_CHARACTERISTICS_GPT_SYSTEM_CONTENT,
+                "function_name": GET_CHARACTER_CORE_CHARACTERISTICS_FUNCTION_NAME,
+                "function_description": GET_CHARACTER_CORE_CHARACTERISTICS_FUNCTION_DESCRIPTION,
+                "parameter_name": CORE_CHARACTERISTICS_PARAMETER_NAME,
+                "parameter_type": "string",
+                "parameter_description": CORE_CHARACTERISTICS_PARAMETER_DESCRIPTION,
+                "model": GPT_4,
+            },
+            "daily_occupation": {
+                "query": f"{self._agent_name}'s current daily occupation.",
+                "system_content": CHARACTER_DAILY_OCCUPATION_GPT_SYSTEM_CONTENT,
+                "function_name": GET_CHARACTER_DAILY_OCCUPATION_FUNCTION_NAME,
+                "function_description": GET_CHARACTER_DAILY_OCCUPATION_FUNCTION_DESCRIPTION,
+                "parameter_name": DAILY_OCCUPATION_PARAMETER_NAME,
+                "parameter_type": "string",
+                "parameter_description": DAILY_OCCUPATION_PARAMETER_DESCRIPTION,
+                "model": GPT_4,
+            },
+            "recent_progress_in_life": {
                 "query": f"{self._agent_name}'s feeling about his or her recent progress in life.",
                 "system_content": CHARACTER_RECENT_PROGRESS_IN_LIFE_GPT_SYSTEM_CONTENT,
                 "function_name": GET_CHARACTER_RECENT_PROGRESS_IN_LIFE_FUNCTION_NAME,
@@ -216,123 +270,155 @@ class CharacterSummaryCreator:
                 "parameter_type": "string",
                 "parameter_description": RECENT_PROGRESS_IN_LIFE_PARAMETER_DESCRIPTION,
                 "model": GPT_4,
-            }
-        )
+            },
+        }
 
-    def _determine_current_daily_occupation(
-        self, memories_database_querier: DatabaseQuerier
-    ):
-        """Relies on the AI model to determine the character's daily occupation.
+    def _query_memories_of_character_attributes(
+        self, character_attribute_parameters: dict[str, dict]
+    ) -> dict[str, list[str]]:
+        """Queries the memories database for every attribute of the character, encoding all the queries at once.
 
         Args:
-            memories_database_querier (MemoriesDatabaseQuerier): an instance of the class that handles queries to the memories database.
+            character_attribute_parameters (dict[str, dict]): the parameters of every attribute.
 
         Returns:
-            str: the character's current daily occupation.
+            dict[str, list[str]]: the memories returned for every attribute, keyed by the name of the attribute.
         """
-        return self._determine_character_attribute(
-            {
-                "memories_database_querier": memories_database_querier,
-                "query": f"{self._agent_name}'s current daily occupation.",
-                "system_content": CHARACTER_DAILY_OCCUPATION_GPT_SYSTEM_CONTENT,
-                "function_name": GET_CHARACTER_DAILY_OCCUPATION_FUNCTION_NAME,
-                "function_description": GET_CHARACTER_DAILY_OCCUPATION_FUNCTION_DESCRIPTION,
-                "parameter_name": DAILY_OCCUPATION_PARAMETER_NAME,
-                "parameter_type": "string",
-                "parameter_description": DAILY_OCCUPATION_PARAMETER_DESCRIPTION,
-                "model": GPT_4,
+        if self._memory_service_client is not None:
+            return {
+                attribute_name: self._memory_service_client.query(
+                    self._agent_name,
+                    self._current_timestamp,
+                    parameters["query"],
+                    NUMBER_OF_MEMORIES_FOR_CHARACTER_ATTRIBUTE_QUERY,
+                )
+                for attribute_name, parameters in character_attribute_parameters.items()
             }
-        )
 
-    def _determine_character_age(
-        self, memories_database_querier: DatabaseQuerier
-    ):
-        """Relies on the AI model to determine the character's age
+        database_full_path = get_base_memories_full_path(self._agent_name)
+        database_json_full_path = get_base_memories_json_full_path(self._agent_name)
 
-        Args:
-            memories_database_querier (MemoriesDatabaseQuerier): an instance of the class that handles queries to the memories database.
+        index, raw_memories = DatabaseLoader(
+            self._agent_name, database_full_path, database_json_full_path
+        ).load()
 
-        Returns:
-            int: the character's age.
-        """
-        # Determine the character's age
-        return self._determine_character_attribute(
-            {
-                "memories_database_querier": memories_database_querier,
-                "query": f"{self._agent_name}'s current age.",
-                "system_content": CHARACTER_AGE_DETERMINER_GPT_SYSTEM_CONTENT,
-                "function_name": GET_CHARACTER_AGE_FUNCTION_NAME,
-                "function_description": GET_CHARACTER_AGE_FUNCTION_DESCRIPTION,
-                "parameter_name": AGE_PARAMETER_NAME,
-                "parameter_type": "integer",
-                "parameter_description": AGE_PARAMETER_DESCRIPTION,
-                "model": GPT_3_5,
-            }
+        database_updater = DatabaseUpdater(
+            self._current_timestamp, database_full_path, database_json_full_path
         )
 
-    def _determine_character_core_characteristics(
-        self, memories_database_querier: DatabaseQuerier
-    ):
-        """Relies on the AI model to determine the character's core characteristics.
+        try:
+            query_results = DatabaseQuerier(
+                self._current_timestamp,
+                raw_memories,
+                index,
+                database_full_path,
+                database_json_full_path,
+                database_updater,
+            ).query_many_with_scores(
+                [
+                    parameters["query"]
+                    for parameters in character_attribute_parameters.values()
+                ],
+                NUMBER_OF_MEMORIES_FOR_CHARACTER_ATTRIBUTE_QUERY,
+            )
+        finally:
+            # Make sure to unload the database.
+            index.unload()
+
+        database_updater.flush()
+
+        return {
+            attribute_name: [description for description, _ in results]
+            for attribute_name, results in zip(
+                character_attribute_parameters, query_results
+            )
+        }
+
+    def create(self, regenerate_all: bool = False) -> list[str]:
+        """Creates and saves to file the character summary of the passed character. Only the attributes whose
+        retrieved memories or prompt changed since the last time are determined again; the rest are reused
+        from the fingerprints of the summary.
 
         Args:
-            memories_database_querier (MemoriesDatabaseQuerier): an instance of the class that handles queries to the memories database.
+            regenerate_all (bool): whether to determine every attribute again, regardless of the fingerprints.
 
         Returns:
-            str: the character's core characteristics.
+            list[str]: the names of the attributes that were determined again.
         """
-        return self._determine_character_attribute(
-            {
-                "memories_database_querier": memories_database_querier,
-                "query": f"{self._agent_name}'s core characteristics.",
-                "system_content": CHARACTER_CORE_CHARACTERISTICS_GPT_SYSTEM_CONTENT,
-                "function_name": GET_CHARACTER_CORE_CHARACTERISTICS_FUNCTION_NAME,
-                "function_description": GET_CHARACTER_CORE_CHARACTERISTICS_FUNCTION_DESCRIPTION,
-                "parameter_name": CORE_CHARACTERISTICS_PARAMETER_NAME,
-                "parameter_type": "string",
-                "parameter_description": CORE_CHARACTERISTICS_PARAMETER_DESCRIPTION,
-                "model": GPT_4,
-            }
+        character_attribute_parameters = self._create_character_attribute_parameters()
+
+        memories_of_attributes = self._query_memories_of_character_attributes(
+            character_attribute_parameters
         )
 
-    def create(self):
-        """Creates and saves to file the character summary of the passed character."""
-        # If a character summary already exists, this operation is going to overwrite it.
+        previous_fingerprints = (
+            {}
+            if regenerate_all
+            else load_character_summary_fingerprints(self._agent_name)
+        )
 
-        index, raw_memories = DatabaseLoader(self._agent_name).load()
+        fingerprints = {}
+        outdated_attributes = {}
 
-        memories_database_querier = DatabaseQuerier(
-            self._agent_name, self._current_timestamp, raw_memories, index
-        )
+        for attribute_name, parameters in character_attribute_parameters.items():
+            request = self._create_request_of_character_attribute(
+                parameters, memories_of_attributes[attribute_name]
+            )
+
+            # The fingerprint covers the retrieved memories as well as the whole prompt.
+            fingerprint = determine_request_key(
+                request["model"],
+                DEFAULT_TEMPERATURE,
+                request["messages"],
+                request["functions"],
+                request["function_call"],
+            )
 
-        # Determine the character's age.
-        age = self._determine_character_age(memories_database_querier)
+            previous_fingerprint = previous_fingerprints.get(attribute_name)
+
+            if (
+                isinstance(previous_fingerprint, dict)
+                and previous_fingerprint.get("fingerprint") == fingerprint
+                and "value" in previous_fingerprint
+            ):
+                fingerprints[attribute_name] = previous_fingerprint
+            else:
+                fingerprints[attribute_name] = {"fingerprint": fingerprint}
+                outdated_attributes[attribute_name] = request
+
+        # The attributes are independent of each other, so they get determined concurrently.
+        if outdated_attributes:
+            with ThreadPoolExecutor(max_workers=len(outdated_attributes)) as executor:
+                attribute_futures = {
+                    attribute_name: executor.submit(
+                        self._determine_character_attribute,
+                        character_attribute_parameters[attribute_name],
+                        request,
+                    )
+                    for attribute_name, request in outdated_attributes.items()
+                }
 
-        # Determine the character's traits.
-        traits = self._determine_character_traits(memories_database_querier)
+                for attribute_name, attribute_future in attribute_futures.items():
+                    fingerprints[attribute_name]["value"] = attribute_future.result()
 
-        # Determine the character's core characteristics.
-        core_characteristics = self._determine_character_core_characteristics(
-            memories_database_querier
-        )
+        attributes = {
+            attribute_name: fingerprint["value"]
+            for attribute_name, fingerprint in fingerprints.items()
+        }
 
-        # Determine the character's current daily occupation.
-        daily_occupation = self._determine_current_daily_occupation(
-            memories_database_querier
-        )
+        character_summary_full_path = get_character_summary_full_path(self._agent_name)
 
-        # Determine the character's feeling for his or her current progress in life.
-        recent_progress_in_life = self._determine_recent_progress_in_life(
-            memories_database_querier
-        )
+        if outdated_attributes or not os.path.isfile(character_summary_full_path):
+            # Save the character summary to a file.
+            character_summary = f"Name: {self._agent_name} (age {attributes['age']})\n"
+            character_summary += f"Traits: {attributes['traits']}\n"
+            character_summary += f"{attributes['core_characteristics']}\n"
+            character_summary += f"{attributes['daily_occupation']}\n"
+            character_summary += f"{attributes['recent_progress_in_life']}"
 
-        # Make sure to unload the database.
-        index.unload()
+            with open(character_summary_full_path, "w", encoding="utf-8") as file:
+                file.write(character_summary)
 
-        # Save the character summary to a file.
-        with open(
-            get_character_summary_full_path(self._agent_name), "w", encoding="utf-8"
-        ) as file:
-            file.write(
-                f"Name: {self._agent_name} (age {age})\nTraits: {traits}\n{core_characteristics}\n{daily_occupation}\n{recent_progress_in_life}"
-            )
+            save_character_summary_fingerprints(self._agent_name, fingerprints)
+
+        return list(outdated_attributes)
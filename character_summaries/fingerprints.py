@@ -0,0 +1,54 @@
+"""This module loads and saves the fingerprints of character summaries: a sidecar json file that records,
+for every attribute of the summary, the key of the request that determined it along with the resulting value.
+When the memories retrieved for an attribute and its prompt haven't changed, neither does the key,
+so the attribute doesn't need to be determined again.
+"""
+import json
+import os
+
+from paths.full_paths import get_character_summary_fingerprints_full_path
+
+
+def load_character_summary_fingerprints(agent_name: str) -> dict[str, dict]:
+    """Loads the fingerprints of the character summary of an agent.
+
+    Args:
+        agent_name (str): the name of the agent.
+
+    Returns:
+        dict[str, dict]: for every attribute, keyed by its name, a dict with its 'fingerprint' and 'value'.
+            It's empty if no fingerprints were saved, or if they couldn't be read.
+    """
+    try:
+        with open(
+            get_character_summary_fingerprints_full_path(agent_name),
+            "r",
+            encoding="utf-8",
+        ) as file:
+            fingerprints = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+    if not isinstance(fingerprints, dict):
+        return {}
+
+    return fingerprints
+
+
+def save_character_summary_fingerprints(
+    agent_name: str, fingerprints: dict[str, dict]
+):
+    """Saves the fingerprints of the character summary of an agent. The file is replaced atomically.
+
+    Args:
+        agent_name (str): the name of the agent.
+        fingerprints (dict[str, dict]): for every attribute, keyed by its name, a dict with its
+            'fingerprint' and 'value'.
+    """
+    fingerprints_full_path = get_character_summary_fingerprints_full_path(agent_name)
+    temporary_full_path = f"{fingerprints_full_path}.tmp"
+
+    with open(temporary_full_path, "w", encoding="utf-8") as file:
+        json.dump(fingerprints, file, ensure_ascii=False, indent=2, sort_keys=True)
+
+    os.replace(temporary_full_path, fingerprints_full_path)
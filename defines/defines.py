@@ -1,6 +1,5 @@
-from sentence_transformers import SentenceTransformer
-
-MODEL = SentenceTransformer("paraphrase-MiniLM-L6-v2")
+EMBEDDING_MODEL_NAME = "paraphrase-MiniLM-L6-v2"
+EMBEDDING_BATCH_SIZE = 64
 
 GPT_3_5 = "gpt-3.5-turbo-0613"
 GPT_4 = "gpt-4-0613"
@@ -14,11 +13,60 @@ USER_ROLE = "user"
 
 VECTOR_DIMENSIONS = 384
 NUMBER_OF_TREES = 10
+DELTA_SEGMENT_COMPACTION_THRESHOLD = 256
+EXACT_VECTOR_INDEX_MAX_ITEMS = 1000
 METRIC_ANGULAR = "angular"
 DECAY_RATE = 0.99
 
 NUMBER_OF_BASE_RESULTS_FOR_EVERY_QUERY = 50
 
+MAX_OPEN_MEMORY_STORES = 16
+
+MEMORY_SERVICE_HOST = "127.0.0.1"
+MEMORY_SERVICE_PORT = 8765
+MEMORY_SERVICE_TIMEOUT_SECONDS = 60.0
+MEMORY_SERVICE_CREATE_ENDPOINT = "/create"
+MEMORY_SERVICE_QUERY_ENDPOINT = "/query"
+MEMORY_SERVICE_UPDATE_ENDPOINT = "/update"
+MEMORY_SERVICE_FLUSH_ENDPOINT = "/flush"
+
+ACCESS_TIMESTAMPS_FLUSH_INTERVAL_SECONDS = 5.0
+ACCESS_TIMESTAMPS_FLUSH_THRESHOLD = 200
+
+STAND_IN_SERVER_HOST = "127.0.0.1"
+STAND_IN_SERVER_PORT = 8766
+STAND_IN_CHAT_COMPLETIONS_ENDPOINT = "/v1/chat/completions"
+
+# Per minute, as granted by the OpenAI account. Models not listed here use the default limits.
+AI_MODEL_RATE_LIMITS = {
+    GPT_3_5: {"requests_per_minute": 3500, "tokens_per_minute": 90000},
+    GPT_4: {"requests_per_minute": 200, "tokens_per_minute": 40000},
+}
+DEFAULT_AI_MODEL_RATE_LIMITS = {"requests_per_minute": 3500, "tokens_per_minute": 90000}
+MAX_CONCURRENT_AI_MODEL_REQUESTS_PER_MODEL = 16
+ESTIMATED_COMPLETION_TOKENS = 256
+# The whole context window, shared by the prompt and the completion (up to MAX_TOKENS).
+AI_MODEL_CONTEXT_WINDOWS = {GPT_3_5: 4096, GPT_4: 8192}
+DEFAULT_AI_MODEL_CONTEXT_WINDOW = 4096
+MAX_MEMORY_CONTEXT_TOKENS = 1000
+CHARACTERS_PER_TOKEN = 4
+# Text that isn't plain English (names, punctuation, json) takes up more tokens than the characters suggest.
+PROMPT_TOKEN_BUDGET_SAFETY_FACTOR = 0.85
+TOKENS_PER_MESSAGE = 4
+
+LLM_RESPONSE_CACHE_DIRECTORY = ".llm_response_cache"
+LLM_RESPONSE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+LLM_RESPONSE_CACHE_MAX_AGE_SECONDS = 30 * 24 * 60 * 60
+
+MAX_CONCURRENT_CHARACTER_SUMMARY_REFRESHES = 4
+
+DIALOGUE_SUMMARY_CHUNK_TOKENS = 1500
+MAX_CONCURRENT_DIALOGUE_SUMMARY_REQUESTS = 4
+DIALOGUE_CHUNK_SUMMARY_CACHE_MAX_ENTRIES = 1024
+
+IMPORTANCE_RATING_CHUNK_SIZE = 20
+MAX_CONCURRENT_IMPORTANCE_RATING_REQUESTS = 4
+
 SCORE_ALPHA = 1.0
 SCORE_BETA = 1.0
 SCORE_GAMMA = 1.0
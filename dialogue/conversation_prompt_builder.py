@@ -0,0 +1,134 @@
+"""This module contains the definition of ConversationPromptBuilder, which renders once per conversation
+the sections of the dialogue prompts that don't change from turn to turn, so that every turn only needs
+to join them with the sections that do.
+"""
+from threading import Lock
+from weakref import WeakKeyDictionary
+
+from agents.agent import Agent
+from datetime_utils import format_timestamp_for_prompt
+from dialogue.conversation_state import ConversationState
+from dialogue.prompting import (
+    add_characters_involved_in_conversation,
+    add_involved_agents_status,
+    add_reason_for_conversation,
+)
+from enums.enums import DialoguePromptKind
+from errors import InvalidParameterError
+
+
+class ConversationPromptBuilder:
+    """Assembles the user content of the dialogue prompts of a conversation. The sections that stay the same
+    during the whole conversation (the timestamp, the involved agents and their statuses, the reason for the
+    conversation and the character summaries) are rendered once, when the builder is created. Every prompt of
+    the same kind starts with the same stable prefix, which lets the providers of AI models cache it.
+    """
+
+    def __init__(self, conversation_state: ConversationState):
+        """Creates an instance of the class ConversationPromptBuilder.
+
+        Args:
+            conversation_state (ConversationState): the state of the conversation.
+        """
+        involved_agents = conversation_state.get_involved_agents()
+
+        self._timestamp_section = (
+            f"{format_timestamp_for_prompt(conversation_state.get_current_timestamp())}\n"
+        )
+        self._characters_involved_section = add_characters_involved_in_conversation(
+            "", involved_agents
+        )
+        self._context_section = add_reason_for_conversation(
+            add_involved_agents_status("", involved_agents),
+            conversation_state.get_reason_for_conversation(),
+        )
+
+        dialogue_continuation_prefix = self._timestamp_section + self._context_section
+
+        self._stable_prefixes = {
+            DialoguePromptKind.DIALOGUE_CONTINUATION: dialogue_continuation_prefix,
+            DialoguePromptKind.WHO_WILL_SPEAK: self._timestamp_section
+            + self._characters_involved_section
+            + self._context_section,
+        }
+
+        self._line_of_dialogue_prefixes = {
+            agent.get_name(): (
+                f"{agent.get_character_summary()}\n"
+                if agent.get_character_summary() is not None
+                else ""
+            )
+            + dialogue_continuation_prefix
+            for agent in involved_agents
+        }
+
+    def get_characters_involved_section(self) -> str:
+        """Returns the section that lists the characters involved in the conversation.
+
+        Returns:
+            str: the section of the prompt.
+        """
+        return self._characters_involved_section
+
+    def get_stable_prefix(
+        self,
+        dialogue_prompt_kind: DialoguePromptKind,
+        agent_who_will_speak_now: Agent | None = None,
+    ) -> str:
+        """Returns the part of a kind of prompt that stays the same during the whole conversation.
+
+        Args:
+            dialogue_prompt_kind (DialoguePromptKind): the kind of prompt.
+            agent_who_will_speak_now (Agent | None): the agent who will speak now. Required for the prompts
+                that produce a line of dialogue, which start with the character summary of that agent.
+
+        Raises:
+            InvalidParameterError: if the prompt produces a line of dialogue, but the agent who will speak now
+                wasn't passed or isn't involved in the conversation.
+
+        Returns:
+            str: the stable prefix of the prompt.
+        """
+        if dialogue_prompt_kind != DialoguePromptKind.LINE_OF_DIALOGUE:
+            return self._stable_prefixes[dialogue_prompt_kind]
+
+        if (
+            agent_who_will_speak_now is None
+            or agent_who_will_speak_now.get_name()
+            not in self._line_of_dialogue_prefixes
+        ):
+            error_message = f"The function {self.get_stable_prefix.__name__} required an agent involved in the conversation "
+            error_message += f"to produce a line of dialogue, but it was: {agent_who_will_speak_now}"
+            raise InvalidParameterError(error_message)
+
+        return self._line_of_dialogue_prefixes[agent_who_will_speak_now.get_name()]
+
+
+_conversation_prompt_builders = WeakKeyDictionary()
+_conversation_prompt_builders_lock = Lock()
+
+
+def get_conversation_prompt_builder(
+    conversation_state: ConversationState,
+) -> ConversationPromptBuilder:
+    """Returns the prompt builder of a conversation, creating it the first time. The builder lives as long
+    as its conversation state does.
+
+    Args:
+        conversation_state (ConversationState): the state of the conversation.
+
+    Returns:
+        ConversationPromptBuilder: the prompt builder of the conversation.
+    """
+    with _conversation_prompt_builders_lock:
+        conversation_prompt_builder = _conversation_prompt_builders.get(
+            conversation_state
+        )
+
+        if conversation_prompt_builder is None:
+            conversation_prompt_builder = ConversationPromptBuilder(conversation_state)
+            _conversation_prompt_builders[
+                conversation_state
+            ] = conversation_prompt_builder
+
+        return conversation_prompt_builder
@@ -1,8 +1,10 @@
-from datetime_utils import format_timestamp_for_prompt
+from typing import Any, Callable
+
 from defines.defines import GPT_3_5, SYSTEM_ROLE, USER_ROLE
+from dialogue.conversation_prompt_builder import get_conversation_prompt_builder
 from dialogue.conversation_state import ConversationState
 from dialogue.dialogue_history_handler import DialogueHistoryHandler
-from dialogue.prompting import add_involved_agents_status, add_reason_for_conversation
+from enums.enums import DialoguePromptKind
 from input.confirmation import request_confirmation
 from llms.functions import append_function
 from llms.interface import AIModelInterface
@@ -10,6 +12,10 @@ from llms.messages import (
     get_message_from_gpt_response,
     load_arguments_of_message_with_function_call,
 )
+from llms.token_estimation import (
+    determine_remaining_prompt_tokens,
+    estimate_tokens_of_text,
+)
 
 SHOULD_STOP_DIALOGUE_GPT_SYSTEM_CONTENT = "I am ShouldStopDialogueDeterminerGPT. I have the responsibility of determining if the ongoing dialogue should realistically "
 SHOULD_STOP_DIALOGUE_GPT_SYSTEM_CONTENT += (
@@ -53,38 +59,53 @@ class DialogueContinuationHandler:
         """
         return self._should_dialogue_continue
 
-    def _determine_user_content_to_determine_if_dialogue_should_end(self) -> str:
+    def _determine_user_content_to_determine_if_dialogue_should_end(
+        self, max_tokens: int
+    ) -> str:
         """Determines what should be added to the prompt that will be sent to the AI model
         so that it determines whether or not the dialogue should end.
 
+        Args:
+            max_tokens (int): how many tokens the user content can take up. The oldest lines of dialogue
+                get left out until the rest fit.
+
         Returns:
             str: the user content that will be sent in the prompt to the AI model.
         """
-        user_content = ""
-
-        user_content += f"{format_timestamp_for_prompt(self._conversation_state.get_current_timestamp())}\n"
-
-        user_content = add_involved_agents_status(
-            user_content, self._conversation_state.get_involved_agents()
-        )
-
-        user_content = add_reason_for_conversation(
-            user_content, self._conversation_state.get_reason_for_conversation()
+        stable_prefix = get_conversation_prompt_builder(
+            self._conversation_state
+        ).get_stable_prefix(DialoguePromptKind.DIALOGUE_CONTINUATION)
+
+        conclusion = "\nGiven the context and the latest lines of dialogue, should the dialogue end now "
+        conclusion += "because it has reached a natural conclusion?"
+
+        dialogue_history = self._dialogue_history_handler.add_dialogue_history_for_prompt(
+            "",
+            max(
+                0,
+                max_tokens
+                - estimate_tokens_of_text(stable_prefix)
+                - estimate_tokens_of_text(conclusion),
+            ),
         )
 
-        user_content = self._dialogue_history_handler.add_dialogue_history_for_prompt(
-            user_content
-        )
-
-        user_content += "\nGiven the context and the latest lines of dialogue, should the dialogue end now "
-        user_content += "because it has reached a natural conclusion?"
-
-        return user_content
+        return "".join([stable_prefix, dialogue_history, conclusion])
 
     def determine_if_dialogue_should_end(self):
         """Given the current state of the dialogue, this function delegates to the AI model
         the decision of whether or not the dialogue should end now.
         """
+        self.apply_decision_of_whether_dialogue_should_stop(
+            self.request_decision_of_whether_dialogue_should_stop()
+        )
+
+    def request_decision_of_whether_dialogue_should_stop(self) -> bool:
+        """Requests from the AI model the decision of whether or not the dialogue should end now,
+        without applying it. It only reads the state of the dialogue, so it can run concurrently with other requests.
+
+        Returns:
+            bool: whether the AI model decided that the dialogue should stop.
+        """
         messages = []
 
         messages.append(
@@ -94,13 +115,6 @@ class DialogueContinuationHandler:
             }
         )
 
-        messages.append(
-            {
-                "role": USER_ROLE,
-                "content": self._determine_user_content_to_determine_if_dialogue_should_end(),
-            }
-        )
-
         functions = []
         append_function(
             functions,
@@ -115,6 +129,15 @@ class DialogueContinuationHandler:
             ],
         )
 
+        messages.append(
+            {
+                "role": USER_ROLE,
+                "content": self._determine_user_content_to_determine_if_dialogue_should_end(
+                    determine_remaining_prompt_tokens(GPT_3_5, messages, functions)
+                ),
+            }
+        )
+
         message = get_message_from_gpt_response(
             self._ai_model_interface.request_response_using_functions(
                 messages,
@@ -136,9 +159,25 @@ class DialogueContinuationHandler:
         else:
             should_dialogue_stop = bool(message["content"].lower().strip() == "true")
 
+        return should_dialogue_stop
+
+    def apply_decision_of_whether_dialogue_should_stop(
+        self,
+        should_dialogue_stop: bool,
+        work_while_waiting_for_confirmation: Callable[[], Any] | None = None,
+    ):
+        """Applies the decision of the AI model regarding whether the dialogue should stop now,
+        regardless of the request in which the AI model made that decision.
+
+        Args:
+            should_dialogue_stop (bool): whether the AI model decided that the dialogue should stop.
+            work_while_waiting_for_confirmation (Callable[[], Any] | None): the work to do while the user decides
+                whether to overrule the AI model. It's only done if the user gets asked.
+        """
         # Offer the user the opportunity to trump the AI's decision.
         if should_dialogue_stop and request_confirmation(
-            "The AI model has decided that the dialogue should end now. Do you want it to continue?"
+            "The AI model has decided that the dialogue should end now. Do you want it to continue?",
+            work_while_waiting_for_confirmation,
         ):
             should_dialogue_stop = False
 
@@ -1,13 +1,19 @@
 """This module contains the definition of the Dialogue Coordinator class, which handles the dialogue between two or more characters.
 """
+from concurrent.futures import ThreadPoolExecutor
 
 from dialogue.contracts import ensure_dialogue_handler_initialization_contract
 from dialogue.conversation_state import ConversationState
 from dialogue.dialogue_continuation_handler import DialogueContinuationHandler
 from dialogue.dialogue_history_handler import DialogueHistoryHandler
+from dialogue.fused_turn_producer import FusedTurnProducer
 from dialogue.line_of_dialogue_producer import LineOfDialogueProducer
+from dialogue.memory_context_prefetcher import MemoryContextPrefetcher
+from dialogue.rolling_dialogue_summarizer import RollingDialogueSummarizer
 from dialogue.speaker_selector import SpeakerSelector
+from errors import CouldntFindMatchingAgentError
 from llms.interface import AIModelInterface
+from llms.user_responder import UserResponder
 
 
 class DialogueCoordinator:
@@ -18,6 +24,10 @@ class DialogueCoordinator:
         conversation_state: ConversationState,
         player_wants_to_speak_first: bool,
         ai_model_interface: AIModelInterface,
+        use_fused_turns: bool = False,
+        overlap_turn_decisions: bool = False,
+        prefetch_memory_contexts: bool = False,
+        summary_ai_model_interface: AIModelInterface | None = None,
     ):
         """Initializates an instance of the DialogueCoordinator class.
 
@@ -26,6 +36,16 @@ class DialogueCoordinator:
             player_wants_to_speak_first (bool): whether the player wants to speak first.
             request_response_from_ai_model_with_functions_function (Callable[ [list[dict], list[dict], str, str], dict ]): the function responsible
                 for requesting responses from either the user or an AI model.
+            use_fused_turns (bool): whether every turn should request the line of dialogue, whether the dialogue
+                should end and the next speaker in a single call to the AI model, instead of three separate calls.
+            overlap_turn_decisions (bool): whether the requests that determine if the dialogue should end and who
+                will speak next should be sent at the same time, instead of one after the other. It shouldn't be
+                enabled if 'ai_model_interface' requests its responses from the user.
+            prefetch_memory_contexts (bool): whether the relevant memories of the candidates to speak next should be
+                retrieved while the current line of dialogue is being produced.
+            summary_ai_model_interface (AIModelInterface | None): the interface to request the rolling summary of
+                the earlier dialogue from, in the background, so that long dialogues keep a bounded prompt without
+                forgetting what was said. If None, the earlier lines of dialogue are simply left out of the prompts.
         """
         ensure_dialogue_handler_initialization_contract(
             conversation_state.get_involved_agents(),
@@ -33,22 +53,156 @@ class DialogueCoordinator:
         )
 
         self._ai_model_interface = ai_model_interface
+        # If the user answers in place of the AI model, speculating would ask them who speaks next
+        # even if they end up ending the dialogue.
+        self._speculate_next_speaker = not isinstance(ai_model_interface, UserResponder)
+        self._use_fused_turns = use_fused_turns
+        self._overlap_turn_decisions = overlap_turn_decisions
+        self._turn_decisions_executor = None
 
         self._conversation_state = conversation_state
 
-        self._dialogue_history_handler = DialogueHistoryHandler()
+        self._dialogue_history_handler = DialogueHistoryHandler(
+            RollingDialogueSummarizer(summary_ai_model_interface)
+            if summary_ai_model_interface is not None
+            else None
+        )
         self._speaker_selector = SpeakerSelector(
             self._conversation_state,
             self._dialogue_history_handler,
             self._ai_model_interface,
         )
+        self._memory_context_prefetcher = (
+            MemoryContextPrefetcher(self._conversation_state)
+            if prefetch_memory_contexts
+            else None
+        )
         self._line_of_dialogue_producer = LineOfDialogueProducer(
             self._conversation_state,
             self._speaker_selector,
+            self._memory_context_prefetcher,
+        )
+
+        self._fused_turn_producer = FusedTurnProducer(
+            self._conversation_state, self._line_of_dialogue_producer
         )
 
         self._speaker_selector.select_first_speaker(player_wants_to_speak_first)
 
+    def _perform_turn(
+        self, dialogue_continuation_handler: DialogueContinuationHandler
+    ):
+        # Delegate producing a line of dialogue, and then story it in the dialogue history.
+        self._dialogue_history_handler.register_line_of_dialogue(
+            self._line_of_dialogue_producer.produce_line_of_dialogue(
+                self._dialogue_history_handler
+            )
+        )
+
+        self._determine_continuation_and_next_speaker(dialogue_continuation_handler)
+
+    def _determine_continuation_and_next_speaker(
+        self, dialogue_continuation_handler: DialogueContinuationHandler
+    ):
+        if self._turn_decisions_executor is None:
+            self._determine_continuation_and_next_speaker_sequentially(
+                dialogue_continuation_handler
+            )
+            return
+
+        # Both requests only read the dialogue history, which already contains the latest line,
+        # so they can be sent at the same time. Their decisions are applied in order afterwards.
+        next_speaker_name_future = self._turn_decisions_executor.submit(
+            self._speaker_selector.request_next_speaker_name
+        )
+
+        try:
+            dialogue_continuation_handler.apply_decision_of_whether_dialogue_should_stop(
+                dialogue_continuation_handler.request_decision_of_whether_dialogue_should_stop()
+            )
+        except BaseException:
+            next_speaker_name_future.cancel()
+            raise
+
+        # If the dialogue is over, the proposed next speaker is simply discarded.
+        if dialogue_continuation_handler.should_dialogue_continue():
+            self._speaker_selector.select_proposed_next_speaker(
+                next_speaker_name_future.result()
+            )
+
+    def _determine_continuation_and_next_speaker_sequentially(
+        self, dialogue_continuation_handler: DialogueContinuationHandler
+    ):
+        speculative_next_speaker_names = []
+
+        def request_next_speaker_name_speculatively():
+            # If the user decides that the dialogue should continue, the next speaker will already be known.
+            try:
+                speculative_next_speaker_names.append(
+                    self._speaker_selector.request_next_speaker_name()
+                )
+            except Exception:
+                # The next speaker will simply be requested again after the confirmation.
+                pass
+
+        dialogue_continuation_handler.apply_decision_of_whether_dialogue_should_stop(
+            dialogue_continuation_handler.request_decision_of_whether_dialogue_should_stop(),
+            request_next_speaker_name_speculatively
+            if self._speculate_next_speaker
+            else None,
+        )
+
+        if not dialogue_continuation_handler.should_dialogue_continue():
+            return
+
+        if speculative_next_speaker_names:
+            self._speaker_selector.select_proposed_next_speaker(
+                speculative_next_speaker_names[0]
+            )
+        else:
+            self._speaker_selector.select_next_speaker()
+
+    def _perform_fused_turn(
+        self, dialogue_continuation_handler: DialogueContinuationHandler
+    ):
+        fused_turn = self._fused_turn_producer.produce_fused_turn(
+            self._dialogue_history_handler
+        )
+
+        self._dialogue_history_handler.register_line_of_dialogue(
+            fused_turn.get_line_of_dialogue()
+        )
+
+        # Any decision missing from the fused turn (for example because the player spoke) is requested separately.
+        if (
+            fused_turn.get_should_dialogue_stop() is None
+            and fused_turn.get_proposed_next_speaker_name() is None
+        ):
+            self._determine_continuation_and_next_speaker(dialogue_continuation_handler)
+            return
+
+        if fused_turn.get_should_dialogue_stop() is None:
+            dialogue_continuation_handler.determine_if_dialogue_should_end()
+        else:
+            dialogue_continuation_handler.apply_decision_of_whether_dialogue_should_stop(
+                fused_turn.get_should_dialogue_stop()
+            )
+
+        if not dialogue_continuation_handler.should_dialogue_continue():
+            return
+
+        if fused_turn.get_proposed_next_speaker_name() is None:
+            self._speaker_selector.select_next_speaker()
+            return
+
+        try:
+            self._speaker_selector.select_proposed_next_speaker(
+                fused_turn.get_proposed_next_speaker_name()
+            )
+        except CouldntFindMatchingAgentError:
+            # The AI model made up a name, so the next speaker gets requested separately.
+            self._speaker_selector.select_next_speaker()
+
     def perform_dialogue(self) -> list[dict]:
         """Performs a dialogue given the initial context passed during the initialization of this class.
         This dialogue will continue until the AI model stops the dialogue by using the function 'stop_dialogue',
@@ -63,17 +217,24 @@ class DialogueCoordinator:
             self._ai_model_interface,
         )
 
-        while dialogue_continuation_handler.should_dialogue_continue():
-            # Delegate producing a line of dialogue, and then story it in the dialogue history.
-            self._dialogue_history_handler.register_line_of_dialogue(
-                self._line_of_dialogue_producer.produce_line_of_dialogue(
-                    self._dialogue_history_handler
-                )
-            )
+        if self._overlap_turn_decisions:
+            self._turn_decisions_executor = ThreadPoolExecutor(max_workers=1)
 
-            dialogue_continuation_handler.determine_if_dialogue_should_end()
+        try:
+            while dialogue_continuation_handler.should_dialogue_continue():
+                if self._use_fused_turns:
+                    self._perform_fused_turn(dialogue_continuation_handler)
+                else:
+                    self._perform_turn(dialogue_continuation_handler)
+        finally:
+            if self._turn_decisions_executor is not None:
+                # A discarded request for the next speaker doesn't need to be waited for.
+                self._turn_decisions_executor.shutdown(wait=False, cancel_futures=True)
+                self._turn_decisions_executor = None
+
+            if self._memory_context_prefetcher is not None:
+                self._memory_context_prefetcher.close()
 
-            if dialogue_continuation_handler.should_dialogue_continue():
-                self._speaker_selector.select_next_speaker()
+            self._dialogue_history_handler.close()
 
         return self._dialogue_history_handler.get_dialogue_history()
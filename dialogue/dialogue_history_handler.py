@@ -1,17 +1,55 @@
 """This module contains the definition of DialogueHistoryHandler, that handles the dialogue history of a conversation.
 """
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+
+from console_output.messages import output_colored_message
+from dialogue.rolling_dialogue_summarizer import RollingDialogueSummarizer
+from enums.enums import RequestPriority
 from errors import InvalidParameterError
+from llms.gpt_responder import REQUEST_FAILURE_EXCEPTIONS
+from llms.request_scheduler import request_priority
+from llms.token_estimation import estimate_tokens_of_text
 
 
 HOW_MANY_LINES_OF_DIALOGUE_TO_INCLUDE_IN_PROMPT = 15
+HOW_MANY_LINES_OF_DIALOGUE_TO_FOLD_INTO_SUMMARY_AT_ONCE = 10
+DIALOGUE_HISTORY_HEADER = "\nLatest lines of dialogue:\n"
+DIALOGUE_SUMMARY_HEADER = "\nSummary of the earlier dialogue:\n"
 
 
 class DialogueHistoryHandler:
-    """Handles the dialogue history of a conversation."""
+    """Handles the dialogue history of a conversation. If it has a rolling summarizer, the lines of dialogue that
+    fall out of the prompts get folded in the background into a summary of the earlier dialogue, which the prompts
+    carry along with the latest lines. If folding keeps failing, the prompts only carry the lines that fit in
+    their window, so the oldest unfolded lines get dropped.
+    """
+
+    def __init__(
+        self, rolling_dialogue_summarizer: RollingDialogueSummarizer | None = None
+    ):
+        """Creates an instance of the class DialogueHistoryHandler.
 
-    def __init__(self):
+        Args:
+            rolling_dialogue_summarizer (RollingDialogueSummarizer | None): folds the earlier lines of dialogue
+                into a summary. If None, the earlier lines of dialogue are simply left out of the prompts.
+        """
         self._dialogue_history = []
 
+        self._rolling_dialogue_summarizer = rolling_dialogue_summarizer
+        self._dialogue_summary = None
+        self._number_of_summarized_lines = 0
+        self._number_of_lines_scheduled_for_summary = 0
+        self._summary_futures: list[Future] = []
+        self._lock = Lock()
+
+        # A single worker, so that the lines get folded into the summary in order.
+        self._summary_executor = (
+            ThreadPoolExecutor(max_workers=1)
+            if rolling_dialogue_summarizer is not None
+            else None
+        )
+
     def get_dialogue_history(self) -> list[dict]:
         """Returns the dialogue history.
 
@@ -20,28 +58,189 @@ class DialogueHistoryHandler:
         """
         return self._dialogue_history
 
-    def add_dialogue_history_for_prompt(self, user_content):
-        """Adds the last X lines of dialogue to the prompt that will be sent to an AI model.
+    def get_dialogue_summary(self) -> str | None:
+        """Returns the summary of the lines of dialogue that have been folded so far.
+
+        Returns:
+            str | None: the summary of the earlier dialogue, if there is one.
+        """
+        with self._lock:
+            return self._dialogue_summary
+
+    def _get_lines_of_dialogue_for_prompt(self) -> tuple[str | None, list[str]]:
+        with self._lock:
+            dialogue_summary = self._dialogue_summary
+            number_of_summarized_lines = self._number_of_summarized_lines
+
+        if self._rolling_dialogue_summarizer is None:
+            first_line = max(
+                0,
+                len(self._dialogue_history)
+                - HOW_MANY_LINES_OF_DIALOGUE_TO_INCLUDE_IN_PROMPT,
+            )
+        else:
+            # Every line that hasn't been folded into the summary yet, unless the summary lags too far behind.
+            first_line = max(
+                number_of_summarized_lines,
+                len(self._dialogue_history)
+                - HOW_MANY_LINES_OF_DIALOGUE_TO_INCLUDE_IN_PROMPT
+                - HOW_MANY_LINES_OF_DIALOGUE_TO_FOLD_INTO_SUMMARY_AT_ONCE,
+            )
+
+        return dialogue_summary, [
+            line_of_dialogue["content"]
+            for line_of_dialogue in self._dialogue_history[first_line:]
+        ]
+
+    def add_dialogue_history_for_prompt(
+        self, user_content, max_tokens: int | None = None
+    ):
+        """Adds the summary of the earlier dialogue, if there is one, and the latest lines of dialogue
+        to the prompt that will be sent to an AI model.
 
         Args:
             user_content (str): part of the text that will be sent in the prompt to the AI model.
+            max_tokens (int | None): how many tokens the added summary and lines can take up. If passed,
+                the oldest lines get left out until the rest fit, and the summary only gets added if it
+                fits along with them.
 
         Returns:
             str: part of the text that will be sent in the prompt to the AI model.
         """
-        if len(self._dialogue_history) > 0:
-            user_content += "\nLatest lines of dialogue:\n"
-            user_content += "\n".join(
-                [
-                    line_of_dialogue["content"]
-                    for line_of_dialogue in self._dialogue_history[
-                        -HOW_MANY_LINES_OF_DIALOGUE_TO_INCLUDE_IN_PROMPT:
-                    ]
-                ]
+        dialogue_summary, lines_of_dialogue = self._get_lines_of_dialogue_for_prompt()
+
+        if max_tokens is not None:
+            lines_of_dialogue = self._select_latest_lines_that_fit(
+                lines_of_dialogue, max_tokens
+            )
+
+            remaining_tokens = max_tokens - (
+                estimate_tokens_of_text(
+                    DIALOGUE_HISTORY_HEADER + "\n".join(lines_of_dialogue)
+                )
+                if lines_of_dialogue
+                else 0
             )
 
+            if (
+                dialogue_summary is not None
+                and estimate_tokens_of_text(DIALOGUE_SUMMARY_HEADER + dialogue_summary)
+                > remaining_tokens
+            ):
+                dialogue_summary = None
+
+        if dialogue_summary is not None:
+            user_content += DIALOGUE_SUMMARY_HEADER
+            user_content += dialogue_summary
+
+        if len(lines_of_dialogue) > 0:
+            user_content += DIALOGUE_HISTORY_HEADER
+            user_content += "\n".join(lines_of_dialogue)
+
         return user_content
 
+    def _select_latest_lines_that_fit(
+        self, lines_of_dialogue: list[str], max_tokens: int
+    ) -> list[str]:
+        used_tokens = estimate_tokens_of_text(DIALOGUE_HISTORY_HEADER)
+
+        selected_lines = []
+
+        for line_of_dialogue in reversed(lines_of_dialogue):
+            # Every line also takes up the line break that separates it from the next.
+            line_tokens = estimate_tokens_of_text(line_of_dialogue) + 1
+
+            if used_tokens + line_tokens > max_tokens:
+                break
+
+            selected_lines.append(line_of_dialogue)
+            used_tokens += line_tokens
+
+        return list(reversed(selected_lines))
+
+    def _fold_lines_of_dialogue_into_summary(self, last_line: int):
+        """Folds into the summary every line of dialogue up to the passed one that hasn't been folded yet.
+        If the request fails, the lines get folded along with the next ones. The prompts only carry the latest
+        15 lines plus up to 10 lines awaiting their fold, so after repeated failures the oldest unfolded lines
+        get dropped from the prompts without ever reaching the summary.
+
+        Args:
+            last_line (int): the line of dialogue up to which (not included) the summary will reach.
+        """
+        # Starts from whatever has actually been summarized, in case an earlier fold failed.
+        with self._lock:
+            previous_summary = self._dialogue_summary
+            first_line = self._number_of_summarized_lines
+
+        if first_line >= last_line:
+            return
+
+        lines_of_dialogue = [
+            line_of_dialogue["content"]
+            for line_of_dialogue in self._dialogue_history[first_line:last_line]
+        ]
+
+        try:
+            # The summary isn't needed by the current turn, so it yields to the requests of the dialogue.
+            with request_priority(RequestPriority.BACKGROUND):
+                dialogue_summary = (
+                    self._rolling_dialogue_summarizer.fold_lines_of_dialogue(
+                        previous_summary, lines_of_dialogue
+                    )
+                )
+        except REQUEST_FAILURE_EXCEPTIONS as exception:
+            output_colored_message(
+                "light_red",
+                f"Failed to fold lines {first_line} to {last_line - 1} of the dialogue into its summary. "
+                f"They will be folded along with the next ones. Error: {exception}",
+            )
+
+            # The lines will be scheduled again along with the next ones.
+            with self._lock:
+                self._number_of_lines_scheduled_for_summary = (
+                    self._number_of_summarized_lines
+                )
+            return
+
+        with self._lock:
+            self._dialogue_summary = dialogue_summary
+            self._number_of_summarized_lines = last_line
+
+    def _schedule_folding_of_evicted_lines(self):
+        with self._lock:
+            number_of_evicted_lines = (
+                len(self._dialogue_history)
+                - HOW_MANY_LINES_OF_DIALOGUE_TO_INCLUDE_IN_PROMPT
+            )
+
+            if (
+                number_of_evicted_lines - self._number_of_lines_scheduled_for_summary
+                < HOW_MANY_LINES_OF_DIALOGUE_TO_FOLD_INTO_SUMMARY_AT_ONCE
+            ):
+                return
+
+            self._number_of_lines_scheduled_for_summary = number_of_evicted_lines
+
+        self._raise_errors_of_finished_folds()
+
+        self._summary_futures.append(
+            self._summary_executor.submit(
+                self._fold_lines_of_dialogue_into_summary, number_of_evicted_lines
+            )
+        )
+
+    def _raise_errors_of_finished_folds(self):
+        # The expected failures are handled within the fold, so anything raised here is a programming error.
+        finished_futures = [future for future in self._summary_futures if future.done()]
+
+        self._summary_futures = [
+            future for future in self._summary_futures if not future.done()
+        ]
+
+        for future in finished_futures:
+            if not future.cancelled():
+                future.result()
+
     def register_line_of_dialogue(self, line_of_dialogue: dict):
         """Registers a line of dialogue (in the message format of a GPT message) in the dialogue history.
 
@@ -51,6 +250,7 @@ class DialogueHistoryHandler:
         Raises:
             InvalidParameterError: if 'line_of_dialogue' isn't a dictionary'.
             ValueError: if 'line_of_dialogue' isn't in the format of a message from GPT.
+            Exception: any unexpected error raised by an earlier fold of lines of dialogue into the summary.
         """
         if not isinstance(line_of_dialogue, dict):
             raise InvalidParameterError(
@@ -62,3 +262,23 @@ class DialogueHistoryHandler:
             )
 
         self._dialogue_history.append(line_of_dialogue)
+
+        if self._rolling_dialogue_summarizer is not None:
+            self._schedule_folding_of_evicted_lines()
+
+    def wait_for_dialogue_summary(self):
+        """Waits until every line of dialogue scheduled to be folded into the summary has been folded.
+
+        Raises:
+            Exception: any unexpected error raised while folding lines of dialogue into the summary.
+        """
+        if self._summary_executor is not None:
+            # The single worker runs in order, so once this no-op runs, every earlier fold has finished.
+            self._summary_executor.submit(lambda: None).result()
+
+            self._raise_errors_of_finished_folds()
+
+    def close(self):
+        """Stops folding lines of dialogue into the summary. Any pending fold is discarded."""
+        if self._summary_executor is not None:
+            self._summary_executor.shutdown(wait=False, cancel_futures=True)
@@ -1,10 +1,163 @@
-from defines.defines import GPT_4
+"""This module contains the definition of DialogueSummarizer, which summarizes a dialogue relying on an AI model.
+Transcripts too long for a single request get summarized in chunks that are then reduced into a single summary.
+"""
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+from defines.defines import (
+    DEFAULT_TEMPERATURE,
+    DIALOGUE_CHUNK_SUMMARY_CACHE_MAX_ENTRIES,
+    DIALOGUE_SUMMARY_CHUNK_TOKENS,
+    GPT_3_5,
+    GPT_4,
+    MAX_CONCURRENT_DIALOGUE_SUMMARY_REQUESTS,
+)
 from errors import InvalidParameterError
 from llms.interface import AIModelInterface
+from llms.messages import get_message_from_gpt_response
+from llms.request_keys import determine_request_key
+from llms.token_estimation import estimate_prompt_tokens, get_prompt_token_budget
+
+DIALOGUE_SUMMARIZER_GPT_SYSTEM_CONTENT = "I am DialogueSummarizerGPT. I have the responsibility of summarizing a dialogue held between two or more characters, "
+DIALOGUE_SUMMARIZER_GPT_SYSTEM_CONTENT += (
+    "making sure to note the most important points of the dialogue."
+)
+DIALOGUE_SUMMARIZER_USER_CONTENT = "Please summarize the previous dialogue."
+
+PARTIAL_SUMMARIES_HEADER = "Summaries of consecutive parts of a dialogue, in order:\n"
+PARTIAL_SUMMARIES_USER_CONTENT = "Please combine the previous summaries into a single summary of the whole dialogue."
+
+
+class ChunkSummaryCache:
+    """Keeps the summaries of chunks of dialogue in memory, keyed by the hash of their requests, so that
+    a transcript that grows only needs the chunks at its tail summarized again. The least recently used
+    summaries get evicted first. It's safe to use from several threads at once.
+    """
+
+    def __init__(self, max_entries: int = DIALOGUE_CHUNK_SUMMARY_CACHE_MAX_ENTRIES):
+        """Creates an instance of the class ChunkSummaryCache.
+
+        Args:
+            max_entries (int): how many summaries can be kept.
+
+        Raises:
+            ValueError: if 'max_entries' isn't greater than zero.
+        """
+        if not max_entries > 0:
+            raise ValueError(
+                f"The class {ChunkSummaryCache.__name__} expected 'max_entries' to be greater than zero, but it was: {max_entries}"
+            )
+
+        self._max_entries = max_entries
+        self._summaries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, request_key: str) -> str | None:
+        """Returns the summary stored for a request, if there is one.
+
+        Args:
+            request_key (str): the key of the request that summarizes the chunk.
+
+        Returns:
+            str | None: the stored summary, if there is one.
+        """
+        with self._lock:
+            summary = self._summaries.get(request_key)
+
+            if summary is not None:
+                self._summaries.move_to_end(request_key)
+
+            return summary
+
+    def store(self, request_key: str, summary: str):
+        """Stores the summary of a chunk, evicting the least recently used summaries if necessary.
+
+        Args:
+            request_key (str): the key of the request that summarized the chunk.
+            summary (str): the summary of the chunk.
+        """
+        with self._lock:
+            self._summaries[request_key] = summary
+            self._summaries.move_to_end(request_key)
+
+            while len(self._summaries) > self._max_entries:
+                self._summaries.popitem(last=False)
+
+    def get_number_of_entries(self) -> int:
+        """Returns how many summaries are stored.
+
+        Returns:
+            int: the number of stored summaries.
+        """
+        with self._lock:
+            return len(self._summaries)
+
+
+def split_messages_into_chunks(
+    messages: list[dict], max_tokens: int = DIALOGUE_SUMMARY_CHUNK_TOKENS
+) -> list[list[dict]]:
+    """Splits messages into consecutive chunks that take up at most a number of tokens each. The chunks
+    are filled greedily from the start, so appending messages never changes any chunk but the last one.
+    A message that doesn't fit in a chunk on its own gets a chunk for itself.
+
+    Args:
+        messages (list[dict]): the messages to split.
+        max_tokens (int): how many tokens every chunk can take up.
+
+    Returns:
+        list[list[dict]]: the chunks of messages, in order.
+    """
+    chunks = []
+    chunk = []
+    chunk_tokens = 0
+
+    for message in messages:
+        message_tokens = estimate_prompt_tokens([message])
+
+        if chunk and chunk_tokens + message_tokens > max_tokens:
+            chunks.append(chunk)
+            chunk = []
+            chunk_tokens = 0
+
+        chunk.append(message)
+        chunk_tokens += message_tokens
+
+    if chunk:
+        chunks.append(chunk)
+
+    return chunks
+
+
+CHUNK_SUMMARY_CACHE = ChunkSummaryCache()
 
 
 class DialogueSummarizer:
-    def __init__(self, messages: list, ai_model_interface: AIModelInterface):
+    """Summarizes a dialogue relying on an AI model. Transcripts that fit in a single request get summarized
+    in one pass. Longer ones get split into chunks that are summarized concurrently, and whose summaries are
+    then reduced into the summary of the whole dialogue.
+    """
+
+    def __init__(
+        self,
+        messages: list,
+        ai_model_interface: AIModelInterface,
+        model: str = GPT_4,
+        chunk_model: str = GPT_3_5,
+        chunk_summary_cache: ChunkSummaryCache = CHUNK_SUMMARY_CACHE,
+    ):
+        """Creates an instance of the class DialogueSummarizer.
+
+        Args:
+            messages (list): the lines of dialogue to summarize, in the message format of GPT.
+            ai_model_interface (AIModelInterface): the interface to request responses from the AI model.
+            model (str): the AI model that produces the summary of the whole dialogue.
+            chunk_model (str): the AI model that summarizes the chunks of long transcripts.
+            chunk_summary_cache (ChunkSummaryCache): where the summaries of the chunks are kept.
+
+        Raises:
+            InvalidParameterError: if 'messages' isn't a list.
+        """
         if not isinstance(messages, list):
             error_message = f"The init function of {DialogueSummarizer.__name__} required 'messages' to be a list, but it was: {messages}"
             raise InvalidParameterError(error_message)
@@ -12,22 +165,133 @@ class DialogueSummarizer:
         self._messages = messages
 
         self._ai_model_interface = ai_model_interface
+        self._model = model
+        self._chunk_model = chunk_model
+        self._chunk_summary_cache = chunk_summary_cache
 
-    def summarize(self):
-        copied_messages = list(self._messages)
+    def _create_summary_request_messages(self, messages: list[dict]) -> list[dict]:
+        copied_messages = list(messages)
 
-        system_content = "I am DialogueSummarizerGPT. I have the responsibility of summarizing a dialogue held between two or more characters, "
-        system_content += (
-            "making sure to note the most important points of the dialogue."
-        )
         copied_messages.append(
             {
                 "role": "system",
-                "content": system_content,
+                "content": DIALOGUE_SUMMARIZER_GPT_SYSTEM_CONTENT,
             }
         )
 
-        user_content = "Please summarize the previous dialogue."
-        copied_messages.append({"role": "user", "content": user_content})
+        copied_messages.append(
+            {"role": "user", "content": DIALOGUE_SUMMARIZER_USER_CONTENT}
+        )
+
+        return copied_messages
+
+    def _create_reduction_request_messages(
+        self, partial_summaries: list[str]
+    ) -> list[dict]:
+        return [
+            {
+                "role": "user",
+                "content": PARTIAL_SUMMARIES_HEADER
+                + "\n\n".join(partial_summaries),
+            },
+            {
+                "role": "system",
+                "content": DIALOGUE_SUMMARIZER_GPT_SYSTEM_CONTENT,
+            },
+            {"role": "user", "content": PARTIAL_SUMMARIES_USER_CONTENT},
+        ]
+
+    def _request_cached_summary(self, request_messages: list[dict]) -> str:
+        request_key = determine_request_key(
+            self._chunk_model, DEFAULT_TEMPERATURE, request_messages
+        )
+
+        summary = self._chunk_summary_cache.get(request_key)
+
+        if summary is None:
+            summary = get_message_from_gpt_response(
+                self._ai_model_interface.request_response(
+                    request_messages, model=self._chunk_model
+                )
+            )["content"].strip()
+
+            self._chunk_summary_cache.store(request_key, summary)
+
+        return summary
+
+    def _request_cached_summaries(
+        self, requests_messages: list[list[dict]]
+    ) -> list[str]:
+        with ThreadPoolExecutor(
+            max_workers=min(
+                MAX_CONCURRENT_DIALOGUE_SUMMARY_REQUESTS, len(requests_messages)
+            )
+        ) as executor:
+            return list(executor.map(self._request_cached_summary, requests_messages))
 
-        return self._ai_model_interface.request_response(copied_messages, model=GPT_4)
+    def _fits_in_a_single_request(self, request_messages: list[dict]) -> bool:
+        return estimate_prompt_tokens(request_messages) <= get_prompt_token_budget(
+            self._model
+        )
+
+    def _reduce_partial_summaries(self, partial_summaries: list[str]) -> list[str]:
+        # While the partial summaries don't fit in the final request, they get reduced in groups.
+        while len(partial_summaries) > 1 and not self._fits_in_a_single_request(
+            self._create_reduction_request_messages(partial_summaries)
+        ):
+            groups = split_messages_into_chunks(
+                [{"role": "user", "content": summary} for summary in partial_summaries]
+            )
+
+            if len(groups) == len(partial_summaries):
+                # Every summary is too long to be grouped with another, so reducing further won't help.
+                break
+
+            partial_summaries = self._request_cached_summaries(
+                [
+                    self._create_reduction_request_messages(
+                        [message["content"] for message in group]
+                    )
+                    for group in groups
+                ]
+            )
+
+        return partial_summaries
+
+    def summarize_in_chunks(self) -> dict:
+        """Summarizes the dialogue by splitting it into chunks, summarizing them concurrently, and reducing
+        their summaries into the summary of the whole dialogue. The summaries of the chunks are cached
+        by the hash of their content, so summarizing the same transcript after appending lines to it
+        only requests the summaries of the chunks at its tail.
+
+        Returns:
+            dict: the response of the AI model that contains the summary of the whole dialogue.
+        """
+        partial_summaries = self._reduce_partial_summaries(
+            self._request_cached_summaries(
+                [
+                    self._create_summary_request_messages(chunk)
+                    for chunk in split_messages_into_chunks(self._messages)
+                ]
+            )
+        )
+
+        return self._ai_model_interface.request_response(
+            self._create_reduction_request_messages(partial_summaries),
+            model=self._model,
+        )
+
+    def summarize(self) -> dict:
+        """Summarizes the dialogue in a single request if it fits, and in chunks otherwise.
+
+        Returns:
+            dict: the response of the AI model that contains the summary of the dialogue.
+        """
+        request_messages = self._create_summary_request_messages(self._messages)
+
+        if not self._fits_in_a_single_request(request_messages):
+            return self.summarize_in_chunks()
+
+        return self._ai_model_interface.request_response(
+            request_messages, model=self._model
+        )
@@ -0,0 +1,211 @@
+"""This module contains the definition of FusedTurnProducer, which requests from an AI model, in a single call,
+the line of dialogue of the current speaker, whether the dialogue should end afterwards, and who should speak next.
+"""
+from defines.defines import GPT_4, SYSTEM_ROLE, USER_ROLE
+from dialogue.conversation_prompt_builder import get_conversation_prompt_builder
+from dialogue.conversation_state import ConversationState
+from dialogue.dialogue_history_handler import DialogueHistoryHandler
+from dialogue.line_of_dialogue_producer import (
+    LINE_OF_DIALOGUE_PARAMETER_DESCRIPTION,
+    LINE_OF_DIALOGUE_PARAMETER_NAME,
+    LineOfDialogueProducer,
+)
+from enums.enums import RequestPriority
+from llms.functions import append_function
+from llms.messages import (
+    get_message_from_gpt_response,
+    load_arguments_of_message_with_function_call,
+)
+from llms.request_scheduler import request_priority
+from llms.token_estimation import (
+    determine_remaining_prompt_tokens,
+    estimate_tokens_of_text,
+)
+
+PRODUCE_FUSED_TURN_GPT_SYSTEM_CONTENT = "I am DialogueTurnGPT. I have the responsibility of writing the following line of dialogue "
+PRODUCE_FUSED_TURN_GPT_SYSTEM_CONTENT += "in this conversation, then determining if the dialogue should realistically end after that line, "
+PRODUCE_FUSED_TURN_GPT_SYSTEM_CONTENT += (
+    "and if not, the exact name of the character who will speak next."
+)
+WRITE_DIALOGUE_TURN_FUNCTION_NAME = "write_dialogue_turn"
+WRITE_DIALOGUE_TURN_FUNCTION_DESCRIPTION = "Writes the line of dialogue of the character who speaks now, determines if the dialogue has reached "
+WRITE_DIALOGUE_TURN_FUNCTION_DESCRIPTION += "a natural conclusion after that line, and determines who will speak next."
+SHOULD_STOP_DIALOGUE_AFTER_LINE_PARAMETER_NAME = "should_stop_dialogue"
+SHOULD_STOP_DIALOGUE_AFTER_LINE_PARAMETER_DESCRIPTION = "Whether or not the dialogue will have reached a natural conclusion after this "
+SHOULD_STOP_DIALOGUE_AFTER_LINE_PARAMETER_DESCRIPTION += (
+    "line of dialogue, given the context of the conversation."
+)
+CHARACTER_WHO_WILL_SPEAK_NEXT_PARAMETER_NAME = "character_who_will_speak_next"
+CHARACTER_WHO_WILL_SPEAK_NEXT_PARAMETER_DESCRIPTION = "Exact name of the character who will utter the line of dialogue after this one. "
+CHARACTER_WHO_WILL_SPEAK_NEXT_PARAMETER_DESCRIPTION += (
+    "Never choose the character who is speaking now."
+)
+
+
+class FusedTurn:
+    """The outcome of a fused turn. If the line of dialogue didn't come from the AI model (for example because
+    the player wrote it), the decisions regarding the rest of the turn are missing, and must be requested separately.
+    """
+
+    def __init__(
+        self,
+        line_of_dialogue: dict,
+        should_dialogue_stop: bool | None,
+        proposed_next_speaker_name: str | None,
+    ):
+        self._line_of_dialogue = line_of_dialogue
+        self._should_dialogue_stop = should_dialogue_stop
+        self._proposed_next_speaker_name = proposed_next_speaker_name
+
+    def get_line_of_dialogue(self) -> dict:
+        return self._line_of_dialogue
+
+    def get_should_dialogue_stop(self) -> bool | None:
+        return self._should_dialogue_stop
+
+    def get_proposed_next_speaker_name(self) -> str | None:
+        return self._proposed_next_speaker_name
+
+
+class FusedTurnProducer:
+    """Produces a whole turn of dialogue with a single request to the AI model of the agent who speaks now,
+    instead of separate requests for the line of dialogue, the continuation of the dialogue and the next speaker.
+    """
+
+    def __init__(
+        self,
+        conversation_state: ConversationState,
+        line_of_dialogue_producer: LineOfDialogueProducer,
+    ):
+        """Creates an instance of the class FusedTurnProducer.
+
+        Args:
+            conversation_state (ConversationState): the state of the conversation.
+            line_of_dialogue_producer (LineOfDialogueProducer): the producer whose prompt the fused turn extends.
+        """
+        self._conversation_state = conversation_state
+        self._line_of_dialogue_producer = line_of_dialogue_producer
+
+    def _determine_user_content_for_producing_fused_turn(
+        self, agent_who_will_speak_now, dialogue_history_handler, max_tokens
+    ) -> str:
+        characters_involved_section = get_conversation_prompt_builder(
+            self._conversation_state
+        ).get_characters_involved_section()
+
+        conclusion = "\nAfter that line of dialogue, should the dialogue end now because it has reached a natural conclusion? "
+        conclusion += "If it shouldn't, what is the name of the character who will utter the next line of dialogue? "
+        conclusion += f"DON'T choose {agent_who_will_speak_now.get_name()}."
+
+        return "".join(
+            [
+                characters_involved_section,
+                self._line_of_dialogue_producer.determine_user_content_for_producing_line_of_dialogue(
+                    agent_who_will_speak_now,
+                    dialogue_history_handler,
+                    max(
+                        0,
+                        max_tokens
+                        - estimate_tokens_of_text(characters_involved_section)
+                        - estimate_tokens_of_text(conclusion),
+                    ),
+                ),
+                conclusion,
+            ]
+        )
+
+    def produce_fused_turn(
+        self, dialogue_history_handler: DialogueHistoryHandler
+    ) -> FusedTurn:
+        """Delegates to either the user (if a player agent is set) or an AI model producing a turn of dialogue.
+
+        Args:
+            dialogue_history_handler (DialogueHistoryHandler): the handler of the dialogue history.
+
+        Returns:
+            FusedTurn: the line of dialogue, along with the decisions of the AI model for the rest of the turn.
+        """
+        agent_who_will_speak_now = (
+            self._line_of_dialogue_producer.determine_agent_who_will_speak_now()
+        )
+
+        messages = [
+            {"role": SYSTEM_ROLE, "content": PRODUCE_FUSED_TURN_GPT_SYSTEM_CONTENT}
+        ]
+
+        functions = []
+        append_function(
+            functions,
+            WRITE_DIALOGUE_TURN_FUNCTION_NAME,
+            WRITE_DIALOGUE_TURN_FUNCTION_DESCRIPTION,
+            [
+                {
+                    "name": LINE_OF_DIALOGUE_PARAMETER_NAME,
+                    "type": "string",
+                    "description": LINE_OF_DIALOGUE_PARAMETER_DESCRIPTION,
+                },
+                {
+                    "name": SHOULD_STOP_DIALOGUE_AFTER_LINE_PARAMETER_NAME,
+                    "type": "boolean",
+                    "description": SHOULD_STOP_DIALOGUE_AFTER_LINE_PARAMETER_DESCRIPTION,
+                },
+                {
+                    "name": CHARACTER_WHO_WILL_SPEAK_NEXT_PARAMETER_NAME,
+                    "type": "string",
+                    "description": CHARACTER_WHO_WILL_SPEAK_NEXT_PARAMETER_DESCRIPTION,
+                },
+            ],
+        )
+
+        messages.append(
+            {
+                "role": USER_ROLE,
+                "content": self._determine_user_content_for_producing_fused_turn(
+                    agent_who_will_speak_now,
+                    dialogue_history_handler,
+                    determine_remaining_prompt_tokens(GPT_4, messages, functions),
+                ),
+            }
+        )
+
+        self._line_of_dialogue_producer.prefetch_memory_contexts_of_candidates_to_speak_next(
+            agent_who_will_speak_now
+        )
+
+        with request_priority(RequestPriority.DIALOGUE):
+            response = agent_who_will_speak_now.get_ai_model_interface().request_response_using_functions(
+                messages,
+                functions,
+                {"name": WRITE_DIALOGUE_TURN_FUNCTION_NAME},
+                GPT_4,
+            )
+
+        line_of_dialogue = (
+            self._line_of_dialogue_producer.separate_player_response_from_ai_model_response(
+                agent_who_will_speak_now, response
+            )
+        )
+
+        message = get_message_from_gpt_response(response)
+
+        if not message.get("function_call"):
+            # The player wrote the line of dialogue, so there are no decisions for the rest of the turn.
+            return FusedTurn(line_of_dialogue, None, None)
+
+        function_arguments = load_arguments_of_message_with_function_call(message)
+
+        should_dialogue_stop = function_arguments.get(
+            SHOULD_STOP_DIALOGUE_AFTER_LINE_PARAMETER_NAME
+        )
+        proposed_next_speaker_name = function_arguments.get(
+            CHARACTER_WHO_WILL_SPEAK_NEXT_PARAMETER_NAME
+        )
+
+        return FusedTurn(
+            line_of_dialogue,
+            should_dialogue_stop if isinstance(should_dialogue_stop, bool) else None,
+            proposed_next_speaker_name
+            if isinstance(proposed_next_speaker_name, str)
+            and proposed_next_speaker_name.strip()
+            else None,
+        )
@@ -1,20 +1,31 @@
 from agents.agent import Agent
-from datetime_utils import format_timestamp_for_prompt
-from defines.defines import GPT_4, SYSTEM_ROLE, USER_ROLE
+from defines.defines import (
+    GPT_4,
+    MAX_MEMORY_CONTEXT_TOKENS,
+    SYSTEM_ROLE,
+    USER_ROLE,
+)
+from dialogue.conversation_prompt_builder import get_conversation_prompt_builder
 from dialogue.conversation_state import ConversationState
 from dialogue.dialogue_history_handler import DialogueHistoryHandler
+from dialogue.memory_context_prefetcher import MemoryContextPrefetcher
 from dialogue.speaker_selector import SpeakerSelector
 from dialogue.prompting import (
-    add_involved_agents_status,
-    add_reason_for_conversation,
-    add_relevant_memories_regarding_interlocutors,
+    determine_relevant_memories_regarding_interlocutors,
+    render_relevant_memories_regarding_interlocutors,
 )
 from dialogue.speaking_order import determine_agent_who_will_speak_now
+from enums.enums import DialoguePromptKind, RequestPriority
 from llms.functions import append_function
 from llms.messages import (
     get_message_from_gpt_response,
     load_arguments_of_message_with_function_call,
 )
+from llms.request_scheduler import request_priority
+from llms.token_estimation import (
+    determine_remaining_prompt_tokens,
+    estimate_tokens_of_text,
+)
 
 PRODUCE_LINE_OF_DIALOGUE_GPT_SYSTEM_CONTENT = "I am LineOfDialogueProducerGPT. I have the responsibility of writing the following line "
 PRODUCE_LINE_OF_DIALOGUE_GPT_SYSTEM_CONTENT += "of dialogue in this conversation."
@@ -33,11 +44,25 @@ class LineOfDialogueProducer:
         self,
         conversation_state: ConversationState,
         speaker_selector: SpeakerSelector,
+        memory_context_prefetcher: MemoryContextPrefetcher | None = None,
+        max_memory_context_tokens: int = MAX_MEMORY_CONTEXT_TOKENS,
     ):
+        """Creates an instance of the class LineOfDialogueProducer.
+
+        Args:
+            conversation_state (ConversationState): the state of the conversation.
+            speaker_selector (SpeakerSelector): the selector of the agent who will speak now.
+            memory_context_prefetcher (MemoryContextPrefetcher | None): if passed, the memory contexts of the
+                candidates to speak next get retrieved while the current line of dialogue is being produced.
+            max_memory_context_tokens (int): how many tokens the relevant memories can take up in the prompt.
+                The memories that bring the most score per token get in first.
+        """
         self._conversation_state = conversation_state
         self._speaker_selector = speaker_selector
+        self._memory_context_prefetcher = memory_context_prefetcher
+        self._max_memory_context_tokens = max_memory_context_tokens
 
-    def _separate_player_response_from_ai_model_response(
+    def separate_player_response_from_ai_model_response(
         self, agent_who_will_speak_now: Agent, response: dict
     ) -> dict:
         """Handles the response gotten either from the player or from an AI model.
@@ -50,6 +75,9 @@ class LineOfDialogueProducer:
 
         Raises:
             ValueError: if the contents of 'response' were unexpected.
+
+        Returns:
+            dict: the line of dialogue, in the format of a GPT message.
         """
         if response.get("choices"):
             # Could be the case that function call isn't set
@@ -75,51 +103,106 @@ class LineOfDialogueProducer:
         error_message += f"\nAgent who will speak now: {agent_who_will_speak_now}"
         raise ValueError(error_message)
 
-    def _determine_user_content_for_producing_line_of_dialogue(
+    def determine_user_content_for_producing_line_of_dialogue(
         self,
         agent_who_will_speak_now: Agent,
         dialogue_history_handler: DialogueHistoryHandler,
+        max_tokens: int | None = None,
     ) -> str:
         """Determines part of the text that will end up in the prompt sent to the AI model,
         who will produce a line of dialogue based on the prompt.
 
         Args:
             agent_who_will_speak_now (Agent): the agent chosen to speak now.
+            dialogue_history_handler (DialogueHistoryHandler): the handler of the dialogue history.
+            max_tokens (int | None): how many tokens the text can take up. If passed, the latest lines
+                of dialogue get the room first, and the relevant memories take up what remains.
 
         Returns:
             str: part of the text that will end up in the prompt to be sent to the AI model.
         """
-        user_content = ""
+        stable_prefix = get_conversation_prompt_builder(
+            self._conversation_state
+        ).get_stable_prefix(
+            DialoguePromptKind.LINE_OF_DIALOGUE, agent_who_will_speak_now
+        )
+
+        # Prompt the AI model to write a line for the dialogue.
+        conclusion = f"\n{agent_who_will_speak_now.get_name()} is going to speak now. What does {agent_who_will_speak_now.get_name()} say?"
 
-        if agent_who_will_speak_now.get_character_summary() is not None:
-            user_content += f"{agent_who_will_speak_now.get_character_summary()}\n"
+        remaining_tokens = None
 
-        user_content += f"{format_timestamp_for_prompt(self._conversation_state.get_current_timestamp())}\n"
+        if max_tokens is not None:
+            remaining_tokens = max(
+                0,
+                max_tokens
+                - estimate_tokens_of_text(stable_prefix)
+                - estimate_tokens_of_text(conclusion),
+            )
 
-        user_content = add_involved_agents_status(
-            user_content, self._conversation_state.get_involved_agents()
+        dialogue_history = dialogue_history_handler.add_dialogue_history_for_prompt(
+            "", remaining_tokens
         )
 
-        user_content = add_reason_for_conversation(
-            user_content, self._conversation_state.get_reason_for_conversation()
+        memory_context_tokens = self._max_memory_context_tokens
+
+        if remaining_tokens is not None:
+            memory_context_tokens = min(
+                memory_context_tokens,
+                max(0, remaining_tokens - estimate_tokens_of_text(dialogue_history)),
+            )
+
+        return "".join(
+            [
+                stable_prefix,
+                render_relevant_memories_regarding_interlocutors(
+                    agent_who_will_speak_now.get_name(),
+                    self._determine_relevant_memories(agent_who_will_speak_now),
+                    memory_context_tokens,
+                ),
+                dialogue_history,
+                conclusion,
+            ]
         )
 
-        user_content = add_relevant_memories_regarding_interlocutors(
+    def _determine_relevant_memories(
+        self, agent_who_will_speak_now: Agent
+    ) -> dict[str, list[tuple[str, float]]]:
+        if self._memory_context_prefetcher is not None:
+            return self._memory_context_prefetcher.get_relevant_memories(
+                agent_who_will_speak_now
+            )
+
+        return determine_relevant_memories_regarding_interlocutors(
             self._conversation_state.get_current_timestamp(),
-            user_content,
             agent_who_will_speak_now,
             self._conversation_state.get_involved_agents(),
         )
 
-        # Now add the dialogue history
-        user_content = dialogue_history_handler.add_dialogue_history_for_prompt(
-            user_content
-        )
+    def prefetch_memory_contexts_of_candidates_to_speak_next(
+        self, agent_who_will_speak_now: Agent
+    ):
+        """Starts retrieving the memory contexts of the candidates to speak next, if a prefetcher was passed.
+        It should be called right before requesting the current line of dialogue, so both overlap.
 
-        # Prompt the AI model to write a line for the dialogue.
-        user_content += f"\n{agent_who_will_speak_now.get_name()} is going to speak now. What does {agent_who_will_speak_now.get_name()} say?"
+        Args:
+            agent_who_will_speak_now (Agent): the agent who will speak now.
+        """
+        if self._memory_context_prefetcher is not None:
+            self._memory_context_prefetcher.prefetch_memory_contexts_of_candidates_to_speak_next(
+                agent_who_will_speak_now
+            )
 
-        return user_content
+    def determine_agent_who_will_speak_now(self) -> Agent:
+        """Determines the involved agent who has been selected to speak now.
+
+        Returns:
+            Agent: the agent who will speak now.
+        """
+        return determine_agent_who_will_speak_now(
+            self._speaker_selector.get_next_speaker(),
+            self._conversation_state.get_involved_agents(),
+        )
 
     def produce_line_of_dialogue(
         self, dialogue_history_handler: DialogueHistoryHandler
@@ -134,19 +217,7 @@ class LineOfDialogueProducer:
             }
         )
 
-        agent_who_will_speak_now = determine_agent_who_will_speak_now(
-            self._speaker_selector.get_next_speaker(),
-            self._conversation_state.get_involved_agents(),
-        )
-
-        messages.append(
-            {
-                "role": USER_ROLE,
-                "content": self._determine_user_content_for_producing_line_of_dialogue(
-                    agent_who_will_speak_now, dialogue_history_handler
-                ),
-            }
-        )
+        agent_who_will_speak_now = self.determine_agent_who_will_speak_now()
 
         functions = []
         append_function(
@@ -162,12 +233,30 @@ class LineOfDialogueProducer:
             ],
         )
 
-        return self._separate_player_response_from_ai_model_response(
-            agent_who_will_speak_now,
-            agent_who_will_speak_now.get_ai_model_interface().request_response_using_functions(
+        messages.append(
+            {
+                "role": USER_ROLE,
+                "content": self.determine_user_content_for_producing_line_of_dialogue(
+                    agent_who_will_speak_now,
+                    dialogue_history_handler,
+                    determine_remaining_prompt_tokens(GPT_4, messages, functions),
+                ),
+            }
+        )
+
+        self.prefetch_memory_contexts_of_candidates_to_speak_next(
+            agent_who_will_speak_now
+        )
+
+        # The player is waiting for this line, so it goes ahead of any background request.
+        with request_priority(RequestPriority.DIALOGUE):
+            response = agent_who_will_speak_now.get_ai_model_interface().request_response_using_functions(
                 messages,
                 functions,
                 {"name": WRITE_LINE_OF_DIALOGUE_FUNCTION_NAME},
                 GPT_4,
-            ),
+            )
+
+        return self.separate_player_response_from_ai_model_response(
+            agent_who_will_speak_now, response
         )
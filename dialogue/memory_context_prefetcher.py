@@ -0,0 +1,114 @@
+"""This module contains the definition of MemoryContextPrefetcher, which retrieves the relevant memories
+of the agents who may speak next while the current line of dialogue is still being produced.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+
+from agents.agent import Agent
+from dialogue.conversation_state import ConversationState
+from dialogue.prompting import determine_relevant_memories_regarding_interlocutors
+
+
+class MemoryContextPrefetcher:
+    """Retrieves in the background the memory context of the likely next speaker: in a dialogue between two agents,
+    the one not speaking now, and otherwise the one who spoke right before the current speaker.
+    Retrieving a memory context records the accesses to the memories, which affects their future scores,
+    so the candidates are restricted to avoid recording accesses that no line of dialogue will use.
+    A memory context that isn't consumed by the next line of dialogue gets dropped.
+    """
+
+    def __init__(self, conversation_state: ConversationState):
+        """Creates an instance of the class MemoryContextPrefetcher.
+
+        Args:
+            conversation_state (ConversationState): the state of the conversation.
+        """
+        self._conversation_state = conversation_state
+
+        self._memory_context_futures: dict[str, Future] = {}
+        self._name_of_previous_speaker = None
+        self._lock = Lock()
+
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def _determine_relevant_memories(
+        self, agent: Agent
+    ) -> dict[str, list[tuple[str, float]]]:
+        return determine_relevant_memories_regarding_interlocutors(
+            self._conversation_state.get_current_timestamp(),
+            agent,
+            self._conversation_state.get_involved_agents(),
+        )
+
+    def _determine_likely_next_speakers(
+        self, agent_who_will_speak_now: Agent
+    ) -> list[Agent]:
+        candidates = [
+            agent
+            for agent in self._conversation_state.get_involved_agents()
+            if agent.get_name() != agent_who_will_speak_now.get_name()
+        ]
+
+        if len(candidates) == 1:
+            return candidates
+
+        # Among several agents, the one who spoke before the current speaker is the likeliest to answer.
+        return [
+            agent
+            for agent in candidates
+            if agent.get_name() == self._name_of_previous_speaker
+        ]
+
+    def prefetch_memory_contexts_of_candidates_to_speak_next(
+        self, agent_who_will_speak_now: Agent
+    ):
+        """Starts retrieving the memory context of the likely next speaker. Any memory context prefetched
+        for an earlier line of dialogue that hasn't been consumed is dropped, because it's out of date.
+
+        Args:
+            agent_who_will_speak_now (Agent): the agent who will speak now, who won't be prefetched.
+        """
+        with self._lock:
+            for memory_context_future in self._memory_context_futures.values():
+                memory_context_future.cancel()
+
+            self._memory_context_futures = {
+                agent.get_name(): self._executor.submit(
+                    self._determine_relevant_memories, agent
+                )
+                for agent in self._determine_likely_next_speakers(
+                    agent_who_will_speak_now
+                )
+            }
+
+            self._name_of_previous_speaker = agent_who_will_speak_now.get_name()
+
+    def get_relevant_memories(
+        self, agent_who_will_speak_now: Agent
+    ) -> dict[str, list[tuple[str, float]]]:
+        """Returns the memory context of the agent who will speak now, consuming the prefetched one if there is one
+        (waiting for it if necessary), or retrieving it right away otherwise.
+
+        Args:
+            agent_who_will_speak_now (Agent): the agent who will speak now.
+
+        Returns:
+            dict[str, list[tuple[str, float]]]: the relevant memories of the agent regarding every other
+                involved agent, by name, along with their scores.
+        """
+        with self._lock:
+            memory_context_future = self._memory_context_futures.pop(
+                agent_who_will_speak_now.get_name(), None
+            )
+
+        if memory_context_future is None:
+            return self._determine_relevant_memories(agent_who_will_speak_now)
+
+        return memory_context_future.result()
+
+    def close(self):
+        """Stops prefetching. Any memory context that hasn't started being retrieved is discarded."""
+        with self._lock:
+            self._memory_context_futures.clear()
+
+        self._executor.shutdown(wait=False, cancel_futures=True)
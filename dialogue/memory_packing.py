@@ -0,0 +1,90 @@
+"""This module packs the relevant memories of an agent regarding its interlocutors into a token budget.
+The memories retrieved for every interlocutor compete for the same budget: duplicates are kept only once,
+and the memories that bring the most score per token get in first.
+"""
+from llms.token_estimation import estimate_tokens_of_text
+
+
+def _deduplicate_scored_memories(
+    scored_memories: dict[str, list[tuple[str, float]]]
+) -> list[tuple[str, str, float]]:
+    # A memory retrieved for several interlocutors stays with the one for which it scored the highest.
+    best_candidates = {}
+
+    for interlocutor_name, memories in scored_memories.items():
+        for description, score in memories:
+            best_candidate = best_candidates.get(description)
+
+            if best_candidate is None or score > best_candidate[1]:
+                best_candidates[description] = (interlocutor_name, score)
+
+    return [
+        (interlocutor_name, description, score)
+        for description, (interlocutor_name, score) in best_candidates.items()
+    ]
+
+
+def pack_memories(
+    scored_memories: dict[str, list[tuple[str, float]]],
+    max_tokens: int | None = None,
+    header_tokens: dict[str, int] | None = None,
+) -> dict[str, list[str]]:
+    """Packs the relevant memories regarding every interlocutor into a token budget. Duplicated memories are
+    kept only once, and the rest are chosen greedily by score per token.
+
+    Args:
+        scored_memories (dict[str, list[tuple[str, float]]]): the memories retrieved regarding every interlocutor,
+            by name, along with their scores.
+        max_tokens (int | None): how many tokens the packed memories can take up. If None, every memory fits.
+        header_tokens (dict[str, int] | None): how many tokens the header that introduces the memories regarding
+            every interlocutor takes up. It only counts for the interlocutors that end up with some memory.
+
+    Returns:
+        dict[str, list[str]]: the packed memories regarding every interlocutor that got any, by name,
+            in descending order of scores. The interlocutors keep their original order.
+    """
+    header_tokens = header_tokens or {}
+
+    candidates = [
+        (
+            interlocutor_name,
+            description,
+            score,
+            # Every memory also takes up the space that separates it from the next.
+            estimate_tokens_of_text(description) + 1,
+        )
+        for interlocutor_name, description, score in _deduplicate_scored_memories(
+            scored_memories
+        )
+    ]
+
+    if max_tokens is not None:
+        candidates.sort(key=lambda candidate: candidate[2] / candidate[3], reverse=True)
+
+    packed_memories = {}
+    used_tokens = 0
+
+    for interlocutor_name, description, score, memory_tokens in candidates:
+        required_tokens = memory_tokens
+
+        if interlocutor_name not in packed_memories:
+            required_tokens += header_tokens.get(interlocutor_name, 0)
+
+        if max_tokens is not None and used_tokens + required_tokens > max_tokens:
+            continue
+
+        packed_memories.setdefault(interlocutor_name, []).append((description, score))
+        used_tokens += required_tokens
+
+    return {
+        interlocutor_name: [
+            description
+            for description, _ in sorted(
+                packed_memories[interlocutor_name],
+                key=lambda memory: memory[1],
+                reverse=True,
+            )
+        ]
+        for interlocutor_name in scored_memories
+        if interlocutor_name in packed_memories
+    }
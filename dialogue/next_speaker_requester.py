@@ -2,13 +2,17 @@
 the name of the character who will either speak first or speak next.
 """
 from typing import Callable
-from defines.defines import SYSTEM_ROLE, USER_ROLE
+from defines.defines import GPT_3_5, SYSTEM_ROLE, USER_ROLE
 from dialogue.conversation_state import ConversationState
 from dialogue.dialogue_history_handler import DialogueHistoryHandler
 from dialogue.speaking_order import request_from_ai_model_who_will_speak_next
 from dialogue.user_content import add_user_content_for_who_will_speak
 from llms.functions import append_function
 from llms.interface import AIModelInterface
+from llms.token_estimation import (
+    determine_remaining_prompt_tokens,
+    estimate_tokens_of_text,
+)
 
 WHO_WILL_SPEAK_FIRST_GPT_SYSTEM_CONTENT = "I am WhoWillSpeakFirstGPT. I have the responsibility of determining the exact name of the agent who will "
 WHO_WILL_SPEAK_FIRST_GPT_SYSTEM_CONTENT += (
@@ -69,14 +73,6 @@ class NextSpeakerRequester:
         """
         messages = [{"role": SYSTEM_ROLE, "content": system_content}]
 
-        user_content = add_user_content_for_who_will_speak(
-            self._conversation_state,
-            self._dialogue_history_handler,
-        )
-
-        user_content += user_content_conclusion
-        messages.append({"role": USER_ROLE, "content": user_content})
-
         functions = []
         append_function(
             functions,
@@ -91,6 +87,16 @@ class NextSpeakerRequester:
             ],
         )
 
+        user_content = add_user_content_for_who_will_speak(
+            self._conversation_state,
+            self._dialogue_history_handler,
+            determine_remaining_prompt_tokens(GPT_3_5, messages, functions)
+            - estimate_tokens_of_text(user_content_conclusion),
+        )
+
+        user_content += user_content_conclusion
+        messages.append({"role": USER_ROLE, "content": user_content})
+
         return request_from_ai_model_who_will_speak_next(
             messages,
             functions,
@@ -1,42 +1,122 @@
 from datetime import datetime
 from agents.agent import Agent
-from vector_databases.database_loader import DatabaseLoader
+from dialogue.memory_packing import pack_memories
+from llms.token_estimation import estimate_tokens_of_text
+from paths.full_paths import (
+    get_base_memories_full_path,
+    get_base_memories_json_full_path,
+)
 from vector_databases.database_querier import DatabaseQuerier
+from vector_databases.database_updater import DatabaseUpdater
+from vector_databases.memory_store_registry import MEMORY_STORE_REGISTRY
 
 NUMBER_OF_RESULTS_FOR_RELATIONSHIP_WITH_INTERLOCUTOR_QUERY = 20
 
 
-def add_relevant_memories_regarding_interlocutors(
+def determine_relevant_memories_regarding_interlocutors(
     current_timestamp: datetime,
-    user_content: str,
     agent_who_will_speak_now: Agent,
     involved_agents: list[Agent],
-):
-    index, memories_raw_data = DatabaseLoader(
+) -> dict[str, list[tuple[str, float]]]:
+    """Determines the relevant memories of the agent who will speak now regarding every other involved agent.
+    They don't depend on the dialogue history, so they can be determined ahead of time.
+
+    Args:
+        current_timestamp (datetime): the current timestamp.
+        agent_who_will_speak_now (Agent): the agent whose memories will be queried.
+        involved_agents (list[Agent]): the agents involved in the conversation.
+
+    Returns:
+        dict[str, list[tuple[str, float]]]: the relevant memories regarding every other involved agent, by name,
+            along with their scores, from the most to the least relevant.
+    """
+    relevant_memories = {}
+
+    database_full_path = get_base_memories_full_path(
         agent_who_will_speak_now.get_name()
-    ).load()
+    )
+    database_json_full_path = get_base_memories_json_full_path(
+        agent_who_will_speak_now.get_name()
+    )
 
-    memories_database_querier = DatabaseQuerier(
+    # The memories database remains resident in the registry between lines of dialogue,
+    # so it only gets loaded from disk the first time or after its files have changed.
+    with MEMORY_STORE_REGISTRY.borrow_memory_store(
         agent_who_will_speak_now.get_name(),
-        current_timestamp,
-        memories_raw_data,
-        index,
+        database_full_path,
+        database_json_full_path,
+    ) as (index, memories_raw_data):
+        memories_database_querier = DatabaseQuerier(
+            current_timestamp,
+            memories_raw_data,
+            index,
+            database_full_path,
+            database_json_full_path,
+            DatabaseUpdater(
+                current_timestamp, database_full_path, database_json_full_path
+            ),
+            MEMORY_STORE_REGISTRY.get_scoring_columns(
+                agent_who_will_speak_now.get_name()
+            ),
+        )
+
+        for agent in involved_agents:
+            if agent != agent_who_will_speak_now:
+                relevant_memories[
+                    agent.get_name()
+                ] = memories_database_querier.query_with_scores(
+                    f"What is {agent_who_will_speak_now.get_name()}'s relationship with {agent.get_name()}?",
+                    NUMBER_OF_RESULTS_FOR_RELATIONSHIP_WITH_INTERLOCUTOR_QUERY,
+                )
+
+    return relevant_memories
+
+
+def _create_memory_context_header(agent_name: str, interlocutor_name: str) -> str:
+    return f"Summary of relevant context from {agent_name}'s memory regarding {interlocutor_name}:\n"
+
+
+def render_relevant_memories_regarding_interlocutors(
+    agent_name: str,
+    relevant_memories: dict[str, list[tuple[str, float]]],
+    max_tokens: int | None = None,
+) -> str:
+    """Renders the section of a prompt that contains the relevant memories of an agent regarding
+    the other involved agents. Memories retrieved for several interlocutors appear only once.
+
+    Args:
+        agent_name (str): the name of the agent whose memories they are.
+        relevant_memories (dict[str, list[tuple[str, float]]]): the relevant memories regarding every other
+            involved agent, by name, along with their scores.
+        max_tokens (int | None): how many tokens the section can take up. If passed, the memories that bring
+            the most score per token get in first, and the rest are left out.
+
+    Returns:
+        str: the section of the prompt with the relevant memories.
+    """
+    packed_memories = pack_memories(
+        relevant_memories,
+        max_tokens,
+        {
+            # Every header also takes up the line break that closes its memories.
+            interlocutor_name: estimate_tokens_of_text(
+                _create_memory_context_header(agent_name, interlocutor_name)
+            )
+            + 1
+            for interlocutor_name in relevant_memories
+        },
     )
 
-    for agent in involved_agents:
-        if agent != agent_who_will_speak_now:
-            relevant_memories = memories_database_querier.query(
-                f"What is {agent_who_will_speak_now.get_name()}'s relationship with {agent.get_name()}?",
-                NUMBER_OF_RESULTS_FOR_RELATIONSHIP_WITH_INTERLOCUTOR_QUERY,
-            )
+    memory_context = ""
 
-            user_content += f"Summary of relevant context from {agent_who_will_speak_now.get_name()}'s memory regarding {agent.get_name()}:\n"
+    for interlocutor_name, memories in packed_memories.items():
+        memory_context += _create_memory_context_header(agent_name, interlocutor_name)
 
-            user_content += " ".join(relevant_memories)
+        memory_context += " ".join(memories)
 
-            user_content += "\n"
+        memory_context += "\n"
 
-    return user_content
+    return memory_context
 
 
 def add_involved_agents_status(user_content: str, involved_agents: list[Agent]):
@@ -0,0 +1,69 @@
+"""This module contains the definition of RollingDialogueSummarizer, which folds the lines of dialogue that
+have fallen out of the prompts into a running summary of the earlier dialogue.
+"""
+from defines.defines import GPT_3_5, SYSTEM_ROLE, USER_ROLE
+from errors import InvalidParameterError
+from llms.interface import AIModelInterface
+from llms.messages import get_message_from_gpt_response
+
+MAX_WORDS_OF_ROLLING_DIALOGUE_SUMMARY = 150
+
+ROLLING_DIALOGUE_SUMMARIZER_GPT_SYSTEM_CONTENT = "I am RollingDialogueSummarizerGPT. I have the responsibility of keeping up to date the summary of "
+ROLLING_DIALOGUE_SUMMARIZER_GPT_SYSTEM_CONTENT += "a dialogue held between two or more characters, folding new lines of dialogue into it while keeping "
+ROLLING_DIALOGUE_SUMMARIZER_GPT_SYSTEM_CONTENT += "the most important points of the whole dialogue."
+
+
+class RollingDialogueSummarizer:
+    """Folds lines of dialogue into a running summary of the dialogue, relying on a cheap AI model."""
+
+    def __init__(self, ai_model_interface: AIModelInterface, model: str = GPT_3_5):
+        """Creates an instance of the class RollingDialogueSummarizer.
+
+        Args:
+            ai_model_interface (AIModelInterface): the interface to request responses from the AI model.
+            model (str): the AI model that folds the lines of dialogue into the summary.
+        """
+        self._ai_model_interface = ai_model_interface
+        self._model = model
+
+    def fold_lines_of_dialogue(
+        self, previous_summary: str | None, lines_of_dialogue: list[str]
+    ) -> str:
+        """Folds lines of dialogue into the summary of the dialogue that preceded them.
+
+        Args:
+            previous_summary (str | None): the summary of the dialogue so far, if there is one.
+            lines_of_dialogue (list[str]): the lines of dialogue that followed the previous summary.
+
+        Raises:
+            InvalidParameterError: if 'lines_of_dialogue' is empty.
+
+        Returns:
+            str: the summary of the whole dialogue, including the folded lines.
+        """
+        if not lines_of_dialogue:
+            raise InvalidParameterError(
+                f"The function {self.fold_lines_of_dialogue.__name__} expected 'lines_of_dialogue' to contain lines of dialogue."
+            )
+
+        user_content = ""
+
+        if previous_summary:
+            user_content += f"Summary of the dialogue so far:\n{previous_summary}\n\n"
+
+        user_content += "Lines of dialogue that followed:\n"
+        user_content += "\n".join(lines_of_dialogue)
+        user_content += f"\n\nWrite the updated summary of the whole dialogue, in at most {MAX_WORDS_OF_ROLLING_DIALOGUE_SUMMARY} words."
+
+        response = self._ai_model_interface.request_response(
+            [
+                {
+                    "role": SYSTEM_ROLE,
+                    "content": ROLLING_DIALOGUE_SUMMARIZER_GPT_SYSTEM_CONTENT,
+                },
+                {"role": USER_ROLE, "content": user_content},
+            ],
+            self._model,
+        )
+
+        return get_message_from_gpt_response(response)["content"].strip()
@@ -110,8 +110,29 @@ class SpeakerSelector:
         sometimes chooses the same agent to speak twice (or more) in a row, for obscure reasons.
         As a side effect, the internal attribute 'self._next_speaker' is set.
         """
+        self.select_proposed_next_speaker(self.request_next_speaker_name())
+
+    def request_next_speaker_name(self) -> str:
+        """Requests from the AI model the name of the agent who will speak next, without selecting it.
+        It only reads the state of the dialogue, so it can run concurrently with other requests.
+
+        Returns:
+            str: the name of the agent that the AI model proposed to speak next.
+        """
+        return self._next_speaker_requester.request_next_speaker()
+
+    def select_proposed_next_speaker(self, proposed_next_speaker_name: str):
+        """Selects the next speaker out of the name proposed by the AI model, applying the same safeguards
+        as 'select_next_speaker': the agent who spoke last won't be chosen to speak again.
+
+        Args:
+            proposed_next_speaker_name (str): the name of the agent that the AI model proposed to speak next.
+
+        Raises:
+            CouldntFindMatchingAgentError: if no involved agent matches the proposed name.
+        """
         matching_agent = self._find_involved_agent_with_matching_name(
-            self._next_speaker_requester.request_next_speaker()
+            proposed_next_speaker_name
         )
 
         # we would never want to have the same person talking twice in a row.
@@ -1,35 +1,23 @@
-from datetime_utils import format_timestamp_for_prompt
+from dialogue.conversation_prompt_builder import get_conversation_prompt_builder
 from dialogue.conversation_state import ConversationState
 from dialogue.dialogue_history_handler import DialogueHistoryHandler
-from dialogue.prompting import (
-    add_agent_statuses,
-    add_characters_involved_in_conversation,
-    add_reason_for_conversation,
-)
+from enums.enums import DialoguePromptKind
+from llms.token_estimation import estimate_tokens_of_text
 
 
 def add_user_content_for_who_will_speak(
     conversation_state: ConversationState,
     dialogue_history_handler: DialogueHistoryHandler,
+    max_tokens: int | None = None,
 ):
-    user_content = (
-        f"{format_timestamp_for_prompt(conversation_state.get_current_timestamp())}\n"
-    )
-
-    user_content = add_characters_involved_in_conversation(
-        user_content, conversation_state.get_involved_agents()
-    )
-
-    user_content = add_agent_statuses(
-        user_content, conversation_state.get_involved_agents()
-    )
-
-    user_content = add_reason_for_conversation(
-        user_content, conversation_state.get_reason_for_conversation()
-    )
+    stable_prefix = get_conversation_prompt_builder(
+        conversation_state
+    ).get_stable_prefix(DialoguePromptKind.WHO_WILL_SPEAK)
 
-    user_content = dialogue_history_handler.add_dialogue_history_for_prompt(
-        user_content
+    # Whatever remains of the budget goes to the latest lines of dialogue.
+    return stable_prefix + dialogue_history_handler.add_dialogue_history_for_prompt(
+        "",
+        None
+        if max_tokens is None
+        else max(0, max_tokens - estimate_tokens_of_text(stable_prefix)),
     )
-
-    return user_content
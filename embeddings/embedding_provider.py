@@ -0,0 +1,82 @@
+"""This module contains the definition of EmbeddingProvider, which loads the sentence embedding model
+only when it's first needed, so that importing the library doesn't pay for the model's startup.
+"""
+from threading import Lock
+from typing import Any, Callable, List
+
+from defines.defines import EMBEDDING_MODEL_NAME
+
+
+def load_sentence_transformer(model_name: str):
+    """Loads a SentenceTransformer model. The import happens here so that merely importing
+    this module doesn't pull in torch.
+
+    Args:
+        model_name (str): the name of the SentenceTransformer model to load.
+
+    Returns:
+        SentenceTransformer: the loaded model.
+    """
+    # pylint: disable=import-outside-toplevel
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(model_name)
+
+
+class EmbeddingProvider:
+    """Provides sentence embeddings, loading the underlying model on the first request.
+    It's safe to use from several threads: the model is only ever loaded once.
+    """
+
+    def __init__(
+        self,
+        model_name: str = EMBEDDING_MODEL_NAME,
+        model_loader: Callable[[str], Any] = load_sentence_transformer,
+    ):
+        """Creates an instance of the class EmbeddingProvider.
+
+        Args:
+            model_name (str): the name of the embedding model.
+            model_loader (Callable[[str], Any]): the function that loads the model given its name.
+        """
+        self._model_name = model_name
+        self._model_loader = model_loader
+
+        self._model = None
+        self._lock = Lock()
+
+    def _get_model(self):
+        # Double-checked so that the lock is only contended until the model has been loaded.
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self._model_loader(self._model_name)
+
+        return self._model
+
+    def is_loaded(self) -> bool:
+        """Returns whether the embedding model has been loaded already.
+
+        Returns:
+            bool: whether the embedding model has been loaded.
+        """
+        return self._model is not None
+
+    def prewarm(self):
+        """Loads the embedding model right away, instead of waiting for the first call to 'encode'."""
+        self._get_model()
+
+    def encode(self, sentences: str | List[str], **kwargs):
+        """Encodes one or more sentences into embeddings, loading the model if necessary.
+
+        Args:
+            sentences (str | List[str]): the sentence or sentences to encode.
+            **kwargs: any additional arguments accepted by the model's 'encode' (for example 'batch_size').
+
+        Returns:
+            numpy.ndarray: the embedding of the sentence, or a matrix with one embedding per sentence.
+        """
+        return self._get_model().encode(sentences, **kwargs)
+
+
+EMBEDDING_PROVIDER = EmbeddingProvider()
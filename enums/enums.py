@@ -1,2 +1,19 @@
 """This module contains all the custom Enums used throughout the library.
 """
+from enum import IntEnum
+
+
+class RequestPriority(IntEnum):
+    """The priority with which requests to AI models get scheduled. Lower values are served first."""
+
+    DIALOGUE = 0
+    DEFAULT = 1
+    BACKGROUND = 2
+
+
+class DialoguePromptKind(IntEnum):
+    """The kinds of prompts sent to AI models during a dialogue, each of which starts with its own stable prefix."""
+
+    LINE_OF_DIALOGUE = 0
+    DIALOGUE_CONTINUATION = 1
+    WHO_WILL_SPEAK = 2
@@ -48,3 +48,11 @@ class CouldntFindMatchingAgentError(Exception):
 
 class PromptTooBigError(Exception):
     pass
+
+
+class InvalidColumnarMetadataError(Exception):
+    pass
+
+
+class MemoryServiceError(Exception):
+    pass
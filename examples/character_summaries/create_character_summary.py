@@ -2,7 +2,11 @@
 import argparse
 from datetime import datetime
 
+from character_summaries.character_summaries_refresher import (
+    refresh_character_summaries,
+)
 from character_summaries.character_summary_creator import CharacterSummaryCreator
+from vector_databases.memory_service_client import MemoryServiceClient
 
 
 def main():
@@ -11,18 +15,54 @@ def main():
     )
     parser.add_argument(
         "agent_name",
+        nargs="?",
         help="The name of the agent whose character summary will be created.",
     )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Refreshes the character summaries of every agent that has a memories database and a character summary.",
+    )
+    parser.add_argument(
+        "--regenerate-all",
+        action="store_true",
+        help="Determines every attribute again, even if its inputs haven't changed.",
+    )
+    parser.add_argument(
+        "--service-url",
+        help=(
+            "The url of a running memory service (for example 'http://127.0.0.1:8765'). If passed, "
+            "the memories are queried through the service instead of loading the memories databases in this process."
+        ),
+    )
 
     args = parser.parse_args()
 
+    current_timestamp = datetime(2023, 6, 6)
+
+    memory_service_client = (
+        MemoryServiceClient(args.service_url) if args.service_url else None
+    )
+
+    if args.all:
+        refreshed_attributes = refresh_character_summaries(
+            current_timestamp,
+            regenerate_all=args.regenerate_all,
+            memory_service_client=memory_service_client,
+        )
+
+        for agent_name, attribute_names in refreshed_attributes.items():
+            print(f"{agent_name}: {', '.join(attribute_names) or 'up to date'}")
+
+        return None
+
     if not args.agent_name:
         print("Error: The name of the agent cannot be empty.")
         return None
 
-    current_timestamp = datetime(2023, 6, 6)
-
-    CharacterSummaryCreator(args.agent_name, current_timestamp).create()
+    CharacterSummaryCreator(
+        args.agent_name, current_timestamp, memory_service_client=memory_service_client
+    ).create(args.regenerate_all)
 
 
 if __name__ == "__main__":
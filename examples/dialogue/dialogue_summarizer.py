@@ -2,6 +2,7 @@
 
 
 from dialogue.dialogue_summarizer import DialogueSummarizer
+from llms.gpt_responder import GPTResponder
 
 
 def main():
@@ -180,7 +181,7 @@ def main():
         }
     )
 
-    dialogue_summarizer = DialogueSummarizer(messages)
+    dialogue_summarizer = DialogueSummarizer(messages, GPTResponder())
 
     dialogue_summary = dialogue_summarizer.summarize()
 
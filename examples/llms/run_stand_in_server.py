@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+import argparse
+
+from defines.defines import STAND_IN_SERVER_HOST, STAND_IN_SERVER_PORT
+from llms.stand_in_responder import (
+    StandInResponseSource,
+    create_constant_latency,
+    create_lognormal_latency,
+    create_uniform_latency,
+)
+from llms.stand_in_server import run_stand_in_server
+from llms.transcripts import load_transcript
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Runs a local stand-in for the chat completions endpoint of the OpenAI API, replaying recorded transcripts or synthesizing valid responses."
+    )
+    parser.add_argument(
+        "--host",
+        default=STAND_IN_SERVER_HOST,
+        help="The host on which the stand-in server will listen.",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=STAND_IN_SERVER_PORT,
+        help="The port on which the stand-in server will listen.",
+    )
+    parser.add_argument(
+        "--transcript",
+        help="The full path of a transcript recorded with RecordingAIModelInterface, whose responses will be replayed.",
+    )
+    parser.add_argument(
+        "--latency",
+        choices=["constant", "uniform", "lognormal"],
+        default="lognormal",
+        help="The distribution that the latency of the responses will follow.",
+    )
+    parser.add_argument(
+        "--latency-seconds",
+        type=float,
+        default=1.0,
+        help="The latency of every response if constant, its maximum if uniform, or its median if log-normal.",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="The seed of the randomness, so that benchmarks can be reproduced.",
+    )
+
+    args = parser.parse_args()
+
+    if args.latency == "constant":
+        latency_distribution = create_constant_latency(args.latency_seconds)
+    elif args.latency == "uniform":
+        latency_distribution = create_uniform_latency(0.0, args.latency_seconds)
+    else:
+        latency_distribution = create_lognormal_latency(args.latency_seconds)
+
+    response_source = StandInResponseSource(
+        load_transcript(args.transcript) if args.transcript else None,
+        latency_distribution,
+        seed=args.seed,
+    )
+
+    print(f"Serving the stand-in AI model at http://{args.host}:{args.port}/v1")
+
+    run_stand_in_server(response_source, args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+import argparse
+
+from paths.full_paths import get_base_memories_json_full_path
+from vector_databases.columnar_metadata import (
+    export_columnar_metadata_to_json_memories,
+    get_columnar_metadata_full_path,
+    import_json_memories_to_columnar_metadata,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Converts the paired data of an agent's memories database between the json and the columnar formats."
+    )
+    parser.add_argument(
+        "agent_name",
+        help="The name of the agent whose memories database will be converted.",
+    )
+    parser.add_argument(
+        "--to-json",
+        action="store_true",
+        help="Export the columnar metadata back to the json file, instead of importing the json file.",
+    )
+
+    args = parser.parse_args()
+
+    if not args.agent_name:
+        print("Error: The name of the agent cannot be empty.")
+        return None
+
+    database_json_full_path = get_base_memories_json_full_path(args.agent_name)
+    columnar_metadata_full_path = get_columnar_metadata_full_path(
+        database_json_full_path
+    )
+
+    if args.to_json:
+        export_columnar_metadata_to_json_memories(
+            columnar_metadata_full_path, database_json_full_path
+        )
+    else:
+        import_json_memories_to_columnar_metadata(
+            database_json_full_path, columnar_metadata_full_path
+        )
+
+
+if __name__ == "__main__":
+    main()
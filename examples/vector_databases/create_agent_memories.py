@@ -7,7 +7,10 @@ from paths.full_paths import (
     get_seed_memories_full_path,
 )
 
+from llms.caching_ai_model_interface import CachingAIModelInterface
+from llms.gpt_responder import GPTResponder
 from vector_databases.database_creator import DatabaseCreator
+from vector_databases.memory_service_client import MemoryServiceClient
 
 
 def main():
@@ -18,6 +21,18 @@ def main():
         "agent_name",
         help="The name of the agent whose memories database will be created.",
     )
+    parser.add_argument(
+        "--cache-llm-responses",
+        action="store_true",
+        help="Reuse the stored responses of the AI model to identical requests, and store the new ones.",
+    )
+    parser.add_argument(
+        "--service-url",
+        help=(
+            "The url of a running memory service (for example 'http://127.0.0.1:8765'). If passed, "
+            "the operation is sent to the service instead of loading the memories database in this process."
+        ),
+    )
 
     args = parser.parse_args()
 
@@ -27,7 +42,18 @@ def main():
 
     current_timestamp = datetime(2023, 6, 6)
 
-    memories_database_creator = DatabaseCreator()
+    if args.service_url:
+        MemoryServiceClient(args.service_url).create(
+            args.agent_name, current_timestamp
+        )
+
+        return None
+
+    memories_database_creator = DatabaseCreator(
+        importance_judge=CachingAIModelInterface(GPTResponder())
+        if args.cache_llm_responses
+        else None
+    )
 
     memories_database_creator.create_database(
         args.agent_name,
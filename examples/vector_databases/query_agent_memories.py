@@ -9,6 +9,13 @@ from paths.full_paths import (
 from vector_databases.database_loader import DatabaseLoader
 from vector_databases.database_querier import DatabaseQuerier
 from vector_databases.database_updater import DatabaseUpdater
+from vector_databases.memory_service_client import MemoryServiceClient
+
+
+def print_query_results(query: str, query_results: list[str]):
+    print(f"{query}:\n")
+    for query_result in query_results:
+        print(f" {query_result}")
 
 
 def main():
@@ -23,6 +30,13 @@ def main():
         "query",
         help="The query for the agent's memories database.",
     )
+    parser.add_argument(
+        "--service-url",
+        help=(
+            "The url of a running memory service (for example 'http://127.0.0.1:8765'). If passed, "
+            "the operation is sent to the service instead of loading the memories database in this process."
+        ),
+    )
 
     args = parser.parse_args()
 
@@ -33,6 +47,17 @@ def main():
         print("Error: The query cannot be empty.")
         return None
 
+    current_timestamp = datetime(2023, 6, 7)
+
+    if args.service_url:
+        query_results = MemoryServiceClient(args.service_url).query(
+            args.agent_name, current_timestamp, args.query, 5
+        )
+
+        print_query_results(args.query, query_results)
+
+        return None
+
     database_full_path = get_base_memories_full_path(args.agent_name)
     database_json_full_path = get_base_memories_json_full_path(args.agent_name)
 
@@ -40,8 +65,6 @@ def main():
         args.agent_name, database_full_path, database_json_full_path
     ).load()
 
-    current_timestamp = datetime(2023, 6, 7)
-
     database_updater = DatabaseUpdater(
         current_timestamp, database_full_path, database_json_full_path
     )
@@ -55,9 +78,7 @@ def main():
         database_updater,
     ).query(args.query, 5)
 
-    print(f"{args.query}:\n")
-    for query_result in query_results:
-        print(f" {query_result}")
+    print_query_results(args.query, query_results)
 
     index.unload()
 
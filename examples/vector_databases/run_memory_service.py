@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+import argparse
+
+from defines.defines import MEMORY_SERVICE_HOST, MEMORY_SERVICE_PORT
+from vector_databases.memory_service import run_memory_service
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Runs the memory service, which keeps the memories databases of agents resident and serves their operations over localhost HTTP."
+    )
+    parser.add_argument(
+        "--host",
+        default=MEMORY_SERVICE_HOST,
+        help="The host on which the memory service will listen.",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=MEMORY_SERVICE_PORT,
+        help="The port on which the memory service will listen.",
+    )
+
+    args = parser.parse_args()
+
+    print(f"Serving the memory service at http://{args.host}:{args.port}")
+
+    run_memory_service(args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ from paths.full_paths import (
 )
 from vector_databases.database_loader import DatabaseLoader
 from vector_databases.database_updater import DatabaseUpdater
+from vector_databases.memory_service_client import MemoryServiceClient
 
 
 def main():
@@ -22,6 +23,13 @@ def main():
         "new_memory",
         help="The new memory that will be added to the memories database of the agent.",
     )
+    parser.add_argument(
+        "--service-url",
+        help=(
+            "The url of a running memory service (for example 'http://127.0.0.1:8765'). If passed, "
+            "the operation is sent to the service instead of loading the memories database in this process."
+        ),
+    )
 
     args = parser.parse_args()
 
@@ -32,6 +40,15 @@ def main():
         print("Error: The new memory cannot be empty.")
         return None
 
+    current_timestamp = datetime(2023, 6, 6)
+
+    if args.service_url:
+        MemoryServiceClient(args.service_url).update(
+            args.agent_name, current_timestamp, [args.new_memory]
+        )
+
+        return None
+
     database_full_path = get_base_memories_full_path(args.agent_name)
     database_json_full_path = get_base_memories_json_full_path(args.agent_name)
 
@@ -39,8 +56,6 @@ def main():
         args.agent_name, database_full_path, database_json_full_path
     ).load()
 
-    current_timestamp = datetime(2023, 6, 6)
-
     DatabaseUpdater(
         current_timestamp,
         database_full_path,
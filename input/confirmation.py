@@ -1,15 +1,29 @@
-def request_confirmation(question):
+from typing import Any, Callable
+
+from input.console_input import CONSOLE_INPUT_READER
+
+
+def request_confirmation(
+    question, work_while_waiting: Callable[[], Any] | None = None
+):
     """Requests the user to input either 'yes' or 'no' through the console,
     and continues insisting until the user enters the correct value.
 
     Args:
         question (str): the text that will be presented to the user before asking for the input.
+        work_while_waiting (Callable[[], Any] | None): the work to do while the user is typing the first answer.
 
     Returns:
         bool: either True or False.
     """
     while True:
-        user_input = input(f"{question}\nPlease enter 'yes' or 'no': ")
+        user_input = CONSOLE_INPUT_READER.read_input(
+            f"{question}\nPlease enter 'yes' or 'no': ", work_while_waiting
+        )
+
+        # The work only has to be done once, even if the user has to be asked again.
+        work_while_waiting = None
+
         if user_input.lower() in ["yes", "y"]:
             return True
         elif user_input.lower() in ["no", "n"]:
@@ -0,0 +1,100 @@
+"""This module contains the definition of ConsoleInputReader, which reads the input of the player in a dedicated
+thread, so that the rest of the engine can keep working while the player is typing.
+"""
+import asyncio
+from concurrent.futures import Future
+from queue import SimpleQueue
+from threading import Lock, Thread
+from typing import Any, Callable
+
+
+class ConsoleInputReader:
+    """Reads from the console in a dedicated thread. The requests for input are answered one after the other,
+    so that prompts coming from different threads never get mixed up in the console.
+    """
+
+    def __init__(self, input_function: Callable[[str], str] = input):
+        """Creates an instance of the class ConsoleInputReader.
+
+        Args:
+            input_function (Callable[[str], str]): the function that prompts the player and returns the input.
+        """
+        self._input_function = input_function
+
+        self._requests = SimpleQueue()
+        self._thread = None
+        self._lock = Lock()
+
+    def _ensure_thread_is_running(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = Thread(target=self._read_requested_inputs, daemon=True)
+                self._thread.start()
+
+    def _read_requested_inputs(self):
+        while True:
+            prompt, future = self._requests.get()
+
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                future.set_result(self._input_function(prompt))
+            except BaseException as exception:
+                future.set_exception(exception)
+
+    def request_input(self, prompt: str) -> Future:
+        """Requests input from the player without waiting for it.
+
+        Args:
+            prompt (str): the text that will be presented to the player.
+
+        Returns:
+            Future: the future that will hold the input of the player.
+        """
+        self._ensure_thread_is_running()
+
+        future = Future()
+        self._requests.put((prompt, future))
+
+        return future
+
+    def read_input(
+        self, prompt: str, work_while_waiting: Callable[[], Any] | None = None
+    ) -> str:
+        """Requests input from the player and waits for it. Meanwhile, the calling thread can do some work,
+        for example precomputing whatever will be needed once the player has answered.
+
+        Args:
+            prompt (str): the text that will be presented to the player.
+            work_while_waiting (Callable[[], Any] | None): the work to do while the player is typing.
+
+        Returns:
+            str: the input of the player.
+        """
+        future = self.request_input(prompt)
+
+        if work_while_waiting is None:
+            return future.result()
+
+        try:
+            work_while_waiting()
+        finally:
+            # The prompt is already in the console, so its answer must be collected even if the work failed.
+            user_input = future.result()
+
+        return user_input
+
+    async def aread_input(self, prompt: str) -> str:
+        """Requests input from the player and awaits it, leaving the event loop free meanwhile.
+
+        Args:
+            prompt (str): the text that will be presented to the player.
+
+        Returns:
+            str: the input of the player.
+        """
+        return await asyncio.wrap_future(self.request_input(prompt))
+
+
+CONSOLE_INPUT_READER = ConsoleInputReader()
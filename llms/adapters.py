@@ -0,0 +1,157 @@
+"""This module contains the adapters between the synchronous and asynchronous interfaces of AI models,
+so that code written against either interface can use any AI model.
+"""
+import asyncio
+from threading import Lock, Thread
+from typing import Any, Coroutine, List
+
+from llms.async_interface import AsyncAIModelInterface
+from llms.interface import AIModelInterface
+
+
+class _BackgroundEventLoop:
+    """An event loop that runs forever in a daemon thread, started on first use. Synchronous callers from
+    any thread submit their coroutines to it, so their requests can overlap when they come from several threads.
+    """
+
+    def __init__(self):
+        self._loop = None
+        self._lock = Lock()
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+
+                Thread(target=self._loop.run_forever, daemon=True).start()
+
+            return self._loop
+
+    def run(self, coroutine: Coroutine) -> Any:
+        loop = self._get_loop()
+
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if running_loop is loop:
+            coroutine.close()
+
+            raise RuntimeError(
+                "Can't wait synchronously for a coroutine from the thread of the event loop that has to run it."
+            )
+
+        return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+
+
+_BACKGROUND_EVENT_LOOP = _BackgroundEventLoop()
+
+
+def run_coroutine_synchronously(coroutine: Coroutine) -> Any:
+    """Runs a coroutine in the shared background event loop and waits for its result.
+    It works even if the caller is itself running inside another event loop.
+
+    Args:
+        coroutine (Coroutine): the coroutine to run.
+
+    Returns:
+        Any: whatever the coroutine returned.
+    """
+    return _BACKGROUND_EVENT_LOOP.run(coroutine)
+
+
+class SyncAIModelInterfaceAdapter(AIModelInterface):
+    """Lets the existing synchronous callers use an asynchronous AI model."""
+
+    def __init__(self, async_ai_model: AsyncAIModelInterface):
+        """Creates an instance of the class SyncAIModelInterfaceAdapter.
+
+        Args:
+            async_ai_model (AsyncAIModelInterface): the asynchronous AI model to adapt.
+        """
+        self._async_ai_model = async_ai_model
+
+    def request_response_using_functions(
+        self,
+        messages: List[dict],
+        functions: List[dict],
+        function_call: str,
+        model: str,
+    ) -> dict:
+        return run_coroutine_synchronously(
+            self._async_ai_model.arequest_response_using_functions(
+                messages, functions, function_call, model
+            )
+        )
+
+    def request_response(self, messages: List[dict], model: str) -> dict:
+        return run_coroutine_synchronously(
+            self._async_ai_model.arequest_response(messages, model)
+        )
+
+
+class AsyncAIModelInterfaceAdapter(AsyncAIModelInterface):
+    """Lets asynchronous callers use a synchronous AI model. Every request runs in a worker thread,
+    so the event loop isn't blocked while it waits.
+    """
+
+    def __init__(self, ai_model: AIModelInterface):
+        """Creates an instance of the class AsyncAIModelInterfaceAdapter.
+
+        Args:
+            ai_model (AIModelInterface): the synchronous AI model to adapt.
+        """
+        self._ai_model = ai_model
+
+    async def arequest_response_using_functions(
+        self,
+        messages: List[dict],
+        functions: List[dict],
+        function_call: str,
+        model: str,
+    ) -> dict:
+        return await asyncio.to_thread(
+            self._ai_model.request_response_using_functions,
+            messages,
+            functions,
+            function_call,
+            model,
+        )
+
+    async def arequest_response(self, messages: List[dict], model: str) -> dict:
+        return await asyncio.to_thread(self._ai_model.request_response, messages, model)
+
+
+def to_sync_ai_model(
+    ai_model: AIModelInterface | AsyncAIModelInterface,
+) -> AIModelInterface:
+    """Returns a synchronous interface to the passed AI model, adapting it only if necessary.
+
+    Args:
+        ai_model (AIModelInterface | AsyncAIModelInterface): the AI model.
+
+    Returns:
+        AIModelInterface: the synchronous interface to the AI model.
+    """
+    if isinstance(ai_model, AIModelInterface):
+        return ai_model
+
+    return SyncAIModelInterfaceAdapter(ai_model)
+
+
+def to_async_ai_model(
+    ai_model: AIModelInterface | AsyncAIModelInterface,
+) -> AsyncAIModelInterface:
+    """Returns an asynchronous interface to the passed AI model, adapting it only if necessary.
+
+    Args:
+        ai_model (AIModelInterface | AsyncAIModelInterface): the AI model.
+
+    Returns:
+        AsyncAIModelInterface: the asynchronous interface to the AI model.
+    """
+    if isinstance(ai_model, AsyncAIModelInterface):
+        return ai_model
+
+    return AsyncAIModelInterfaceAdapter(ai_model)
@@ -0,0 +1,22 @@
+from abc import ABC, abstractmethod
+from typing import List
+
+
+class AsyncAIModelInterface(ABC):
+    """The asynchronous counterpart of AIModelInterface. Awaiting its requests lets independent calls
+    to AI models overlap, instead of waiting for each of them in turn.
+    """
+
+    @abstractmethod
+    async def arequest_response_using_functions(
+        self,
+        messages: List[dict],
+        functions: List[dict],
+        function_call: str,
+        model: str,
+    ) -> dict:
+        pass
+
+    @abstractmethod
+    async def arequest_response(self, messages: List[dict], model: str) -> dict:
+        pass
@@ -0,0 +1,279 @@
+"""This module contains the definition of CachingAIModelInterface, which stores the responses of an AI model
+on disk, so that identical requests don't have to be sent again.
+"""
+from collections import OrderedDict
+import json
+import os
+from threading import Lock
+import time
+from typing import List
+
+from defines.defines import (
+    DEFAULT_TEMPERATURE,
+    LLM_RESPONSE_CACHE_DIRECTORY,
+    LLM_RESPONSE_CACHE_MAX_AGE_SECONDS,
+    LLM_RESPONSE_CACHE_MAX_BYTES,
+)
+from llms.interface import AIModelInterface
+from llms.request_keys import determine_request_key
+
+CACHED_RESPONSE_FILE_EXTENSION = ".json"
+
+
+class CachingAIModelInterface(AIModelInterface):
+    """Wraps an AI model, storing every response on disk keyed by the canonical hash of its request.
+    The cache is bounded both in size and in age: the least recently used responses get evicted first,
+    and responses that haven't been used for too long are discarded.
+    """
+
+    def __init__(
+        self,
+        ai_model_interface: AIModelInterface,
+        cache_directory: str = LLM_RESPONSE_CACHE_DIRECTORY,
+        max_bytes: int = LLM_RESPONSE_CACHE_MAX_BYTES,
+        max_age_seconds: float = LLM_RESPONSE_CACHE_MAX_AGE_SECONDS,
+        temperature: float = DEFAULT_TEMPERATURE,
+    ):
+        """Creates an instance of the class CachingAIModelInterface.
+
+        Args:
+            ai_model_interface (AIModelInterface): the AI model whose responses will be cached.
+            cache_directory (str): the directory where the responses will be stored.
+            max_bytes (int): how many bytes the stored responses can take up.
+            max_age_seconds (float): how long a stored response can remain unused before it's discarded.
+            temperature (float): the temperature with which the wrapped AI model sends its requests.
+
+        Raises:
+            ValueError: if 'max_bytes' or 'max_age_seconds' aren't greater than zero.
+        """
+        if not max_bytes > 0:
+            raise ValueError(
+                f"The class {CachingAIModelInterface.__name__} expected 'max_bytes' to be greater than zero, but it was: {max_bytes}"
+            )
+        if not max_age_seconds > 0:
+            raise ValueError(
+                f"The class {CachingAIModelInterface.__name__} expected 'max_age_seconds' to be greater than zero, but it was: {max_age_seconds}"
+            )
+
+        self._ai_model_interface = ai_model_interface
+        self._cache_directory = cache_directory
+        self._max_bytes = max_bytes
+        self._max_age_seconds = max_age_seconds
+        self._temperature = temperature
+
+        self._number_of_hits = 0
+        self._number_of_misses = 0
+        self._lock = Lock()
+
+        os.makedirs(self._cache_directory, exist_ok=True)
+
+        # Keyed by request key, from the least to the most recently used: (size in bytes, time of last use).
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+
+        self._load_entries()
+
+    def _get_entry_full_path(self, request_key: str) -> str:
+        return os.path.join(
+            self._cache_directory, f"{request_key}{CACHED_RESPONSE_FILE_EXTENSION}"
+        )
+
+    def _load_entries(self):
+        entries = []
+
+        with os.scandir(self._cache_directory) as directory_entries:
+            for directory_entry in directory_entries:
+                if directory_entry.is_file() and directory_entry.name.endswith(
+                    CACHED_RESPONSE_FILE_EXTENSION
+                ):
+                    request_key = os.path.splitext(directory_entry.name)[0]
+                    stat_result = directory_entry.stat()
+
+                    entries.append(
+                        (request_key, stat_result.st_size, stat_result.st_mtime)
+                    )
+
+        # The modification time of every stored response is updated whenever it gets used.
+        for request_key, size, last_used in sorted(
+            entries, key=lambda entry: entry[2]
+        ):
+            self._entries[request_key] = (size, last_used)
+            self._total_bytes += size
+
+        self._evict_entries()
+
+    def _remove_entry(self, request_key: str):
+        size, _ = self._entries.pop(request_key)
+        self._total_bytes -= size
+
+        try:
+            os.remove(self._get_entry_full_path(request_key))
+        except FileNotFoundError:
+            pass
+
+    def _evict_entries(self):
+        oldest_allowed_use = time.time() - self._max_age_seconds
+
+        while self._entries:
+            request_key, (_, last_used) = next(iter(self._entries.items()))
+
+            if (
+                self._total_bytes <= self._max_bytes
+                and last_used >= oldest_allowed_use
+            ):
+                break
+
+            self._remove_entry(request_key)
+
+    def _load_cached_response(self, request_key: str) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(request_key)
+
+            if entry is None:
+                return None
+
+            if entry[1] < time.time() - self._max_age_seconds:
+                self._remove_entry(request_key)
+                return None
+
+            try:
+                with open(
+                    self._get_entry_full_path(request_key), "r", encoding="utf-8"
+                ) as file:
+                    response = json.load(file)
+            except (OSError, ValueError):
+                # Another process may have evicted it, or it may have been left unreadable.
+                self._remove_entry(request_key)
+                return None
+
+            now = time.time()
+            os.utime(self._get_entry_full_path(request_key), (now, now))
+
+            self._entries[request_key] = (entry[0], now)
+            self._entries.move_to_end(request_key)
+
+            return response
+
+    def _store_response(self, request_key: str, response: dict):
+        content = json.dumps(response, ensure_ascii=False).encode("utf-8")
+
+        with self._lock:
+            entry_full_path = self._get_entry_full_path(request_key)
+            temporary_full_path = f"{entry_full_path}.{os.getpid()}.tmp"
+
+            with open(temporary_full_path, "wb") as file:
+                file.write(content)
+
+            os.replace(temporary_full_path, entry_full_path)
+
+            if request_key in self._entries:
+                self._total_bytes -= self._entries.pop(request_key)[0]
+
+            self._entries[request_key] = (len(content), time.time())
+            self._total_bytes += len(content)
+
+            self._evict_entries()
+
+    def _request_response_through_cache(self, request_key: str, request_response):
+        cached_response = self._load_cached_response(request_key)
+
+        if cached_response is not None:
+            with self._lock:
+                self._number_of_hits += 1
+
+            return cached_response
+
+        with self._lock:
+            self._number_of_misses += 1
+
+        response = request_response()
+
+        self._store_response(request_key, response)
+
+        return response
+
+    def request_response_using_functions(
+        self,
+        messages: List[dict],
+        functions: List[dict],
+        function_call: str,
+        model: str,
+        use_cache: bool = True,
+    ) -> dict:
+        """Returns the stored response to an identical request, or requests it from the wrapped AI model
+        and stores it.
+
+        Args:
+            messages (list[dict]): the list of messages that will be sent to the AI model.
+            functions (list[dict]): the list of functions that the AI model will have available.
+            function_call (str): whether the AI model should choose to use the functions or not.
+            model (str): what AI model will be used.
+            use_cache (bool): whether the cache should be used for this call. If False, the response
+                is requested from the wrapped AI model, and it doesn't get stored.
+
+        Returns:
+            dict: the response returned from the AI model.
+        """
+        if not use_cache:
+            return self._ai_model_interface.request_response_using_functions(
+                messages, functions, function_call, model
+            )
+
+        return self._request_response_through_cache(
+            determine_request_key(
+                model, self._temperature, messages, functions, function_call
+            ),
+            lambda: self._ai_model_interface.request_response_using_functions(
+                messages, functions, function_call, model
+            ),
+        )
+
+    def request_response(
+        self, messages: List[dict], model: str, use_cache: bool = True
+    ) -> dict:
+        """Returns the stored response to an identical request, or requests it from the wrapped AI model
+        and stores it.
+
+        Args:
+            messages (list[dict]): the list of messages that will be sent to the AI model.
+            model (str): what AI model will be used.
+            use_cache (bool): whether the cache should be used for this call. If False, the response
+                is requested from the wrapped AI model, and it doesn't get stored.
+
+        Returns:
+            dict: the response returned from the AI model.
+        """
+        if not use_cache:
+            return self._ai_model_interface.request_response(messages, model)
+
+        return self._request_response_through_cache(
+            determine_request_key(model, self._temperature, messages),
+            lambda: self._ai_model_interface.request_response(messages, model),
+        )
+
+    def get_number_of_hits(self) -> int:
+        """Returns how many requests have been answered from the cache.
+
+        Returns:
+            int: the number of cache hits.
+        """
+        with self._lock:
+            return self._number_of_hits
+
+    def get_number_of_misses(self) -> int:
+        """Returns how many requests had to be sent to the wrapped AI model.
+
+        Returns:
+            int: the number of cache misses.
+        """
+        with self._lock:
+            return self._number_of_misses
+
+    def get_total_bytes(self) -> int:
+        """Returns how many bytes the stored responses take up.
+
+        Returns:
+            int: the total size of the stored responses.
+        """
+        with self._lock:
+            return self._total_bytes
@@ -13,7 +13,8 @@ def append_function(
         functions (List[dict]): a list of functions, that may be empty.
         function_name (str): the name of the function to append.
         function_description (str): the description of the function to append.
-        parameters (dict): the parameters that the function should have.
+        parameters (dict): the parameters that the function should have. Parameters of type 'array'
+            may also include an 'items' key with the schema of their elements.
     """
     function_dict = {
         "name": function_name,
@@ -30,6 +31,10 @@ def append_function(
             "type": param["type"],
             "description": param["description"],
         }
+        if param.get("items"):
+            function_dict["parameters"]["properties"][param["name"]]["items"] = param[
+                "items"
+            ]
         function_dict["parameters"]["required"].append(param["name"])
 
     functions.append(function_dict)
@@ -1,18 +1,163 @@
+from threading import Lock
 from typing import List
 
 import openai
-from tenacity import retry, stop_after_attempt, wait_random_exponential
+from tenacity import (
+    RetryError,
+    retry,
+    retry_if_not_exception_type,
+    stop_after_attempt,
+    wait_random_exponential,
+)
 from defines.defines import DEFAULT_TEMPERATURE, MAX_TOKENS
 from errors import PromptTooBigError
+from llms.async_interface import AsyncAIModelInterface
 from llms.interface import AIModelInterface
+from llms.request_scheduler import REQUEST_SCHEDULER
+from llms.token_estimation import estimate_prompt_tokens, get_prompt_token_limit
 
-# Read API key from file
-with open("api_key.txt", "r", encoding="utf8") as file:
-    openai.api_key = file.read().strip()
+API_KEY_FILE_NAME = "api_key.txt"
+
+# Retrying these would only fail again, so they are raised right away.
+NON_RETRYABLE_EXCEPTIONS = (
+    PromptTooBigError,
+    TypeError,
+    FileNotFoundError,
+    openai.error.InvalidRequestError,
+    openai.error.AuthenticationError,
+    openai.error.PermissionError,
+)
+
+# What a request can fail with once its retries are exhausted, as opposed to programming errors.
+REQUEST_FAILURE_EXCEPTIONS = (
+    PromptTooBigError,
+    RetryError,
+    OSError,
+    openai.error.OpenAIError,
+)
+
+_retry_transient_errors = retry(
+    retry=retry_if_not_exception_type(NON_RETRYABLE_EXCEPTIONS),
+    wait=wait_random_exponential(min=1, max=40),
+    stop=stop_after_attempt(3),
+)
+
+_API_KEY_LOCK = Lock()
+
+
+def _ensure_api_key_is_loaded():
+    # The key is only read once a request is about to be sent, so that importing this module works
+    # on machines without it (for example, when benchmarking against a stand-in server). A key already
+    # set, for example from the OPENAI_API_KEY environment variable, takes precedence.
+    with _API_KEY_LOCK:
+        if openai.api_key is None:
+            with open(API_KEY_FILE_NAME, "r", encoding="utf8") as file:
+                openai.api_key = file.read().strip()
+
+
+def _validate_messages(messages: List[dict], function_name: str):
+    if not isinstance(messages, list):
+        error_message = f"The function {function_name} expected 'messages' to be a list, but it was: {messages}"
+        raise TypeError(error_message)
+
+
+def _validate_functions(functions: List[dict], function_name: str):
+    if functions is None:
+        error_message = (
+            f"The function {function_name} expected 'functions' not to be None."
+        )
+        raise TypeError(error_message)
+
+
+def _validate_prompt_size(
+    messages: List[dict], functions: List[dict] | None, model: str
+):
+    estimated_prompt_tokens = estimate_prompt_tokens(messages, functions)
+
+    # The safety margin of the budget is only meant for trimming, so only prompts over the actual limit get refused.
+    prompt_token_limit = get_prompt_token_limit(model)
+
+    if estimated_prompt_tokens > prompt_token_limit:
+        error_message = f"The prompt was estimated to take up {estimated_prompt_tokens} tokens, "
+        error_message += f"but the limit of {model} is {prompt_token_limit}.\nLast message: {messages[-1:]}"
+        raise PromptTooBigError(error_message)
+
+
+def _create_prompt_too_big_error(
+    exception: openai.InvalidRequestError, messages: List[dict]
+) -> PromptTooBigError:
+    return PromptTooBigError(
+        f"GPT refused a request because the prompt was too big.\nError: {exception}\nLast message: {messages[-1:]}"
+    )
+
+
+def _get_used_tokens(response: dict | None) -> int | None:
+    if response is None or "usage" not in response:
+        return None
+
+    return response["usage"]["total_tokens"]
+
+
+def _create_chat_completion(model: str, messages: List[dict], **kwargs) -> dict:
+    # Every request waits for its turn in the process-wide scheduler, which keeps the requests
+    # within the rate limits of the model instead of relying on the retries after a refusal.
+    scheduled_request = REQUEST_SCHEDULER.acquire(
+        model, estimate_prompt_tokens(messages, kwargs.get("functions"))
+    )
+
+    response = None
+    was_rate_limited = False
+
+    try:
+        response = openai.ChatCompletion.create(
+            model=model,
+            temperature=DEFAULT_TEMPERATURE,
+            messages=messages,
+            max_tokens=MAX_TOKENS,
+            **kwargs,
+        )
+    except openai.error.RateLimitError:
+        was_rate_limited = True
+        raise
+    finally:
+        REQUEST_SCHEDULER.release(
+            scheduled_request, _get_used_tokens(response), was_rate_limited
+        )
+
+    return response
+
+
+async def _acreate_chat_completion(
+    model: str, messages: List[dict], **kwargs
+) -> dict:
+    scheduled_request = await REQUEST_SCHEDULER.aacquire(
+        model, estimate_prompt_tokens(messages, kwargs.get("functions"))
+    )
+
+    response = None
+    was_rate_limited = False
+
+    try:
+        response = await openai.ChatCompletion.acreate(
+            model=model,
+            temperature=DEFAULT_TEMPERATURE,
+            messages=messages,
+            max_tokens=MAX_TOKENS,
+            **kwargs,
+        )
+    except openai.error.RateLimitError:
+        was_rate_limited = True
+        raise
+    finally:
+        REQUEST_SCHEDULER.release(
+            scheduled_request, _get_used_tokens(response), was_rate_limited
+        )
+
+    return response
 
 
 class GPTResponder(AIModelInterface):
-    @retry(wait=wait_random_exponential(min=1, max=40), stop=stop_after_attempt(3))
+    @_retry_transient_errors
     def request_response_using_functions(
         self,
         messages: List[dict],
@@ -34,30 +179,21 @@ class GPTResponder(AIModelInterface):
         Returns:
             dict: the response returned from the AI model.
         """
-        if not isinstance(messages, list):
-            error_message = f"The function {self.request_response_using_functions.__name__} expected 'messages' to be a list, but it was: {messages}"
-            raise TypeError(error_message)
-        if functions is None:
-            error_message = f"The function {self.request_response_using_functions.__name__} expected 'functions' not to be None."
-            raise TypeError(error_message)
+        _validate_messages(messages, self.request_response_using_functions.__name__)
+        _validate_functions(functions, self.request_response_using_functions.__name__)
+        _validate_prompt_size(messages, functions, model)
+        _ensure_api_key_is_loaded()
 
         try:
-            response = openai.ChatCompletion.create(
-                model=model,
-                temperature=DEFAULT_TEMPERATURE,
-                messages=messages,
-                max_tokens=MAX_TOKENS,
-                functions=functions,
-                function_call=function_call,
+            response = _create_chat_completion(
+                model, messages, functions=functions, function_call=function_call
             )
         except openai.InvalidRequestError as exception:
-            raise PromptTooBigError(
-                f"GPT refused a request because the prompt was too big.\nError: {exception}\nLast message: {messages[-1:]}"
-            ) from exception
+            raise _create_prompt_too_big_error(exception, messages) from exception
 
         return response
 
-    @retry(wait=wait_random_exponential(min=1, max=40), stop=stop_after_attempt(3))
+    @_retry_transient_errors
     def request_response(self, messages: List[dict], model: str) -> dict:
         """Tries to get a response from an AI model.
 
@@ -69,15 +205,69 @@ class GPTResponder(AIModelInterface):
             dict: the response returned from the AI model.
         """
 
-        if not isinstance(messages, list):
-            error_message = f"The function {self.request_response.__name__} expected 'messages' to be a list, but it was: {messages}"
-            raise TypeError(error_message)
+        _validate_messages(messages, self.request_response.__name__)
+        _validate_prompt_size(messages, None, model)
+        _ensure_api_key_is_loaded()
 
-        response = openai.ChatCompletion.create(
-            model=model,
-            temperature=DEFAULT_TEMPERATURE,
-            messages=messages,
-            max_tokens=MAX_TOKENS,
-        )
+        response = _create_chat_completion(model, messages)
+
+        return response
+
+
+class AsyncGPTResponder(AsyncAIModelInterface):
+    """The asynchronous variant of GPTResponder. While a request awaits its response, the event loop
+    is free to send other requests.
+    """
+
+    @_retry_transient_errors
+    async def arequest_response_using_functions(
+        self,
+        messages: List[dict],
+        functions: List[dict],
+        function_call: str,
+        model: str,
+    ) -> dict:
+        """Tries to get a response from an AI model. In this variant, the use of functions is expected
+        by the AI model.
+
+        Args:
+            messages (list[dict]): the list of messages that will be sent to the AI model.
+            functions (list[dict]): the list of functions that the AI model will have available.
+            function_call (str): whether the AI model should choose to use the functions or not.
+            model (str): what AI model will be used.
+
+        Returns:
+            dict: the response returned from the AI model.
+        """
+        _validate_messages(messages, self.arequest_response_using_functions.__name__)
+        _validate_functions(functions, self.arequest_response_using_functions.__name__)
+        _validate_prompt_size(messages, functions, model)
+        _ensure_api_key_is_loaded()
+
+        try:
+            response = await _acreate_chat_completion(
+                model, messages, functions=functions, function_call=function_call
+            )
+        except openai.InvalidRequestError as exception:
+            raise _create_prompt_too_big_error(exception, messages) from exception
+
+        return response
+
+    @_retry_transient_errors
+    async def arequest_response(self, messages: List[dict], model: str) -> dict:
+        """Tries to get a response from an AI model.
+
+        Args:
+            messages (list[dict]): the list of messages that will be sent to the AI model.
+            model (str): what AI model will be used.
+
+        Returns:
+            dict: the response returned from the AI model.
+        """
+        _validate_messages(messages, self.arequest_response.__name__)
+        _validate_prompt_size(messages, None, model)
+        _ensure_api_key_is_loaded()
+
+        response = await _acreate_chat_completion(model, messages)
 
         return response
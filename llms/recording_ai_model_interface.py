@@ -0,0 +1,92 @@
+"""This module contains the definition of RecordingAIModelInterface, which records every request sent to
+an AI model along with its response, so that the session can later be replayed without the AI model.
+"""
+from typing import List
+
+from defines.defines import DEFAULT_TEMPERATURE
+from llms.interface import AIModelInterface
+from llms.request_keys import determine_request_key
+from llms.transcripts import append_to_transcript
+
+
+class RecordingAIModelInterface(AIModelInterface):
+    """Wraps an AI model, appending every request and its response to a transcript."""
+
+    def __init__(
+        self,
+        ai_model_interface: AIModelInterface,
+        transcript_full_path: str,
+        temperature: float = DEFAULT_TEMPERATURE,
+    ):
+        """Creates an instance of the class RecordingAIModelInterface.
+
+        Args:
+            ai_model_interface (AIModelInterface): the AI model whose responses will be recorded.
+            transcript_full_path (str): the full path of the transcript where the responses will be appended.
+            temperature (float): the temperature with which the wrapped AI model sends its requests.
+        """
+        self._ai_model_interface = ai_model_interface
+        self._transcript_full_path = transcript_full_path
+        self._temperature = temperature
+
+    def _record(self, request: dict, response: dict):
+        append_to_transcript(
+            self._transcript_full_path,
+            determine_request_key(**request),
+            request,
+            response,
+        )
+
+    def request_response_using_functions(
+        self,
+        messages: List[dict],
+        functions: List[dict],
+        function_call: str,
+        model: str,
+    ) -> dict:
+        """Requests a response from the wrapped AI model and records it.
+
+        Args:
+            messages (list[dict]): the list of messages that will be sent to the AI model.
+            functions (list[dict]): the list of functions that the AI model will have available.
+            function_call (str): whether the AI model should choose to use the functions or not.
+            model (str): what AI model will be used.
+
+        Returns:
+            dict: the response returned from the AI model.
+        """
+        response = self._ai_model_interface.request_response_using_functions(
+            messages, functions, function_call, model
+        )
+
+        self._record(
+            {
+                "model": model,
+                "temperature": self._temperature,
+                "messages": messages,
+                "functions": functions,
+                "function_call": function_call,
+            },
+            response,
+        )
+
+        return response
+
+    def request_response(self, messages: List[dict], model: str) -> dict:
+        """Requests a response from the wrapped AI model and records it.
+
+        Args:
+            messages (list[dict]): the list of messages that will be sent to the AI model.
+            model (str): what AI model will be used.
+
+        Returns:
+            dict: the response returned from the AI model.
+        """
+        response = self._ai_model_interface.request_response(messages, model)
+
+        self._record(
+            {"model": model, "temperature": self._temperature, "messages": messages},
+            response,
+        )
+
+        return response
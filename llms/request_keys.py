@@ -0,0 +1,42 @@
+"""This module determines the canonical keys of requests to AI models, so that identical requests
+can be recognized regardless of how their content was built.
+"""
+import hashlib
+import json
+from typing import List
+
+
+def determine_request_key(
+    model: str,
+    temperature: float,
+    messages: List[dict],
+    functions: List[dict] | None = None,
+    function_call: str | dict | None = None,
+) -> str:
+    """Determines the canonical key of a request to an AI model: the sha256 of its content serialized
+    with sorted keys, so that equal requests always produce the same key.
+
+    Args:
+        model (str): what AI model the request is for.
+        temperature (float): the temperature of the request.
+        messages (List[dict]): the messages of the request.
+        functions (List[dict] | None): the functions available to the AI model, if any.
+        function_call (str | dict | None): which function the AI model should call, if any.
+
+    Returns:
+        str: the hexadecimal digest that identifies the request.
+    """
+    canonical_request = json.dumps(
+        {
+            "model": model,
+            "temperature": temperature,
+            "messages": messages,
+            "functions": functions,
+            "function_call": function_call,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+
+    return hashlib.sha256(canonical_request.encode("utf-8")).hexdigest()
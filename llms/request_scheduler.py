@@ -0,0 +1,425 @@
+"""This module contains the definition of RequestScheduler, which paces the requests to AI models so that
+they stay within the requests-per-minute and tokens-per-minute limits of every model. Queued requests are
+served by priority, so that the dialogue doesn't wait behind background work such as importance ratings.
+"""
+import asyncio
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+import heapq
+import itertools
+from threading import Lock, Timer
+import time
+from typing import Dict
+
+from defines.defines import (
+    AI_MODEL_RATE_LIMITS,
+    DEFAULT_AI_MODEL_RATE_LIMITS,
+    ESTIMATED_COMPLETION_TOKENS,
+    MAX_CONCURRENT_AI_MODEL_REQUESTS_PER_MODEL,
+)
+from enums.enums import RequestPriority
+
+_REQUEST_PRIORITY = ContextVar("request_priority", default=RequestPriority.DEFAULT)
+
+
+def get_request_priority() -> RequestPriority:
+    """Returns the priority with which the requests of the current context get scheduled.
+
+    Returns:
+        RequestPriority: the priority of the current context.
+    """
+    return _REQUEST_PRIORITY.get()
+
+
+@contextmanager
+def request_priority(priority: RequestPriority):
+    """Schedules the requests made within the block with the given priority. Note that the priority
+    doesn't carry over to threads started from within the block.
+
+    Args:
+        priority (RequestPriority): the priority of the requests made within the block.
+    """
+    token = _REQUEST_PRIORITY.set(priority)
+
+    try:
+        yield
+    finally:
+        _REQUEST_PRIORITY.reset(token)
+
+
+class TokenBucket:
+    """A bucket that holds up to a capacity and refills continuously. Its level can go below zero when
+    the actual cost of something turns out higher than what was reserved, which delays what comes after.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        """Creates an instance of the class TokenBucket, initially full.
+
+        Args:
+            capacity (float): the most that the bucket can hold.
+            refill_per_second (float): how much the bucket refills every second.
+        """
+        self._capacity = capacity
+        self._refill_per_second = refill_per_second
+        self._level = capacity
+        self._last_refill = time.monotonic()
+
+    def _refill(self, now: float):
+        self._level = min(
+            self._capacity,
+            self._level + (now - self._last_refill) * self._refill_per_second,
+        )
+        self._last_refill = now
+
+    def get_seconds_until_available(self, amount: float, now: float) -> float:
+        """Returns how long it will take until the bucket holds the amount.
+
+        Args:
+            amount (float): the amount to hold. It's capped to the capacity of the bucket.
+            now (float): the current monotonic time.
+
+        Returns:
+            float: the seconds to wait, which are zero if the amount is already available.
+        """
+        self._refill(now)
+
+        missing = min(amount, self._capacity) - self._level
+
+        return max(0.0, missing / self._refill_per_second)
+
+    def consume(self, amount: float):
+        """Takes an amount out of the bucket.
+
+        Args:
+            amount (float): the amount to take out. It may be negative to give back what was overestimated.
+        """
+        self._level = min(self._capacity, self._level - amount)
+
+    def empty(self, now: float):
+        """Empties the bucket, for example when the limit was hit despite the estimates.
+
+        Args:
+            now (float): the current monotonic time.
+        """
+        self._refill(now)
+        self._level = min(self._level, 0.0)
+
+    def get_level(self, now: float) -> float:
+        """Returns how much the bucket holds.
+
+        Args:
+            now (float): the current monotonic time.
+
+        Returns:
+            float: the level of the bucket.
+        """
+        self._refill(now)
+
+        return self._level
+
+
+class ScheduledRequest:
+    """A request that the scheduler has allowed to be sent. It must be handed back to the scheduler
+    through 'release' once the response has arrived.
+    """
+
+    def __init__(self, model: str, reserved_tokens: int, waited_seconds: float):
+        self._model = model
+        self._reserved_tokens = reserved_tokens
+        self._waited_seconds = waited_seconds
+
+    def get_model(self) -> str:
+        return self._model
+
+    def get_reserved_tokens(self) -> int:
+        return self._reserved_tokens
+
+    def get_waited_seconds(self) -> float:
+        return self._waited_seconds
+
+
+class _ModelSchedule:
+    def __init__(self, rate_limits: dict, max_concurrent_requests: int):
+        self.requests_bucket = TokenBucket(
+            rate_limits["requests_per_minute"],
+            rate_limits["requests_per_minute"] / 60.0,
+        )
+        self.tokens_bucket = TokenBucket(
+            rate_limits["tokens_per_minute"], rate_limits["tokens_per_minute"] / 60.0
+        )
+        self.max_concurrent_requests = max_concurrent_requests
+
+        # Entries: (priority, arrival order, reserved tokens, enqueue time, future).
+        self.queue = []
+        self.number_of_requests_in_flight = 0
+        self.refill_timer = None
+
+        self.number_of_scheduled_requests = 0
+        self.total_waited_seconds = 0.0
+
+
+class RequestScheduler:
+    """Schedules the requests to AI models, process-wide. Every model gets its own budget of requests and
+    tokens per minute, along with a limit of concurrent requests. Requests that don't fit get queued,
+    and are sent in order of priority as soon as the budget allows it.
+    """
+
+    def __init__(
+        self,
+        rate_limits: Dict[str, dict] | None = None,
+        default_rate_limits: dict | None = None,
+        max_concurrent_requests_per_model: int = MAX_CONCURRENT_AI_MODEL_REQUESTS_PER_MODEL,
+        estimated_completion_tokens: int = ESTIMATED_COMPLETION_TOKENS,
+    ):
+        """Creates an instance of the class RequestScheduler.
+
+        Args:
+            rate_limits (Dict[str, dict] | None): the 'requests_per_minute' and 'tokens_per_minute' of every model.
+            default_rate_limits (dict | None): the limits of the models that don't appear in 'rate_limits'.
+            max_concurrent_requests_per_model (int): how many requests to a model can be in flight at once.
+            estimated_completion_tokens (int): how many tokens get reserved for the completion of every request,
+                on top of its prompt. The reservation gets corrected once the actual usage is known.
+
+        Raises:
+            ValueError: if 'max_concurrent_requests_per_model' isn't greater than zero.
+        """
+        if not max_concurrent_requests_per_model > 0:
+            raise ValueError(
+                f"The class {RequestScheduler.__name__} expected 'max_concurrent_requests_per_model' to be greater than zero, but it was: {max_concurrent_requests_per_model}"
+            )
+
+        self._rate_limits = AI_MODEL_RATE_LIMITS if rate_limits is None else rate_limits
+        self._default_rate_limits = default_rate_limits or DEFAULT_AI_MODEL_RATE_LIMITS
+        self._max_concurrent_requests_per_model = max_concurrent_requests_per_model
+        self._estimated_completion_tokens = estimated_completion_tokens
+
+        self._schedules = {}
+        self._arrival_order = itertools.count()
+        self._lock = Lock()
+
+    def _get_schedule(self, model: str) -> _ModelSchedule:
+        schedule = self._schedules.get(model)
+
+        if schedule is None:
+            schedule = _ModelSchedule(
+                self._rate_limits.get(model, self._default_rate_limits),
+                self._max_concurrent_requests_per_model,
+            )
+            self._schedules[model] = schedule
+
+        return schedule
+
+    def _dispatch(self, model: str):
+        # Must be called while holding the lock.
+        schedule = self._get_schedule(model)
+
+        while (
+            schedule.queue
+            and schedule.number_of_requests_in_flight < schedule.max_concurrent_requests
+        ):
+            _, _, reserved_tokens, enqueue_time, future = schedule.queue[0]
+
+            if future.cancelled():
+                heapq.heappop(schedule.queue)
+                continue
+
+            now = time.monotonic()
+            seconds_until_available = max(
+                schedule.requests_bucket.get_seconds_until_available(1, now),
+                schedule.tokens_bucket.get_seconds_until_available(
+                    reserved_tokens, now
+                ),
+            )
+
+            if seconds_until_available > 0:
+                self._schedule_refill(model, schedule, seconds_until_available)
+                return
+
+            heapq.heappop(schedule.queue)
+
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            schedule.requests_bucket.consume(1)
+            schedule.tokens_bucket.consume(reserved_tokens)
+            schedule.number_of_requests_in_flight += 1
+            schedule.number_of_scheduled_requests += 1
+            schedule.total_waited_seconds += now - enqueue_time
+
+            future.set_result(
+                ScheduledRequest(model, reserved_tokens, now - enqueue_time)
+            )
+
+    def _schedule_refill(self, model: str, schedule: _ModelSchedule, seconds: float):
+        if schedule.refill_timer is not None:
+            return
+
+        def on_refill():
+            with self._lock:
+                schedule.refill_timer = None
+                self._dispatch(model)
+
+        schedule.refill_timer = Timer(seconds, on_refill)
+        schedule.refill_timer.daemon = True
+        schedule.refill_timer.start()
+
+    def request_slot(
+        self,
+        model: str,
+        estimated_prompt_tokens: int,
+        priority: RequestPriority | None = None,
+    ) -> Future:
+        """Queues a request without waiting for it to be allowed.
+
+        Args:
+            model (str): what AI model the request is for.
+            estimated_prompt_tokens (int): how many tokens the prompt of the request is estimated to take up.
+            priority (RequestPriority | None): the priority of the request. If None, the priority of the
+                current context is used.
+
+        Returns:
+            Future: the future that will hold the ScheduledRequest once the request is allowed to be sent.
+        """
+        if priority is None:
+            priority = get_request_priority()
+
+        future = Future()
+
+        with self._lock:
+            heapq.heappush(
+                self._get_schedule(model).queue,
+                (
+                    int(priority),
+                    next(self._arrival_order),
+                    estimated_prompt_tokens + self._estimated_completion_tokens,
+                    time.monotonic(),
+                    future,
+                ),
+            )
+            self._dispatch(model)
+
+        return future
+
+    def acquire(
+        self,
+        model: str,
+        estimated_prompt_tokens: int,
+        priority: RequestPriority | None = None,
+    ) -> ScheduledRequest:
+        """Waits until a request is allowed to be sent.
+
+        Args:
+            model (str): what AI model the request is for.
+            estimated_prompt_tokens (int): how many tokens the prompt of the request is estimated to take up.
+            priority (RequestPriority | None): the priority of the request. If None, the priority of the
+                current context is used.
+
+        Returns:
+            ScheduledRequest: the allowed request, which must be released once its response has arrived.
+        """
+        return self.request_slot(model, estimated_prompt_tokens, priority).result()
+
+    async def aacquire(
+        self,
+        model: str,
+        estimated_prompt_tokens: int,
+        priority: RequestPriority | None = None,
+    ) -> ScheduledRequest:
+        """Awaits until a request is allowed to be sent, leaving the event loop free meanwhile.
+
+        Args:
+            model (str): what AI model the request is for.
+            estimated_prompt_tokens (int): how many tokens the prompt of the request is estimated to take up.
+            priority (RequestPriority | None): the priority of the request. If None, the priority of the
+                current context is used.
+
+        Returns:
+            ScheduledRequest: the allowed request, which must be released once its response has arrived.
+        """
+        return await asyncio.wrap_future(
+            self.request_slot(model, estimated_prompt_tokens, priority)
+        )
+
+    def release(
+        self,
+        scheduled_request: ScheduledRequest,
+        used_tokens: int | None = None,
+        was_rate_limited: bool = False,
+    ):
+        """Hands back an allowed request once its response has arrived (or it failed).
+
+        Args:
+            scheduled_request (ScheduledRequest): the request returned by 'acquire'.
+            used_tokens (int | None): how many tokens the request actually used, if known, so that the
+                reservation gets corrected.
+            was_rate_limited (bool): whether the AI model refused the request for exceeding its limits,
+                in which case the budget of the model gets emptied so that the queue backs off.
+        """
+        with self._lock:
+            schedule = self._get_schedule(scheduled_request.get_model())
+            schedule.number_of_requests_in_flight -= 1
+
+            if used_tokens is not None:
+                schedule.tokens_bucket.consume(
+                    used_tokens - scheduled_request.get_reserved_tokens()
+                )
+
+            if was_rate_limited:
+                now = time.monotonic()
+                schedule.requests_bucket.empty(now)
+                schedule.tokens_bucket.empty(now)
+
+            self._dispatch(scheduled_request.get_model())
+
+    def get_queue_depth(self, model: str) -> int:
+        """Returns how many requests to a model are waiting to be sent.
+
+        Args:
+            model (str): the AI model.
+
+        Returns:
+            int: the number of queued requests.
+        """
+        with self._lock:
+            return len(self._get_schedule(model).queue)
+
+    def get_number_of_requests_in_flight(self, model: str) -> int:
+        """Returns how many requests to a model have been sent and are awaiting their response.
+
+        Args:
+            model (str): the AI model.
+
+        Returns:
+            int: the number of requests in flight.
+        """
+        with self._lock:
+            return self._get_schedule(model).number_of_requests_in_flight
+
+    def get_metrics(self) -> Dict[str, dict]:
+        """Returns the state of the schedule of every model that has received requests.
+
+        Returns:
+            Dict[str, dict]: by model, the 'queue_depth', 'requests_in_flight', 'available_requests',
+                'available_tokens', 'scheduled_requests' and 'average_wait_seconds'.
+        """
+        with self._lock:
+            now = time.monotonic()
+
+            return {
+                model: {
+                    "queue_depth": len(schedule.queue),
+                    "requests_in_flight": schedule.number_of_requests_in_flight,
+                    "available_requests": schedule.requests_bucket.get_level(now),
+                    "available_tokens": schedule.tokens_bucket.get_level(now),
+                    "scheduled_requests": schedule.number_of_scheduled_requests,
+                    "average_wait_seconds": schedule.total_waited_seconds
+                    / schedule.number_of_scheduled_requests
+                    if schedule.number_of_scheduled_requests
+                    else 0.0,
+                }
+                for model, schedule in self._schedules.items()
+            }
+
+
+REQUEST_SCHEDULER = RequestScheduler()
@@ -1,26 +1,31 @@
+import json
 import random
 import string
 import time
 
 
-def create_response_in_gpt_format(user_input, messages, model):
-    # Create a random ID for the response
-    id_string = "chatcmpl-" + "".join(
+def _create_response_id():
+    return "chatcmpl-" + "".join(
         random.choices(string.ascii_letters + string.digits, k=24)
     )
 
+
+def _create_usage(messages, completion):
+    return {
+        "prompt_tokens": len(messages[-1]["content"].split()),
+        "completion_tokens": len(completion.split()),
+        "total_tokens": len(messages[-1]["content"].split()) + len(completion.split()),
+    }
+
+
+def create_response_in_gpt_format(user_input, messages, model):
     # Create a response in the same format as the AI model
     return {
-        "id": id_string,
+        "id": _create_response_id(),
         "object": "chat.completion",
         "created": int(time.time()),
         "model": model,
-        "usage": {
-            "prompt_tokens": len(messages[-1]["content"].split()),
-            "completion_tokens": len(user_input.split()),
-            "total_tokens": len(messages[-1]["content"].split())
-            + len(user_input.split()),
-        },
+        "usage": _create_usage(messages, user_input),
         "choices": [
             {
                 "message": {"role": "user", "content": user_input},
@@ -29,3 +34,32 @@ def create_response_in_gpt_format(user_input, messages, model):
             }
         ],
     }
+
+
+def create_function_call_response_in_gpt_format(
+    function_name, arguments, messages, model
+):
+    serialized_arguments = json.dumps(arguments, ensure_ascii=False)
+
+    # Create a response in the same format as the AI model when it calls a function
+    return {
+        "id": _create_response_id(),
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "usage": _create_usage(messages, serialized_arguments),
+        "choices": [
+            {
+                "message": {
+                    "role": "assistant",
+                    "content": None,
+                    "function_call": {
+                        "name": function_name,
+                        "arguments": serialized_arguments,
+                    },
+                },
+                "finish_reason": "function_call",
+                "index": 0,
+            }
+        ],
+    }
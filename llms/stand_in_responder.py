@@ -0,0 +1,439 @@
+"""This module contains the definitions of StandInResponder and AsyncStandInResponder, which answer requests
+in place of an actual AI model: they replay recorded transcripts, and otherwise synthesize responses that are
+valid according to the schemas of the requested functions. Their latency follows a configurable distribution,
+so that the throughput and concurrency of the engine can be measured without any network access.
+"""
+import asyncio
+import copy
+import math
+import random
+import time
+from threading import Lock
+from typing import Callable, Dict, List
+
+from defines.defines import DEFAULT_TEMPERATURE
+from llms.async_interface import AsyncAIModelInterface
+from llms.interface import AIModelInterface
+from llms.request_keys import determine_request_key
+from llms.request_scheduler import RequestScheduler
+from llms.responses import (
+    create_function_call_response_in_gpt_format,
+    create_response_in_gpt_format,
+)
+from llms.token_estimation import estimate_prompt_tokens
+
+STAND_IN_VOCABULARY = [
+    "the",
+    "old",
+    "road",
+    "winds",
+    "past",
+    "a",
+    "quiet",
+    "village",
+    "where",
+    "lanterns",
+    "glow",
+    "and",
+    "travelers",
+    "share",
+    "stories",
+    "of",
+    "distant",
+    "mountains",
+    "rivers",
+    "friends",
+]
+
+LatencyDistribution = Callable[[random.Random], float]
+ArgumentSynthesizer = Callable[[List[dict], random.Random], dict]
+
+
+def create_constant_latency(seconds: float) -> LatencyDistribution:
+    """Creates a latency distribution that always takes the same time.
+
+    Args:
+        seconds (float): how long every response takes.
+
+    Returns:
+        LatencyDistribution: the latency distribution.
+    """
+    return lambda _random_generator: seconds
+
+
+def create_uniform_latency(
+    min_seconds: float, max_seconds: float
+) -> LatencyDistribution:
+    """Creates a latency distribution where every response takes between two durations.
+
+    Args:
+        min_seconds (float): the shortest that a response can take.
+        max_seconds (float): the longest that a response can take.
+
+    Returns:
+        LatencyDistribution: the latency distribution.
+    """
+    return lambda random_generator: random_generator.uniform(min_seconds, max_seconds)
+
+
+def create_lognormal_latency(
+    median_seconds: float, sigma: float = 0.5
+) -> LatencyDistribution:
+    """Creates a log-normal latency distribution, which resembles the long tail of the latencies of
+    actual AI models.
+
+    Args:
+        median_seconds (float): the median duration of a response.
+        sigma (float): the standard deviation of the logarithm of the duration.
+
+    Returns:
+        LatencyDistribution: the latency distribution.
+    """
+    return lambda random_generator: random_generator.lognormvariate(
+        math.log(median_seconds), sigma
+    )
+
+
+def _synthesize_text(random_generator: random.Random) -> str:
+    number_of_words = random_generator.randint(8, 24)
+
+    return " ".join(random_generator.choices(STAND_IN_VOCABULARY, k=number_of_words))
+
+
+def synthesize_value_from_schema(schema: dict, random_generator: random.Random):
+    """Synthesizes a value that is valid according to a json schema, as used by the parameters of functions.
+
+    Args:
+        schema (dict): the json schema of the value.
+        random_generator (random.Random): the source of randomness.
+
+    Returns:
+        Any: the synthesized value.
+    """
+    if schema.get("enum"):
+        return random_generator.choice(schema["enum"])
+
+    value_type = schema.get("type", "string")
+
+    if value_type == "object":
+        return {
+            name: synthesize_value_from_schema(property_schema, random_generator)
+            for name, property_schema in schema.get("properties", {}).items()
+        }
+
+    if value_type == "array":
+        return [
+            synthesize_value_from_schema(
+                schema.get("items", {"type": "string"}), random_generator
+            )
+            for _ in range(random_generator.randint(1, 3))
+        ]
+
+    if value_type == "boolean":
+        return random_generator.random() < 0.5
+
+    if value_type == "integer":
+        return random_generator.randint(
+            schema.get("minimum", 1), schema.get("maximum", 10)
+        )
+
+    if value_type == "number":
+        return random_generator.uniform(
+            schema.get("minimum", 0.0), schema.get("maximum", 1.0)
+        )
+
+    return _synthesize_text(random_generator)
+
+
+class StandInResponseSource:
+    """Decides the responses of the stand-in responders, along with how long each of them should take.
+    It's safe to use from several threads at once.
+    """
+
+    def __init__(
+        self,
+        transcript: Dict[str, List[dict]] | None = None,
+        latency_distribution: LatencyDistribution | None = None,
+        argument_synthesizers: Dict[str, ArgumentSynthesizer] | None = None,
+        seed: int | None = None,
+    ):
+        """Creates an instance of the class StandInResponseSource.
+
+        Args:
+            transcript (Dict[str, List[dict]] | None): the recorded responses of every request key, as loaded
+                by 'load_transcript'. When a request has several recorded responses, they are replayed in order.
+            latency_distribution (LatencyDistribution | None): how long the responses take. If None, they
+                are immediate.
+            argument_synthesizers (Dict[str, ArgumentSynthesizer] | None): the functions that synthesize
+                the arguments of specific functions, by function name, for when their schema isn't enough to
+                produce meaningful arguments (for example, the name of a character present in the dialogue).
+            seed (int | None): the seed of the randomness, so that benchmarks can be reproduced.
+        """
+        self._transcript = transcript or {}
+        self._latency_distribution = latency_distribution or create_constant_latency(
+            0.0
+        )
+        self._argument_synthesizers = argument_synthesizers or {}
+
+        self._random_generator = random.Random(seed)
+        self._replay_positions = {}
+        self._lock = Lock()
+
+        self._number_of_replayed_responses = 0
+        self._number_of_synthesized_responses = 0
+
+    def _replay_response(self, request_key: str) -> dict | None:
+        recorded_responses = self._transcript.get(request_key)
+
+        if not recorded_responses:
+            return None
+
+        position = self._replay_positions.get(request_key, 0)
+        self._replay_positions[request_key] = position + 1
+
+        return copy.deepcopy(recorded_responses[position % len(recorded_responses)])
+
+    def _choose_function(
+        self, functions: List[dict] | None, function_call: str | dict | None
+    ) -> dict | None:
+        if not functions or function_call == "none":
+            return None
+
+        if isinstance(function_call, dict):
+            for function in functions:
+                if function["name"] == function_call.get("name"):
+                    return function
+
+            return None
+
+        return self._random_generator.choice(functions)
+
+    def _synthesize_response(
+        self,
+        messages: List[dict],
+        functions: List[dict] | None,
+        function_call: str | dict | None,
+        model: str,
+    ) -> dict:
+        function = self._choose_function(functions, function_call)
+
+        if function is None:
+            return create_response_in_gpt_format(
+                _synthesize_text(self._random_generator), messages, model
+            )
+
+        argument_synthesizer = self._argument_synthesizers.get(function["name"])
+
+        if argument_synthesizer is not None:
+            arguments = argument_synthesizer(messages, self._random_generator)
+        else:
+            arguments = synthesize_value_from_schema(
+                function.get("parameters", {"type": "object"}), self._random_generator
+            )
+
+        return create_function_call_response_in_gpt_format(
+            function["name"], arguments, messages, model
+        )
+
+    def produce_response(
+        self,
+        messages: List[dict],
+        functions: List[dict] | None,
+        function_call: str | dict | None,
+        model: str,
+        temperature: float = DEFAULT_TEMPERATURE,
+    ) -> tuple[dict, float]:
+        """Produces the response to a request, replaying it if it was recorded and synthesizing it otherwise.
+
+        Args:
+            messages (List[dict]): the messages of the request.
+            functions (List[dict] | None): the functions available to the AI model, if any.
+            function_call (str | dict | None): which function the AI model should call, if any.
+            model (str): what AI model the request is for.
+            temperature (float): the temperature of the request.
+
+        Returns:
+            tuple[dict, float]: the response, and how many seconds it should take to arrive.
+        """
+        request_key = determine_request_key(
+            model, temperature, messages, functions, function_call
+        )
+
+        with self._lock:
+            response = self._replay_response(request_key)
+
+            if response is not None:
+                self._number_of_replayed_responses += 1
+            else:
+                response = self._synthesize_response(
+                    messages, functions, function_call, model
+                )
+                self._number_of_synthesized_responses += 1
+
+            latency = max(0.0, self._latency_distribution(self._random_generator))
+
+        return response, latency
+
+    def get_number_of_replayed_responses(self) -> int:
+        """Returns how many responses have been replayed from the transcript.
+
+        Returns:
+            int: the number of replayed responses.
+        """
+        with self._lock:
+            return self._number_of_replayed_responses
+
+    def get_number_of_synthesized_responses(self) -> int:
+        """Returns how many responses have been synthesized.
+
+        Returns:
+            int: the number of synthesized responses.
+        """
+        with self._lock:
+            return self._number_of_synthesized_responses
+
+
+class StandInResponder(AIModelInterface):
+    """Answers requests in place of an actual AI model, blocking the calling thread during the latency."""
+
+    def __init__(
+        self,
+        response_source: StandInResponseSource | None = None,
+        request_scheduler: RequestScheduler | None = None,
+    ):
+        """Creates an instance of the class StandInResponder.
+
+        Args:
+            response_source (StandInResponseSource | None): decides the responses and their latency.
+                If None, every response is synthesized immediately.
+            request_scheduler (RequestScheduler | None): the scheduler that the requests go through,
+                as those of an actual AI model would. If None, they aren't scheduled.
+        """
+        self._response_source = response_source or StandInResponseSource()
+        self._request_scheduler = request_scheduler
+
+    def _respond(self, messages, functions, function_call, model):
+        scheduled_request = None
+
+        if self._request_scheduler is not None:
+            scheduled_request = self._request_scheduler.acquire(
+                model, estimate_prompt_tokens(messages, functions)
+            )
+
+        try:
+            response, latency = self._response_source.produce_response(
+                messages, functions, function_call, model
+            )
+
+            time.sleep(latency)
+        finally:
+            if scheduled_request is not None:
+                self._request_scheduler.release(scheduled_request)
+
+        return response
+
+    def request_response_using_functions(
+        self,
+        messages: List[dict],
+        functions: List[dict],
+        function_call: str,
+        model: str,
+    ) -> dict:
+        """Replays or synthesizes the response to a request that expects the use of functions.
+
+        Args:
+            messages (list[dict]): the list of messages of the request.
+            functions (list[dict]): the list of functions that the AI model would have available.
+            function_call (str): whether the AI model should choose to use the functions or not.
+            model (str): what AI model the request is for.
+
+        Returns:
+            dict: the response, in the format of the AI model.
+        """
+        return self._respond(messages, functions, function_call, model)
+
+    def request_response(self, messages: List[dict], model: str) -> dict:
+        """Replays or synthesizes the response to a request.
+
+        Args:
+            messages (list[dict]): the list of messages of the request.
+            model (str): what AI model the request is for.
+
+        Returns:
+            dict: the response, in the format of the AI model.
+        """
+        return self._respond(messages, None, None, model)
+
+
+class AsyncStandInResponder(AsyncAIModelInterface):
+    """The asynchronous variant of StandInResponder. The latency is awaited, so the event loop keeps
+    running other requests meanwhile.
+    """
+
+    def __init__(
+        self,
+        response_source: StandInResponseSource | None = None,
+        request_scheduler: RequestScheduler | None = None,
+    ):
+        """Creates an instance of the class AsyncStandInResponder.
+
+        Args:
+            response_source (StandInResponseSource | None): decides the responses and their latency.
+                If None, every response is synthesized immediately.
+            request_scheduler (RequestScheduler | None): the scheduler that the requests go through,
+                as those of an actual AI model would. If None, they aren't scheduled.
+        """
+        self._response_source = response_source or StandInResponseSource()
+        self._request_scheduler = request_scheduler
+
+    async def _arespond(self, messages, functions, function_call, model):
+        scheduled_request = None
+
+        if self._request_scheduler is not None:
+            scheduled_request = await self._request_scheduler.aacquire(
+                model, estimate_prompt_tokens(messages, functions)
+            )
+
+        try:
+            response, latency = self._response_source.produce_response(
+                messages, functions, function_call, model
+            )
+
+            await asyncio.sleep(latency)
+        finally:
+            if scheduled_request is not None:
+                self._request_scheduler.release(scheduled_request)
+
+        return response
+
+    async def arequest_response_using_functions(
+        self,
+        messages: List[dict],
+        functions: List[dict],
+        function_call: str,
+        model: str,
+    ) -> dict:
+        """Replays or synthesizes the response to a request that expects the use of functions.
+
+        Args:
+            messages (list[dict]): the list of messages of the request.
+            functions (list[dict]): the list of functions that the AI model would have available.
+            function_call (str): whether the AI model should choose to use the functions or not.
+            model (str): what AI model the request is for.
+
+        Returns:
+            dict: the response, in the format of the AI model.
+        """
+        return await self._arespond(messages, functions, function_call, model)
+
+    async def arequest_response(self, messages: List[dict], model: str) -> dict:
+        """Replays or synthesizes the response to a request.
+
+        Args:
+            messages (list[dict]): the list of messages of the request.
+            model (str): what AI model the request is for.
+
+        Returns:
+            dict: the response, in the format of the AI model.
+        """
+        return await self._arespond(messages, None, None, model)
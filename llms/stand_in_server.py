@@ -0,0 +1,117 @@
+"""This module contains a local HTTP server that imitates the chat completions endpoint of the OpenAI API,
+answering through a StandInResponseSource. Pointing the OpenAI client at it ('openai.api_base') exercises
+the whole request path of the engine, including the client library, without any network access.
+"""
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import time
+
+from defines.defines import (
+    DEFAULT_TEMPERATURE,
+    STAND_IN_CHAT_COMPLETIONS_ENDPOINT,
+    STAND_IN_SERVER_HOST,
+    STAND_IN_SERVER_PORT,
+)
+from llms.stand_in_responder import StandInResponseSource
+
+
+class StandInServerRequestHandler(BaseHTTPRequestHandler):
+    """Handles the requests to the chat completions endpoint. Errors are answered in the same format
+    as the OpenAI API.
+    """
+
+    def do_POST(self):
+        if self.path.split("?")[0] != STAND_IN_CHAT_COMPLETIONS_ENDPOINT:
+            self._send_error(HTTPStatus.NOT_FOUND, f"Unknown endpoint: {self.path}")
+            return
+
+        try:
+            content_length = int(self.headers.get("Content-Length", 0))
+            arguments = json.loads(self.rfile.read(content_length) or b"{}")
+
+            if not isinstance(arguments, dict):
+                raise TypeError("The body of the request should be a json object.")
+
+            messages = arguments.get("messages")
+
+            if not isinstance(messages, list) or not messages:
+                raise ValueError(
+                    f"The argument 'messages' of the request should be a non-empty list. It was: {messages}"
+                )
+
+            response, latency = self.server.response_source.produce_response(
+                messages,
+                arguments.get("functions"),
+                arguments.get("function_call"),
+                arguments.get("model", ""),
+                arguments.get("temperature", DEFAULT_TEMPERATURE),
+            )
+        except (ValueError, TypeError) as exception:
+            self._send_error(HTTPStatus.BAD_REQUEST, str(exception))
+            return
+
+        time.sleep(latency)
+
+        self._send_json(HTTPStatus.OK, response)
+
+    def _send_error(self, status: HTTPStatus, message: str):
+        self._send_json(
+            status, {"error": {"message": message, "type": "invalid_request_error"}}
+        )
+
+    def _send_json(self, status: HTTPStatus, content: dict):
+        body = json.dumps(content).encode("utf-8")
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Benchmarks send many requests, so logging every one of them to stderr would only get in the way.
+        pass
+
+
+def create_stand_in_server(
+    response_source: StandInResponseSource,
+    host: str = STAND_IN_SERVER_HOST,
+    port: int = STAND_IN_SERVER_PORT,
+) -> ThreadingHTTPServer:
+    """Creates the stand-in HTTP server, which serves every client in its own thread.
+
+    Args:
+        response_source (StandInResponseSource): decides the responses and their latency.
+        host (str): the host on which the server will listen. It should remain local.
+        port (int): the port on which the server will listen.
+
+    Returns:
+        ThreadingHTTPServer: the server, ready to 'serve_forever'.
+    """
+    server = ThreadingHTTPServer((host, port), StandInServerRequestHandler)
+    server.response_source = response_source
+
+    return server
+
+
+def run_stand_in_server(
+    response_source: StandInResponseSource,
+    host: str = STAND_IN_SERVER_HOST,
+    port: int = STAND_IN_SERVER_PORT,
+):
+    """Runs the stand-in HTTP server until interrupted.
+
+    Args:
+        response_source (StandInResponseSource): decides the responses and their latency.
+        host (str): the host on which the server will listen. It should remain local.
+        port (int): the port on which the server will listen.
+    """
+    server = create_stand_in_server(response_source, host, port)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,102 @@
+"""This module estimates how many tokens the requests to AI models take up, without depending on a tokenizer.
+The estimates are meant for budgeting (rate limits, context windows). Since a rough estimate can fall short
+of the actual count, the prompt token budget that prompts get trimmed to keeps a safety margin on top of it.
+"""
+import json
+import math
+from typing import List
+
+from defines.defines import (
+    AI_MODEL_CONTEXT_WINDOWS,
+    CHARACTERS_PER_TOKEN,
+    DEFAULT_AI_MODEL_CONTEXT_WINDOW,
+    MAX_TOKENS,
+    PROMPT_TOKEN_BUDGET_SAFETY_FACTOR,
+    TOKENS_PER_MESSAGE,
+)
+
+
+def estimate_tokens_of_text(text: str) -> int:
+    """Estimates how many tokens a text takes up.
+
+    Args:
+        text (str): the text.
+
+    Returns:
+        int: the estimated number of tokens.
+    """
+    return math.ceil(len(text) / CHARACTERS_PER_TOKEN)
+
+
+def estimate_prompt_tokens(
+    messages: List[dict], functions: List[dict] | None = None
+) -> int:
+    """Estimates how many tokens the prompt of a request takes up, including the schemas of its functions.
+
+    Args:
+        messages (List[dict]): the messages of the request.
+        functions (List[dict] | None): the functions available to the AI model, if any.
+
+    Returns:
+        int: the estimated number of tokens.
+    """
+    tokens = sum(
+        TOKENS_PER_MESSAGE + estimate_tokens_of_text(message.get("content") or "")
+        for message in messages
+    )
+
+    if functions:
+        tokens += estimate_tokens_of_text(json.dumps(functions, ensure_ascii=False))
+
+    return tokens
+
+
+def get_prompt_token_limit(model: str) -> int:
+    """Returns how many tokens the prompt of a request to a model can actually take up, which is what remains
+    of its context window after reserving the tokens of the completion.
+
+    Args:
+        model (str): the AI model.
+
+    Returns:
+        int: the token limit of the prompt.
+    """
+    return (
+        AI_MODEL_CONTEXT_WINDOWS.get(model, DEFAULT_AI_MODEL_CONTEXT_WINDOW)
+        - MAX_TOKENS
+    )
+
+
+def get_prompt_token_budget(model: str) -> int:
+    """Returns how many tokens the prompts built for a model should be trimmed to, which is its prompt token
+    limit minus a safety margin for underestimates.
+
+    Args:
+        model (str): the AI model.
+
+    Returns:
+        int: the token budget of the prompt.
+    """
+    return int(get_prompt_token_limit(model) * PROMPT_TOKEN_BUDGET_SAFETY_FACTOR)
+
+
+def determine_remaining_prompt_tokens(
+    model: str, messages: List[dict], functions: List[dict] | None = None
+) -> int:
+    """Determines how many tokens remain in the prompt budget of a model for the content of one more message,
+    given the messages and functions that the prompt already contains.
+
+    Args:
+        model (str): the AI model.
+        messages (List[dict]): the messages that the prompt already contains.
+        functions (List[dict] | None): the functions available to the AI model, if any.
+
+    Returns:
+        int: the remaining tokens, which are never negative.
+    """
+    return max(
+        0,
+        get_prompt_token_budget(model)
+        - estimate_prompt_tokens(messages, functions)
+        - TOKENS_PER_MESSAGE,
+    )
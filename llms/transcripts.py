@@ -0,0 +1,59 @@
+"""This module handles transcripts of AI model requests: json lines files where every line holds the key
+of a request, the request itself and the response it received, so that they can be replayed later.
+"""
+from collections import defaultdict
+import json
+import os
+from threading import Lock
+from typing import Dict, List
+
+_TRANSCRIPT_WRITE_LOCK = Lock()
+
+
+def append_to_transcript(
+    transcript_full_path: str, request_key: str, request: dict, response: dict
+):
+    """Appends a request along with its response to a transcript, creating the transcript if necessary.
+
+    Args:
+        transcript_full_path (str): the full path of the transcript.
+        request_key (str): the canonical key of the request.
+        request (dict): the content of the request (model, temperature, messages, functions, function call).
+        response (dict): the response that the request received.
+    """
+    line = json.dumps(
+        {"request_key": request_key, "request": request, "response": response},
+        ensure_ascii=False,
+    )
+
+    directory = os.path.dirname(transcript_full_path)
+
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with _TRANSCRIPT_WRITE_LOCK:
+        with open(transcript_full_path, "a", encoding="utf-8") as file:
+            file.write(line + "\n")
+
+
+def load_transcript(transcript_full_path: str) -> Dict[str, List[dict]]:
+    """Loads the responses of a transcript, grouped by the key of their requests in the order they were received.
+
+    Args:
+        transcript_full_path (str): the full path of the transcript.
+
+    Returns:
+        Dict[str, List[dict]]: the recorded responses of every request key.
+    """
+    responses = defaultdict(list)
+
+    with open(transcript_full_path, "r", encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+
+            entry = json.loads(line)
+
+            responses[entry["request_key"]].append(entry["response"])
+
+    return dict(responses)
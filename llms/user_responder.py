@@ -1,4 +1,6 @@
 from typing import List
+from input.console_input import CONSOLE_INPUT_READER
+from llms.async_interface import AsyncAIModelInterface
 from llms.interface import AIModelInterface
 from llms.responses import create_response_in_gpt_format
 
@@ -10,7 +12,9 @@ class UserResponder(AIModelInterface):
             raise TypeError(error_message)
 
         # Prompt user with the content of the last message
-        user_input = input(f"{messages[-1]['content']}\nUser input: ")
+        user_input = CONSOLE_INPUT_READER.read_input(
+            f"{messages[-1]['content']}\nUser input: "
+        )
 
         return create_response_in_gpt_format(user_input, messages, model)
 
@@ -33,3 +37,40 @@ class UserResponder(AIModelInterface):
 
     def request_response(self, messages: List[dict], model: str) -> dict:
         return self._request_response_from_user(messages, model)
+
+
+class AsyncUserResponder(AsyncAIModelInterface):
+    """The asynchronous variant of UserResponder. The console input happens in the dedicated input thread,
+    so the event loop keeps running other requests while the user types.
+    """
+
+    async def _arequest_response_from_user(self, messages, model):
+        if not isinstance(messages, list):
+            error_message = f"The function {self.arequest_response_using_functions.__name__} expected 'messages' to be a list, but it was: {messages}"
+            raise TypeError(error_message)
+
+        user_input = await CONSOLE_INPUT_READER.aread_input(
+            f"{messages[-1]['content']}\nUser input: "
+        )
+
+        return create_response_in_gpt_format(user_input, messages, model)
+
+    async def arequest_response_using_functions(
+        self,
+        messages: List[dict],
+        _functions: List[dict],
+        _function_call: str,
+        model: str,
+    ) -> dict:
+        """Gets a response from user input.
+
+        Args:
+            messages (list[dict]): the list of messages that will be sent to the user.
+
+        Returns:
+            dict: the response returned from the user.
+        """
+        return await self._arequest_response_from_user(messages, model)
+
+    async def arequest_response(self, messages: List[dict], model: str) -> dict:
+        return await self._arequest_response_from_user(messages, model)
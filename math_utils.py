@@ -1,5 +1,7 @@
 import math
 
+import numpy as np
+
 from defines.defines import SCORE_ALPHA, SCORE_BETA, SCORE_GAMMA
 from errors import CurrentTimestampIsLaterThanAccessTimestampError, ValueOutOfRangeError
 
@@ -58,4 +60,26 @@ def calculate_score(
     beta=SCORE_BETA,
     gamma=SCORE_GAMMA,
 ):
+    """Calculates the score of a memory. Works the same whether the arguments are floats
+    or NumPy arrays aligned with each other (in which case every score is calculated at once).
+    """
     return alpha * relevance + beta * recency + gamma * importance
+
+
+def select_indexes_of_top_values(values: np.ndarray, k: int) -> np.ndarray:
+    """Selects the positions of the k greatest values, ordered from greatest to smallest value.
+    Only those k values get sorted, so it stays cheap even when there are thousands of values.
+
+    Args:
+        values (np.ndarray): the values to select from.
+        k (int): how many positions to select.
+
+    Returns:
+        np.ndarray: the positions of the k greatest values, in descending order of value.
+    """
+    if k >= len(values):
+        return np.argsort(-values, kind="stable")
+
+    top_positions = np.argpartition(-values, k - 1)[:k]
+
+    return top_positions[np.argsort(-values[top_positions], kind="stable")]
@@ -27,3 +27,11 @@ def get_seed_facts_of_simulation_full_path(simulation_name: str):
 
 def get_character_summary_full_path(agent_name: str):
     return f"assets/character_summaries/{replace_spaces_with_underscores(agent_name.lower())}_character_summary.txt"
+
+
+def get_character_summary_fingerprints_full_path(agent_name: str):
+    return f"assets/character_summaries/{replace_spaces_with_underscores(agent_name.lower())}_character_summary_fingerprints.json"
+
+
+def get_base_memories_directory():
+    return "assets/base_memories"
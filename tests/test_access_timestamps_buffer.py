@@ -0,0 +1,113 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from datetime import datetime
+
+from vector_databases.access_timestamps_buffer import AccessTimestampsBuffer
+
+CREATION_TIMESTAMP = datetime(2023, 6, 6)
+ACCESS_TIMESTAMP = datetime(2023, 6, 8)
+
+
+def create_raw_data(number_of_entries: int) -> dict:
+    return {
+        str(i): {
+            "description": f"Memory {i}.",
+            "creation_timestamp": CREATION_TIMESTAMP,
+            "most_recent_access_timestamp": CREATION_TIMESTAMP,
+            "recency": 1.0,
+            "importance": 5,
+        }
+        for i in range(number_of_entries)
+    }
+
+
+class TestAccessTimestampsBuffer(unittest.TestCase):
+    def setUp(self):
+        self._temporary_directory = tempfile.TemporaryDirectory()
+        self._database_json_full_path = os.path.join(
+            self._temporary_directory.name, "alberto_memories.json"
+        )
+
+    def tearDown(self):
+        self._temporary_directory.cleanup()
+
+    def _load_json_file(self) -> dict:
+        with open(self._database_json_full_path, "r", encoding="utf-8") as file:
+            return json.load(file)
+
+    def test_reaching_the_threshold_flushes_right_away(self):
+        buffer = AccessTimestampsBuffer(flush_interval_seconds=60, flush_threshold=2)
+        raw_data = create_raw_data(3)
+
+        buffer.record_accesses(
+            self._database_json_full_path, raw_data, 3, {"0": (0.9, ACCESS_TIMESTAMP)}
+        )
+
+        self.assertFalse(os.path.isfile(self._database_json_full_path))
+
+        buffer.record_accesses(
+            self._database_json_full_path, raw_data, 3, {"1": (0.8, ACCESS_TIMESTAMP)}
+        )
+
+        self.assertEqual(buffer.get_number_of_dirty_entries(), 0)
+        self.assertEqual(
+            self._load_json_file()["1"]["most_recent_access_timestamp"],
+            ACCESS_TIMESTAMP.isoformat(),
+        )
+
+    def test_the_timer_flushes_the_pending_accesses(self):
+        buffer = AccessTimestampsBuffer(flush_interval_seconds=0.05, flush_threshold=100)
+
+        buffer.record_accesses(
+            self._database_json_full_path,
+            create_raw_data(2),
+            2,
+            {"0": (0.9, ACCESS_TIMESTAMP)},
+        )
+
+        deadline = time.monotonic() + 5
+
+        while buffer.get_number_of_dirty_entries() > 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(self._load_json_file()["0"]["recency"], 0.9)
+
+    def test_a_superseded_raw_data_is_never_written(self):
+        buffer = AccessTimestampsBuffer(flush_interval_seconds=60, flush_threshold=100)
+        flushed_raw_data = []
+        buffer.add_flush_listener(
+            lambda _full_path, raw_data: flushed_raw_data.append(raw_data)
+        )
+
+        stale_raw_data = create_raw_data(2)
+        buffer.record_accesses(
+            self._database_json_full_path,
+            stale_raw_data,
+            2,
+            {"0": (0.9, ACCESS_TIMESTAMP)},
+        )
+
+        # A memory got appended on disk, so the raw data was loaded again.
+        reloaded_raw_data = create_raw_data(3)
+        buffer.record_accesses(
+            self._database_json_full_path,
+            reloaded_raw_data,
+            3,
+            {"2": (0.7, ACCESS_TIMESTAMP)},
+        )
+
+        self.assertFalse(os.path.isfile(self._database_json_full_path))
+
+        buffer.flush()
+
+        self.assertEqual(flushed_raw_data, [reloaded_raw_data])
+
+        memories = self._load_json_file()
+
+        self.assertEqual(len(memories), 3)
+        # The unwritten access of the superseded raw data was carried over.
+        self.assertEqual(memories["0"]["recency"], 0.9)
+        self.assertEqual(memories["2"]["recency"], 0.7)
@@ -0,0 +1,141 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from llms.adapters import (
+    AsyncAIModelInterfaceAdapter,
+    SyncAIModelInterfaceAdapter,
+    run_coroutine_synchronously,
+    to_async_ai_model,
+    to_sync_ai_model,
+)
+from llms.async_interface import AsyncAIModelInterface
+from llms.interface import AIModelInterface
+from llms.responses import create_response_in_gpt_format
+
+
+class FakeAsyncEchoModel(AsyncAIModelInterface):
+    """Echoes the last message after a short delay, keeping track of how many requests overlap."""
+
+    def __init__(self):
+        self.maximum_concurrent_requests = 0
+        self._concurrent_requests = 0
+
+    async def _echo(self, messages, model):
+        self._concurrent_requests += 1
+        self.maximum_concurrent_requests = max(
+            self.maximum_concurrent_requests, self._concurrent_requests
+        )
+
+        await asyncio.sleep(0.05)
+
+        self._concurrent_requests -= 1
+
+        return create_response_in_gpt_format(messages[-1]["content"], messages, model)
+
+    async def arequest_response_using_functions(
+        self, messages, functions, function_call, model
+    ):
+        return await self._echo(messages, model)
+
+    async def arequest_response(self, messages, model):
+        return await self._echo(messages, model)
+
+
+class FakeSyncEchoModel(AIModelInterface):
+    def __init__(self):
+        self.thread_names = set()
+
+    def request_response_using_functions(
+        self, messages, functions, function_call, model
+    ):
+        return self.request_response(messages, model)
+
+    def request_response(self, messages, model):
+        self.thread_names.add(threading.current_thread().name)
+
+        time.sleep(0.05)
+
+        return create_response_in_gpt_format(messages[-1]["content"], messages, model)
+
+
+def get_content(response):
+    return response["choices"][0]["message"]["content"]
+
+
+class TestAdapters(unittest.TestCase):
+    def test_sync_adapter_returns_the_response_of_the_async_model(self):
+        ai_model = SyncAIModelInterfaceAdapter(FakeAsyncEchoModel())
+
+        response = ai_model.request_response([{"content": "Hello"}], "test-model")
+
+        self.assertEqual(get_content(response), "Hello")
+
+    def test_sync_adapter_overlaps_requests_from_several_threads(self):
+        async_ai_model = FakeAsyncEchoModel()
+        ai_model = SyncAIModelInterfaceAdapter(async_ai_model)
+
+        threads = [
+            threading.Thread(
+                target=ai_model.request_response_using_functions,
+                args=([{"content": str(i)}], [], "auto", "test-model"),
+            )
+            for i in range(4)
+        ]
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertGreater(async_ai_model.maximum_concurrent_requests, 1)
+
+    def test_sync_adapter_works_from_inside_a_running_event_loop(self):
+        ai_model = SyncAIModelInterfaceAdapter(FakeAsyncEchoModel())
+
+        async def request_synchronously():
+            return ai_model.request_response([{"content": "Nested"}], "test-model")
+
+        response = asyncio.run(request_synchronously())
+
+        self.assertEqual(get_content(response), "Nested")
+
+    def test_async_adapter_runs_requests_outside_of_the_event_loop(self):
+        sync_ai_model = FakeSyncEchoModel()
+        ai_model = AsyncAIModelInterfaceAdapter(sync_ai_model)
+
+        async def request_concurrently():
+            return await asyncio.gather(
+                *[
+                    ai_model.arequest_response([{"content": str(i)}], "test-model")
+                    for i in range(3)
+                ]
+            )
+
+        responses = asyncio.run(request_concurrently())
+
+        self.assertEqual(
+            [get_content(response) for response in responses], ["0", "1", "2"]
+        )
+        self.assertNotIn(threading.current_thread().name, sync_ai_model.thread_names)
+
+    def test_conversions_only_adapt_when_necessary(self):
+        sync_ai_model = FakeSyncEchoModel()
+        async_ai_model = FakeAsyncEchoModel()
+
+        self.assertIs(to_sync_ai_model(sync_ai_model), sync_ai_model)
+        self.assertIs(to_async_ai_model(async_ai_model), async_ai_model)
+        self.assertIsInstance(
+            to_sync_ai_model(async_ai_model), SyncAIModelInterfaceAdapter
+        )
+        self.assertIsInstance(
+            to_async_ai_model(sync_ai_model), AsyncAIModelInterfaceAdapter
+        )
+
+    def test_running_a_coroutine_synchronously_propagates_its_exception(self):
+        async def fail():
+            raise ValueError("Expected failure")
+
+        with self.assertRaises(ValueError):
+            run_coroutine_synchronously(fail())
@@ -0,0 +1,133 @@
+import os
+import tempfile
+import time
+import unittest
+
+from llms.caching_ai_model_interface import CachingAIModelInterface
+from llms.interface import AIModelInterface
+from llms.request_keys import determine_request_key
+from llms.responses import create_response_in_gpt_format
+
+
+class FakeCountingModel(AIModelInterface):
+    """Echoes the last message, counting how many requests actually reach it."""
+
+    def __init__(self):
+        self.number_of_requests = 0
+
+    def request_response_using_functions(
+        self, messages, functions, function_call, model
+    ):
+        return self.request_response(messages, model)
+
+    def request_response(self, messages, model):
+        self.number_of_requests += 1
+
+        return create_response_in_gpt_format(messages[-1]["content"], messages, model)
+
+
+def create_messages(content):
+    return [{"role": "user", "content": content}]
+
+
+class TestCachingAIModelInterface(unittest.TestCase):
+    def setUp(self):
+        self._temporary_directory = tempfile.TemporaryDirectory()
+        self.cache_directory = self._temporary_directory.name
+        self.ai_model = FakeCountingModel()
+
+    def tearDown(self):
+        self._temporary_directory.cleanup()
+
+    def create_caching_ai_model(self, **kwargs):
+        return CachingAIModelInterface(
+            self.ai_model, cache_directory=self.cache_directory, **kwargs
+        )
+
+    def test_identical_requests_are_answered_from_the_cache(self):
+        caching_ai_model = self.create_caching_ai_model()
+
+        first_response = caching_ai_model.request_response_using_functions(
+            create_messages("Hello"), [], "auto", "test-model"
+        )
+        second_response = caching_ai_model.request_response_using_functions(
+            create_messages("Hello"), [], "auto", "test-model"
+        )
+
+        self.assertEqual(first_response, second_response)
+        self.assertEqual(self.ai_model.number_of_requests, 1)
+        self.assertEqual(caching_ai_model.get_number_of_hits(), 1)
+        self.assertEqual(caching_ai_model.get_number_of_misses(), 1)
+
+    def test_responses_persist_between_instances(self):
+        self.create_caching_ai_model().request_response(
+            create_messages("Hello"), "test-model"
+        )
+
+        caching_ai_model = self.create_caching_ai_model()
+        caching_ai_model.request_response(create_messages("Hello"), "test-model")
+
+        self.assertEqual(self.ai_model.number_of_requests, 1)
+        self.assertEqual(caching_ai_model.get_number_of_hits(), 1)
+
+    def test_opting_out_bypasses_the_cache(self):
+        caching_ai_model = self.create_caching_ai_model()
+
+        caching_ai_model.request_response(create_messages("Hello"), "test-model")
+        caching_ai_model.request_response(
+            create_messages("Hello"), "test-model", use_cache=False
+        )
+
+        self.assertEqual(self.ai_model.number_of_requests, 2)
+        self.assertEqual(caching_ai_model.get_number_of_hits(), 0)
+
+    def test_least_recently_used_responses_are_evicted_first(self):
+        caching_ai_model = self.create_caching_ai_model()
+
+        for content in ["first", "second"]:
+            caching_ai_model.request_response(create_messages(content), "test-model")
+            time.sleep(0.01)
+
+        # Using the first response makes the second one the least recently used.
+        caching_ai_model.request_response(create_messages("first"), "test-model")
+
+        bounded_caching_ai_model = self.create_caching_ai_model(
+            max_bytes=caching_ai_model.get_total_bytes() - 1
+        )
+        bounded_caching_ai_model.request_response(
+            create_messages("first"), "test-model"
+        )
+        bounded_caching_ai_model.request_response(
+            create_messages("second"), "test-model"
+        )
+
+        self.assertEqual(bounded_caching_ai_model.get_number_of_hits(), 1)
+        self.assertEqual(bounded_caching_ai_model.get_number_of_misses(), 1)
+
+    def test_responses_unused_for_too_long_are_discarded(self):
+        self.create_caching_ai_model().request_response(
+            create_messages("Hello"), "test-model"
+        )
+
+        for file_name in os.listdir(self.cache_directory):
+            old_time = time.time() - 100
+            os.utime(os.path.join(self.cache_directory, file_name), (old_time, old_time))
+
+        caching_ai_model = self.create_caching_ai_model(max_age_seconds=10)
+
+        self.assertEqual(caching_ai_model.get_total_bytes(), 0)
+        self.assertEqual(os.listdir(self.cache_directory), [])
+
+    def test_request_keys_ignore_the_order_of_dictionary_keys(self):
+        self.assertEqual(
+            determine_request_key(
+                "test-model", 0.7, [{"role": "user", "content": "Hello"}]
+            ),
+            determine_request_key(
+                "test-model", 0.7, [{"content": "Hello", "role": "user"}]
+            ),
+        )
+        self.assertNotEqual(
+            determine_request_key("test-model", 0.7, create_messages("Hello")),
+            determine_request_key("test-model", 0.2, create_messages("Hello")),
+        )
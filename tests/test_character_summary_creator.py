@@ -0,0 +1,143 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+
+from character_summaries.character_summary_creator import CharacterSummaryCreator
+from embeddings.embedding_provider import EmbeddingProvider
+from llms.interface import AIModelInterface
+from paths.full_paths import (
+    get_base_memories_full_path,
+    get_base_memories_json_full_path,
+    get_character_summary_full_path,
+)
+from vector_databases import database_querier
+from vector_databases.access_timestamps_buffer import ACCESS_TIMESTAMPS_BUFFER
+from vector_databases.exact_vector_index import ExactVectorIndex
+
+MEMORIES = [
+    "Alberto is forty-six years old.",
+    "Alberto is a stubborn blacksmith.",
+    "Alberto feels he has wasted the last few years.",
+]
+
+
+class FakeModel:
+    """Encodes every sentence as the same vector, so that every memory is retrieved for every query."""
+
+    def encode(self, sentences, **_kwargs):
+        if isinstance(sentences, str):
+            return [1.0, 0.0, 0.0]
+
+        return [[1.0, 0.0, 0.0] for _ in sentences]
+
+
+class CountingAIModel(AIModelInterface):
+    """Answers every attribute with a fixed value, counting how many requests it has received."""
+
+    def __init__(self):
+        self.number_of_requests = 0
+        self._lock = threading.Lock()
+
+    def request_response_using_functions(
+        self, messages, functions, function_call, model
+    ):
+        with self._lock:
+            self.number_of_requests += 1
+
+        properties = functions[0]["parameters"]["properties"]
+
+        arguments = {
+            name: 46 if schema["type"] == "integer" else f"Some {name}."
+            for name, schema in properties.items()
+        }
+
+        return {
+            "choices": [
+                {
+                    "message": {
+                        "role": "assistant",
+                        "content": None,
+                        "function_call": {
+                            "name": function_call["name"],
+                            "arguments": json.dumps(arguments),
+                        },
+                    }
+                }
+            ]
+        }
+
+    def request_response(self, messages, model):
+        raise NotImplementedError()
+
+
+class TestCharacterSummaryCreator(unittest.TestCase):
+    def setUp(self):
+        self._previous_working_directory = os.getcwd()
+        self._temporary_directory = tempfile.TemporaryDirectory()
+
+        os.chdir(self._temporary_directory.name)
+        os.makedirs("assets/base_memories")
+        os.makedirs("assets/character_summaries")
+
+        self._current_timestamp = datetime(2023, 6, 6)
+
+        index = ExactVectorIndex(dimensions=3)
+        raw_data = {}
+
+        for i, description in enumerate(MEMORIES):
+            index.add_item(i, [1.0, 0.0, 0.0])
+            raw_data[str(i)] = {
+                "description": description,
+                "creation_timestamp": self._current_timestamp.isoformat(),
+                "importance": 5,
+                "recency": 1.0,
+                "most_recent_access_timestamp": self._current_timestamp.isoformat(),
+            }
+
+        index.build(10)
+        index.save(get_base_memories_full_path("Alberto"))
+
+        with open(
+            get_base_memories_json_full_path("Alberto"), "w", encoding="utf-8"
+        ) as file:
+            json.dump(raw_data, file)
+
+        self._previous_embedding_provider = database_querier.EMBEDDING_PROVIDER
+        database_querier.EMBEDDING_PROVIDER = EmbeddingProvider(
+            "fake-model", lambda _model_name: FakeModel()
+        )
+
+        self._ai_model = CountingAIModel()
+
+    def tearDown(self):
+        database_querier.EMBEDDING_PROVIDER = self._previous_embedding_provider
+
+        ACCESS_TIMESTAMPS_BUFFER.flush()
+        os.chdir(self._previous_working_directory)
+        self._temporary_directory.cleanup()
+
+    def _create_character_summary(self, regenerate_all: bool = False) -> list[str]:
+        return CharacterSummaryCreator(
+            "Alberto", self._current_timestamp, self._ai_model
+        ).create(regenerate_all)
+
+    def test_unchanged_memories_dont_request_the_attributes_again(self):
+        self.assertEqual(len(self._create_character_summary()), 5)
+        self.assertEqual(self._ai_model.number_of_requests, 5)
+
+        with open(
+            get_character_summary_full_path("Alberto"), "r", encoding="utf-8"
+        ) as file:
+            self.assertTrue(file.readline().startswith("Name: Alberto (age 46)"))
+
+        self.assertEqual(self._create_character_summary(), [])
+        self.assertEqual(self._ai_model.number_of_requests, 5)
+
+    def test_regenerating_all_requests_every_attribute(self):
+        self._create_character_summary()
+
+        self.assertEqual(len(self._create_character_summary(regenerate_all=True)), 5)
+        self.assertEqual(self._ai_model.number_of_requests, 10)
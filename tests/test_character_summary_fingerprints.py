@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+
+from character_summaries.character_summaries_refresher import (
+    determine_names_of_agents_with_memories,
+)
+from character_summaries.fingerprints import (
+    load_character_summary_fingerprints,
+    save_character_summary_fingerprints,
+)
+from paths.full_paths import (
+    get_character_summary_fingerprints_full_path,
+    get_character_summary_full_path,
+)
+
+
+class TestCharacterSummaryFingerprints(unittest.TestCase):
+    def setUp(self):
+        self._previous_working_directory = os.getcwd()
+        self._temporary_directory = tempfile.TemporaryDirectory()
+
+        os.chdir(self._temporary_directory.name)
+        os.makedirs("assets/character_summaries")
+        os.makedirs("assets/base_memories")
+
+    def tearDown(self):
+        os.chdir(self._previous_working_directory)
+        self._temporary_directory.cleanup()
+
+    def test_saved_fingerprints_are_loaded_back(self):
+        fingerprints = {"age": {"fingerprint": "abc", "value": 34}}
+
+        save_character_summary_fingerprints("Elysia Starbinder", fingerprints)
+
+        self.assertEqual(
+            load_character_summary_fingerprints("Elysia Starbinder"), fingerprints
+        )
+
+    def test_missing_or_unreadable_fingerprints_are_empty(self):
+        self.assertEqual(load_character_summary_fingerprints("Alberto"), {})
+
+        with open(
+            get_character_summary_fingerprints_full_path("Alberto"),
+            "w",
+            encoding="utf-8",
+        ) as file:
+            file.write("{not json")
+
+        self.assertEqual(load_character_summary_fingerprints("Alberto"), {})
+
+    def test_agents_are_found_by_their_memories_databases_and_summaries(self):
+        for file_name in [
+            "alberto_memories.ann",
+            "alberto_memories.json",
+            "mcallister_de_la_vega_memories.ann",
+            "test_memories.ann",
+        ]:
+            open(os.path.join("assets/base_memories", file_name), "w").close()
+
+        for agent_name in ["Alberto", "McAllister de la Vega"]:
+            with open(
+                get_character_summary_full_path(agent_name), "w", encoding="utf-8"
+            ) as file:
+                file.write(f"Name: {agent_name} (age 40)\nTraits: calm")
+
+        # The test fixture has no character summary, so it's left out.
+        self.assertEqual(
+            determine_names_of_agents_with_memories(),
+            ["Alberto", "McAllister de la Vega"],
+        )
@@ -0,0 +1,82 @@
+from datetime import datetime
+import os
+import tempfile
+import unittest
+
+from errors import InvalidColumnarMetadataError
+from vector_databases.columnar_metadata import (
+    ColumnarMemoryMetadata,
+    write_columnar_memory_metadata,
+)
+
+
+class TestColumnarMemoryMetadata(unittest.TestCase):
+    def setUp(self):
+        self._temporary_directory = tempfile.TemporaryDirectory()
+        self.columnar_metadata_full_path = os.path.join(
+            self._temporary_directory.name, "test_memories.cols"
+        )
+
+        self.raw_data = {
+            "0": {
+                "description": "Test was bullied as a kid.",
+                "creation_timestamp": "2023-06-06T00:00:00",
+                "most_recent_access_timestamp": "2023-06-07T00:00:00",
+                "recency": 1.0,
+                "importance": 0.8888888888888888,
+            },
+            "1": {
+                "description": "Test ate a crêpe in Zürich.",
+                "creation_timestamp": "2023-06-06T00:00:00",
+                "most_recent_access_timestamp": "2023-06-06T12:30:15.250000",
+                "recency": 0.5,
+                "importance": 0.0,
+            },
+        }
+
+    def tearDown(self):
+        self._temporary_directory.cleanup()
+
+    def test_exporting_returns_the_imported_json_data(self):
+        write_columnar_memory_metadata(self.columnar_metadata_full_path, self.raw_data)
+
+        exported_raw_data = ColumnarMemoryMetadata(
+            self.columnar_metadata_full_path
+        ).to_json_raw_data()
+
+        self.assertEqual(exported_raw_data.keys(), self.raw_data.keys())
+        for key, entry in self.raw_data.items():
+            self.assertEqual(exported_raw_data[key]["description"], entry["description"])
+            self.assertEqual(
+                exported_raw_data[key]["most_recent_access_timestamp"],
+                entry["most_recent_access_timestamp"],
+            )
+            self.assertAlmostEqual(
+                exported_raw_data[key]["importance"], entry["importance"], places=6
+            )
+
+    def test_access_updates_made_in_place_persist(self):
+        write_columnar_memory_metadata(self.columnar_metadata_full_path, self.raw_data)
+
+        columnar_memory_metadata = ColumnarMemoryMetadata(
+            self.columnar_metadata_full_path
+        )
+        columnar_memory_metadata.set_access("1", 0.25, datetime(2023, 7, 1, 8, 0))
+        columnar_memory_metadata.flush()
+
+        entry = ColumnarMemoryMetadata(self.columnar_metadata_full_path)["1"]
+
+        self.assertEqual(entry["most_recent_access_timestamp"], datetime(2023, 7, 1, 8, 0))
+        self.assertAlmostEqual(entry["recency"], 0.25)
+        self.assertEqual(entry["description"], "Test ate a crêpe in Zürich.")
+
+    def test_files_of_another_format_are_rejected(self):
+        with open(self.columnar_metadata_full_path, "wb") as file:
+            file.write(b"{}" * 32)
+
+        with self.assertRaises(InvalidColumnarMetadataError):
+            ColumnarMemoryMetadata(self.columnar_metadata_full_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
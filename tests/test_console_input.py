@@ -0,0 +1,77 @@
+import asyncio
+import threading
+import unittest
+
+from input.console_input import ConsoleInputReader
+
+
+class FakeConsole:
+    """Answers every prompt with its uppercase version, once the test allows it to answer."""
+
+    def __init__(self):
+        self.prompts = []
+        self.thread_names = set()
+        self.can_answer = threading.Event()
+
+    def input(self, prompt):
+        self.prompts.append(prompt)
+        self.thread_names.add(threading.current_thread().name)
+
+        self.can_answer.wait(timeout=5)
+
+        if prompt == "fail":
+            raise EOFError()
+
+        return prompt.upper()
+
+
+class TestConsoleInputReader(unittest.TestCase):
+    def setUp(self):
+        self.console = FakeConsole()
+        self.console_input_reader = ConsoleInputReader(self.console.input)
+
+    def test_work_is_done_while_the_player_is_typing(self):
+        work_done_before_answer = []
+
+        def work_while_waiting():
+            work_done_before_answer.append(not self.console.can_answer.is_set())
+            self.console.can_answer.set()
+
+        user_input = self.console_input_reader.read_input("yes", work_while_waiting)
+
+        self.assertEqual(user_input, "YES")
+        self.assertEqual(work_done_before_answer, [True])
+        self.assertNotIn(threading.current_thread().name, self.console.thread_names)
+
+    def test_input_is_collected_even_if_the_work_fails(self):
+        def failing_work():
+            self.console.can_answer.set()
+            raise ValueError("Expected failure")
+
+        with self.assertRaises(ValueError):
+            self.console_input_reader.read_input("first", failing_work)
+
+        self.assertEqual(self.console_input_reader.read_input("second"), "SECOND")
+        self.assertEqual(self.console.prompts, ["first", "second"])
+
+    def test_prompts_are_answered_in_order(self):
+        first_future = self.console_input_reader.request_input("first")
+        second_future = self.console_input_reader.request_input("second")
+
+        self.console.can_answer.set()
+
+        self.assertEqual(first_future.result(timeout=5), "FIRST")
+        self.assertEqual(second_future.result(timeout=5), "SECOND")
+
+    def test_exceptions_of_the_input_are_propagated(self):
+        self.console.can_answer.set()
+
+        with self.assertRaises(EOFError):
+            self.console_input_reader.read_input("fail")
+
+    def test_input_can_be_awaited(self):
+        self.console.can_answer.set()
+
+        user_input = asyncio.run(self.console_input_reader.aread_input("async"))
+
+        self.assertEqual(user_input, "ASYNC")
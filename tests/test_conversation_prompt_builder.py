@@ -0,0 +1,85 @@
+import unittest
+from datetime import datetime
+
+from agents.agent import Agent
+from dialogue.conversation_prompt_builder import get_conversation_prompt_builder
+from dialogue.conversation_state import ConversationState
+from enums.enums import DialoguePromptKind
+from errors import InvalidParameterError
+from llms.stand_in_responder import StandInResponder
+
+
+def create_agent(name, status, character_summary=None):
+    agent = Agent(name, StandInResponder())
+    agent.set_status(status)
+
+    if character_summary is not None:
+        agent.set_character_summary(character_summary)
+
+    return agent
+
+
+class TestConversationPromptBuilder(unittest.TestCase):
+    def setUp(self):
+        self._ann = create_agent("Ann", "Ann is tired.", "Ann is a blacksmith.")
+        self._bob = create_agent("Bob", "Bob is cheerful.")
+
+        self._conversation_state = ConversationState(
+            datetime(2023, 11, 4, 19, 10),
+            "They meet at the tavern.",
+            None,
+            [self._ann, self._bob],
+        )
+
+    def test_the_builder_is_shared_by_the_whole_conversation(self):
+        self.assertIs(
+            get_conversation_prompt_builder(self._conversation_state),
+            get_conversation_prompt_builder(self._conversation_state),
+        )
+
+    def test_the_prefixes_contain_the_static_sections_in_order(self):
+        conversation_prompt_builder = get_conversation_prompt_builder(
+            self._conversation_state
+        )
+
+        who_will_speak_prefix = conversation_prompt_builder.get_stable_prefix(
+            DialoguePromptKind.WHO_WILL_SPEAK
+        )
+        line_of_dialogue_prefix = conversation_prompt_builder.get_stable_prefix(
+            DialoguePromptKind.LINE_OF_DIALOGUE, self._ann
+        )
+
+        self.assertLess(
+            who_will_speak_prefix.index("Characters involved in conversation"),
+            who_will_speak_prefix.index("Ann's status"),
+        )
+        self.assertTrue(line_of_dialogue_prefix.startswith("Ann is a blacksmith.\n"))
+        self.assertTrue(
+            line_of_dialogue_prefix.endswith(
+                conversation_prompt_builder.get_stable_prefix(
+                    DialoguePromptKind.DIALOGUE_CONTINUATION
+                )
+            )
+        )
+        self.assertNotIn(
+            "Ann is a blacksmith.",
+            conversation_prompt_builder.get_stable_prefix(
+                DialoguePromptKind.LINE_OF_DIALOGUE, self._bob
+            ),
+        )
+
+    def test_lines_of_dialogue_require_an_involved_agent(self):
+        conversation_prompt_builder = get_conversation_prompt_builder(
+            self._conversation_state
+        )
+
+        with self.assertRaises(InvalidParameterError):
+            conversation_prompt_builder.get_stable_prefix(
+                DialoguePromptKind.LINE_OF_DIALOGUE
+            )
+
+        with self.assertRaises(InvalidParameterError):
+            conversation_prompt_builder.get_stable_prefix(
+                DialoguePromptKind.LINE_OF_DIALOGUE,
+                create_agent("Eve", "Eve is lost."),
+            )
@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from embeddings.embedding_provider import EmbeddingProvider
+from vector_databases import database_querier
+from vector_databases.database_querier import DatabaseQuerier
+from vector_databases.database_updater import DatabaseUpdater
+from vector_databases.exact_vector_index import ExactVectorIndex
+
+VECTORS_OF_SENTENCES = {
+    "Alberto is a blacksmith.": [1.0, 0.0, 0.0],
+    "Alberto owns a dog.": [0.0, 1.0, 0.0],
+    "Alberto fears the sea.": [0.0, 0.0, 1.0],
+}
+
+
+class FakeModel:
+    def encode(self, sentences, **_kwargs):
+        if isinstance(sentences, str):
+            return VECTORS_OF_SENTENCES[sentences]
+
+        return [VECTORS_OF_SENTENCES[sentence] for sentence in sentences]
+
+
+class TestDatabaseQuerier(unittest.TestCase):
+    def setUp(self):
+        self._temporary_directory = tempfile.TemporaryDirectory()
+        database_full_path = os.path.join(
+            self._temporary_directory.name, "alberto_memories.ann"
+        )
+        database_json_full_path = os.path.join(
+            self._temporary_directory.name, "alberto_memories.json"
+        )
+
+        current_timestamp = datetime(2023, 6, 6)
+
+        index = ExactVectorIndex(dimensions=3)
+        raw_data = {}
+
+        for i, (description, vector) in enumerate(VECTORS_OF_SENTENCES.items()):
+            index.add_item(i, vector)
+            raw_data[str(i)] = {
+                "description": description,
+                "creation_timestamp": current_timestamp.isoformat(),
+                "importance": 0.5,
+                "recency": 1.0,
+                "most_recent_access_timestamp": current_timestamp.isoformat(),
+            }
+
+        index.build(10)
+
+        self._database_updater = DatabaseUpdater(
+            current_timestamp, database_full_path, database_json_full_path
+        )
+        self._database_querier = DatabaseQuerier(
+            current_timestamp,
+            raw_data,
+            index,
+            database_full_path,
+            database_json_full_path,
+            self._database_updater,
+        )
+
+        self._previous_embedding_provider = database_querier.EMBEDDING_PROVIDER
+        database_querier.EMBEDDING_PROVIDER = EmbeddingProvider(
+            "fake-model", lambda _model_name: FakeModel()
+        )
+
+    def tearDown(self):
+        database_querier.EMBEDDING_PROVIDER = self._previous_embedding_provider
+
+        # Any buffered access gets written while the temporary directory still exists.
+        self._database_updater.flush()
+        self._temporary_directory.cleanup()
+
+    def test_results_come_with_their_scores_in_descending_order(self):
+        results = self._database_querier.query_with_scores("Alberto owns a dog.", 2)
+
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0][0], "Alberto owns a dog.")
+        self.assertIsInstance(results[0][1], float)
+        self.assertGreaterEqual(results[0][1], results[1][1])
+
+    def test_query_returns_only_the_descriptions(self):
+        self.assertEqual(
+            self._database_querier.query("Alberto fears the sea.", 1),
+            ["Alberto fears the sea."],
+        )
@@ -0,0 +1,181 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from defines.defines import VECTOR_DIMENSIONS
+from embeddings.embedding_provider import EmbeddingProvider
+from llms.interface import AIModelInterface
+from vector_databases import vectorization
+from vector_databases.database_loader import DatabaseLoader
+from vector_databases.database_updater import DatabaseUpdater
+from vector_databases.exact_vector_index import ExactVectorIndex
+from vector_databases.importance_rating import (
+    GET_IMPORTANCE_RATINGS_FOR_MEMORIES_FUNCTION_NAME,
+)
+from vector_databases.incremental_index import get_delta_segment_full_path
+from vector_databases.vector_index_policy import load_vector_index
+
+
+def create_vector(*components: float) -> list[float]:
+    # The delta segment starts empty, so it takes the dimensions of the embedding model.
+    return list(components) + [0.0] * (VECTOR_DIMENSIONS - len(components))
+
+
+VECTORS_OF_SENTENCES = {
+    "Alberto is a blacksmith.": create_vector(1.0, 0.0, 0.0),
+    "Alberto owns a dog.": create_vector(0.0, 1.0, 0.0),
+    "Alberto fears the sea.": create_vector(0.0, 0.0, 1.0),
+    "Alberto lost his hammer.": create_vector(0.0, 0.7, 0.7),
+}
+
+
+class FakeModel:
+    def encode(self, sentences, **_kwargs):
+        if isinstance(sentences, str):
+            return VECTORS_OF_SENTENCES[sentences]
+
+        return [VECTORS_OF_SENTENCES[sentence] for sentence in sentences]
+
+
+class FakeImportanceJudge(AIModelInterface):
+    """Rates every memory in a chunk with the same importance."""
+
+    def request_response_using_functions(
+        self, messages, functions, function_call, model
+    ):
+        if function_call["name"] == GET_IMPORTANCE_RATINGS_FOR_MEMORIES_FUNCTION_NAME:
+            arguments = {
+                "ratings": [
+                    {"index": position, "rating": 5}
+                    for position, _ in enumerate(
+                        messages[-1]["content"].split("\n")[1:]
+                    )
+                ]
+            }
+        else:
+            arguments = {"rating": 5}
+
+        return {
+            "choices": [
+                {
+                    "message": {
+                        "role": "assistant",
+                        "content": None,
+                        "function_call": {
+                            "name": function_call["name"],
+                            "arguments": json.dumps(arguments),
+                        },
+                    }
+                }
+            ]
+        }
+
+    def request_response(self, messages, model):
+        raise NotImplementedError()
+
+
+class TestDatabaseUpdater(unittest.TestCase):
+    def setUp(self):
+        self._temporary_directory = tempfile.TemporaryDirectory()
+        self._database_full_path = os.path.join(
+            self._temporary_directory.name, "alberto_memories.ann"
+        )
+        self._database_json_full_path = os.path.join(
+            self._temporary_directory.name, "alberto_memories.json"
+        )
+        self._current_timestamp = datetime(2023, 6, 6)
+
+        index = ExactVectorIndex()
+        index.add_item(0, VECTORS_OF_SENTENCES["Alberto is a blacksmith."])
+        index.build(10)
+        index.save(self._database_full_path)
+
+        with open(self._database_json_full_path, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "0": {
+                        "description": "Alberto is a blacksmith.",
+                        "creation_timestamp": self._current_timestamp.isoformat(),
+                        "importance": 0.5,
+                        "recency": 1.0,
+                        "most_recent_access_timestamp": self._current_timestamp.isoformat(),
+                    }
+                },
+                file,
+            )
+
+        self._previous_embedding_provider = vectorization.EMBEDDING_PROVIDER
+        vectorization.EMBEDDING_PROVIDER = EmbeddingProvider(
+            "fake-model", lambda _model_name: FakeModel()
+        )
+
+    def tearDown(self):
+        vectorization.EMBEDDING_PROVIDER = self._previous_embedding_provider
+        self._temporary_directory.cleanup()
+
+    def _load(self):
+        return DatabaseLoader(
+            "alberto", self._database_full_path, self._database_json_full_path
+        ).load()
+
+    def _update(self, new_entries: list[str]):
+        index, _ = self._load()
+
+        DatabaseUpdater(
+            self._current_timestamp,
+            self._database_full_path,
+            self._database_json_full_path,
+            delta_segment_compaction_threshold=2,
+            importance_judge=FakeImportanceJudge(),
+        ).update_database_with_new_entries(new_entries, index)
+
+        index.unload()
+
+    def test_new_entries_go_to_the_delta_segment_and_get_queried_with_the_base(
+        self,
+    ):
+        self._update(["Alberto owns a dog.", "Alberto fears the sea."])
+
+        self.assertTrue(
+            os.path.isfile(get_delta_segment_full_path(self._database_full_path))
+        )
+        # The vector index on disk wasn't rebuilt.
+        self.assertEqual(load_vector_index(self._database_full_path).get_n_items(), 1)
+
+        index, raw_data = self._load()
+
+        self.assertEqual(index.get_delta_n_items(), 2)
+        self.assertEqual(raw_data["2"]["description"], "Alberto fears the sea.")
+        self.assertEqual(index.get_nns_by_vector(create_vector(1.0, 0.1), 1), [0])
+        self.assertEqual(
+            index.get_nns_by_vector(create_vector(0.0, 0.2, 1.0), 2), [2, 1]
+        )
+
+    def test_crossing_the_threshold_compacts_every_entry_into_the_vector_index(
+        self,
+    ):
+        self._update(["Alberto owns a dog.", "Alberto fears the sea."])
+        self._update(["Alberto lost his hammer."])
+
+        self.assertEqual(load_vector_index(self._database_full_path).get_n_items(), 4)
+
+        index, raw_data = self._load()
+
+        self.assertEqual(index.get_delta_n_items(), 0)
+        self.assertEqual(len(raw_data), 4)
+        self.assertEqual(
+            index.get_nns_by_vector(create_vector(0.0, 0.7, 0.7), 1), [3]
+        )
+
+    def test_rebuilding_the_vector_index_removes_the_delta_segment(self):
+        self._update(["Alberto owns a dog."])
+
+        delta_segment_full_path = get_delta_segment_full_path(self._database_full_path)
+
+        self.assertTrue(os.path.isfile(delta_segment_full_path))
+
+        self._update(["Alberto fears the sea.", "Alberto lost his hammer."])
+
+        self.assertFalse(os.path.isfile(delta_segment_full_path))
@@ -0,0 +1,277 @@
+import json
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import input.confirmation
+import llms.user_responder
+from agents.agent import Agent
+from dialogue.conversation_state import ConversationState
+from dialogue.dialogue_continuation_handler import (
+    SHOULD_STOP_DIALOGUE_FUNCTION_NAME,
+    DialogueContinuationHandler,
+)
+from dialogue.dialogue_coordinator import DialogueCoordinator
+from dialogue.next_speaker_requester import (
+    DETERMINE_WHO_WILL_SPEAK_FIRST_FUNCTION_NAME,
+    DETERMINE_WHO_WILL_SPEAK_NEXT_FUNCTION_NAME,
+)
+from input.console_input import ConsoleInputReader
+from llms.interface import AIModelInterface
+from llms.user_responder import UserResponder
+
+
+class FakeConsole:
+    """Plays the user who answers in place of the AI model, and who decides to end the dialogue."""
+
+    def __init__(self):
+        self.prompts = []
+
+    def input(self, prompt):
+        self.prompts.append(prompt)
+
+        if "Please enter 'yes' or 'no'" in prompt:
+            return "no"
+        if "should the dialogue end now" in prompt:
+            return "true"
+
+        return "Alberto"
+
+
+class TurnDecisionsAIModel(AIModelInterface):
+    """Decides whether the dialogue should stop and who speaks next, recording which functions got called.
+    The decision of whether the dialogue should stop can be delayed until the next speaker has been requested.
+    """
+
+    def __init__(
+        self,
+        should_stop_dialogue: bool | Exception,
+        wait_for_next_speaker: bool = False,
+    ):
+        self.names_of_called_functions = []
+        self.next_speaker_requested = threading.Event()
+
+        self._should_stop_dialogue = should_stop_dialogue
+        self._wait_for_next_speaker = wait_for_next_speaker
+        self._lock = threading.Lock()
+
+    def request_response_using_functions(
+        self, messages, functions, function_call, model
+    ):
+        if function_call["name"] == DETERMINE_WHO_WILL_SPEAK_FIRST_FUNCTION_NAME:
+            arguments = {"character_who_will_speak_first": "Alberto"}
+        elif function_call["name"] == DETERMINE_WHO_WILL_SPEAK_NEXT_FUNCTION_NAME:
+            arguments = {"character_who_will_speak_next": "Leire"}
+            self.next_speaker_requested.set()
+        else:
+            if isinstance(self._should_stop_dialogue, Exception):
+                raise self._should_stop_dialogue
+
+            if self._wait_for_next_speaker and not self.next_speaker_requested.wait(5):
+                raise TimeoutError("The next speaker wasn't requested at the same time.")
+
+            arguments = {"should_stop_dialogue": self._should_stop_dialogue}
+
+        # The functions are recorded as they get answered, which may differ from the order they were called in.
+        with self._lock:
+            self.names_of_called_functions.append(function_call["name"])
+
+        return {
+            "choices": [
+                {
+                    "message": {
+                        "role": "assistant",
+                        "content": None,
+                        "function_call": {
+                            "name": function_call["name"],
+                            "arguments": json.dumps(arguments),
+                        },
+                    }
+                }
+            ]
+        }
+
+    def request_response(self, messages, model):
+        raise NotImplementedError()
+
+
+class RecordingThreadPoolExecutor(ThreadPoolExecutor):
+    """Keeps the futures of the submitted requests, so their fate can be checked."""
+
+    def __init__(self):
+        super().__init__(max_workers=1)
+
+        self.futures = []
+
+    def submit(self, fn, /, *args, **kwargs):
+        future = super().submit(fn, *args, **kwargs)
+        self.futures.append(future)
+
+        return future
+
+
+def create_agent(name: str, ai_model_interface) -> Agent:
+    agent = Agent(name, ai_model_interface)
+    agent.set_status(f"{name} is at the tavern.")
+    agent.set_character_summary(f"Name: {name}")
+
+    return agent
+
+
+class TestDialogueCoordinator(unittest.TestCase):
+    def setUp(self):
+        self.console = FakeConsole()
+        console_input_reader = ConsoleInputReader(self.console.input)
+
+        self._previous_console_input_readers = (
+            input.confirmation.CONSOLE_INPUT_READER,
+            llms.user_responder.CONSOLE_INPUT_READER,
+        )
+        input.confirmation.CONSOLE_INPUT_READER = console_input_reader
+        llms.user_responder.CONSOLE_INPUT_READER = console_input_reader
+
+    def tearDown(self):
+        (
+            input.confirmation.CONSOLE_INPUT_READER,
+            llms.user_responder.CONSOLE_INPUT_READER,
+        ) = self._previous_console_input_readers
+
+    def test_the_user_isnt_asked_who_speaks_next_after_ending_the_dialogue(self):
+        user_responder = UserResponder()
+
+        conversation_state = ConversationState(
+            datetime(2023, 6, 6),
+            "Alberto and Leire meet at the tavern.",
+            None,
+            [
+                create_agent("Alberto", user_responder),
+                create_agent("Leire", user_responder),
+            ],
+        )
+
+        dialogue_coordinator = DialogueCoordinator(
+            conversation_state, False, user_responder
+        )
+        dialogue_history_handler = dialogue_coordinator._dialogue_history_handler
+        dialogue_history_handler.register_line_of_dialogue(
+            {"role": "user", "content": "Alberto: Good evening."}
+        )
+
+        # Only the prompt that selected the first speaker has been issued so far.
+        self.console.prompts.clear()
+
+        dialogue_continuation_handler = DialogueContinuationHandler(
+            conversation_state, dialogue_history_handler, user_responder
+        )
+        dialogue_coordinator._determine_continuation_and_next_speaker(
+            dialogue_continuation_handler
+        )
+
+        self.assertFalse(dialogue_continuation_handler.should_dialogue_continue())
+        self.assertEqual(len(self.console.prompts), 2)
+        self.assertIn("Please enter 'yes' or 'no'", self.console.prompts[-1])
+
+    def _create_overlapping_dialogue_coordinator(
+        self, ai_model: TurnDecisionsAIModel
+    ) -> tuple:
+        conversation_state = ConversationState(
+            datetime(2023, 6, 6),
+            "Alberto, Leire and Jorge meet at the tavern.",
+            None,
+            [
+                create_agent("Alberto", ai_model),
+                create_agent("Leire", ai_model),
+                create_agent("Jorge", ai_model),
+            ],
+        )
+
+        dialogue_coordinator = DialogueCoordinator(
+            conversation_state, False, ai_model, overlap_turn_decisions=True
+        )
+        # The executor only exists while a dialogue is being performed.
+        dialogue_coordinator._turn_decisions_executor = RecordingThreadPoolExecutor()
+        dialogue_coordinator._dialogue_history_handler.register_line_of_dialogue(
+            {"role": "user", "content": "Alberto: Good evening."}
+        )
+
+        dialogue_continuation_handler = DialogueContinuationHandler(
+            conversation_state, dialogue_coordinator._dialogue_history_handler, ai_model
+        )
+
+        return dialogue_coordinator, dialogue_continuation_handler
+
+    def test_overlapping_cancels_the_next_speaker_request_if_the_stop_request_fails(
+        self,
+    ):
+        ai_model = TurnDecisionsAIModel(OSError("The connection was reset."))
+        (
+            dialogue_coordinator,
+            dialogue_continuation_handler,
+        ) = self._create_overlapping_dialogue_coordinator(ai_model)
+        executor = dialogue_coordinator._turn_decisions_executor
+
+        # Keeps the only worker busy, so the request for the next speaker is still queued when the other one fails.
+        worker_released = threading.Event()
+        executor.submit(worker_released.wait, 5)
+
+        with self.assertRaises(OSError):
+            dialogue_coordinator._determine_continuation_and_next_speaker(
+                dialogue_continuation_handler
+            )
+
+        worker_released.set()
+        executor.shutdown(wait=True)
+
+        self.assertTrue(executor.futures[-1].cancelled())
+        self.assertNotIn(
+            DETERMINE_WHO_WILL_SPEAK_NEXT_FUNCTION_NAME,
+            ai_model.names_of_called_functions,
+        )
+
+    def test_overlapping_discards_the_proposed_speaker_if_the_dialogue_ends(self):
+        ai_model = TurnDecisionsAIModel(True, wait_for_next_speaker=True)
+        (
+            dialogue_coordinator,
+            dialogue_continuation_handler,
+        ) = self._create_overlapping_dialogue_coordinator(ai_model)
+
+        dialogue_coordinator._determine_continuation_and_next_speaker(
+            dialogue_continuation_handler
+        )
+        dialogue_coordinator._turn_decisions_executor.shutdown(wait=True)
+
+        self.assertFalse(dialogue_continuation_handler.should_dialogue_continue())
+        # Leire was proposed to speak next, but the dialogue is over.
+        self.assertEqual(
+            dialogue_coordinator._speaker_selector.get_next_speaker().get_name(),
+            "Alberto",
+        )
+
+    def test_overlapping_applies_the_proposed_speaker_after_the_dialogue_continues(
+        self,
+    ):
+        ai_model = TurnDecisionsAIModel(False, wait_for_next_speaker=True)
+        (
+            dialogue_coordinator,
+            dialogue_continuation_handler,
+        ) = self._create_overlapping_dialogue_coordinator(ai_model)
+
+        dialogue_coordinator._determine_continuation_and_next_speaker(
+            dialogue_continuation_handler
+        )
+        dialogue_coordinator._turn_decisions_executor.shutdown(wait=True)
+
+        # The next speaker got proposed before the dialogue was decided to continue, yet applied afterwards.
+        self.assertEqual(
+            ai_model.names_of_called_functions[1:],
+            [
+                DETERMINE_WHO_WILL_SPEAK_NEXT_FUNCTION_NAME,
+                SHOULD_STOP_DIALOGUE_FUNCTION_NAME,
+            ],
+        )
+        self.assertTrue(dialogue_continuation_handler.should_dialogue_continue())
+        self.assertEqual(
+            dialogue_coordinator._speaker_selector.get_next_speaker().get_name(),
+            "Leire",
+        )
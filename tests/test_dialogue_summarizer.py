@@ -0,0 +1,86 @@
+import unittest
+
+from defines.defines import GPT_4
+from dialogue.dialogue_summarizer import (
+    ChunkSummaryCache,
+    DialogueSummarizer,
+    split_messages_into_chunks,
+)
+from llms.interface import AIModelInterface
+from llms.responses import create_response_in_gpt_format
+
+
+class FakeSummarizingModel(AIModelInterface):
+    """Answers with a short summary, recording the models of the requests it received."""
+
+    def __init__(self):
+        self.requested_models = []
+
+    def request_response_using_functions(
+        self, messages, functions, function_call, model
+    ):
+        raise NotImplementedError()
+
+    def request_response(self, messages, model):
+        self.requested_models.append(model)
+
+        return create_response_in_gpt_format(
+            f"Summary number {len(self.requested_models)}.", messages, model
+        )
+
+
+def create_lines_of_dialogue(first_line, last_line):
+    return [
+        {"role": "user", "content": f"Line {number}: " + "word " * 80}
+        for number in range(first_line, last_line)
+    ]
+
+
+class TestDialogueSummarizer(unittest.TestCase):
+    def test_appending_messages_only_changes_the_last_chunk(self):
+        messages = create_lines_of_dialogue(0, 50)
+
+        chunks = split_messages_into_chunks(messages, max_tokens=500)
+        chunks_after_appending = split_messages_into_chunks(
+            messages + create_lines_of_dialogue(50, 52), max_tokens=500
+        )
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(chunks[:-1], chunks_after_appending[: len(chunks) - 1])
+
+    def test_short_dialogues_are_summarized_in_a_single_request(self):
+        model = FakeSummarizingModel()
+
+        DialogueSummarizer(
+            create_lines_of_dialogue(0, 5),
+            model,
+            chunk_summary_cache=ChunkSummaryCache(),
+        ).summarize()
+
+        self.assertEqual(model.requested_models, [GPT_4])
+
+    def test_long_dialogues_only_summarize_again_the_tail(self):
+        model = FakeSummarizingModel()
+        chunk_summary_cache = ChunkSummaryCache()
+        messages = create_lines_of_dialogue(0, 300)
+
+        response = DialogueSummarizer(
+            messages, model, chunk_summary_cache=chunk_summary_cache
+        ).summarize()
+
+        number_of_chunks = len(split_messages_into_chunks(messages))
+        number_of_requests = len(model.requested_models)
+
+        self.assertIn("Summary number", response["choices"][0]["message"]["content"])
+        self.assertGreater(number_of_chunks, 1)
+        self.assertEqual(model.requested_models[-1], GPT_4)
+        self.assertEqual(chunk_summary_cache.get_number_of_entries(), number_of_chunks)
+
+        DialogueSummarizer(
+            messages + create_lines_of_dialogue(300, 301),
+            model,
+            chunk_summary_cache=chunk_summary_cache,
+        ).summarize()
+
+        # Only the last chunk and the final reduction were requested again.
+        self.assertEqual(len(model.requested_models), number_of_requests + 2)
@@ -0,0 +1,59 @@
+import threading
+import time
+import unittest
+
+from embeddings.embedding_provider import EmbeddingProvider
+
+
+class FakeModel:
+    def encode(self, sentences, **_kwargs):
+        return sentences
+
+
+class TestEmbeddingProvider(unittest.TestCase):
+    def setUp(self):
+        self.loaded_model_names = []
+
+    def _load_fake_model(self, model_name):
+        # Give other threads the chance to race for the model.
+        time.sleep(0.01)
+        self.loaded_model_names.append(model_name)
+
+        return FakeModel()
+
+    def test_model_is_not_loaded_until_first_encode(self):
+        embedding_provider = EmbeddingProvider("fake-model", self._load_fake_model)
+
+        self.assertFalse(embedding_provider.is_loaded())
+
+        self.assertEqual(embedding_provider.encode("hello"), "hello")
+
+        self.assertTrue(embedding_provider.is_loaded())
+        self.assertEqual(self.loaded_model_names, ["fake-model"])
+
+    def test_prewarm_loads_the_model(self):
+        embedding_provider = EmbeddingProvider("fake-model", self._load_fake_model)
+
+        embedding_provider.prewarm()
+        embedding_provider.encode("hello")
+
+        self.assertEqual(self.loaded_model_names, ["fake-model"])
+
+    def test_model_is_loaded_only_once_when_encoding_from_several_threads(self):
+        embedding_provider = EmbeddingProvider("fake-model", self._load_fake_model)
+
+        threads = [
+            threading.Thread(target=embedding_provider.encode, args=("hello",))
+            for _ in range(8)
+        ]
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.loaded_model_names, ["fake-model"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+
+from vector_databases.exact_vector_index import ExactVectorIndex
+from vector_databases.vector_index_policy import load_vector_index
+
+
+class TestExactVectorIndex(unittest.TestCase):
+    def setUp(self):
+        self._temporary_directory = tempfile.TemporaryDirectory()
+        self.index_full_path = os.path.join(
+            self._temporary_directory.name, "test_memories.ann"
+        )
+
+        self.index = ExactVectorIndex(dimensions=3)
+        self.index.add_item(0, [1.0, 0.0, 0.0])
+        self.index.add_item(1, [0.0, 1.0, 0.0])
+        self.index.add_item(2, [1.0, 1.0, 0.0])
+        self.index.build(10)
+
+    def tearDown(self):
+        self._temporary_directory.cleanup()
+
+    def test_nearest_neighbors_are_sorted_by_angular_distance(self):
+        ids, distances = self.index.get_nns_by_vector(
+            [1.0, 0.1, 0.0], 3, include_distances=True
+        )
+
+        self.assertEqual(ids, [0, 2, 1])
+        self.assertAlmostEqual(distances[0], (2 - 2 * (1 / 1.01**0.5)) ** 0.5, 5)
+
+    def test_adding_items_out_of_sequence_fails(self):
+        with self.assertRaises(ValueError):
+            self.index.add_item(5, [0.0, 0.0, 1.0])
+
+    def test_saved_index_is_loaded_as_an_exact_index(self):
+        self.index.save(self.index_full_path)
+
+        loaded_index = load_vector_index(self.index_full_path)
+
+        self.assertIsInstance(loaded_index, ExactVectorIndex)
+        self.assertEqual(loaded_index.get_n_items(), 3)
+        self.assertEqual(loaded_index.get_item_vector(2), [1.0, 1.0, 0.0])
+
+    def test_the_length_of_the_vectors_doesnt_change_the_distances(self):
+        self.index.add_item(3, [10.0, 10.0, 0.0])
+        self.index.save(self.index_full_path)
+
+        loaded_index = load_vector_index(self.index_full_path)
+
+        for index in [self.index, loaded_index]:
+            _, distances = index.get_nns_by_vector(
+                [5.0, 5.0, 0.0], 4, include_distances=True
+            )
+
+            # The vectors are float32, so the distance of parallel vectors is only nearly zero.
+            self.assertAlmostEqual(distances[0], 0.0, 3)
+            self.assertAlmostEqual(distances[1], 0.0, 3)
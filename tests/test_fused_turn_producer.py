@@ -0,0 +1,276 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from agents.agent import Agent
+from dialogue.conversation_state import ConversationState
+from dialogue.dialogue_continuation_handler import (
+    SHOULD_STOP_DIALOGUE_FUNCTION_NAME,
+    DialogueContinuationHandler,
+)
+from dialogue.dialogue_coordinator import DialogueCoordinator
+from dialogue.fused_turn_producer import WRITE_DIALOGUE_TURN_FUNCTION_NAME
+from dialogue.next_speaker_requester import (
+    DETERMINE_WHO_WILL_SPEAK_FIRST_FUNCTION_NAME,
+    DETERMINE_WHO_WILL_SPEAK_NEXT_FUNCTION_NAME,
+)
+from embeddings.embedding_provider import EmbeddingProvider
+from llms.interface import AIModelInterface
+from paths.full_paths import (
+    get_base_memories_full_path,
+    get_base_memories_json_full_path,
+)
+from vector_databases import database_querier
+from vector_databases.access_timestamps_buffer import ACCESS_TIMESTAMPS_BUFFER
+from vector_databases.exact_vector_index import ExactVectorIndex
+from vector_databases.memory_store_registry import MEMORY_STORE_REGISTRY
+
+AGENT_NAMES = ["Alberto", "Leire", "Jorge"]
+
+
+class FakeModel:
+    """Encodes every sentence as the same vector, so that every memory is retrieved for every query."""
+
+    def encode(self, sentences, **_kwargs):
+        if isinstance(sentences, str):
+            return [1.0, 0.0, 0.0]
+
+        return [[1.0, 0.0, 0.0] for _ in sentences]
+
+
+class ScriptedAIModel(AIModelInterface):
+    """Answers every function with the arguments scripted for it, recording which functions got called."""
+
+    def __init__(self, arguments_by_function_name: dict):
+        self.names_of_called_functions = []
+        self._arguments_by_function_name = arguments_by_function_name
+
+    def request_response_using_functions(
+        self, messages, functions, function_call, model
+    ):
+        self.names_of_called_functions.append(function_call["name"])
+
+        arguments = self._arguments_by_function_name[function_call["name"]]
+
+        if isinstance(arguments, str):
+            # Plays the player, who answers with a fully-fledged message instead of a function call.
+            return {"choices": [{"message": {"role": "user", "content": arguments}}]}
+
+        return {
+            "choices": [
+                {
+                    "message": {
+                        "role": "assistant",
+                        "content": None,
+                        "function_call": {
+                            "name": function_call["name"],
+                            "arguments": json.dumps(arguments),
+                        },
+                    }
+                }
+            ]
+        }
+
+    def request_response(self, messages, model):
+        raise NotImplementedError()
+
+
+def save_memories_database(agent_name: str, current_timestamp: datetime):
+    index = ExactVectorIndex(dimensions=3)
+    index.add_item(0, [1.0, 0.0, 0.0])
+    index.build(10)
+    index.save(get_base_memories_full_path(agent_name))
+
+    raw_data = {
+        "0": {
+            "description": f"{agent_name} grew up in the village.",
+            "creation_timestamp": current_timestamp.isoformat(),
+            "importance": 5,
+            "recency": 1.0,
+            "most_recent_access_timestamp": current_timestamp.isoformat(),
+        }
+    }
+
+    with open(
+        get_base_memories_json_full_path(agent_name), "w", encoding="utf-8"
+    ) as file:
+        json.dump(raw_data, file)
+
+
+class TestFusedTurnProducer(unittest.TestCase):
+    def setUp(self):
+        self._previous_working_directory = os.getcwd()
+        self._temporary_directory = tempfile.TemporaryDirectory()
+
+        os.chdir(self._temporary_directory.name)
+        os.makedirs("assets/base_memories")
+
+        self._current_timestamp = datetime(2023, 6, 6)
+
+        for agent_name in AGENT_NAMES:
+            save_memories_database(agent_name, self._current_timestamp)
+
+        self._previous_embedding_provider = database_querier.EMBEDDING_PROVIDER
+        database_querier.EMBEDDING_PROVIDER = EmbeddingProvider(
+            "fake-model", lambda _model_name: FakeModel()
+        )
+
+    def tearDown(self):
+        database_querier.EMBEDDING_PROVIDER = self._previous_embedding_provider
+
+        ACCESS_TIMESTAMPS_BUFFER.flush()
+        MEMORY_STORE_REGISTRY.clear()
+        os.chdir(self._previous_working_directory)
+        self._temporary_directory.cleanup()
+
+    def _perform_fused_turn(self, dialogue_turn_arguments) -> tuple:
+        """Performs the first fused turn of a dialogue that Alberto opens, with Jorge as the fallback next speaker."""
+        ai_model = ScriptedAIModel(
+            {
+                DETERMINE_WHO_WILL_SPEAK_FIRST_FUNCTION_NAME: {
+                    "character_who_will_speak_first": "Alberto"
+                },
+                WRITE_DIALOGUE_TURN_FUNCTION_NAME: dialogue_turn_arguments,
+                SHOULD_STOP_DIALOGUE_FUNCTION_NAME: {"should_stop_dialogue": False},
+                DETERMINE_WHO_WILL_SPEAK_NEXT_FUNCTION_NAME: {
+                    "character_who_will_speak_next": "Jorge"
+                },
+            }
+        )
+
+        agents = []
+
+        for agent_name in AGENT_NAMES:
+            agent = Agent(agent_name, ai_model)
+            agent.set_status(f"{agent_name} is at the tavern.")
+            agent.set_character_summary(f"Name: {agent_name}")
+            agents.append(agent)
+
+        conversation_state = ConversationState(
+            self._current_timestamp, "They meet at the tavern.", None, agents
+        )
+
+        dialogue_coordinator = DialogueCoordinator(
+            conversation_state, False, ai_model, use_fused_turns=True
+        )
+        dialogue_continuation_handler = DialogueContinuationHandler(
+            conversation_state,
+            dialogue_coordinator._dialogue_history_handler,
+            ai_model,
+        )
+
+        dialogue_coordinator._perform_fused_turn(dialogue_continuation_handler)
+
+        return ai_model, dialogue_coordinator, dialogue_continuation_handler
+
+    def test_a_complete_fused_turn_needs_no_other_request(self):
+        ai_model, dialogue_coordinator, dialogue_continuation_handler = (
+            self._perform_fused_turn(
+                {
+                    "line_of_dialogue": "Alberto: Good evening.",
+                    "should_stop_dialogue": False,
+                    "character_who_will_speak_next": "Leire",
+                }
+            )
+        )
+
+        self.assertEqual(
+            ai_model.names_of_called_functions,
+            [
+                DETERMINE_WHO_WILL_SPEAK_FIRST_FUNCTION_NAME,
+                WRITE_DIALOGUE_TURN_FUNCTION_NAME,
+            ],
+        )
+        self.assertEqual(
+            dialogue_coordinator._dialogue_history_handler.get_dialogue_history(),
+            [{"role": "user", "content": "Alberto: Good evening."}],
+        )
+        self.assertTrue(dialogue_continuation_handler.should_dialogue_continue())
+        self.assertEqual(
+            dialogue_coordinator._speaker_selector.get_next_speaker().get_name(),
+            "Leire",
+        )
+
+    def test_a_missing_decision_to_stop_gets_requested_separately(self):
+        ai_model, dialogue_coordinator, _ = self._perform_fused_turn(
+            {
+                "line_of_dialogue": "Alberto: Good evening.",
+                "character_who_will_speak_next": "Leire",
+            }
+        )
+
+        self.assertEqual(
+            ai_model.names_of_called_functions[1:],
+            [WRITE_DIALOGUE_TURN_FUNCTION_NAME, SHOULD_STOP_DIALOGUE_FUNCTION_NAME],
+        )
+        self.assertEqual(
+            dialogue_coordinator._speaker_selector.get_next_speaker().get_name(),
+            "Leire",
+        )
+
+    def test_a_missing_next_speaker_gets_requested_separately(self):
+        ai_model, dialogue_coordinator, _ = self._perform_fused_turn(
+            {
+                "line_of_dialogue": "Alberto: Good evening.",
+                "should_stop_dialogue": False,
+                "character_who_will_speak_next": " ",
+            }
+        )
+
+        self.assertEqual(
+            ai_model.names_of_called_functions[1:],
+            [
+                WRITE_DIALOGUE_TURN_FUNCTION_NAME,
+                DETERMINE_WHO_WILL_SPEAK_NEXT_FUNCTION_NAME,
+            ],
+        )
+        self.assertEqual(
+            dialogue_coordinator._speaker_selector.get_next_speaker().get_name(),
+            "Jorge",
+        )
+
+    def test_a_made_up_next_speaker_gets_requested_again(self):
+        ai_model, dialogue_coordinator, _ = self._perform_fused_turn(
+            {
+                "line_of_dialogue": "Alberto: Good evening.",
+                "should_stop_dialogue": False,
+                "character_who_will_speak_next": "Gandalf",
+            }
+        )
+
+        self.assertEqual(
+            ai_model.names_of_called_functions[1:],
+            [
+                WRITE_DIALOGUE_TURN_FUNCTION_NAME,
+                DETERMINE_WHO_WILL_SPEAK_NEXT_FUNCTION_NAME,
+            ],
+        )
+        self.assertEqual(
+            dialogue_coordinator._speaker_selector.get_next_speaker().get_name(),
+            "Jorge",
+        )
+
+    def test_a_line_written_by_the_player_requests_every_decision(self):
+        ai_model, dialogue_coordinator, dialogue_continuation_handler = (
+            self._perform_fused_turn("Alberto: I wrote this myself.")
+        )
+
+        self.assertEqual(
+            ai_model.names_of_called_functions[1:],
+            [
+                WRITE_DIALOGUE_TURN_FUNCTION_NAME,
+                SHOULD_STOP_DIALOGUE_FUNCTION_NAME,
+                DETERMINE_WHO_WILL_SPEAK_NEXT_FUNCTION_NAME,
+            ],
+        )
+        self.assertEqual(
+            dialogue_coordinator._dialogue_history_handler.get_dialogue_history(),
+            [{"role": "user", "content": "Alberto: I wrote this myself."}],
+        )
+        self.assertTrue(dialogue_continuation_handler.should_dialogue_continue())
+        self.assertEqual(
+            dialogue_coordinator._speaker_selector.get_next_speaker().get_name(),
+            "Jorge",
+        )
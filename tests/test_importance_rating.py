@@ -0,0 +1,108 @@
+import json
+import re
+import threading
+import unittest
+
+from llms.interface import AIModelInterface
+from vector_databases.importance_rating import (
+    GET_IMPORTANCE_RATINGS_FOR_MEMORIES_FUNCTION_NAME,
+    rate_importance_of_memories,
+)
+
+
+def create_function_call_response(function_name, arguments):
+    return {
+        "choices": [
+            {
+                "message": {
+                    "role": "assistant",
+                    "content": None,
+                    "function_call": {
+                        "name": function_name,
+                        "arguments": json.dumps(arguments),
+                    },
+                }
+            }
+        ]
+    }
+
+
+class FakeImportanceJudge(AIModelInterface):
+    """Rates every memory with the number found in its description, but 'forgets' the memories marked as skipped."""
+
+    def __init__(self):
+        self.requested_function_names = []
+        self._lock = threading.Lock()
+
+    def request_response_using_functions(
+        self, messages, functions, function_call, model
+    ):
+        with self._lock:
+            self.requested_function_names.append(function_call["name"])
+
+        if function_call["name"] == GET_IMPORTANCE_RATINGS_FOR_MEMORIES_FUNCTION_NAME:
+            ratings = []
+
+            for line in messages[-1]["content"].split("\n")[1:]:
+                position, description = line.split(". ", 1)
+
+                if "skipped" not in description:
+                    ratings.append(
+                        {
+                            "index": int(position),
+                            "rating": int(re.search(r"\d+", description).group()),
+                        }
+                    )
+
+            return create_function_call_response(
+                function_call["name"], {"ratings": ratings}
+            )
+
+        rating = int(re.search(r"Memory: .*?(\d+)", messages[-1]["content"]).group(1))
+
+        return create_function_call_response(function_call["name"], {"rating": rating})
+
+    def request_response(self, messages, model):
+        raise NotImplementedError()
+
+
+class TestRateImportanceOfMemories(unittest.TestCase):
+    def test_memories_are_rated_in_chunks_and_mapped_back_in_order(self):
+        judge = FakeImportanceJudge()
+
+        memory_descriptions = [f"Memory rated {rating}." for rating in range(1, 11)]
+
+        importances = rate_importance_of_memories(
+            memory_descriptions, judge, chunk_size=3, max_concurrent_requests=2
+        )
+
+        self.assertEqual(len(judge.requested_function_names), 4)
+        for importance, rating in zip(importances, range(1, 11)):
+            self.assertAlmostEqual(importance, (rating - 1) / 9)
+
+    def test_memories_missing_from_a_chunk_response_are_rated_individually(self):
+        judge = FakeImportanceJudge()
+
+        importances = rate_importance_of_memories(
+            ["Memory rated 4.", "Memory rated 10, skipped."], judge, chunk_size=5
+        )
+
+        self.assertEqual(
+            judge.requested_function_names,
+            [
+                GET_IMPORTANCE_RATINGS_FOR_MEMORIES_FUNCTION_NAME,
+                "get_importance_rating_for_memory",
+            ],
+        )
+        self.assertAlmostEqual(importances[0], 3 / 9)
+        self.assertAlmostEqual(importances[1], 1.0)
+
+    def test_no_memories_means_no_requests(self):
+        judge = FakeImportanceJudge()
+
+        self.assertEqual(rate_importance_of_memories([], judge), [])
+        self.assertEqual(judge.requested_function_names, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
 import unittest
 
-from math_utils import calculate_score
+import numpy as np
+
+from math_utils import calculate_score, select_indexes_of_top_values
 
 
 class TestCalculateScore(unittest.TestCase):
@@ -13,6 +15,27 @@ class TestCalculateScore(unittest.TestCase):
         self.assertAlmostEqual(result_2, 2.21)
         self.assertAlmostEqual(result_3, 2.20)
 
+    def test_calculate_score_scores_aligned_arrays_at_once(self):
+        result = calculate_score(
+            np.array([0.91, 0.87, 0.85]),
+            np.array([0.63, 0.63, 0.73]),
+            np.array([0.80, 0.71, 0.62]),
+        )
+
+        np.testing.assert_allclose(result, [2.34, 2.21, 2.20])
+
+
+class TestSelectIndexesOfTopValues(unittest.TestCase):
+    def test_selects_the_greatest_values_in_descending_order(self):
+        values = np.array([0.2, 2.5, 1.1, 3.0, 0.7, 2.9])
+
+        self.assertEqual(select_indexes_of_top_values(values, 3).tolist(), [3, 5, 1])
+
+    def test_selects_every_value_when_k_exceeds_their_number(self):
+        values = np.array([0.2, 2.5, 1.1])
+
+        self.assertEqual(select_indexes_of_top_values(values, 10).tolist(), [1, 2, 0])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+from datetime import datetime
+from threading import Lock, get_ident
+
+from agents.agent import Agent
+from dialogue.conversation_state import ConversationState
+from dialogue.memory_context_prefetcher import MemoryContextPrefetcher
+
+
+class CountingMemoryContextPrefetcher(MemoryContextPrefetcher):
+    """Records the memory contexts it retrieves instead of querying any memories database."""
+
+    def __init__(self, conversation_state: ConversationState):
+        super().__init__(conversation_state)
+
+        self.names_of_retrieved_agents = []
+        self._names_lock = Lock()
+
+    def _determine_relevant_memories(self, agent: Agent):
+        with self._names_lock:
+            self.names_of_retrieved_agents.append(agent.get_name())
+
+        # The thread tells apart the prefetched memory contexts from those retrieved on demand.
+        return {agent.get_name(): [(f"Retrieved by thread {get_ident()}.", 1.0)]}
+
+
+def create_prefetcher(agents: list[Agent]) -> CountingMemoryContextPrefetcher:
+    return CountingMemoryContextPrefetcher(
+        ConversationState(datetime(2023, 6, 6), "A chat.", None, agents)
+    )
+
+
+class TestMemoryContextPrefetcher(unittest.TestCase):
+    def setUp(self):
+        self._alberto = Agent("Alberto", None)
+        self._leire = Agent("Leire", None)
+        self._jorge = Agent("Jorge", None)
+
+    def test_between_two_agents_the_other_one_gets_prefetched_and_consumed(self):
+        prefetcher = create_prefetcher([self._alberto, self._leire])
+
+        prefetcher.prefetch_memory_contexts_of_candidates_to_speak_next(self._alberto)
+
+        self.assertNotEqual(
+            prefetcher.get_relevant_memories(self._leire),
+            {"Leire": [(f"Retrieved by thread {get_ident()}.", 1.0)]},
+        )
+        self.assertEqual(prefetcher.names_of_retrieved_agents, ["Leire"])
+
+        prefetcher.close()
+
+    def test_among_several_agents_only_the_previous_speaker_gets_prefetched(self):
+        prefetcher = create_prefetcher([self._alberto, self._leire, self._jorge])
+
+        # Nobody has spoken before, so there is no likely next speaker.
+        prefetcher.prefetch_memory_contexts_of_candidates_to_speak_next(self._alberto)
+        prefetcher.get_relevant_memories(self._leire)
+        prefetcher.prefetch_memory_contexts_of_candidates_to_speak_next(self._leire)
+        prefetcher.get_relevant_memories(self._alberto)
+
+        self.assertEqual(prefetcher.names_of_retrieved_agents, ["Leire", "Alberto"])
+
+        prefetcher.close()
+
+    def test_an_unconsumed_memory_context_is_dropped_at_the_next_prefetch(self):
+        prefetcher = create_prefetcher([self._alberto, self._leire, self._jorge])
+
+        prefetcher.prefetch_memory_contexts_of_candidates_to_speak_next(self._alberto)
+        prefetcher.prefetch_memory_contexts_of_candidates_to_speak_next(self._leire)
+        # Jorge speaks instead of Alberto, so Alberto's memory context never gets consumed.
+        prefetcher.get_relevant_memories(self._jorge)
+        prefetcher.prefetch_memory_contexts_of_candidates_to_speak_next(self._jorge)
+
+        # Alberto's memory context gets retrieved again instead of reusing the outdated one.
+        self.assertEqual(
+            prefetcher.get_relevant_memories(self._alberto),
+            {"Alberto": [(f"Retrieved by thread {get_ident()}.", 1.0)]},
+        )
+
+        prefetcher.close()
@@ -0,0 +1,52 @@
+import unittest
+
+from dialogue.memory_packing import pack_memories
+
+
+class TestMemoryPacking(unittest.TestCase):
+    def test_memories_retrieved_for_several_interlocutors_appear_once(self):
+        packed_memories = pack_memories(
+            {
+                "Bob": [("We all went fishing.", 0.4), ("Bob snores.", 0.3)],
+                "Ann": [("We all went fishing.", 0.7)],
+            }
+        )
+
+        self.assertEqual(
+            packed_memories,
+            {"Bob": ["Bob snores."], "Ann": ["We all went fishing."]},
+        )
+
+    def test_memories_are_packed_by_score_per_token(self):
+        long_memory = "Bob told me a very long story about his travels " * 3
+
+        packed_memories = pack_memories(
+            {
+                "Bob": [(long_memory, 0.9), ("Bob is kind.", 0.6)],
+                "Ann": [("Ann is my sister.", 0.5)],
+            },
+            max_tokens=20,
+        )
+
+        self.assertEqual(
+            packed_memories, {"Bob": ["Bob is kind."], "Ann": ["Ann is my sister."]}
+        )
+
+    def test_headers_only_count_for_interlocutors_with_memories(self):
+        scored_memories = {
+            "Bob": [("Bob is kind.", 0.9)],
+            "Ann": [("Ann is my sister.", 0.1)],
+        }
+
+        packed_memories = pack_memories(
+            scored_memories, max_tokens=10, header_tokens={"Bob": 5, "Ann": 5}
+        )
+
+        self.assertEqual(packed_memories, {"Bob": ["Bob is kind."]})
+
+    def test_packed_memories_keep_descending_order_of_scores(self):
+        packed_memories = pack_memories(
+            {"Bob": [("Bob is tall.", 0.2), ("Bob is kind.", 0.9)]}, max_tokens=100
+        )
+
+        self.assertEqual(packed_memories, {"Bob": ["Bob is kind.", "Bob is tall."]})
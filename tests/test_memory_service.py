@@ -0,0 +1,125 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+
+from embeddings.embedding_provider import EmbeddingProvider
+from errors import MemoryServiceError
+from paths.full_paths import (
+    get_base_memories_full_path,
+    get_base_memories_json_full_path,
+)
+from vector_databases import database_querier, memory_service
+from vector_databases.exact_vector_index import ExactVectorIndex
+from vector_databases.memory_service import create_memory_service_server
+from vector_databases.memory_service_client import MemoryServiceClient
+from vector_databases.memory_store_registry import MEMORY_STORE_REGISTRY
+
+VECTORS_OF_SENTENCES = {
+    "Alberto is a blacksmith.": [1.0, 0.0, 0.0],
+    "Alberto owns a dog.": [0.0, 1.0, 0.0],
+    "Alberto fears the sea.": [0.0, 0.0, 1.0],
+}
+
+
+class FakeModel:
+    def encode(self, sentences, **_kwargs):
+        if isinstance(sentences, str):
+            return VECTORS_OF_SENTENCES[sentences]
+
+        return [VECTORS_OF_SENTENCES[sentence] for sentence in sentences]
+
+
+def save_memories_database(agent_name: str, current_timestamp: datetime):
+    index = ExactVectorIndex(dimensions=3)
+    raw_data = {}
+
+    for i, (description, vector) in enumerate(VECTORS_OF_SENTENCES.items()):
+        index.add_item(i, vector)
+        raw_data[str(i)] = {
+            "description": description,
+            "creation_timestamp": current_timestamp.isoformat(),
+            "importance": 0.5,
+            "recency": 1.0,
+            "most_recent_access_timestamp": current_timestamp.isoformat(),
+        }
+
+    index.build(10)
+    index.save(get_base_memories_full_path(agent_name))
+
+    with open(
+        get_base_memories_json_full_path(agent_name), "w", encoding="utf-8"
+    ) as file:
+        json.dump(raw_data, file)
+
+
+class TestMemoryService(unittest.TestCase):
+    def setUp(self):
+        self._previous_working_directory = os.getcwd()
+        self._temporary_directory = tempfile.TemporaryDirectory()
+        os.chdir(self._temporary_directory.name)
+        os.makedirs("assets/base_memories")
+
+        self._current_timestamp = datetime(2023, 6, 6)
+        save_memories_database("Alberto", self._current_timestamp)
+
+        fake_embedding_provider = EmbeddingProvider(
+            "fake-model", lambda _model_name: FakeModel()
+        )
+        self._previous_embedding_providers = (
+            database_querier.EMBEDDING_PROVIDER,
+            memory_service.EMBEDDING_PROVIDER,
+        )
+        database_querier.EMBEDDING_PROVIDER = fake_embedding_provider
+        memory_service.EMBEDDING_PROVIDER = fake_embedding_provider
+
+        # Port zero lets the system pick any free port.
+        self._server = create_memory_service_server(port=0)
+        self._server_thread = threading.Thread(target=self._server.serve_forever)
+        self._server_thread.start()
+
+        host, port = self._server.server_address[:2]
+        self._client = MemoryServiceClient(f"http://{host}:{port}")
+
+    def tearDown(self):
+        self._server.shutdown()
+        self._server_thread.join()
+        self._server.server_close()
+
+        (
+            database_querier.EMBEDDING_PROVIDER,
+            memory_service.EMBEDDING_PROVIDER,
+        ) = self._previous_embedding_providers
+
+        MEMORY_STORE_REGISTRY.clear()
+        os.chdir(self._previous_working_directory)
+        self._temporary_directory.cleanup()
+
+    def test_a_query_goes_through_the_service_and_back(self):
+        self.assertEqual(
+            self._client.query(
+                "Alberto", self._current_timestamp, "Alberto owns a dog.", 1
+            ),
+            ["Alberto owns a dog."],
+        )
+
+    def test_flushing_writes_the_accesses_of_a_query_to_disk(self):
+        query_timestamp = datetime(2023, 6, 8)
+
+        self._client.query("Alberto", query_timestamp, "Alberto fears the sea.", 1)
+        self._client.flush("Alberto")
+
+        with open(
+            get_base_memories_json_full_path("Alberto"), "r", encoding="utf-8"
+        ) as file:
+            raw_data = json.load(file)
+
+        self.assertEqual(
+            raw_data["2"]["most_recent_access_timestamp"], query_timestamp.isoformat()
+        )
+
+    def test_querying_an_agent_without_memories_raises_an_error(self):
+        with self.assertRaises(MemoryServiceError):
+            self._client.query("Nobody", self._current_timestamp, "Anything.", 1)
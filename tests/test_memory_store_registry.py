@@ -0,0 +1,109 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from vector_databases.exact_vector_index import ExactVectorIndex
+from vector_databases.memory_store_registry import MemoryStoreRegistry
+
+
+def save_memories_database(directory: str, database_name: str, descriptions: list):
+    database_full_path = os.path.join(directory, f"{database_name}_memories.ann")
+    database_json_full_path = os.path.join(directory, f"{database_name}_memories.json")
+
+    current_timestamp = datetime(2023, 6, 6).isoformat()
+
+    index = ExactVectorIndex(dimensions=3)
+    raw_data = {}
+
+    for i, description in enumerate(descriptions):
+        index.add_item(i, [1.0, float(i), 0.0])
+        raw_data[str(i)] = {
+            "description": description,
+            "creation_timestamp": current_timestamp,
+            "importance": 5,
+            "recency": 1.0,
+            "most_recent_access_timestamp": current_timestamp,
+        }
+
+    index.build(10)
+    index.save(database_full_path)
+
+    with open(database_json_full_path, "w", encoding="utf-8") as file:
+        json.dump(raw_data, file)
+
+    return database_full_path, database_json_full_path
+
+
+class TestMemoryStoreRegistry(unittest.TestCase):
+    def setUp(self):
+        self._temporary_directory = tempfile.TemporaryDirectory()
+        self._registry = MemoryStoreRegistry(max_open_memory_stores=2)
+
+        self._paths = {
+            database_name: save_memories_database(
+                self._temporary_directory.name,
+                database_name,
+                [f"{database_name} remembers something.", "It rained."],
+            )
+            for database_name in ["alberto", "leire", "eolan"]
+        }
+
+    def tearDown(self):
+        self._registry.clear()
+        self._temporary_directory.cleanup()
+
+    def _borrow(self, database_name: str):
+        return self._registry.borrow_memory_store(
+            database_name, *self._paths[database_name]
+        )
+
+    def test_the_least_recently_used_stores_get_evicted(self):
+        for database_name in ["alberto", "leire", "alberto", "eolan"]:
+            with self._borrow(database_name):
+                pass
+
+        self.assertEqual(self._registry.get_number_of_open_memory_stores(), 2)
+        # Leire was the least recently used, so she got evicted instead of Alberto.
+        self.assertIsNone(self._registry.get_scoring_columns("leire"))
+        self.assertIsNotNone(self._registry.get_scoring_columns("alberto"))
+
+    def test_a_borrowed_store_stays_loaded_until_it_is_returned(self):
+        with self._borrow("alberto") as (index, _):
+            with self._borrow("leire"), self._borrow("eolan"):
+                # Alberto has been evicted, but his query is still running.
+                self.assertIsNone(self._registry.get_scoring_columns("alberto"))
+                self.assertEqual(index.get_n_items(), 2)
+
+        self.assertEqual(index.get_n_items(), 0)
+
+    def test_a_store_whose_files_change_gets_loaded_again(self):
+        with self._borrow("alberto") as (_, raw_data):
+            pass
+
+        save_memories_database(
+            self._temporary_directory.name,
+            "alberto",
+            ["Alberto remembers something.", "It rained.", "It snowed."],
+        )
+
+        with self._borrow("alberto") as (index, reloaded_raw_data):
+            self.assertIsNot(reloaded_raw_data, raw_data)
+            self.assertEqual(index.get_n_items(), 3)
+
+    def test_acknowledged_writes_dont_make_the_store_stale(self):
+        _, database_json_full_path = self._paths["alberto"]
+
+        with self._borrow("alberto") as (_, raw_data):
+            raw_data["1"]["recency"] = 0.5
+
+            with open(database_json_full_path, "w", encoding="utf-8") as file:
+                json.dump(raw_data, file, default=str, indent=4)
+
+            self._registry.acknowledge_write_of_raw_data(
+                database_json_full_path, raw_data
+            )
+
+        with self._borrow("alberto") as (_, current_raw_data):
+            self.assertIs(current_raw_data, raw_data)
@@ -0,0 +1,84 @@
+import time
+import unittest
+
+from defines.defines import AI_MODEL_CONTEXT_WINDOWS, GPT_3_5, MAX_TOKENS
+from dialogue.dialogue_history_handler import DialogueHistoryHandler
+from dialogue.prompting import render_relevant_memories_regarding_interlocutors
+from errors import PromptTooBigError
+from llms.gpt_responder import GPTResponder, _validate_prompt_size
+from llms.token_estimation import (
+    estimate_prompt_tokens,
+    estimate_tokens_of_text,
+    get_prompt_token_budget,
+    get_prompt_token_limit,
+)
+
+
+class TestPromptBudget(unittest.TestCase):
+    def test_the_oldest_lines_of_dialogue_are_left_out_first(self):
+        dialogue_history_handler = DialogueHistoryHandler()
+
+        for number in range(5):
+            dialogue_history_handler.register_line_of_dialogue(
+                {"role": "user", "content": f"Line {number}: " + "word " * 20}
+            )
+
+        user_content = dialogue_history_handler.add_dialogue_history_for_prompt(
+            "", max_tokens=80
+        )
+
+        self.assertLessEqual(estimate_tokens_of_text(user_content), 80)
+        self.assertIn("Line 4", user_content)
+        self.assertIn("Line 3", user_content)
+        self.assertNotIn("Line 0", user_content)
+
+    def test_the_memory_context_fits_its_budget(self):
+        relevant_memories = {
+            "Bob": [("Bob saved my life.", 0.9), ("Bob likes apples.", 0.5)],
+            "Ann": [("Ann is my sister.", 0.8), ("Ann owes me money.", 0.2)],
+        }
+
+        full_memory_context = render_relevant_memories_regarding_interlocutors(
+            "Eve", relevant_memories
+        )
+        trimmed_memory_context = render_relevant_memories_regarding_interlocutors(
+            "Eve", relevant_memories, max_tokens=45
+        )
+
+        self.assertIn("Ann owes me money.", full_memory_context)
+        self.assertLessEqual(estimate_tokens_of_text(trimmed_memory_context), 45)
+        self.assertIn("Bob saved my life.", trimmed_memory_context)
+        self.assertNotIn("Ann owes me money.", trimmed_memory_context)
+
+    def test_prompts_over_the_budget_fail_without_being_sent_or_retried(self):
+        messages = [
+            {
+                "role": "user",
+                "content": "word " * (get_prompt_token_budget(GPT_3_5) * 2),
+            }
+        ]
+
+        start = time.monotonic()
+
+        with self.assertRaises(PromptTooBigError):
+            GPTResponder().request_response(messages, GPT_3_5)
+
+        self.assertLess(time.monotonic() - start, 1.0)
+
+    def test_the_budget_keeps_a_margin_for_underestimates(self):
+        self.assertLess(
+            get_prompt_token_budget(GPT_3_5),
+            AI_MODEL_CONTEXT_WINDOWS[GPT_3_5] - MAX_TOKENS,
+        )
+
+    def test_prompts_within_the_limit_arent_refused_for_the_margin(self):
+        messages = [
+            {"role": "user", "content": "x" * (get_prompt_token_limit(GPT_3_5) * 4 - 100)}
+        ]
+
+        self.assertGreater(
+            estimate_prompt_tokens(messages), get_prompt_token_budget(GPT_3_5)
+        )
+
+        # It doesn't raise, even though the prompt doesn't fit in the budget.
+        _validate_prompt_size(messages, None, GPT_3_5)
@@ -0,0 +1,119 @@
+import asyncio
+import time
+import unittest
+
+from enums.enums import RequestPriority
+from llms.request_scheduler import (
+    RequestScheduler,
+    get_request_priority,
+    request_priority,
+)
+from llms.token_estimation import estimate_prompt_tokens
+
+
+def create_scheduler(requests_per_minute=6000, tokens_per_minute=600000, **kwargs):
+    return RequestScheduler(
+        rate_limits={
+            "test-model": {
+                "requests_per_minute": requests_per_minute,
+                "tokens_per_minute": tokens_per_minute,
+            }
+        },
+        estimated_completion_tokens=0,
+        **kwargs,
+    )
+
+
+class TestRequestScheduler(unittest.TestCase):
+    def test_queued_requests_are_served_by_priority(self):
+        scheduler = create_scheduler(max_concurrent_requests_per_model=1)
+
+        first_request = scheduler.acquire("test-model", 10)
+
+        background_future = scheduler.request_slot(
+            "test-model", 10, RequestPriority.BACKGROUND
+        )
+        dialogue_future = scheduler.request_slot(
+            "test-model", 10, RequestPriority.DIALOGUE
+        )
+
+        self.assertEqual(scheduler.get_queue_depth("test-model"), 2)
+
+        scheduler.release(first_request)
+
+        self.assertTrue(dialogue_future.done())
+        self.assertFalse(background_future.done())
+
+        scheduler.release(dialogue_future.result())
+
+        self.assertTrue(background_future.done())
+        self.assertEqual(scheduler.get_queue_depth("test-model"), 0)
+
+    def test_requests_beyond_the_budget_wait_for_it_to_refill(self):
+        # Two requests per second, so the third request must wait around half a second.
+        scheduler = create_scheduler(requests_per_minute=120)
+        scheduler._get_schedule("test-model").requests_bucket.consume(118)
+
+        start = time.monotonic()
+
+        for _ in range(3):
+            scheduler.release(scheduler.acquire("test-model", 10))
+
+        elapsed = time.monotonic() - start
+
+        self.assertGreater(elapsed, 0.3)
+        self.assertLess(elapsed, 2.0)
+
+    def test_overestimated_tokens_are_given_back(self):
+        scheduler = create_scheduler(tokens_per_minute=1000)
+
+        scheduled_request = scheduler.acquire("test-model", 600)
+        scheduler.release(scheduled_request, used_tokens=100)
+
+        self.assertGreater(
+            scheduler.get_metrics()["test-model"]["available_tokens"], 850
+        )
+
+    def test_being_rate_limited_empties_the_budget(self):
+        scheduler = create_scheduler()
+
+        scheduler.release(scheduler.acquire("test-model", 10), was_rate_limited=True)
+
+        metrics = scheduler.get_metrics()["test-model"]
+
+        self.assertLess(metrics["available_requests"], 1)
+        self.assertEqual(metrics["requests_in_flight"], 0)
+        self.assertEqual(metrics["scheduled_requests"], 1)
+
+    def test_requests_can_be_awaited(self):
+        scheduler = create_scheduler(max_concurrent_requests_per_model=2)
+
+        async def request_concurrently():
+            async def request():
+                scheduled_request = await scheduler.aacquire("test-model", 10)
+                await asyncio.sleep(0.01)
+                scheduler.release(scheduled_request)
+
+            await asyncio.gather(*[request() for _ in range(6)])
+
+        asyncio.run(request_concurrently())
+
+        self.assertEqual(
+            scheduler.get_metrics()["test-model"]["scheduled_requests"], 6
+        )
+
+    def test_the_priority_applies_within_its_block(self):
+        self.assertEqual(get_request_priority(), RequestPriority.DEFAULT)
+
+        with request_priority(RequestPriority.BACKGROUND):
+            self.assertEqual(get_request_priority(), RequestPriority.BACKGROUND)
+
+        self.assertEqual(get_request_priority(), RequestPriority.DEFAULT)
+
+    def test_functions_count_towards_the_prompt_tokens(self):
+        messages = [{"role": "user", "content": "Hello there"}]
+
+        self.assertGreater(
+            estimate_prompt_tokens(messages, [{"name": "some_function"}]),
+            estimate_prompt_tokens(messages),
+        )
@@ -0,0 +1,155 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+
+import openai
+
+from dialogue.dialogue_history_handler import (
+    HOW_MANY_LINES_OF_DIALOGUE_TO_FOLD_INTO_SUMMARY_AT_ONCE,
+    HOW_MANY_LINES_OF_DIALOGUE_TO_INCLUDE_IN_PROMPT,
+    DialogueHistoryHandler,
+)
+from dialogue.rolling_dialogue_summarizer import RollingDialogueSummarizer
+from llms.interface import AIModelInterface
+from llms.responses import create_response_in_gpt_format
+
+
+class FakeSummarizingModel(AIModelInterface):
+    """Summarizes by listing the lines it was given, failing on demand."""
+
+    def __init__(self):
+        self.number_of_requests = 0
+        self.should_fail = False
+        self.has_a_bug = False
+
+    def request_response_using_functions(
+        self, messages, functions, function_call, model
+    ):
+        raise NotImplementedError()
+
+    def request_response(self, messages, model):
+        self.number_of_requests += 1
+
+        if self.should_fail:
+            raise openai.error.ServiceUnavailableError("The AI model is unavailable.")
+        if self.has_a_bug:
+            raise KeyError("choices")
+
+        folded_lines = [
+            line
+            for line in messages[-1]["content"].split("\n")
+            if line.startswith("Line")
+        ]
+        previous_summary = ""
+
+        if "so far:\n" in messages[-1]["content"]:
+            previous_summary = (
+                messages[-1]["content"].split("so far:\n")[1].split("\n")[0] + " "
+            )
+
+        summary = previous_summary + " ".join(
+            line.split(":")[0] for line in folded_lines
+        )
+
+        return create_response_in_gpt_format(summary, messages, model)
+
+
+def register_lines_of_dialogue(dialogue_history_handler, first_line, last_line):
+    for number in range(first_line, last_line):
+        dialogue_history_handler.register_line_of_dialogue(
+            {"role": "user", "content": f"Line {number}: something was said."}
+        )
+
+
+class TestRollingDialogueSummary(unittest.TestCase):
+    def test_evicted_lines_are_folded_into_the_summary(self):
+        model = FakeSummarizingModel()
+        dialogue_history_handler = DialogueHistoryHandler(
+            RollingDialogueSummarizer(model)
+        )
+
+        number_of_lines = HOW_MANY_LINES_OF_DIALOGUE_TO_INCLUDE_IN_PROMPT + (
+            2 * HOW_MANY_LINES_OF_DIALOGUE_TO_FOLD_INTO_SUMMARY_AT_ONCE
+        )
+        register_lines_of_dialogue(dialogue_history_handler, 0, number_of_lines)
+        dialogue_history_handler.wait_for_dialogue_summary()
+
+        user_content = dialogue_history_handler.add_dialogue_history_for_prompt("")
+
+        self.assertEqual(model.number_of_requests, 2)
+        self.assertIn("Line 0 ", dialogue_history_handler.get_dialogue_summary())
+        self.assertIn("Line 19", dialogue_history_handler.get_dialogue_summary())
+        self.assertNotIn("Line 0:", user_content)
+        self.assertIn(f"Line {number_of_lines - 1}:", user_content)
+        self.assertEqual(
+            user_content.count(": something was said."),
+            HOW_MANY_LINES_OF_DIALOGUE_TO_INCLUDE_IN_PROMPT,
+        )
+
+        dialogue_history_handler.close()
+
+    def test_lines_of_a_failed_fold_are_folded_later(self):
+        model = FakeSummarizingModel()
+        model.should_fail = True
+        dialogue_history_handler = DialogueHistoryHandler(
+            RollingDialogueSummarizer(model)
+        )
+
+        number_of_lines = (
+            HOW_MANY_LINES_OF_DIALOGUE_TO_INCLUDE_IN_PROMPT
+            + HOW_MANY_LINES_OF_DIALOGUE_TO_FOLD_INTO_SUMMARY_AT_ONCE
+        )
+        console_output = io.StringIO()
+
+        with redirect_stdout(console_output):
+            register_lines_of_dialogue(dialogue_history_handler, 0, number_of_lines)
+            dialogue_history_handler.wait_for_dialogue_summary()
+
+        self.assertIn("The AI model is unavailable.", console_output.getvalue())
+        self.assertIsNone(dialogue_history_handler.get_dialogue_summary())
+        # Nothing that wasn't summarized has been left out of the prompt.
+        self.assertIn(
+            "Line 0:", dialogue_history_handler.add_dialogue_history_for_prompt("")
+        )
+
+        model.should_fail = False
+        register_lines_of_dialogue(
+            dialogue_history_handler, number_of_lines, number_of_lines + 1
+        )
+        dialogue_history_handler.wait_for_dialogue_summary()
+
+        self.assertIn("Line 0 ", dialogue_history_handler.get_dialogue_summary())
+
+        dialogue_history_handler.close()
+
+    def test_unexpected_errors_while_folding_arent_swallowed(self):
+        model = FakeSummarizingModel()
+        model.has_a_bug = True
+        dialogue_history_handler = DialogueHistoryHandler(
+            RollingDialogueSummarizer(model)
+        )
+
+        register_lines_of_dialogue(
+            dialogue_history_handler,
+            0,
+            HOW_MANY_LINES_OF_DIALOGUE_TO_INCLUDE_IN_PROMPT
+            + HOW_MANY_LINES_OF_DIALOGUE_TO_FOLD_INTO_SUMMARY_AT_ONCE,
+        )
+
+        with self.assertRaises(KeyError):
+            dialogue_history_handler.wait_for_dialogue_summary()
+
+        dialogue_history_handler.close()
+
+    def test_without_a_summarizer_the_earlier_lines_are_left_out(self):
+        dialogue_history_handler = DialogueHistoryHandler()
+
+        register_lines_of_dialogue(dialogue_history_handler, 0, 40)
+
+        user_content = dialogue_history_handler.add_dialogue_history_for_prompt("")
+
+        self.assertIsNone(dialogue_history_handler.get_dialogue_summary())
+        self.assertEqual(
+            user_content.count(": something was said."),
+            HOW_MANY_LINES_OF_DIALOGUE_TO_INCLUDE_IN_PROMPT,
+        )
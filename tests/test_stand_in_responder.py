@@ -0,0 +1,172 @@
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+import unittest
+
+from llms.functions import append_function
+from llms.messages import (
+    get_message_from_gpt_response,
+    load_arguments_of_message_with_function_call,
+)
+from llms.recording_ai_model_interface import RecordingAIModelInterface
+from llms.stand_in_responder import (
+    AsyncStandInResponder,
+    StandInResponder,
+    StandInResponseSource,
+    create_constant_latency,
+    synthesize_value_from_schema,
+)
+from llms.transcripts import load_transcript
+
+
+def create_functions():
+    functions = []
+    append_function(
+        functions,
+        "rate_memories",
+        "Rates memories.",
+        [
+            {"name": "summary", "type": "string", "description": "A summary."},
+            {"name": "should_stop", "type": "boolean", "description": "Stop?"},
+            {
+                "name": "ratings",
+                "type": "array",
+                "description": "The ratings.",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "index": {"type": "integer", "description": "The index."},
+                        "rating": {"type": "integer", "description": "The rating."},
+                    },
+                    "required": ["index", "rating"],
+                },
+            },
+        ],
+    )
+
+    return functions
+
+
+def create_messages(content):
+    return [{"role": "user", "content": content}]
+
+
+class TestStandInResponder(unittest.TestCase):
+    def test_function_calls_are_synthesized_from_their_schemas(self):
+        responder = StandInResponder(StandInResponseSource(seed=1))
+
+        message = get_message_from_gpt_response(
+            responder.request_response_using_functions(
+                create_messages("Rate these."),
+                create_functions(),
+                {"name": "rate_memories"},
+                "test-model",
+            )
+        )
+        arguments = load_arguments_of_message_with_function_call(message)
+
+        self.assertEqual(message["function_call"]["name"], "rate_memories")
+        self.assertIsInstance(arguments["summary"], str)
+        self.assertIsInstance(arguments["should_stop"], bool)
+        self.assertTrue(arguments["ratings"])
+
+        for rating in arguments["ratings"]:
+            self.assertTrue(1 <= rating["rating"] <= 10)
+            self.assertIsInstance(rating["index"], int)
+
+    def test_specific_functions_can_have_their_own_synthesizers(self):
+        responder = StandInResponder(
+            StandInResponseSource(
+                argument_synthesizers={
+                    "rate_memories": lambda messages, _random_generator: {
+                        "summary": messages[-1]["content"]
+                    }
+                }
+            )
+        )
+
+        message = get_message_from_gpt_response(
+            responder.request_response_using_functions(
+                create_messages("Echo"),
+                create_functions(),
+                {"name": "rate_memories"},
+                "test-model",
+            )
+        )
+
+        self.assertEqual(
+            load_arguments_of_message_with_function_call(message), {"summary": "Echo"}
+        )
+
+    def test_plain_requests_receive_text(self):
+        response = StandInResponder().request_response(
+            create_messages("Talk."), "test-model"
+        )
+
+        self.assertTrue(get_message_from_gpt_response(response)["content"])
+
+    def test_recorded_transcripts_are_replayed_in_order(self):
+        with tempfile.TemporaryDirectory() as directory:
+            transcript_full_path = os.path.join(directory, "transcript.jsonl")
+            recording_responder = RecordingAIModelInterface(
+                StandInResponder(StandInResponseSource(seed=2)), transcript_full_path
+            )
+
+            recorded_responses = [
+                recording_responder.request_response_using_functions(
+                    create_messages("Rate these."),
+                    create_functions(),
+                    {"name": "rate_memories"},
+                    "test-model",
+                )
+                for _ in range(2)
+            ]
+
+            response_source = StandInResponseSource(
+                load_transcript(transcript_full_path)
+            )
+            responder = StandInResponder(response_source)
+
+            replayed_responses = [
+                responder.request_response_using_functions(
+                    create_messages("Rate these."),
+                    create_functions(),
+                    {"name": "rate_memories"},
+                    "test-model",
+                )
+                for _ in range(3)
+            ]
+
+        self.assertEqual(replayed_responses[:2], recorded_responses)
+        self.assertEqual(replayed_responses[2], recorded_responses[0])
+        self.assertEqual(response_source.get_number_of_replayed_responses(), 3)
+        self.assertEqual(response_source.get_number_of_synthesized_responses(), 0)
+
+    def test_async_responses_overlap_their_latency(self):
+        responder = AsyncStandInResponder(
+            StandInResponseSource(latency_distribution=create_constant_latency(0.1))
+        )
+
+        async def request_concurrently():
+            return await asyncio.gather(
+                *[
+                    responder.arequest_response(create_messages("Talk."), "test-model")
+                    for _ in range(10)
+                ]
+            )
+
+        start = time.perf_counter()
+        responses = asyncio.run(request_concurrently())
+
+        self.assertEqual(len(responses), 10)
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+    def test_synthesized_values_can_be_serialized(self):
+        value = synthesize_value_from_schema(
+            create_functions()[0]["parameters"], random.Random(3)
+        )
+
+        self.assertEqual(json.loads(json.dumps(value)), value)
@@ -0,0 +1,106 @@
+import json
+import unittest
+from datetime import datetime
+
+from embeddings.embedding_provider import EmbeddingProvider
+from llms.interface import AIModelInterface
+from vector_databases import vectorization
+from vector_databases.exact_vector_index import ExactVectorIndex
+from vector_databases.vectorization import create_vectorized_memories
+
+VECTORS_OF_SENTENCES = {
+    "Alberto is a blacksmith.": [1.0, 0.0, 0.0],
+    "Alberto owns a dog.": [0.0, 1.0, 0.0],
+    "Alberto fears the sea.": [0.0, 0.0, 1.0],
+}
+
+
+class CountingModel:
+    """Encodes the sentences it knows, recording every call it receives."""
+
+    def __init__(self):
+        self.encoded_batches = []
+
+    def encode(self, sentences, **_kwargs):
+        self.encoded_batches.append(sentences)
+
+        if isinstance(sentences, str):
+            return VECTORS_OF_SENTENCES[sentences]
+
+        return [VECTORS_OF_SENTENCES[sentence] for sentence in sentences]
+
+
+class FakeImportanceJudge(AIModelInterface):
+    """Rates every memory of a chunk with its number in the list, plus one."""
+
+    def request_response_using_functions(
+        self, messages, functions, function_call, model
+    ):
+        ratings = [
+            {"index": position, "rating": position + 1}
+            for position, _ in enumerate(messages[-1]["content"].split("\n")[1:])
+        ]
+
+        return {
+            "choices": [
+                {
+                    "message": {
+                        "role": "assistant",
+                        "content": None,
+                        "function_call": {
+                            "name": function_call["name"],
+                            "arguments": json.dumps({"ratings": ratings}),
+                        },
+                    }
+                }
+            ]
+        }
+
+    def request_response(self, messages, model):
+        raise NotImplementedError()
+
+
+class TestVectorization(unittest.TestCase):
+    def setUp(self):
+        self._model = CountingModel()
+
+        self._previous_embedding_provider = vectorization.EMBEDDING_PROVIDER
+        vectorization.EMBEDDING_PROVIDER = EmbeddingProvider(
+            "fake-model", lambda _model_name: self._model
+        )
+
+    def tearDown(self):
+        vectorization.EMBEDDING_PROVIDER = self._previous_embedding_provider
+
+    def test_seed_memories_are_encoded_in_one_call_keeping_their_ids_and_order(
+        self,
+    ):
+        index = ExactVectorIndex(dimensions=3)
+        # The memory already in the database keeps its id.
+        index.add_item(0, [1.0, 1.0, 0.0])
+
+        memory_descriptions = list(VECTORS_OF_SENTENCES)
+
+        memories = create_vectorized_memories(
+            memory_descriptions,
+            datetime(2023, 6, 6),
+            index,
+            importance_judge=FakeImportanceJudge(),
+        )
+
+        self.assertEqual(self._model.encoded_batches, [memory_descriptions])
+
+        self.assertEqual(list(memories), [1, 2, 3])
+        self.assertEqual(
+            [memory["description"] for memory in memories.values()],
+            memory_descriptions,
+        )
+        # The ratings grow with the position in the list, so the importances must too.
+        importances = [memory["importance"] for memory in memories.values()]
+        self.assertEqual(importances, sorted(set(importances)))
+
+        for vector_index, memory in memories.items():
+            self.assertEqual(
+                list(index.get_item_vector(vector_index)),
+                VECTORS_OF_SENTENCES[memory["description"]],
+            )
@@ -0,0 +1,226 @@
+"""This module contains the definition of AccessTimestampsBuffer, which keeps the changes to the most recent
+access timestamps of vector databases in memory, and writes them to the json files later on (write-behind).
+"""
+import atexit
+from datetime import datetime
+from threading import RLock, Timer
+from typing import Callable, Dict, List, Tuple
+
+from defines.defines import (
+    ACCESS_TIMESTAMPS_FLUSH_INTERVAL_SECONDS,
+    ACCESS_TIMESTAMPS_FLUSH_THRESHOLD,
+)
+from vector_databases.columnar_metadata import ColumnarMemoryMetadata
+from vector_databases.jsonification import format_python_memory_data_for_json
+from vector_databases.saving import save_memories_to_json_file
+
+
+def _apply_access(
+    raw_data: dict, key: str, recency: float, most_recent_access_timestamp: datetime
+):
+    if isinstance(raw_data, ColumnarMemoryMetadata):
+        raw_data.set_access(key, recency, most_recent_access_timestamp)
+    else:
+        raw_data[key]["recency"] = recency
+        raw_data[key]["most_recent_access_timestamp"] = most_recent_access_timestamp
+
+
+class _PendingWrite:
+    def __init__(self, raw_data: dict, number_of_items: int):
+        self.raw_data = raw_data
+        self.number_of_items = number_of_items
+        self.dirty_keys = set()
+
+
+class AccessTimestampsBuffer:
+    """Buffers the updates of 'recency' and 'most_recent_access_timestamp' made by queries. The updates are applied
+    to the raw data in memory right away, but the json files are only written when the buffer gets flushed: either
+    explicitly, after a time interval, once enough entries are dirty, or when the process exits.
+    Every flush writes each affected json file once.
+    """
+
+    def __init__(
+        self,
+        flush_interval_seconds: float = ACCESS_TIMESTAMPS_FLUSH_INTERVAL_SECONDS,
+        flush_threshold: int = ACCESS_TIMESTAMPS_FLUSH_THRESHOLD,
+    ):
+        """Creates an instance of the class AccessTimestampsBuffer.
+
+        Args:
+            flush_interval_seconds (float): how long the updates can remain unwritten.
+            flush_threshold (int): how many dirty entries trigger a flush right away.
+
+        Raises:
+            ValueError: if either 'flush_interval_seconds' or 'flush_threshold' aren't greater than zero.
+        """
+        if not flush_interval_seconds > 0:
+            raise ValueError(
+                f"The class {AccessTimestampsBuffer.__name__} expected 'flush_interval_seconds' to be greater than zero, but it was: {flush_interval_seconds}"
+            )
+        if not flush_threshold > 0:
+            raise ValueError(
+                f"The class {AccessTimestampsBuffer.__name__} expected 'flush_threshold' to be greater than zero, but it was: {flush_threshold}"
+            )
+
+        self._flush_interval_seconds = flush_interval_seconds
+        self._flush_threshold = flush_threshold
+
+        self._pending_writes: Dict[str, _PendingWrite] = {}
+        self._flush_listeners: List[Callable[[str, dict], None]] = []
+        self._timer = None
+        self._lock = RLock()
+
+    def add_flush_listener(self, flush_listener: Callable[[str, dict], None]):
+        """Registers a function that will be called after a json file has been written by a flush.
+
+        Args:
+            flush_listener (Callable[[str, dict], None]): receives the full path to the json file, as well as
+                the raw data that was written to it.
+        """
+        with self._lock:
+            self._flush_listeners.append(flush_listener)
+
+    def record_accesses(
+        self,
+        database_json_full_path: str,
+        raw_data: dict,
+        number_of_items: int,
+        accesses: Dict[str, Tuple[float, datetime]],
+    ):
+        """Applies the new recency and access timestamps to the raw data, and marks those entries as dirty.
+
+        Args:
+            database_json_full_path (str): the full path to the json file where the raw data belongs.
+            raw_data (dict): the entire raw data of the vector database.
+            number_of_items (int): how many items the index of the vector database contains.
+            accesses (Dict[str, Tuple[float, datetime]]): the new recency and most recent access timestamp, keyed by entry.
+        """
+        with self._lock:
+            pending_write = self._pending_writes.get(database_json_full_path)
+
+            # If the raw data was reloaded in the meantime, the file on disk changed (for example, memories were
+            # appended), so the superseded copy must never be written. Its unwritten accesses move to the new copy.
+            if pending_write is None or pending_write.raw_data is not raw_data:
+                superseded_pending_write = pending_write
+
+                pending_write = _PendingWrite(raw_data, number_of_items)
+                self._pending_writes[database_json_full_path] = pending_write
+
+                if superseded_pending_write is not None:
+                    self._carry_over_dirty_entries(
+                        superseded_pending_write, pending_write
+                    )
+
+            for key, (recency, most_recent_access_timestamp) in accesses.items():
+                _apply_access(raw_data, key, recency, most_recent_access_timestamp)
+
+                pending_write.dirty_keys.add(key)
+
+            pending_write.number_of_items = number_of_items
+
+            if self.get_number_of_dirty_entries() >= self._flush_threshold:
+                self.flush()
+            elif self._timer is None:
+                self._timer = Timer(self._flush_interval_seconds, self._flush_on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _carry_over_dirty_entries(
+        self, superseded_pending_write: _PendingWrite, pending_write: _PendingWrite
+    ):
+        for key in superseded_pending_write.dirty_keys:
+            try:
+                entry = pending_write.raw_data[key]
+            except KeyError:
+                continue
+
+            superseded_entry = superseded_pending_write.raw_data[key]
+
+            # The reloaded copy could already contain a later access.
+            if (
+                superseded_entry["most_recent_access_timestamp"]
+                <= entry["most_recent_access_timestamp"]
+            ):
+                continue
+
+            _apply_access(
+                pending_write.raw_data,
+                key,
+                superseded_entry["recency"],
+                superseded_entry["most_recent_access_timestamp"],
+            )
+
+            pending_write.dirty_keys.add(key)
+
+    def get_number_of_dirty_entries(self) -> int:
+        """Returns how many entries have been updated but not yet written to disk.
+
+        Returns:
+            int: the number of dirty entries.
+        """
+        with self._lock:
+            return sum(
+                len(pending_write.dirty_keys)
+                for pending_write in self._pending_writes.values()
+            )
+
+    def flush(self, database_json_full_path: str | None = None):
+        """Writes the buffered updates to disk, once per json file.
+
+        Args:
+            database_json_full_path (str | None): if passed, only the updates of this json file get written.
+        """
+        with self._lock:
+            if database_json_full_path is None:
+                pending_writes = list(self._pending_writes.items())
+            elif database_json_full_path in self._pending_writes:
+                pending_writes = [
+                    (
+                        database_json_full_path,
+                        self._pending_writes[database_json_full_path],
+                    )
+                ]
+            else:
+                pending_writes = []
+
+            for full_path, pending_write in pending_writes:
+                del self._pending_writes[full_path]
+
+                self._flush_pending_write(full_path, pending_write)
+
+            if not self._pending_writes and self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def _flush_on_timer(self):
+        with self._lock:
+            self._timer = None
+
+            self.flush()
+
+    def _flush_pending_write(
+        self, database_json_full_path: str, pending_write: _PendingWrite
+    ):
+        if isinstance(pending_write.raw_data, ColumnarMemoryMetadata):
+            # Columnar metadata was already updated in place, so it only needs to reach the disk.
+            pending_write.raw_data.flush()
+        else:
+            # Format a shallow copy, so that the raw data in memory keeps its timestamps as datetimes.
+            self._save_raw_data_to_json_file(database_json_full_path, pending_write)
+
+        for flush_listener in self._flush_listeners:
+            flush_listener(database_json_full_path, pending_write.raw_data)
+
+    def _save_raw_data_to_json_file(
+        self, database_json_full_path: str, pending_write: _PendingWrite
+    ):
+        save_memories_to_json_file(
+            database_json_full_path,
+            format_python_memory_data_for_json(dict(pending_write.raw_data)),
+            pending_write.number_of_items,
+        )
+
+
+ACCESS_TIMESTAMPS_BUFFER = AccessTimestampsBuffer()
+
+atexit.register(ACCESS_TIMESTAMPS_BUFFER.flush)
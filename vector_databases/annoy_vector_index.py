@@ -0,0 +1,44 @@
+"""This module contains the definition of AnnoyVectorIndex, the approximate nearest neighbors backend
+of the vector databases, for stores large enough to benefit from it.
+"""
+from typing import List, Tuple
+
+from annoy import AnnoyIndex
+
+from defines.defines import METRIC_ANGULAR, VECTOR_DIMENSIONS
+from vector_databases.vector_index import VectorIndex
+
+
+class AnnoyVectorIndex(VectorIndex):
+    """Approximate nearest neighbors search through an AnnoyIndex with the angular metric."""
+
+    def __init__(self, dimensions: int = VECTOR_DIMENSIONS):
+        self._index = AnnoyIndex(dimensions, METRIC_ANGULAR)
+
+    def add_item(self, i: int, vector):
+        self._index.add_item(i, vector)
+
+    def build(self, n_trees: int):
+        self._index.build(n_trees)
+
+    def save(self, full_path: str):
+        self._index.save(full_path)
+
+    def load(self, full_path: str):
+        self._index.load(full_path)
+
+    def unload(self):
+        self._index.unload()
+
+    def get_n_items(self) -> int:
+        return self._index.get_n_items()
+
+    def get_item_vector(self, i: int) -> List[float]:
+        return self._index.get_item_vector(i)
+
+    def get_nns_by_vector(
+        self, vector, n: int, include_distances: bool = False
+    ) -> List[int] | Tuple[List[int], List[float]]:
+        return self._index.get_nns_by_vector(
+            vector, n, include_distances=include_distances
+        )
@@ -0,0 +1,386 @@
+"""This module contains the definition of ColumnarMemoryMetadata, a binary, columnar alternative to the json file
+that stores the data paired with the entries of a vector database.
+
+The file starts with a fixed header (magic bytes, format version, number of entries and size of the descriptions),
+followed by these columns, each aligned to eight bytes:
+    importance (float32), recency (float32), creation timestamp (int64, microseconds since the epoch),
+    most recent access timestamp (int64, microseconds since the epoch), and an offset table (int64, one more
+    than the number of entries) into a blob with every description encoded in UTF-8.
+The file is loaded through numpy.memmap, so loading it doesn't create Python objects per entry, and the recency
+and access timestamps of an entry can be updated in place.
+"""
+from collections.abc import Mapping
+from datetime import datetime, timedelta, timezone
+import json
+import os
+import struct
+from typing import Iterator
+
+import numpy as np
+
+from errors import InvalidColumnarMetadataError
+from vector_databases.jsonification import (
+    format_json_memory_data_for_python,
+    format_python_memory_data_for_json,
+)
+
+COLUMNAR_METADATA_MAGIC = b"RPGMEMCL"
+COLUMNAR_METADATA_VERSION = 1
+COLUMNAR_METADATA_HEADER_FORMAT = "<8sIIQQ"
+COLUMNAR_METADATA_HEADER_SIZE = struct.calcsize(COLUMNAR_METADATA_HEADER_FORMAT)
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def get_columnar_metadata_full_path(database_json_full_path: str) -> str:
+    """Determines where the columnar metadata of a vector database is stored, given the path to its json file.
+
+    Args:
+        database_json_full_path (str): the full path to the json file of the vector database.
+
+    Returns:
+        str: the full path to the columnar metadata file.
+    """
+    return f"{os.path.splitext(database_json_full_path)[0]}.cols"
+
+
+def convert_datetime_to_epoch_microseconds(timestamp: datetime) -> int:
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return (timestamp - EPOCH) // timedelta(microseconds=1)
+
+
+def convert_epoch_microseconds_to_datetime(microseconds: int) -> datetime:
+    return EPOCH + timedelta(microseconds=int(microseconds))
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) // 8 * 8
+
+
+def _determine_column_offsets(number_of_entries: int):
+    importance_offset = _align(COLUMNAR_METADATA_HEADER_SIZE)
+    recency_offset = _align(importance_offset + 4 * number_of_entries)
+    creation_timestamp_offset = _align(recency_offset + 4 * number_of_entries)
+    access_timestamp_offset = creation_timestamp_offset + 8 * number_of_entries
+    description_offsets_offset = access_timestamp_offset + 8 * number_of_entries
+    blob_offset = description_offsets_offset + 8 * (number_of_entries + 1)
+
+    return (
+        importance_offset,
+        recency_offset,
+        creation_timestamp_offset,
+        access_timestamp_offset,
+        description_offsets_offset,
+        blob_offset,
+    )
+
+
+def write_columnar_memory_metadata(columnar_metadata_full_path: str, raw_data: dict):
+    """Writes the raw data of a vector database (in either json or python format) to a columnar metadata file.
+    The file is replaced atomically.
+
+    Args:
+        columnar_metadata_full_path (str): the full path to the columnar metadata file.
+        raw_data (dict): the raw data of the vector database, keyed by the stringified ids of the index.
+    """
+    raw_data = format_json_memory_data_for_python(
+        format_python_memory_data_for_json(
+            {str(key): entry for key, entry in raw_data.items()}
+        )
+    )
+
+    number_of_entries = len(raw_data)
+
+    importances = np.zeros(number_of_entries, dtype="<f4")
+    recencies = np.zeros(number_of_entries, dtype="<f4")
+    creation_timestamps = np.zeros(number_of_entries, dtype="<i8")
+    access_timestamps = np.zeros(number_of_entries, dtype="<i8")
+    encoded_descriptions = [b""] * number_of_entries
+
+    for key, entry in raw_data.items():
+        position = int(key)
+
+        importances[position] = entry["importance"]
+        recencies[position] = entry["recency"]
+        creation_timestamps[position] = convert_datetime_to_epoch_microseconds(
+            entry["creation_timestamp"]
+        )
+        access_timestamps[position] = convert_datetime_to_epoch_microseconds(
+            entry["most_recent_access_timestamp"]
+        )
+        encoded_descriptions[position] = entry["description"].encode("utf-8")
+
+    description_offsets = np.zeros(number_of_entries + 1, dtype="<i8")
+    description_offsets[1:] = np.cumsum(
+        [len(encoded_description) for encoded_description in encoded_descriptions]
+    )
+
+    offsets = _determine_column_offsets(number_of_entries)
+
+    temporary_full_path = f"{columnar_metadata_full_path}.tmp"
+
+    with open(temporary_full_path, "wb") as file:
+        file.write(
+            struct.pack(
+                COLUMNAR_METADATA_HEADER_FORMAT,
+                COLUMNAR_METADATA_MAGIC,
+                COLUMNAR_METADATA_VERSION,
+                0,
+                number_of_entries,
+                int(description_offsets[-1]),
+            )
+        )
+
+        for offset, column in zip(
+            offsets,
+            [
+                importances,
+                recencies,
+                creation_timestamps,
+                access_timestamps,
+                description_offsets,
+            ],
+        ):
+            file.write(b"\0" * (offset - file.tell()))
+            file.write(column.tobytes())
+
+        file.write(b"".join(encoded_descriptions))
+
+    os.replace(temporary_full_path, columnar_metadata_full_path)
+
+
+class ColumnarMemoryMetadata(Mapping):
+    """The memory-mapped content of a columnar metadata file. It can be read like the raw data loaded from the json file
+    (a mapping of stringified ids to dicts with python timestamps), and it also exposes the columns directly.
+    """
+
+    def __init__(self, columnar_metadata_full_path: str):
+        """Memory-maps a columnar metadata file.
+
+        Args:
+            columnar_metadata_full_path (str): the full path to the columnar metadata file.
+
+        Raises:
+            InvalidColumnarMetadataError: if the file isn't a columnar metadata file of a supported version.
+        """
+        self._columnar_metadata_full_path = columnar_metadata_full_path
+
+        self._memory_map = np.memmap(columnar_metadata_full_path, dtype=np.uint8, mode="r+")
+
+        if len(self._memory_map) < COLUMNAR_METADATA_HEADER_SIZE:
+            raise InvalidColumnarMetadataError(
+                f"The file '{columnar_metadata_full_path}' is too small to be a columnar metadata file."
+            )
+
+        magic, version, _, number_of_entries, blob_size = struct.unpack(
+            COLUMNAR_METADATA_HEADER_FORMAT,
+            self._memory_map[:COLUMNAR_METADATA_HEADER_SIZE].tobytes(),
+        )
+
+        if magic != COLUMNAR_METADATA_MAGIC:
+            raise InvalidColumnarMetadataError(
+                f"The file '{columnar_metadata_full_path}' isn't a columnar metadata file."
+            )
+        if version != COLUMNAR_METADATA_VERSION:
+            raise InvalidColumnarMetadataError(
+                f"The columnar metadata file '{columnar_metadata_full_path}' has the unsupported version {version}."
+            )
+
+        (
+            importance_offset,
+            recency_offset,
+            creation_timestamp_offset,
+            access_timestamp_offset,
+            description_offsets_offset,
+            blob_offset,
+        ) = _determine_column_offsets(number_of_entries)
+
+        if len(self._memory_map) != blob_offset + blob_size:
+            raise InvalidColumnarMetadataError(
+                f"The columnar metadata file '{columnar_metadata_full_path}' is truncated or corrupted."
+            )
+
+        self._number_of_entries = number_of_entries
+
+        self._importances = self._view(importance_offset, "<f4", number_of_entries)
+        self._recencies = self._view(recency_offset, "<f4", number_of_entries)
+        self._creation_timestamps = self._view(
+            creation_timestamp_offset, "<i8", number_of_entries
+        )
+        self._access_timestamps = self._view(
+            access_timestamp_offset, "<i8", number_of_entries
+        )
+        self._description_offsets = self._view(
+            description_offsets_offset, "<i8", number_of_entries + 1
+        )
+        self._blob = self._memory_map[blob_offset:]
+
+    def _view(self, offset: int, dtype: str, length: int) -> np.ndarray:
+        end = offset + np.dtype(dtype).itemsize * length
+
+        return self._memory_map[offset:end].view(dtype)
+
+    def __len__(self) -> int:
+        return self._number_of_entries
+
+    def __iter__(self) -> Iterator[str]:
+        return (str(position) for position in range(self._number_of_entries))
+
+    def __getitem__(self, key: str) -> dict:
+        position = self._determine_position(key)
+
+        return {
+            "description": self.get_description(position),
+            "creation_timestamp": convert_epoch_microseconds_to_datetime(
+                self._creation_timestamps[position]
+            ),
+            "most_recent_access_timestamp": convert_epoch_microseconds_to_datetime(
+                self._access_timestamps[position]
+            ),
+            "recency": float(self._recencies[position]),
+            "importance": float(self._importances[position]),
+        }
+
+    def _determine_position(self, key: str) -> int:
+        try:
+            position = int(key)
+        except (TypeError, ValueError) as exception:
+            raise KeyError(key) from exception
+
+        if not 0 <= position < self._number_of_entries:
+            raise KeyError(key)
+
+        return position
+
+    def get_description(self, position: int) -> str:
+        start = self._description_offsets[position]
+        end = self._description_offsets[position + 1]
+
+        return self._blob[start:end].tobytes().decode("utf-8")
+
+    def get_recencies(self) -> np.ndarray:
+        return self._recencies
+
+    def get_importances(self) -> np.ndarray:
+        return self._importances
+
+    def set_access(self, key: str, recency: float, most_recent_access_timestamp: datetime):
+        """Updates, in place, the recency and the most recent access timestamp of an entry.
+
+        Args:
+            key (str): the stringified id of the entry.
+            recency (float): the new recency of the entry.
+            most_recent_access_timestamp (datetime): the new most recent access timestamp of the entry.
+        """
+        position = self._determine_position(key)
+
+        self._recencies[position] = recency
+        self._access_timestamps[position] = convert_datetime_to_epoch_microseconds(
+            most_recent_access_timestamp
+        )
+
+    def flush(self):
+        """Writes to disk the changes made in place."""
+        self._memory_map.flush()
+
+    def to_json_raw_data(self) -> dict:
+        """Exports the metadata in the same format as the content of the json file.
+
+        Returns:
+            dict: the raw data in json format.
+        """
+        return format_python_memory_data_for_json(dict(self.items()))
+
+
+def import_json_memories_to_columnar_metadata(
+    database_json_full_path: str, columnar_metadata_full_path: str
+):
+    """Converts the json file of a vector database into a columnar metadata file.
+
+    Args:
+        database_json_full_path (str): the full path to the json file.
+        columnar_metadata_full_path (str): the full path to the columnar metadata file that will be written.
+    """
+    with open(database_json_full_path, "r", encoding="utf8") as json_file:
+        write_columnar_memory_metadata(columnar_metadata_full_path, json.load(json_file))
+
+
+def export_columnar_metadata_to_json_memories(
+    columnar_metadata_full_path: str, database_json_full_path: str
+):
+    """Converts a columnar metadata file back into the json file of a vector database.
+
+    Args:
+        columnar_metadata_full_path (str): the full path to the columnar metadata file.
+        database_json_full_path (str): the full path to the json file that will be written.
+    """
+    temporary_full_path = f"{database_json_full_path}.tmp"
+
+    with open(temporary_full_path, "w", encoding="utf8") as json_file:
+        json.dump(
+            ColumnarMemoryMetadata(columnar_metadata_full_path).to_json_raw_data(),
+            json_file,
+        )
+
+    os.replace(temporary_full_path, database_json_full_path)
+
+
+def is_columnar_metadata_current(database_json_full_path: str) -> bool:
+    """Determines whether a vector database has a columnar metadata file that is at least as recent as its json file.
+
+    Args:
+        database_json_full_path (str): the full path to the json file of the vector database.
+
+    Returns:
+        bool: whether the columnar metadata file exists and no json file has been written after it.
+    """
+    columnar_metadata_full_path = get_columnar_metadata_full_path(
+        database_json_full_path
+    )
+
+    if not os.path.isfile(columnar_metadata_full_path):
+        return False
+    if not os.path.isfile(database_json_full_path):
+        return True
+
+    return (
+        os.stat(columnar_metadata_full_path).st_mtime_ns
+        >= os.stat(database_json_full_path).st_mtime_ns
+    )
+
+
+def load_columnar_memory_metadata(database_json_full_path: str) -> ColumnarMemoryMetadata:
+    """Loads the columnar metadata of a vector database, importing the json file first if it's more recent.
+
+    Args:
+        database_json_full_path (str): the full path to the json file of the vector database.
+
+    Returns:
+        ColumnarMemoryMetadata: the memory-mapped metadata.
+    """
+    columnar_metadata_full_path = get_columnar_metadata_full_path(
+        database_json_full_path
+    )
+
+    if not is_columnar_metadata_current(database_json_full_path):
+        import_json_memories_to_columnar_metadata(
+            database_json_full_path, columnar_metadata_full_path
+        )
+
+    return ColumnarMemoryMetadata(columnar_metadata_full_path)
+
+
+def synchronize_json_memories_with_columnar_metadata(database_json_full_path: str):
+    """Makes sure that the json file of a vector database contains any change made in place to its
+    columnar metadata, so that the json file can be safely extended.
+
+    Args:
+        database_json_full_path (str): the full path to the json file of the vector database.
+    """
+    if is_columnar_metadata_current(database_json_full_path):
+        export_columnar_metadata_to_json_memories(
+            get_columnar_metadata_full_path(database_json_full_path),
+            database_json_full_path,
+        )
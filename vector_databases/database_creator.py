@@ -4,9 +4,11 @@ from datetime import datetime
 import os
 from typing import List
 
-from annoy import AnnoyIndex
-from defines.defines import METRIC_ANGULAR, VECTOR_DIMENSIONS
+from defines.defines import EMBEDDING_BATCH_SIZE
+from llms.interface import AIModelInterface
+from vector_databases.incremental_index import remove_delta_segment
 from vector_databases.saving import save_memories
+from vector_databases.vector_index_policy import create_vector_index
 
 from string_utils import end_string_with_period
 
@@ -14,6 +16,29 @@ from string_utils import end_string_with_period
 class DatabaseCreator:
     """Handles the creation of a vector database (vector database and json file) based on a seed file."""
 
+    def __init__(
+        self,
+        embedding_batch_size: int = EMBEDDING_BATCH_SIZE,
+        importance_judge: AIModelInterface | None = None,
+    ):
+        """Creates an instance of the class DatabaseCreator.
+
+        Args:
+            embedding_batch_size (int): how many seeds the embedding model will encode at once.
+            importance_judge (AIModelInterface | None): the AI model that rates the importance of the seeds.
+                If None, GPT is used.
+
+        Raises:
+            ValueError: if 'embedding_batch_size' isn't greater than zero.
+        """
+        if not embedding_batch_size > 0:
+            raise ValueError(
+                f"The class {DatabaseCreator.__name__} expected 'embedding_batch_size' to be greater than zero, but it was: {embedding_batch_size}"
+            )
+
+        self._embedding_batch_size = embedding_batch_size
+        self._importance_judge = importance_judge
+
     def create_database(
         self,
         database_name: str,
@@ -83,9 +108,13 @@ class DatabaseCreator:
             seed_memories (list[str]): A list of seed memories.
 
         Raises:
-            Any exceptions raised by save_memories() or AnnoyIndex.
+            Any exceptions raised by save_memories() or the vector index.
         """
-        new_index = AnnoyIndex(VECTOR_DIMENSIONS, METRIC_ANGULAR)
+        # The backend of the vector index depends on how many memories it will hold.
+        new_index = create_vector_index(len(seed_memories))
+
+        # A leftover delta segment would belong to a previous incarnation of this database.
+        remove_delta_segment(base_memories_full_path)
 
         try:
             save_memories(
@@ -94,7 +123,9 @@ class DatabaseCreator:
                 new_index,
                 base_memories_full_path,
                 base_memories_json_full_path,
+                self._embedding_batch_size,
+                self._importance_judge,
             )
         finally:
-            # always make sure to unload the AnnoyIndex, even if an exception was raised.
+            # always make sure to unload the vector index, even if an exception was raised.
             new_index.unload()
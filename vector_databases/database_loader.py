@@ -1,8 +1,16 @@
 import json
-from annoy import AnnoyIndex
-from defines.defines import METRIC_ANGULAR, VECTOR_DIMENSIONS
+import os
+from vector_databases.columnar_metadata import (
+    get_columnar_metadata_full_path,
+    load_columnar_memory_metadata,
+)
+from vector_databases.incremental_index import (
+    IncrementalIndex,
+    get_delta_segment_full_path,
+)
 from vector_databases.jsonification import format_json_memory_data_for_python
 from vector_databases.validation import ensure_parity_between_databases
+from vector_databases.vector_index_policy import load_vector_index
 
 
 class DatabaseLoader:
@@ -19,17 +27,33 @@ class DatabaseLoader:
             FileNotFoundError: if the vector database doesn't exist.
 
         Returns:
-            AnnoyIndex, dict: the AnnoyIndex with the content of the vector database, along with the paired data in json format.
+            IncrementalIndex, dict: the index with the content of the vector database (including the entries
+                appended since the vector index was last built), along with the paired data. If the vector database
+                has columnar metadata, the paired data is a ColumnarMemoryMetadata, which can be read like a dict.
         """
-        index = AnnoyIndex(VECTOR_DIMENSIONS, METRIC_ANGULAR)
-
         try:
-            index.load(self._database_full_path)
+            index = load_vector_index(self._database_full_path)
         except OSError as exception:
             raise FileNotFoundError(
                 f"Failed to load the index of a vector database because the file doesn't seem to exist. The filename is '{self._database_full_path}'. Error: {exception}"
             ) from exception
 
+        index = IncrementalIndex(
+            index, get_delta_segment_full_path(self._database_full_path)
+        )
+
+        # Vector databases that have been converted to columnar metadata don't need their json file parsed.
+        if os.path.isfile(
+            get_columnar_metadata_full_path(self._database_json_full_path)
+        ):
+            memories_raw_data = load_columnar_memory_metadata(
+                self._database_json_full_path
+            )
+
+            ensure_parity_between_databases(memories_raw_data, index)
+
+            return index, memories_raw_data
+
         with open(self._database_json_full_path, "r", encoding="utf8") as json_file:
             memories_raw_data = json.load(json_file)
 
@@ -2,12 +2,15 @@
 """
 from datetime import datetime
 from typing import List, Tuple
-from annoy import AnnoyIndex
+import numpy as np
 
-from defines.defines import MODEL, NUMBER_OF_BASE_RESULTS_FOR_EVERY_QUERY
-from math_utils import calculate_score
+from defines.defines import NUMBER_OF_BASE_RESULTS_FOR_EVERY_QUERY
+from embeddings.embedding_provider import EMBEDDING_PROVIDER
+from math_utils import calculate_score, select_indexes_of_top_values
 from vector_databases.database_entry import DatabaseEntry
 from vector_databases.database_updater import DatabaseUpdater
+from vector_databases.scoring_columns import ScoringColumns
+from vector_databases.vector_index import VectorIndex
 
 
 class DatabaseQuerier:
@@ -17,20 +20,25 @@ class DatabaseQuerier:
         self,
         current_timestamp: datetime,
         raw_data: dict,
-        index: AnnoyIndex,
+        index: VectorIndex,
         database_full_path: str,
         database_json_full_path: str,
         database_updater: DatabaseUpdater,
+        scoring_columns: ScoringColumns | None = None,
+        number_of_base_results: int = NUMBER_OF_BASE_RESULTS_FOR_EVERY_QUERY,
     ):
         """Initializes an instance of the DatabaseQuerier class.
 
         Args:
             current_timestamp (datetime): the current timestamp.
             raw_data (dict): the raw data of the vector database (the content of the json file).
-            index (AnnoyIndex): the index of the vector database.
+            index (VectorIndex): the index of the vector database.
             database_full_path (str): the full path to the 'ann' file of the vector database.
             database_json_full_path (str): the full path to the 'json' file of the vector database.
             database_updater (DatabaseUpdater): the class responsible for updating the vector database.
+            scoring_columns (ScoringColumns | None): the recency and importance of every entry, aligned to the ids
+                of the index. If they aren't passed (or they are out of date), they get built from the raw data.
+            number_of_base_results (int): how many nearest neighbors get scored for every query.
         """
         self._current_timestamp = current_timestamp
         self._raw_data = raw_data
@@ -38,71 +46,143 @@ class DatabaseQuerier:
         self._database_full_path = database_full_path
         self._database_json_full_path = database_json_full_path
         self._database_updater = database_updater
+        self._number_of_base_results = number_of_base_results
+
+        if (
+            scoring_columns is None
+            or scoring_columns.get_number_of_entries() != len(raw_data)
+        ):
+            scoring_columns = ScoringColumns.from_raw_data(raw_data)
+
+        self._scoring_columns = scoring_columns
 
     def query(self, query: str, number_of_results: int) -> List[str]:
         """Queries the vector database for the passed query.
         It also updates the recent access timestamps for the returned results.
-        Note: this function doesn't close the corresponding AnnoyIndex.
+        Note: this function doesn't close the corresponding vector index.
 
 
         Args:
             query (str): the text with which the database will be queried.
             number_of_results (int): how many relevant results will be return.
         """
-        if not isinstance(query, str):
+        return [
+            description
+            for description, _ in self.query_with_scores(query, number_of_results)
+        ]
+
+    def query_with_scores(
+        self, query: str, number_of_results: int
+    ) -> List[Tuple[str, float]]:
+        """Queries the vector database for the passed query, returning the results along with their scores,
+        so that the caller can weigh them against results of other queries.
+        It also updates the recent access timestamps for the returned results.
+
+        Args:
+            query (str): the text with which the database will be queried.
+            number_of_results (int): how many relevant results will be return.
+
+        Returns:
+            List[Tuple[str, float]]: the descriptions of the results along with their scores,
+                in descending order of scores.
+        """
+        return self.query_many_with_scores([query], number_of_results)[0]
+
+    def query_many_with_scores(
+        self, queries: List[str], number_of_results: int
+    ) -> List[List[Tuple[str, float]]]:
+        """Queries the vector database for several independent queries at once. All the queries get encoded
+        in a single call to the embedding model, and the recent access timestamps of all their results
+        get updated together. Every query is scored against the state of the database before any of them.
+
+        Args:
+            queries (List[str]): the texts with which the database will be queried.
+            number_of_results (int): how many relevant results will be returned for every query.
+
+        Returns:
+            List[List[Tuple[str, float]]]: for every query, in the same order, the descriptions of its results
+                along with their scores, in descending order of scores.
+        """
+        if not isinstance(queries, list) or not all(
+            isinstance(query, str) for query in queries
+        ):
             raise TypeError(
-                f"The function {self.query.__name__} expected 'query' to be a string. It was: {query}"
+                f"The function {self.query_many_with_scores.__name__} expected 'queries' to be a list of strings. It was: {queries}"
             )
         if not isinstance(number_of_results, int):
             raise TypeError(
-                f"The function {self.query.__name__} expected 'number_of_results' to be an int. It was: {number_of_results}"
+                f"The function {self.query_many_with_scores.__name__} expected 'number_of_results' to be an int. It was: {number_of_results}"
             )
         if not number_of_results > 0:
             raise ValueError(
-                f"The function {self.query.__name__} expected 'number_of_results' to be greater than zero, but it was: {number_of_results}"
+                f"The function {self.query_many_with_scores.__name__} expected 'number_of_results' to be greater than zero, but it was: {number_of_results}"
             )
 
-        # Get nearest neighbors from the Annoy index
-        nearest_neighbors = self._index.get_nns_by_vector(
-            MODEL.encode(query),
-            NUMBER_OF_BASE_RESULTS_FOR_EVERY_QUERY,
-            include_distances=True,
-        )
+        if not queries:
+            return []
 
-        # Calculate the custom scores
-        scores = self._calculate_custom_scores_of_query_results(nearest_neighbors)
+        # Encode every query in a single batch.
+        query_vectors = EMBEDDING_PROVIDER.encode(queries)
 
-        # Sort the results by the custom scores in descending order
-        scores = sorted(scores, key=lambda x: x[1], reverse=True)
+        scores_of_queries = []
 
-        # limit the scores to those we are going to return
-        scores = scores[:number_of_results]
+        for query_vector in query_vectors:
+            # Get nearest neighbors from the vector index
+            nearest_neighbors = self._index.get_nns_by_vector(
+                query_vector,
+                self._number_of_base_results,
+                include_distances=True,
+            )
+
+            # Calculate the custom scores, and keep only those we are going to return,
+            # ordered by descending order of scores.
+            scores_of_queries.append(
+                self._calculate_custom_scores_of_query_results(
+                    nearest_neighbors, number_of_results
+                )
+            )
 
-        # Now that we have determined a subset of scores to return (those ordered
-        # by descending order of scores, we must update their most recent access timestamps.)
-        self._database_updater.update_most_recent_access_timestamps(
-            scores, self._index, self._raw_data
+        # Now that we have determined a subset of scores to return, we must update their most recent access timestamps.
+        accesses = self._database_updater.update_most_recent_access_timestamps(
+            [entry for scores in scores_of_queries for entry in scores],
+            self._index,
+            self._raw_data,
         )
 
-        return [f"{entry[0].get_description()}" for entry in scores]
+        self._scoring_columns.update_recencies(accesses)
+
+        return [
+            [(f"{entry.get_description()}", score) for entry, score in scores]
+            for scores in scores_of_queries
+        ]
 
     def _calculate_custom_scores_of_query_results(
-        self, nearest_neighbors: List[int]
+        self, nearest_neighbors: Tuple[List[int], List[float]], number_of_results: int
     ) -> List[Tuple[DatabaseEntry, float]]:
-        """Calculates the custom scores of a list of data returned from the vector database.
+        """Calculates the custom scores of a list of data returned from the vector database,
+        all at once, and selects the best ones.
+
+        Args:
+            nearest_neighbors (Tuple[List[int], List[float]]): the ids of the nearest neighbors, along with their distances.
+            number_of_results (int): how many of the best scored results will be returned.
 
         Returns:
-            List[Tuple[DatabaseEntry, float]]: a list containing tuples of DatabaseEntry along with its score.
+            List[Tuple[DatabaseEntry, float]]: a list containing tuples of DatabaseEntry along with its score,
+                in descending order of scores.
         """
-        scores = []
+        ids = np.asarray(nearest_neighbors[0], dtype=np.int64)
+        relevances = 1 - np.asarray(nearest_neighbors[1], dtype=np.float64)
 
-        for idx, distance in zip(nearest_neighbors[0], nearest_neighbors[1]):
-            database_entry = DatabaseEntry(idx, self._raw_data[str(idx)])
-
-            relevance = 1 - distance
-            recency = database_entry.get_recency()
-            importance = database_entry.get_importance()
-            score = calculate_score(relevance, recency, importance)
-            scores.append((database_entry, score))
+        scores = calculate_score(
+            relevances,
+            self._scoring_columns.get_recencies()[ids],
+            self._scoring_columns.get_importances()[ids],
+        )
 
-        return scores
+        return [
+            (
+                DatabaseEntry(int(ids[position]), self._raw_data[str(ids[position])]),
+                float(scores[position]),
+            )
+            for position in select_indexes_of_top_values(scores, number_of_results)
+        ]
@@ -1,15 +1,26 @@
 from datetime import datetime
-from typing import List, Tuple
-from annoy import AnnoyIndex
+from typing import Dict, List, Tuple
 
-from defines.defines import DECAY_RATE, METRIC_ANGULAR, VECTOR_DIMENSIONS
+from defines.defines import DECAY_RATE, DELTA_SEGMENT_COMPACTION_THRESHOLD
+from llms.interface import AIModelInterface
 from math_utils import calculate_recency
+from vector_databases.access_timestamps_buffer import ACCESS_TIMESTAMPS_BUFFER
+from vector_databases.columnar_metadata import (
+    synchronize_json_memories_with_columnar_metadata,
+)
 from vector_databases.database_entry import DatabaseEntry
-from vector_databases.jsonification import format_python_memory_data_for_json
+from vector_databases.incremental_index import (
+    IncrementalIndex,
+    remove_delta_segment,
+)
+from vector_databases.jsonification import append_to_previous_json_memories_if_necessary
 from vector_databases.saving import (
     save_memories,
     save_memories_to_json_file_ensuring_parity,
 )
+from vector_databases.vector_index import VectorIndex
+from vector_databases.vector_index_policy import build_compacted_vector_index
+from vector_databases.vectorization import create_vectorized_memories
 
 
 class DatabaseUpdater:
@@ -20,19 +31,78 @@ class DatabaseUpdater:
         current_timestamp: datetime,
         database_full_path: str,
         database_json_full_path: str,
+        delta_segment_compaction_threshold: int = DELTA_SEGMENT_COMPACTION_THRESHOLD,
+        importance_judge: AIModelInterface | None = None,
     ):
+        """Creates an instance of the class DatabaseUpdater.
+
+        Args:
+            current_timestamp (datetime): the current timestamp.
+            database_full_path (str): the full path to the 'ann' file of the vector database.
+            database_json_full_path (str): the full path to the 'json' file of the vector database.
+            delta_segment_compaction_threshold (int): how many entries the delta segment can hold
+                before the whole vector index gets rebuilt.
+            importance_judge (AIModelInterface | None): the AI model that rates the importance of the new entries.
+                If None, GPT is used.
+        """
         self._current_timestamp = current_timestamp
         self._database_full_path = database_full_path
         self._database_json_full_path = database_json_full_path
+        self._delta_segment_compaction_threshold = delta_segment_compaction_threshold
+        self._importance_judge = importance_judge
 
     def update_database_with_new_entries(
-        self, new_entries: list[str], index: AnnoyIndex
+        self, new_entries: list[str], index: IncrementalIndex | VectorIndex
     ):
-        """Updates the corresponding vector and json databases with the new entries."""
-        new_index = AnnoyIndex(VECTOR_DIMENSIONS, METRIC_ANGULAR)
+        """Updates the corresponding vector and json databases with the new entries.
+        As long as the delta segment of the index has room for them, the new entries are appended to it
+        without touching the vector index. Otherwise, every entry gets compacted into a rebuilt vector index.
 
-        for i in range(index.get_n_items()):
-            new_index.add_item(i, index.get_item_vector(i))
+        Args:
+            new_entries (list[str]): the descriptions of the new entries.
+            index (IncrementalIndex | VectorIndex): the loaded index of the vector database.
+        """
+        # The new entries get appended to what's on disk, so any buffered access update must be written first,
+        # and the json file must contain the changes made in place to the columnar metadata (if any).
+        # The columnar metadata gets imported again from the extended json file the next time it's loaded.
+        self.flush()
+        synchronize_json_memories_with_columnar_metadata(self._database_json_full_path)
+
+        if (
+            isinstance(index, IncrementalIndex)
+            and index.get_delta_n_items() + len(new_entries)
+            <= self._delta_segment_compaction_threshold
+        ):
+            self._append_to_delta_segment(new_entries, index)
+        else:
+            self._rebuild_index_with_new_entries(new_entries, index)
+
+    def _append_to_delta_segment(
+        self, new_entries: list[str], index: IncrementalIndex
+    ):
+        memories = create_vectorized_memories(
+            new_entries,
+            self._current_timestamp,
+            index,
+            importance_judge=self._importance_judge,
+        )
+
+        index.save_delta_segment()
+
+        memories = append_to_previous_json_memories_if_necessary(
+            self._database_json_full_path, memories
+        )
+
+        save_memories_to_json_file_ensuring_parity(
+            self._database_json_full_path, memories, index
+        )
+
+    def _rebuild_index_with_new_entries(
+        self, new_entries: list[str], index: IncrementalIndex | VectorIndex
+    ):
+        new_index = build_compacted_vector_index(
+            index, index.get_n_items() + len(new_entries)
+        )
 
         # Vital to unload the original index, which should free up the database file.
         index.unload()
@@ -44,43 +114,53 @@ class DatabaseUpdater:
                 new_index,
                 self._database_full_path,
                 self._database_json_full_path,
+                importance_judge=self._importance_judge,
             )
+
+            # The entries of the delta segment are now part of the rebuilt vector index.
+            remove_delta_segment(self._database_full_path)
         finally:
             new_index.unload()
 
     def update_most_recent_access_timestamps(
         self,
         scores: List[Tuple[DatabaseEntry, float]],
-        index: AnnoyIndex,
+        index: VectorIndex,
         raw_data: dict,
-    ):
+    ) -> Dict[str, Tuple[float, datetime]]:
         """Updates the most recent access timestamps of query results.
-        Note: it does not close the AnnoyIndex, because this is part of a repeatable query operation.
+        The raw data is updated in memory right away, but writing it to the json file is deferred
+        to the access timestamps buffer, which batches the writes of many queries together.
+        Note: it does not close the vector index, because this is part of a repeatable query operation.
 
         Args:
             scores (List[Tuple[DatabaseEntry, float]]): a scored and ordered list of relevant results of a query.
+            index (VectorIndex): the index of the vector database.
             raw_data (dict): the entire raw data of the corresponding vector database.
 
         Returns:
-            dict: the data in raw data format, with updated 'most_recent_access_timestamp' and 'recency' values.
+            Dict[str, Tuple[float, datetime]]: the new recency and most recent access timestamp, keyed by entry.
         """
 
-        # Update the 'most_recent_access_timestamp' as well as the 'recency' values of each entry
-        for database_entry, _ in scores:
-            raw_data[str(database_entry.get_index())]["recency"] = calculate_recency(
+        # Determine the new 'most_recent_access_timestamp' as well as the 'recency' values of each entry
+        accesses = {
+            str(database_entry.get_index()): (
+                calculate_recency(
+                    self._current_timestamp,
+                    database_entry.get_most_recent_access_timestamp(),
+                    DECAY_RATE,
+                ),
                 self._current_timestamp,
-                database_entry.get_most_recent_access_timestamp(),
-                DECAY_RATE,
             )
+            for database_entry, _ in scores
+        }
 
-            raw_data[str(database_entry.get_index())][
-                "most_recent_access_timestamp"
-            ] = self._current_timestamp.isoformat()
+        ACCESS_TIMESTAMPS_BUFFER.record_accesses(
+            self._database_json_full_path, raw_data, index.get_n_items(), accesses
+        )
 
-        # After we have modified the most 'recent_access_timestamp' values, we have to ensure
-        # that we format the _raw_data into jsonificable values (meaning that we turn the dates into text.)
-        raw_data = format_python_memory_data_for_json(raw_data)
+        return accesses
 
-        save_memories_to_json_file_ensuring_parity(
-            self._database_json_full_path, raw_data, index
-        )
+    def flush(self):
+        """Writes to disk any buffered update of the most recent access timestamps of this vector database."""
+        ACCESS_TIMESTAMPS_BUFFER.flush(self._database_json_full_path)
@@ -0,0 +1,143 @@
+"""This module contains the definition of ExactVectorIndex, a backend of the vector databases that searches
+exhaustively through a matrix of normalized vectors, so that every query is a single matrix-vector product.
+For small stores it's both faster and more accurate than building trees, and adding an entry costs nothing.
+"""
+import os
+from typing import List, Tuple
+
+import numpy as np
+
+from defines.defines import VECTOR_DIMENSIONS
+from math_utils import select_indexes_of_top_values
+from vector_databases.vector_index import VectorIndex
+
+NUMPY_FILE_MAGIC = b"\x93NUMPY"
+
+
+def normalize_vectors(vectors: np.ndarray) -> np.ndarray:
+    """Scales every row of a matrix to unit length. Rows of zeros stay as they are.
+
+    Args:
+        vectors (np.ndarray): a matrix with one vector per row.
+
+    Returns:
+        np.ndarray: the matrix with every row normalized.
+    """
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+def calculate_angular_distances(
+    unit_vectors: np.ndarray, unit_vector: np.ndarray
+) -> np.ndarray:
+    """Calculates the angular distances between a normalized vector and every row of a matrix of normalized
+    vectors, in the same way that Annoy does for its 'angular' metric: sqrt(2 * (1 - cos(u, v))).
+
+    Args:
+        unit_vectors (np.ndarray): a matrix with one normalized vector per row.
+        unit_vector (np.ndarray): the normalized vector to compare against.
+
+    Returns:
+        np.ndarray: the angular distance to every row of the matrix.
+    """
+    cosines = unit_vectors @ unit_vector
+
+    return np.sqrt(np.maximum(2.0 - 2.0 * cosines, 0.0))
+
+
+class ExactVectorIndex(VectorIndex):
+    """Exact nearest neighbors search through a matrix with one vector per row. The distances are angular,
+    like those of an AnnoyIndex with the angular metric, so both backends can be used interchangeably.
+    """
+
+    def __init__(self, dimensions: int = VECTOR_DIMENSIONS):
+        self._dimensions = dimensions
+        self._vectors = np.empty((0, dimensions), dtype=np.float32)
+        # The rows normalized once, so that the queries don't need to calculate their norms again.
+        self._unit_vectors = np.empty((0, dimensions), dtype=np.float32)
+        self._pending_vectors = []
+
+    def _get_vectors(self) -> np.ndarray:
+        # Added vectors are stacked lazily, so that adding many items one by one doesn't copy the matrix every time.
+        if self._pending_vectors:
+            pending_vectors = np.stack(self._pending_vectors)
+
+            self._vectors = np.vstack([self._vectors, pending_vectors])
+            self._unit_vectors = np.vstack(
+                [self._unit_vectors, normalize_vectors(pending_vectors)]
+            )
+            self._pending_vectors = []
+
+        return self._vectors
+
+    def add_item(self, i: int, vector):
+        """Adds an item to the index. The ids must be assigned in sequence.
+
+        Args:
+            i (int): the id of the new item, which must be the current number of items.
+            vector (list or np.ndarray): the vector of the new item.
+
+        Raises:
+            ValueError: if the id isn't the next one in sequence.
+        """
+        if i != self.get_n_items():
+            raise ValueError(
+                f"The class {ExactVectorIndex.__name__} can only add items in sequence. Expected the id {self.get_n_items()}, but got {i}"
+            )
+
+        self._pending_vectors.append(np.asarray(vector, dtype=np.float32))
+
+    def build(self, n_trees: int):
+        # There are no trees to build: the search is exhaustive.
+        self._get_vectors()
+
+    def save(self, full_path: str):
+        """Saves the matrix of vectors in NumPy's format, replacing the previous file atomically.
+
+        Args:
+            full_path (str): the full path to the file.
+        """
+        temporary_full_path = f"{full_path}.tmp"
+
+        with open(temporary_full_path, "wb") as file:
+            np.save(file, self._get_vectors())
+
+        os.replace(temporary_full_path, full_path)
+
+    def load(self, full_path: str):
+        vectors = np.load(full_path).astype(np.float32)
+
+        # The saved matrix knows its own dimensions, even if it holds no vectors.
+        self._dimensions = vectors.shape[1] if vectors.ndim == 2 else self._dimensions
+        self._vectors = vectors.reshape(-1, self._dimensions)
+        self._unit_vectors = normalize_vectors(self._vectors)
+        self._pending_vectors = []
+
+    def unload(self):
+        self._vectors = np.empty((0, self._dimensions), dtype=np.float32)
+        self._unit_vectors = np.empty((0, self._dimensions), dtype=np.float32)
+        self._pending_vectors = []
+
+    def get_n_items(self) -> int:
+        return self._vectors.shape[0] + len(self._pending_vectors)
+
+    def get_item_vector(self, i: int) -> List[float]:
+        return self._get_vectors()[i].tolist()
+
+    def get_nns_by_vector(
+        self, vector, n: int, include_distances: bool = False
+    ) -> List[int] | Tuple[List[int], List[float]]:
+        self._get_vectors()
+
+        distances = calculate_angular_distances(
+            self._unit_vectors,
+            normalize_vectors(np.asarray(vector, dtype=np.float32).reshape(1, -1))[0],
+        )
+
+        ids = select_indexes_of_top_values(-distances, n)
+
+        if include_distances:
+            return ids.tolist(), distances[ids].tolist()
+
+        return ids.tolist()
@@ -0,0 +1,196 @@
+"""This module handles rating the importance of many memories at once, by asking the AI model
+to rate whole chunks of memories in a single function call, and sending those chunks concurrently.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import json
+from typing import Dict, List
+
+from defines.defines import (
+    GPT_3_5,
+    IMPORTANCE_RATING_CHUNK_SIZE,
+    MAX_CONCURRENT_IMPORTANCE_RATING_REQUESTS,
+)
+from enums.enums import RequestPriority
+from errors import FailedToReceiveFunctionCallFromAiModelError
+from llms.functions import append_function
+from llms.interface import AIModelInterface
+from llms.request_scheduler import request_priority
+from math_utils import normalize_value
+from vector_databases.jsonification import (
+    MEMORY_IMPORTANCE_JUDGE_GPT_SYSTEM_CONTENT,
+    MEMORY_IMPORTANCE_RATING_INSTRUCTIONS,
+    rate_importance_of_memory,
+)
+
+GET_IMPORTANCE_RATINGS_FOR_MEMORIES_FUNCTION_NAME = "get_importance_ratings_for_memories"
+GET_IMPORTANCE_RATINGS_FOR_MEMORIES_FUNCTION_DESCRIPTION = "Gets the importance rating, from 1 to 10, for each memory of a numbered list."
+RATINGS_PARAMETER_NAME = "ratings"
+RATINGS_PARAMETER_DESCRIPTION = "The rating from 1 to 10 of the importance of every memory, identified by its number in the list."
+
+
+def _request_importance_ratings_for_chunk(
+    memory_descriptions: List[str], ai_model_interface: AIModelInterface
+) -> Dict[int, int]:
+    """Asks the AI model to rate, in a single request, every memory in a chunk.
+
+    Args:
+        memory_descriptions (List[str]): the descriptions of the memories in the chunk.
+        ai_model_interface (AIModelInterface): the interface to request responses from the AI model.
+
+    Raises:
+        FailedToReceiveFunctionCallFromAiModelError: if the AI model didn't answer with the function call.
+
+    Returns:
+        Dict[int, int]: the ratings returned by the AI model, keyed by the position of the memory in the chunk.
+    """
+    messages = [
+        {"role": "system", "content": MEMORY_IMPORTANCE_JUDGE_GPT_SYSTEM_CONTENT}
+    ]
+
+    user_prompt = MEMORY_IMPORTANCE_RATING_INSTRUCTIONS
+    user_prompt += "of each of the following pieces of memory. Rate every memory, referring to it by its number.\n"
+    user_prompt += "\n".join(
+        f"{position}. {memory_description}"
+        for position, memory_description in enumerate(memory_descriptions)
+    )
+
+    messages.append({"role": "user", "content": user_prompt})
+
+    functions = []
+    append_function(
+        functions,
+        GET_IMPORTANCE_RATINGS_FOR_MEMORIES_FUNCTION_NAME,
+        GET_IMPORTANCE_RATINGS_FOR_MEMORIES_FUNCTION_DESCRIPTION,
+        [
+            {
+                "name": RATINGS_PARAMETER_NAME,
+                "type": "array",
+                "description": RATINGS_PARAMETER_DESCRIPTION,
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "index": {
+                            "type": "integer",
+                            "description": "The number of the memory in the list.",
+                        },
+                        "rating": {
+                            "type": "integer",
+                            "description": "A rating from 1 to 10 of the importance of the memory.",
+                        },
+                    },
+                    "required": ["index", "rating"],
+                },
+            }
+        ],
+    )
+
+    response = ai_model_interface.request_response_using_functions(
+        messages,
+        functions,
+        function_call={"name": GET_IMPORTANCE_RATINGS_FOR_MEMORIES_FUNCTION_NAME},
+        model=GPT_3_5,
+    )
+
+    message = response["choices"][0]["message"]
+
+    if not message.get("function_call"):
+        error_message = f"In the function {_request_importance_ratings_for_chunk.__name__}, I failed to receive the function call with the ratings from GPT: {message}"
+        raise FailedToReceiveFunctionCallFromAiModelError(error_message)
+
+    function_arguments = json.loads(message["function_call"]["arguments"])
+
+    ratings = {}
+
+    for rating in function_arguments.get(RATINGS_PARAMETER_NAME) or []:
+        if not isinstance(rating, dict):
+            continue
+
+        position = rating.get("index")
+        value = rating.get("rating")
+
+        # Anything malformed is ignored here; the affected memories get rated individually afterwards.
+        if (
+            isinstance(position, int)
+            and isinstance(value, int)
+            and 0 <= position < len(memory_descriptions)
+            and 1 <= value <= 10
+        ):
+            ratings[position] = value
+
+    return ratings
+
+
+def _rate_importance_of_chunk(
+    memory_descriptions: List[str], ai_model_interface: AIModelInterface
+) -> List[float]:
+    ratings = _request_importance_ratings_for_chunk(
+        memory_descriptions, ai_model_interface
+    )
+
+    return [
+        normalize_value(ratings[position])
+        if position in ratings
+        else rate_importance_of_memory(memory_description, ai_model_interface)
+        for position, memory_description in enumerate(memory_descriptions)
+    ]
+
+
+def _rate_importance_of_chunk_in_background(
+    memory_descriptions: List[str], ai_model_interface: AIModelInterface
+) -> List[float]:
+    # The priority is set in the worker thread itself, because threads don't inherit it.
+    with request_priority(RequestPriority.BACKGROUND):
+        return _rate_importance_of_chunk(memory_descriptions, ai_model_interface)
+
+
+def rate_importance_of_memories(
+    memory_descriptions: List[str],
+    ai_model_interface: AIModelInterface,
+    chunk_size: int = IMPORTANCE_RATING_CHUNK_SIZE,
+    max_concurrent_requests: int = MAX_CONCURRENT_IMPORTANCE_RATING_REQUESTS,
+) -> List[float]:
+    """Relies on the AI model to rate the importance of many memories. The memories are split into chunks
+    that get rated in a single request each, and the requests for different chunks are sent concurrently.
+    Any memory that the AI model fails to rate as part of its chunk gets rated on its own.
+
+    Args:
+        memory_descriptions (List[str]): the descriptions of the memories.
+        ai_model_interface (AIModelInterface): the interface to request responses from the AI model.
+        chunk_size (int): how many memories will be rated in a single request.
+        max_concurrent_requests (int): how many requests can be in flight at the same time.
+
+    Raises:
+        ValueError: if either 'chunk_size' or 'max_concurrent_requests' aren't greater than zero.
+
+    Returns:
+        List[float]: the normalized importance of every memory, in the same order as the descriptions.
+    """
+    if not chunk_size > 0:
+        raise ValueError(
+            f"The function {rate_importance_of_memories.__name__} expected 'chunk_size' to be greater than zero, but it was: {chunk_size}"
+        )
+    if not max_concurrent_requests > 0:
+        raise ValueError(
+            f"The function {rate_importance_of_memories.__name__} expected 'max_concurrent_requests' to be greater than zero, but it was: {max_concurrent_requests}"
+        )
+
+    chunks = []
+
+    for start in range(0, len(memory_descriptions), chunk_size):
+        end = start + chunk_size
+        chunks.append(memory_descriptions[start:end])
+
+    if not chunks:
+        return []
+
+    with ThreadPoolExecutor(
+        max_workers=min(max_concurrent_requests, len(chunks))
+    ) as executor:
+        rated_chunks = executor.map(
+            lambda chunk: _rate_importance_of_chunk_in_background(
+                chunk, ai_model_interface
+            ),
+            chunks,
+        )
+
+        return [importance for rated_chunk in rated_chunks for importance in rated_chunk]
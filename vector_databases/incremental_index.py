@@ -0,0 +1,132 @@
+"""This module contains the definition of IncrementalIndex, which pairs the built vector index of a vector database
+with a small, exhaustively searched delta segment. New entries go to the delta segment right away, so appending
+to a vector database doesn't require rebuilding the whole vector index every time.
+"""
+import os
+from typing import List, Tuple
+
+from vector_databases.exact_vector_index import ExactVectorIndex
+from vector_databases.vector_index import VectorIndex
+
+
+def get_delta_segment_full_path(database_full_path: str) -> str:
+    """Determines where the delta segment of a vector database is stored, given the path to its 'ann' file.
+
+    Args:
+        database_full_path (str): the full path to the 'ann' file of the vector database.
+
+    Returns:
+        str: the full path to the file of the delta segment.
+    """
+    return f"{os.path.splitext(database_full_path)[0]}.delta.npy"
+
+
+class IncrementalIndex:
+    """Behaves like a VectorIndex, but entries added after the base index was built live in a delta segment
+    that is searched exhaustively. The ids of the delta segment continue right after those of the base index.
+    """
+
+    def __init__(self, base_index: VectorIndex, delta_segment_full_path: str):
+        """Creates an instance of the class IncrementalIndex, loading the delta segment if it exists on disk.
+
+        Args:
+            base_index (VectorIndex): the built vector index of the vector database.
+            delta_segment_full_path (str): the full path to the file of the delta segment.
+        """
+        self._base_index = base_index
+        self._delta_segment_full_path = delta_segment_full_path
+
+        self._delta_index = ExactVectorIndex()
+
+        if os.path.isfile(delta_segment_full_path):
+            self._delta_index.load(delta_segment_full_path)
+
+    def get_base_index(self) -> VectorIndex:
+        return self._base_index
+
+    def get_delta_n_items(self) -> int:
+        return self._delta_index.get_n_items()
+
+    def get_n_items(self) -> int:
+        return self._base_index.get_n_items() + self.get_delta_n_items()
+
+    def get_item_vector(self, i: int) -> List[float]:
+        base_n_items = self._base_index.get_n_items()
+
+        if i < base_n_items:
+            return self._base_index.get_item_vector(i)
+
+        return self._delta_index.get_item_vector(i - base_n_items)
+
+    def add_item(self, i: int, vector):
+        """Adds an entry to the delta segment. The ids must be assigned in sequence.
+
+        Args:
+            i (int): the id of the new entry, which must be the current number of items.
+            vector (list or np.ndarray): the vector of the new entry.
+
+        Raises:
+            ValueError: if the id isn't the next one in sequence.
+        """
+        if i != self.get_n_items():
+            raise ValueError(
+                f"The class {IncrementalIndex.__name__} can only append items in sequence. Expected the id {self.get_n_items()}, but got {i}"
+            )
+
+        self._delta_index.add_item(self.get_delta_n_items(), vector)
+
+    def get_nns_by_vector(
+        self, vector, n: int, include_distances: bool = False
+    ) -> List[int] | Tuple[List[int], List[float]]:
+        """Returns the n closest items to a vector, merging the results of the base index and the delta segment.
+
+        Args:
+            vector (list or np.ndarray): the vector to search for.
+            n (int): how many items to return.
+            include_distances (bool): whether to also return the distances.
+
+        Returns:
+            List[int] | Tuple[List[int], List[float]]: the ids of the closest items, along with their distances if requested.
+        """
+        ids, distances = self._base_index.get_nns_by_vector(
+            vector, n, include_distances=True
+        )
+
+        if self.get_delta_n_items() > 0:
+            delta_ids, delta_distances = self._delta_index.get_nns_by_vector(
+                vector, n, include_distances=True
+            )
+            base_n_items = self._base_index.get_n_items()
+
+            ids = list(ids) + [base_n_items + delta_id for delta_id in delta_ids]
+            distances = list(distances) + list(delta_distances)
+
+            closest = sorted(range(len(ids)), key=lambda position: distances[position])[:n]
+
+            ids = [ids[position] for position in closest]
+            distances = [distances[position] for position in closest]
+
+        if include_distances:
+            return ids, distances
+
+        return ids
+
+    def save_delta_segment(self):
+        """Writes the delta segment to disk, replacing the previous file atomically."""
+        self._delta_index.save(self._delta_segment_full_path)
+
+    def unload(self):
+        self._base_index.unload()
+        self._delta_index.unload()
+
+
+def remove_delta_segment(database_full_path: str):
+    """Removes the delta segment of a vector database from disk, if it exists.
+
+    Args:
+        database_full_path (str): the full path to the 'ann' file of the vector database.
+    """
+    delta_segment_full_path = get_delta_segment_full_path(database_full_path)
+
+    if os.path.isfile(delta_segment_full_path):
+        os.remove(delta_segment_full_path)
@@ -35,33 +35,32 @@ def append_to_previous_json_memories_if_necessary(json_filename, memories):
     return memories
 
 
-def create_memory_dictionary(
-    memory_description: str,
-    current_timestamp: datetime,
-    ai_model_interface: AIModelInterface,
-):
-    """Creates a memory dict for the memory description passed
+MEMORY_IMPORTANCE_JUDGE_GPT_SYSTEM_CONTENT = "I am MemoryImportanceJudgeGPT. I have the responsibility of rating memories from 1 to 10 according to their importance."
+MEMORY_IMPORTANCE_RATING_INSTRUCTIONS = "On the scale of 1 to 10, where 1 is purely mundane (e.g., brushing teeth, making bed) "
+MEMORY_IMPORTANCE_RATING_INSTRUCTIONS += "and 10 is extremely poignant (e.g., a break up, college acceptance), rate the likely importance "
+
+
+def rate_importance_of_memory(
+    memory_description: str, ai_model_interface: AIModelInterface
+) -> float:
+    """Relies on the AI model to rate the importance of a single memory.
 
     Args:
         memory_description (str): the description of the memory
-        current_timestamp (datetime): the current timestamp
+        ai_model_interface (AIModelInterface): the interface to request responses from the AI model.
+
+    Raises:
+        FailedToReceiveFunctionCallFromAiModelError: if the AI model didn't answer with the function call.
 
     Returns:
-        dict: the data asociated with the memory, to store in a json file
+        float: the importance of the memory, normalized between 0 and 1.
     """
-    most_recent_access_timestamp = current_timestamp
-
-    recency = calculate_recency(
-        current_timestamp, most_recent_access_timestamp, DECAY_RATE
-    )
-
     messages = []
 
-    system_content = "I am MemoryImportanceJudgeGPT. I have the responsibility of rating memories from 1 to 10 according to their importance."
     messages.append(
         {
             "role": "system",
-            "content": system_content,
+            "content": MEMORY_IMPORTANCE_JUDGE_GPT_SYSTEM_CONTENT,
         }
     )
 
@@ -79,8 +78,7 @@ def create_memory_dictionary(
         ],
     )
 
-    user_prompt = "On the scale of 1 to 10, where 1 is purely mundane (e.g., brushing teeth, making bed) "
-    user_prompt += "and 10 is extremely poignant (e.g., a break up, college acceptance), rate the likely importance "
+    user_prompt = MEMORY_IMPORTANCE_RATING_INSTRUCTIONS
     user_prompt += "of the following piece of memory."
     user_prompt += f" Memory: {memory_description}"
 
@@ -96,12 +94,32 @@ def create_memory_dictionary(
     message = importance_response["choices"][0]["message"]
 
     if not message.get("function_call"):
-        error_message = f"In the function {create_memory_dictionary.__name__}, I failed to receive the function call with the rating from GPT: {message}"
+        error_message = f"In the function {rate_importance_of_memory.__name__}, I failed to receive the function call with the rating from GPT: {message}"
         raise FailedToReceiveFunctionCallFromAiModelError(error_message)
 
     function_arguments = json.loads(message["function_call"]["arguments"])
 
-    normalized_importance = normalize_value(function_arguments.get("rating"))
+    return normalize_value(function_arguments.get("rating"))
+
+
+def create_memory_dictionary_with_importance(
+    memory_description: str, current_timestamp: datetime, importance: float
+):
+    """Creates a memory dict for the memory description passed, whose importance has already been rated.
+
+    Args:
+        memory_description (str): the description of the memory
+        current_timestamp (datetime): the current timestamp
+        importance (float): the normalized importance of the memory
+
+    Returns:
+        dict: the data asociated with the memory, to store in a json file
+    """
+    most_recent_access_timestamp = current_timestamp
+
+    recency = calculate_recency(
+        current_timestamp, most_recent_access_timestamp, DECAY_RATE
+    )
 
     # We must create a whole memory dict.
     return {
@@ -109,10 +127,31 @@ def create_memory_dictionary(
         "creation_timestamp": current_timestamp.isoformat(),
         "most_recent_access_timestamp": most_recent_access_timestamp.isoformat(),
         "recency": recency,
-        "importance": normalized_importance,
+        "importance": importance,
     }
 
 
+def create_memory_dictionary(
+    memory_description: str,
+    current_timestamp: datetime,
+    ai_model_interface: AIModelInterface,
+):
+    """Creates a memory dict for the memory description passed
+
+    Args:
+        memory_description (str): the description of the memory
+        current_timestamp (datetime): the current timestamp
+
+    Returns:
+        dict: the data asociated with the memory, to store in a json file
+    """
+    return create_memory_dictionary_with_importance(
+        memory_description,
+        current_timestamp,
+        rate_importance_of_memory(memory_description, ai_model_interface),
+    )
+
+
 def format_json_memory_data_for_python(memories_raw_data):
     for memory_key in memories_raw_data:
         memories_raw_data[memory_key] = {
@@ -0,0 +1,285 @@
+"""This module contains the definition of MemoryService, which handles the operations on the memories databases
+of agents (create, query, update and flush), along with a local HTTP server that exposes those operations.
+A long-running service keeps the embedding model and the loaded vector databases resident, so every request
+only pays for the actual work instead of reloading everything from disk.
+"""
+from datetime import datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+from threading import Lock, RLock
+
+from defines.defines import (
+    MEMORY_SERVICE_CREATE_ENDPOINT,
+    MEMORY_SERVICE_FLUSH_ENDPOINT,
+    MEMORY_SERVICE_HOST,
+    MEMORY_SERVICE_PORT,
+    MEMORY_SERVICE_QUERY_ENDPOINT,
+    MEMORY_SERVICE_UPDATE_ENDPOINT,
+)
+from embeddings.embedding_provider import EMBEDDING_PROVIDER
+from paths.full_paths import (
+    get_base_memories_full_path,
+    get_base_memories_json_full_path,
+    get_seed_memories_full_path,
+)
+from vector_databases.access_timestamps_buffer import ACCESS_TIMESTAMPS_BUFFER
+from vector_databases.database_creator import DatabaseCreator
+from vector_databases.database_querier import DatabaseQuerier
+from vector_databases.database_updater import DatabaseUpdater
+from vector_databases.memory_store_registry import MEMORY_STORE_REGISTRY
+
+
+class MemoryService:
+    """Handles the operations on the memories databases of agents, keeping them resident in the memory store
+    registry. Operations on the same memories database are serialized, while different databases can be
+    operated on concurrently.
+    """
+
+    def __init__(self):
+        self._database_locks = {}
+        self._database_locks_lock = Lock()
+
+    def _get_database_lock(self, agent_name: str) -> RLock:
+        with self._database_locks_lock:
+            return self._database_locks.setdefault(agent_name, RLock())
+
+    def create(self, agent_name: str, current_timestamp: datetime):
+        """Creates the memories database of an agent from its seed memories, if it doesn't exist already.
+
+        Args:
+            agent_name (str): the name of the agent whose memories database will be created.
+            current_timestamp (datetime): the timestamp with which the memories database will be initialized.
+        """
+        with self._get_database_lock(agent_name):
+            DatabaseCreator().create_database(
+                agent_name,
+                current_timestamp,
+                get_base_memories_full_path(agent_name),
+                get_base_memories_json_full_path(agent_name),
+                get_seed_memories_full_path(agent_name),
+            )
+
+            MEMORY_STORE_REGISTRY.invalidate(agent_name)
+
+    def query(
+        self,
+        agent_name: str,
+        current_timestamp: datetime,
+        query: str,
+        number_of_results: int,
+    ) -> list[str]:
+        """Queries the memories database of an agent.
+
+        Args:
+            agent_name (str): the name of the agent whose memories database will be queried.
+            current_timestamp (datetime): the current timestamp.
+            query (str): the text with which the memories database will be queried.
+            number_of_results (int): how many relevant results will be returned.
+
+        Returns:
+            list[str]: the descriptions of the relevant memories.
+        """
+        database_full_path = get_base_memories_full_path(agent_name)
+        database_json_full_path = get_base_memories_json_full_path(agent_name)
+
+        with self._get_database_lock(agent_name):
+            with MEMORY_STORE_REGISTRY.borrow_memory_store(
+                agent_name, database_full_path, database_json_full_path
+            ) as (index, raw_data):
+                return DatabaseQuerier(
+                    current_timestamp,
+                    raw_data,
+                    index,
+                    database_full_path,
+                    database_json_full_path,
+                    DatabaseUpdater(
+                        current_timestamp, database_full_path, database_json_full_path
+                    ),
+                    MEMORY_STORE_REGISTRY.get_scoring_columns(agent_name),
+                ).query(query, number_of_results)
+
+    def update(
+        self, agent_name: str, current_timestamp: datetime, new_memories: list[str]
+    ):
+        """Adds new memories to the memories database of an agent.
+
+        Args:
+            agent_name (str): the name of the agent whose memories database will be updated.
+            current_timestamp (datetime): the timestamp with which the new memories will be created.
+            new_memories (list[str]): the descriptions of the new memories.
+        """
+        database_full_path = get_base_memories_full_path(agent_name)
+        database_json_full_path = get_base_memories_json_full_path(agent_name)
+
+        with self._get_database_lock(agent_name):
+            with MEMORY_STORE_REGISTRY.borrow_memory_store(
+                agent_name, database_full_path, database_json_full_path
+            ) as (index, _):
+                try:
+                    DatabaseUpdater(
+                        current_timestamp, database_full_path, database_json_full_path
+                    ).update_database_with_new_entries(new_memories, index)
+                finally:
+                    # The resident raw data doesn't contain the new memories, so it must be loaded again.
+                    MEMORY_STORE_REGISTRY.invalidate(agent_name)
+
+    def flush(self, agent_name: str | None = None):
+        """Writes to disk any buffered update of the most recent access timestamps.
+
+        Args:
+            agent_name (str | None): the name of the agent whose memories database will be flushed,
+                or None to flush every memories database.
+        """
+        if agent_name is None:
+            ACCESS_TIMESTAMPS_BUFFER.flush()
+            return
+
+        with self._get_database_lock(agent_name):
+            ACCESS_TIMESTAMPS_BUFFER.flush(get_base_memories_json_full_path(agent_name))
+
+
+def _get_required_argument(arguments: dict, name: str, expected_type: type):
+    if name not in arguments:
+        raise ValueError(f"The request is missing the argument '{name}'.")
+
+    value = arguments[name]
+
+    if not isinstance(value, expected_type) or isinstance(value, bool):
+        raise TypeError(
+            f"The argument '{name}' of the request should be of type '{expected_type.__name__}'. It was: {value}"
+        )
+
+    return value
+
+
+def _get_current_timestamp(arguments: dict) -> datetime:
+    return datetime.fromisoformat(
+        _get_required_argument(arguments, "current_timestamp", str)
+    )
+
+
+class MemoryServiceRequestHandler(BaseHTTPRequestHandler):
+    """Handles the HTTP requests of the memory service. Every request is a POST whose body is a json object,
+    and every response is a json object as well (with an 'error' key if the request failed).
+    """
+
+    memory_service = MemoryService()
+
+    def do_POST(self):
+        try:
+            content_length = int(self.headers.get("Content-Length", 0))
+            arguments = json.loads(self.rfile.read(content_length) or b"{}")
+
+            if not isinstance(arguments, dict):
+                raise TypeError("The body of the request should be a json object.")
+
+            response = self._handle_endpoint(arguments)
+
+            if response is None:
+                self._send_json(
+                    HTTPStatus.NOT_FOUND, {"error": f"Unknown endpoint: {self.path}"}
+                )
+                return
+
+            self._send_json(HTTPStatus.OK, response)
+        except FileNotFoundError as exception:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": str(exception)})
+        except (ValueError, TypeError) as exception:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(exception)})
+        except Exception as exception:
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(exception)})
+
+    def _handle_endpoint(self, arguments: dict) -> dict | None:
+        if self.path == MEMORY_SERVICE_CREATE_ENDPOINT:
+            self.memory_service.create(
+                _get_required_argument(arguments, "agent_name", str),
+                _get_current_timestamp(arguments),
+            )
+
+            return {}
+
+        if self.path == MEMORY_SERVICE_QUERY_ENDPOINT:
+            return {
+                "results": self.memory_service.query(
+                    _get_required_argument(arguments, "agent_name", str),
+                    _get_current_timestamp(arguments),
+                    _get_required_argument(arguments, "query", str),
+                    _get_required_argument(arguments, "number_of_results", int),
+                )
+            }
+
+        if self.path == MEMORY_SERVICE_UPDATE_ENDPOINT:
+            new_memories = _get_required_argument(arguments, "new_memories", list)
+
+            if not new_memories or not all(
+                isinstance(new_memory, str) for new_memory in new_memories
+            ):
+                raise ValueError(
+                    f"The argument 'new_memories' of the request should be a non-empty list of strings. It was: {new_memories}"
+                )
+
+            self.memory_service.update(
+                _get_required_argument(arguments, "agent_name", str),
+                _get_current_timestamp(arguments),
+                new_memories,
+            )
+
+            return {}
+
+        if self.path == MEMORY_SERVICE_FLUSH_ENDPOINT:
+            self.memory_service.flush(arguments.get("agent_name"))
+
+            return {}
+
+        return None
+
+    def _send_json(self, status: HTTPStatus, content: dict):
+        body = json.dumps(content).encode("utf-8")
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Every request would otherwise be logged to stderr, which is too noisy for a game server.
+        pass
+
+
+def create_memory_service_server(
+    host: str = MEMORY_SERVICE_HOST, port: int = MEMORY_SERVICE_PORT
+) -> ThreadingHTTPServer:
+    """Creates the HTTP server of the memory service, which serves every client in its own thread.
+    The embedding model gets loaded right away, so that the first request doesn't have to wait for it.
+
+    Args:
+        host (str): the host on which the server will listen. It should remain local.
+        port (int): the port on which the server will listen.
+
+    Returns:
+        ThreadingHTTPServer: the server, ready to 'serve_forever'.
+    """
+    EMBEDDING_PROVIDER.prewarm()
+
+    return ThreadingHTTPServer((host, port), MemoryServiceRequestHandler)
+
+
+def run_memory_service(host: str = MEMORY_SERVICE_HOST, port: int = MEMORY_SERVICE_PORT):
+    """Runs the memory service until interrupted, writing any buffered access update before exiting.
+
+    Args:
+        host (str): the host on which the server will listen. It should remain local.
+        port (int): the port on which the server will listen.
+    """
+    server = create_memory_service_server(host, port)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        ACCESS_TIMESTAMPS_BUFFER.flush()
+        MEMORY_STORE_REGISTRY.clear()
@@ -0,0 +1,143 @@
+"""This module contains the definition of MemoryServiceClient, a thin client of the memory service
+that sends the operations on the memories databases of agents to a running service.
+"""
+from datetime import datetime
+import json
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+from defines.defines import (
+    MEMORY_SERVICE_CREATE_ENDPOINT,
+    MEMORY_SERVICE_FLUSH_ENDPOINT,
+    MEMORY_SERVICE_QUERY_ENDPOINT,
+    MEMORY_SERVICE_TIMEOUT_SECONDS,
+    MEMORY_SERVICE_UPDATE_ENDPOINT,
+)
+from errors import MemoryServiceError
+
+
+class MemoryServiceClient:
+    """Sends the operations on the memories databases of agents to a running memory service."""
+
+    def __init__(
+        self, service_url: str, timeout_seconds: float = MEMORY_SERVICE_TIMEOUT_SECONDS
+    ):
+        """Creates an instance of the class MemoryServiceClient.
+
+        Args:
+            service_url (str): the url of the memory service, for example 'http://127.0.0.1:8765'.
+            timeout_seconds (float): how long to wait for the response to a request.
+        """
+        self._service_url = service_url.rstrip("/")
+        self._timeout_seconds = timeout_seconds
+
+    def _post(self, endpoint: str, arguments: dict) -> dict:
+        request = Request(
+            f"{self._service_url}{endpoint}",
+            data=json.dumps(arguments).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+
+        try:
+            with urlopen(request, timeout=self._timeout_seconds) as response:
+                return json.loads(response.read())
+        except HTTPError as exception:
+            try:
+                error = json.loads(exception.read()).get("error", exception.reason)
+            except ValueError:
+                error = exception.reason
+
+            raise MemoryServiceError(
+                f"The memory service at '{self._service_url}' failed to handle the request to '{endpoint}' ({exception.code}): {error}"
+            ) from exception
+        except URLError as exception:
+            raise MemoryServiceError(
+                f"Couldn't reach the memory service at '{self._service_url}': {exception.reason}"
+            ) from exception
+
+    def create(self, agent_name: str, current_timestamp: datetime):
+        """Creates the memories database of an agent from its seed memories, if it doesn't exist already.
+
+        Args:
+            agent_name (str): the name of the agent whose memories database will be created.
+            current_timestamp (datetime): the timestamp with which the memories database will be initialized.
+
+        Raises:
+            MemoryServiceError: if the memory service couldn't be reached or failed to handle the request.
+        """
+        self._post(
+            MEMORY_SERVICE_CREATE_ENDPOINT,
+            {
+                "agent_name": agent_name,
+                "current_timestamp": current_timestamp.isoformat(),
+            },
+        )
+
+    def query(
+        self,
+        agent_name: str,
+        current_timestamp: datetime,
+        query: str,
+        number_of_results: int,
+    ) -> list[str]:
+        """Queries the memories database of an agent.
+
+        Args:
+            agent_name (str): the name of the agent whose memories database will be queried.
+            current_timestamp (datetime): the current timestamp.
+            query (str): the text with which the memories database will be queried.
+            number_of_results (int): how many relevant results will be returned.
+
+        Raises:
+            MemoryServiceError: if the memory service couldn't be reached or failed to handle the request.
+
+        Returns:
+            list[str]: the descriptions of the relevant memories.
+        """
+        return self._post(
+            MEMORY_SERVICE_QUERY_ENDPOINT,
+            {
+                "agent_name": agent_name,
+                "current_timestamp": current_timestamp.isoformat(),
+                "query": query,
+                "number_of_results": number_of_results,
+            },
+        )["results"]
+
+    def update(
+        self, agent_name: str, current_timestamp: datetime, new_memories: list[str]
+    ):
+        """Adds new memories to the memories database of an agent.
+
+        Args:
+            agent_name (str): the name of the agent whose memories database will be updated.
+            current_timestamp (datetime): the timestamp with which the new memories will be created.
+            new_memories (list[str]): the descriptions of the new memories.
+
+        Raises:
+            MemoryServiceError: if the memory service couldn't be reached or failed to handle the request.
+        """
+        self._post(
+            MEMORY_SERVICE_UPDATE_ENDPOINT,
+            {
+                "agent_name": agent_name,
+                "current_timestamp": current_timestamp.isoformat(),
+                "new_memories": new_memories,
+            },
+        )
+
+    def flush(self, agent_name: str | None = None):
+        """Makes the memory service write to disk any buffered update of the most recent access timestamps.
+
+        Args:
+            agent_name (str | None): the name of the agent whose memories database will be flushed,
+                or None to flush every memories database.
+
+        Raises:
+            MemoryServiceError: if the memory service couldn't be reached or failed to handle the request.
+        """
+        self._post(
+            MEMORY_SERVICE_FLUSH_ENDPOINT,
+            {} if agent_name is None else {"agent_name": agent_name},
+        )
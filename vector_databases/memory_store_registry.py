@@ -0,0 +1,259 @@
+"""This module contains the definition of MemoryStoreRegistry, a process-wide cache that keeps the loaded
+vector databases (the index along with its paired raw data) resident between queries.
+"""
+from collections import OrderedDict
+from contextlib import contextmanager
+import os
+from threading import RLock
+from typing import Iterator, Tuple
+
+from defines.defines import MAX_OPEN_MEMORY_STORES
+from vector_databases.access_timestamps_buffer import ACCESS_TIMESTAMPS_BUFFER
+from vector_databases.columnar_metadata import get_columnar_metadata_full_path
+from vector_databases.database_loader import DatabaseLoader
+from vector_databases.incremental_index import (
+    IncrementalIndex,
+    get_delta_segment_full_path,
+)
+from vector_databases.scoring_columns import ScoringColumns
+
+
+def _determine_file_signature(full_path: str) -> Tuple[float, int] | None:
+    """Determines the signature (modification time and size) of a file.
+
+    Args:
+        full_path (str): the full path to the file.
+
+    Returns:
+        Tuple[float, int] | None: the modification time and size of the file, or None if the file doesn't exist.
+    """
+    try:
+        stat_result = os.stat(full_path)
+    except OSError:
+        return None
+
+    return stat_result.st_mtime_ns, stat_result.st_size
+
+
+class _MemoryStoreEntry:
+    def __init__(
+        self,
+        index: IncrementalIndex,
+        raw_data: dict,
+        database_full_path: str,
+        database_json_full_path: str,
+    ):
+        self.index = index
+        self.raw_data = raw_data
+        self.database_full_path = database_full_path
+        self.database_json_full_path = database_json_full_path
+        self.signature = self.determine_current_signature()
+        self.scoring_columns = None
+        self.number_of_borrowers = 0
+        self.is_removed = False
+
+    def determine_current_signature(self):
+        return (
+            _determine_file_signature(self.database_full_path),
+            _determine_file_signature(self.database_json_full_path),
+            _determine_file_signature(
+                get_delta_segment_full_path(self.database_full_path)
+            ),
+            _determine_file_signature(
+                get_columnar_metadata_full_path(self.database_json_full_path)
+            ),
+        )
+
+    def is_stale(self) -> bool:
+        return self.signature != self.determine_current_signature()
+
+
+class MemoryStoreRegistry:
+    """Keeps the loaded vector databases resident, keyed by database name (usually the name of an agent).
+    The entries are invalidated whenever the files on disk change, and only a bounded amount of them
+    is kept open at any given time (the least recently used ones get unloaded first). An entry that gets
+    removed while borrowed is only unloaded once its last borrower returns it.
+    """
+
+    def __init__(self, max_open_memory_stores: int = MAX_OPEN_MEMORY_STORES):
+        """Creates an instance of the class MemoryStoreRegistry.
+
+        Args:
+            max_open_memory_stores (int): how many vector databases can remain loaded at the same time.
+
+        Raises:
+            ValueError: if 'max_open_memory_stores' isn't greater than zero.
+        """
+        if not max_open_memory_stores > 0:
+            raise ValueError(
+                f"The class {MemoryStoreRegistry.__name__} expected 'max_open_memory_stores' to be greater than zero, but it was: {max_open_memory_stores}"
+            )
+
+        self._max_open_memory_stores = max_open_memory_stores
+        self._entries = OrderedDict()
+        self._lock = RLock()
+
+    @contextmanager
+    def borrow_memory_store(
+        self,
+        database_name: str,
+        database_full_path: str,
+        database_json_full_path: str,
+    ) -> Iterator[Tuple[IncrementalIndex, dict]]:
+        """Lends the loaded vector database for the passed name for the duration of the block, loading it
+        from disk only if it wasn't resident already or if the files on disk have changed since it was loaded.
+        The index remains loaded until the block exits, even if the registry evicts it in the meantime.
+        Note: the lent index belongs to the registry, so callers must not unload it.
+
+        Args:
+            database_name (str): the name of the vector database (usually the name of an agent).
+            database_full_path (str): the full path to the 'ann' file of the vector database.
+            database_json_full_path (str): the full path to the 'json' file of the vector database.
+
+        Yields:
+            IncrementalIndex, dict: the index of the vector database, along with the paired raw data.
+        """
+        entry = self._acquire_entry(
+            database_name, database_full_path, database_json_full_path
+        )
+
+        try:
+            yield entry.index, entry.raw_data
+        finally:
+            self._release_entry(entry)
+
+    def _acquire_entry(
+        self,
+        database_name: str,
+        database_full_path: str,
+        database_json_full_path: str,
+    ) -> _MemoryStoreEntry:
+        with self._lock:
+            entry = self._entries.get(database_name)
+
+            if entry is not None and (
+                entry.database_full_path != database_full_path
+                or entry.database_json_full_path != database_json_full_path
+                or entry.is_stale()
+            ):
+                self._remove_entry(database_name)
+                entry = None
+
+            if entry is None:
+                index, raw_data = DatabaseLoader(
+                    database_name, database_full_path, database_json_full_path
+                ).load()
+
+                entry = _MemoryStoreEntry(
+                    index, raw_data, database_full_path, database_json_full_path
+                )
+                self._entries[database_name] = entry
+
+                self._evict_least_recently_used_entries()
+            else:
+                self._entries.move_to_end(database_name)
+
+            entry.number_of_borrowers += 1
+
+            return entry
+
+    def _release_entry(self, entry: _MemoryStoreEntry):
+        with self._lock:
+            entry.number_of_borrowers -= 1
+
+            if entry.is_removed and entry.number_of_borrowers == 0:
+                entry.index.unload()
+
+    def get_scoring_columns(self, database_name: str) -> ScoringColumns | None:
+        """Returns the scoring columns of a resident vector database, building them the first time.
+
+        Args:
+            database_name (str): the name of the vector database.
+
+        Returns:
+            ScoringColumns | None: the recency and importance of every entry, or None if the vector database isn't resident.
+        """
+        with self._lock:
+            entry = self._entries.get(database_name)
+
+            if entry is None:
+                return None
+
+            if entry.scoring_columns is None:
+                entry.scoring_columns = ScoringColumns.from_raw_data(entry.raw_data)
+
+            return entry.scoring_columns
+
+    def acknowledge_write(self, database_name: str):
+        """Signals the registry that the files of a resident vector database have been written
+        from the data that the registry holds in memory, so the entry shouldn't be considered stale.
+
+        Args:
+            database_name (str): the name of the vector database that was written to disk.
+        """
+        with self._lock:
+            entry = self._entries.get(database_name)
+
+            if entry is not None:
+                entry.signature = entry.determine_current_signature()
+
+    def acknowledge_write_of_raw_data(self, database_json_full_path: str, raw_data: dict):
+        """Signals the registry that a json file has been written from the passed raw data. If that raw data
+        is the one that the registry holds for the vector database, the entry remains current.
+
+        Args:
+            database_json_full_path (str): the full path to the json file that was written.
+            raw_data (dict): the raw data that was written to the json file.
+        """
+        with self._lock:
+            for database_name, entry in self._entries.items():
+                if (
+                    entry.database_json_full_path == database_json_full_path
+                    and entry.raw_data is raw_data
+                ):
+                    self.acknowledge_write(database_name)
+
+    def invalidate(self, database_name: str):
+        """Removes a vector database from the registry, unloading its index once nobody borrows it.
+
+        Args:
+            database_name (str): the name of the vector database to invalidate.
+        """
+        with self._lock:
+            if database_name in self._entries:
+                self._remove_entry(database_name)
+
+    def clear(self):
+        """Removes every vector database from the registry, unloading their indexes once nobody borrows them."""
+        with self._lock:
+            for database_name in list(self._entries):
+                self._remove_entry(database_name)
+
+    def get_number_of_open_memory_stores(self) -> int:
+        """Returns how many vector databases are currently resident.
+
+        Returns:
+            int: the number of resident vector databases.
+        """
+        with self._lock:
+            return len(self._entries)
+
+    def _remove_entry(self, database_name: str):
+        entry = self._entries.pop(database_name)
+        entry.is_removed = True
+
+        # A borrowed index gets unloaded by its last borrower instead.
+        if entry.number_of_borrowers == 0:
+            entry.index.unload()
+
+    def _evict_least_recently_used_entries(self):
+        while len(self._entries) > self._max_open_memory_stores:
+            self._remove_entry(next(iter(self._entries)))
+
+
+MEMORY_STORE_REGISTRY = MemoryStoreRegistry()
+
+# The registry's own raw data is what the access timestamps buffer writes, so those writes don't make it stale.
+ACCESS_TIMESTAMPS_BUFFER.add_flush_listener(
+    MEMORY_STORE_REGISTRY.acknowledge_write_of_raw_data
+)
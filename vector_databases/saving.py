@@ -1,41 +1,63 @@
 from datetime import datetime
 import json
+import os
 
-from annoy import AnnoyIndex
+from defines.defines import EMBEDDING_BATCH_SIZE
+from llms.interface import AIModelInterface
 from vector_databases.creation import create_vector_database
 from vector_databases.jsonification import append_to_previous_json_memories_if_necessary
-from vector_databases.validation import ensure_parity_between_databases
+from vector_databases.validation import ensure_parity_with_number_of_items
+from vector_databases.vector_index import VectorIndex
 
-from vector_databases.vectorization import create_vectorized_memory
+from vector_databases.vectorization import create_vectorized_memories
 
 
-def save_memories_to_json_file_ensuring_parity(
-    memories_json_full_path: str, memories: dict, new_index: AnnoyIndex
+def save_memories_to_json_file(
+    memories_json_full_path: str, memories: dict, number_of_items: int
 ):
-    # Save the memories dictionary to a json file.
-    with open(memories_json_full_path, "w", encoding="utf8") as json_file:
-        json.dump(memories, json_file)
+    """Saves the memories to a json file, after ensuring that there are as many memories as items in the index.
+    The file is replaced atomically, so readers never see a half-written json file.
 
+    Args:
+        memories_json_full_path (str): the full path to the json file.
+        memories (dict): the memories in json-ready format.
+        number_of_items (int): how many items the paired index contains.
+    """
     # ensure that there is parity between the length of both the json and the index database.
-    with open(memories_json_full_path, "r", encoding="utf8") as json_file:
-        ensure_parity_between_databases(json.load(json_file), new_index)
+    ensure_parity_with_number_of_items(
+        {str(memory_key) for memory_key in memories}, number_of_items
+    )
+
+    temporary_full_path = f"{memories_json_full_path}.tmp"
+
+    with open(temporary_full_path, "w", encoding="utf8") as json_file:
+        json.dump(memories, json_file)
+
+    os.replace(temporary_full_path, memories_json_full_path)
+
+
+def save_memories_to_json_file_ensuring_parity(
+    memories_json_full_path: str, memories: dict, new_index: VectorIndex
+):
+    save_memories_to_json_file(
+        memories_json_full_path, memories, new_index.get_n_items()
+    )
 
 
 def save_memories(
     current_timestamp: datetime,
     new_memories: list[str],
-    new_index: AnnoyIndex,
+    new_index: VectorIndex,
     memories_full_path: str,
     memories_json_full_path: str,
+    batch_size: int = EMBEDDING_BATCH_SIZE,
+    importance_judge: AIModelInterface | None = None,
 ):
-    memories = {}
-
-    for memory_description in new_memories:
-        vector_index, memory = create_vectorized_memory(
-            memory_description, current_timestamp, new_index
-        )
-
-        memories.update({vector_index: memory})
+    # All the new memories get encoded together, instead of paying the per-call overhead
+    # of the embedding model once per memory.
+    memories = create_vectorized_memories(
+        new_memories, current_timestamp, new_index, batch_size, importance_judge
+    )
 
     create_vector_database(memories_full_path, new_index)
 
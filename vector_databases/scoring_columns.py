@@ -0,0 +1,62 @@
+"""This module contains the definition of ScoringColumns, which keeps the recency and importance of every entry
+of a vector database as NumPy arrays aligned to the ids of the index, so that query results can be scored at once.
+"""
+from typing import Dict, Tuple
+
+import numpy as np
+
+from vector_databases.columnar_metadata import ColumnarMemoryMetadata
+
+
+class ScoringColumns:
+    """Holds the recency and importance of every entry of a vector database, aligned to the ids of its index."""
+
+    def __init__(self, recencies: np.ndarray, importances: np.ndarray):
+        if recencies.shape != importances.shape:
+            raise ValueError(
+                f"The class {ScoringColumns.__name__} expected 'recencies' and 'importances' to have the same shape, but they were: {recencies.shape} and {importances.shape}"
+            )
+
+        self._recencies = recencies
+        self._importances = importances
+
+    @classmethod
+    def from_raw_data(cls, raw_data: dict) -> "ScoringColumns":
+        """Creates the columns from the raw data of a vector database (the content of the json file).
+
+        Args:
+            raw_data (dict): the raw data of the vector database, keyed by the stringified ids of the index.
+
+        Returns:
+            ScoringColumns: the columns with the recency and importance of every entry.
+        """
+        # Columnar metadata already keeps these columns, so they can be used without copying them.
+        if isinstance(raw_data, ColumnarMemoryMetadata):
+            return cls(raw_data.get_recencies(), raw_data.get_importances())
+
+        recencies = np.zeros(len(raw_data), dtype=np.float64)
+        importances = np.zeros(len(raw_data), dtype=np.float64)
+
+        for key, entry in raw_data.items():
+            recencies[int(key)] = entry.get("recency", 0.0)
+            importances[int(key)] = entry.get("importance", 0.0)
+
+        return cls(recencies, importances)
+
+    def get_number_of_entries(self) -> int:
+        return len(self._recencies)
+
+    def get_recencies(self) -> np.ndarray:
+        return self._recencies
+
+    def get_importances(self) -> np.ndarray:
+        return self._importances
+
+    def update_recencies(self, accesses: Dict[str, Tuple[float, object]]):
+        """Updates the recencies of the entries that were accessed by a query.
+
+        Args:
+            accesses (Dict[str, Tuple[float, object]]): the new recency (along with the access timestamp), keyed by entry.
+        """
+        for key, (recency, _) in accesses.items():
+            self._recencies[int(key)] = recency
@@ -1,8 +1,12 @@
 from errors import DisparityBetweenDatabasesError
 
 
-def ensure_parity_between_databases(memories_raw_data, index):
-    if index.get_n_items() != len(memories_raw_data):
+def ensure_parity_with_number_of_items(memories_raw_data, number_of_items: int):
+    if number_of_items != len(memories_raw_data):
         raise DisparityBetweenDatabasesError(
-            f"The length of the index contents ({index.get_n_items()}) doesn't match the length of the raw memory data ({len(memories_raw_data)})"
+            f"The length of the index contents ({number_of_items}) doesn't match the length of the raw memory data ({len(memories_raw_data)})"
         )
+
+
+def ensure_parity_between_databases(memories_raw_data, index):
+    ensure_parity_with_number_of_items(memories_raw_data, index.get_n_items())
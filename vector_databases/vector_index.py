@@ -0,0 +1,41 @@
+"""This module contains the definition of VectorIndex, the interface that every backend of the vector databases
+implements. It mirrors the subset of the AnnoyIndex API that the library relies on.
+"""
+from abc import ABC, abstractmethod
+from typing import List, Tuple
+
+
+class VectorIndex(ABC):
+    @abstractmethod
+    def add_item(self, i: int, vector):
+        pass
+
+    @abstractmethod
+    def build(self, n_trees: int):
+        pass
+
+    @abstractmethod
+    def save(self, full_path: str):
+        pass
+
+    @abstractmethod
+    def load(self, full_path: str):
+        pass
+
+    @abstractmethod
+    def unload(self):
+        pass
+
+    @abstractmethod
+    def get_n_items(self) -> int:
+        pass
+
+    @abstractmethod
+    def get_item_vector(self, i: int) -> List[float]:
+        pass
+
+    @abstractmethod
+    def get_nns_by_vector(
+        self, vector, n: int, include_distances: bool = False
+    ) -> List[int] | Tuple[List[int], List[float]]:
+        pass
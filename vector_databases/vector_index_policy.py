@@ -0,0 +1,65 @@
+"""This module decides which backend handles each vector database: an exact search for small stores,
+and approximate nearest neighbors through Annoy for large ones.
+"""
+from defines.defines import EXACT_VECTOR_INDEX_MAX_ITEMS
+from vector_databases.annoy_vector_index import AnnoyVectorIndex
+from vector_databases.exact_vector_index import NUMPY_FILE_MAGIC, ExactVectorIndex
+from vector_databases.vector_index import VectorIndex
+
+
+def create_vector_index(expected_number_of_items: int) -> VectorIndex:
+    """Creates an empty vector index, with the backend that suits the expected size of the store.
+
+    Args:
+        expected_number_of_items (int): how many items the index will hold once built.
+
+    Returns:
+        VectorIndex: an ExactVectorIndex for small stores, or an AnnoyVectorIndex for large ones.
+    """
+    if expected_number_of_items <= EXACT_VECTOR_INDEX_MAX_ITEMS:
+        return ExactVectorIndex()
+
+    return AnnoyVectorIndex()
+
+
+def load_vector_index(full_path: str) -> VectorIndex:
+    """Loads a vector index from disk, recognizing its backend from the content of the file.
+
+    Args:
+        full_path (str): the full path to the file of the vector index.
+
+    Raises:
+        OSError: if the file can't be read.
+
+    Returns:
+        VectorIndex: the loaded vector index.
+    """
+    with open(full_path, "rb") as file:
+        magic = file.read(len(NUMPY_FILE_MAGIC))
+
+    index = ExactVectorIndex() if magic == NUMPY_FILE_MAGIC else AnnoyVectorIndex()
+
+    index.load(full_path)
+
+    return index
+
+
+def build_compacted_vector_index(
+    index: VectorIndex, expected_number_of_items: int
+) -> VectorIndex:
+    """Copies every vector of an index (including those in a delta segment) into a new, unbuilt index
+    whose backend suits the expected size of the store.
+
+    Args:
+        index (VectorIndex): the index whose vectors will be copied.
+        expected_number_of_items (int): how many items the new index will hold once built.
+
+    Returns:
+        VectorIndex: a new index with the same items, ready to receive more items before being built.
+    """
+    new_index = create_vector_index(expected_number_of_items)
+
+    for i in range(index.get_n_items()):
+        new_index.add_item(i, index.get_item_vector(i))
+
+    return new_index
@@ -1,33 +1,82 @@
 from datetime import datetime
+from typing import List
 
-from annoy import AnnoyIndex
-
-from defines.defines import MODEL
+from defines.defines import EMBEDDING_BATCH_SIZE
+from embeddings.embedding_provider import EMBEDDING_PROVIDER
 from llms.gpt_responder import GPTResponder
-from vector_databases.jsonification import create_memory_dictionary
+from llms.interface import AIModelInterface
+from vector_databases.importance_rating import rate_importance_of_memories
+from vector_databases.jsonification import create_memory_dictionary_with_importance
+from vector_databases.vector_index import VectorIndex
 
 
-def create_vectorized_memory(
-    memory_description: str,
-    current_timestamp: datetime,
-    index: AnnoyIndex,
-):
-    """Creates a vectorized memory of a memory description
+def add_vectorized_memories_to_index(
+    memory_descriptions: List[str],
+    index: VectorIndex,
+    batch_size: int = EMBEDDING_BATCH_SIZE,
+) -> List[int]:
+    """Encodes all the memory descriptions in a single batched call to the embedding model,
+    and then adds the resulting vectors to the index.
 
     Args:
-        memory_description (str): the description of the memory, in natural English
-        current_timestamp (datetime): the current timestamp
-        index (AnnoyIndex): the index of the 'annoy' library
+        memory_descriptions (List[str]): the descriptions of the memories, in natural English.
+        index (VectorIndex): the vector index that will receive the memories.
+        batch_size (int): how many descriptions the embedding model will encode at once.
 
     Returns:
-        AnnoyIndex, dict: the index of the vector database, as well as a dict with the json-ready data of the memory
+        List[int]: the indexes in the vector database that were assigned to each memory, in the same order.
     """
-    vector_index = index.get_n_items()
+    if not memory_descriptions:
+        return []
+
+    first_vector_index = index.get_n_items()
+
+    embeddings = EMBEDDING_PROVIDER.encode(memory_descriptions, batch_size=batch_size)
+
+    vector_indexes = []
+
+    for offset, embedding in enumerate(embeddings):
+        index.add_item(first_vector_index + offset, embedding)
+        vector_indexes.append(first_vector_index + offset)
+
+    return vector_indexes
+
 
-    index.add_item(vector_index, MODEL.encode(memory_description))
+def create_vectorized_memories(
+    memory_descriptions: List[str],
+    current_timestamp: datetime,
+    index: VectorIndex,
+    batch_size: int = EMBEDDING_BATCH_SIZE,
+    importance_judge: AIModelInterface | None = None,
+) -> dict:
+    """Creates the vectorized memories of several memory descriptions, encoding all of them in batches
+    and rating their importance in chunks.
+
+    Args:
+        memory_descriptions (List[str]): the descriptions of the memories, in natural English.
+        current_timestamp (datetime): the current timestamp.
+        index (VectorIndex): the vector index that will receive the memories.
+        batch_size (int): how many descriptions the embedding model will encode at once.
+        importance_judge (AIModelInterface | None): the AI model that rates the importance of the memories.
+            If None, GPT is used.
+
+    Returns:
+        dict: the json-ready data of every memory, keyed by its index in the vector database.
+    """
+    vector_indexes = add_vectorized_memories_to_index(
+        memory_descriptions, index, batch_size
+    )
 
-    memory = create_memory_dictionary(
-        memory_description, current_timestamp, GPTResponder()
+    importances = rate_importance_of_memories(
+        memory_descriptions,
+        importance_judge if importance_judge is not None else GPTResponder(),
     )
 
-    return vector_index, memory
+    return {
+        vector_index: create_memory_dictionary_with_importance(
+            memory_description, current_timestamp, importance
+        )
+        for vector_index, memory_description, importance in zip(
+            vector_indexes, memory_descriptions, importances
+        )
+    }